@@ -7,9 +7,9 @@ import sys
 import os
 import random
 import math
-sys.path.append('src')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from routes.casino_api import evaluate_slots, spin_reels
+from src.services.slot_engine import evaluate as evaluate_slots, spin as spin_reels
 
 def analyze_rtp_and_hit_rate(num_spins=100000):
     """Analyze RTP and hit rate for 20-payline slots"""
@@ -47,7 +47,7 @@ def analyze_rtp_and_hit_rate(num_spins=100000):
         total_spins += 1
         
         # Spin the reels
-        reels = spin_reels(target_rtp=0.96)
+        reels = spin_reels()
         
         # Evaluate the spin
         payout, wins = evaluate_slots(reels, stake)
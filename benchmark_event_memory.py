@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Cached Event Memory Benchmark
+Retained memory of 10k pre-match events held as API dicts (the old live odds cache)
+vs compact OddsEvent objects (models/odds_event.py), and a check that
+OddsEvent.to_dict() reproduces the dicts exactly (serialized, so price strings
+must match character for character)
+
+Matches are the synthetic GoalServe fixtures from benchmark_market_extraction.py,
+round-tripped through JSON so strings aren't shared the way they would never be in
+a parsed feed; team and league names repeat across events as they do in real feeds.
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_market_extraction import synthetic_matches
+from src.live_odds_cache_service import event_start_ts
+from src.models.odds_event import OddsEvent
+from src.services.market_extractors import get_odds_extractor
+
+SPORTS = ('soccer', 'basketball', 'tennis', 'hockey', 'baseball', 'cricket', 'football', 'rugby')
+EVENTS = 10_000
+
+
+def build_feed_text():
+    rng = random.Random(3)
+    per_sport = EVENTS // len(SPORTS)
+    feed = {}
+    for sport in SPORTS:
+        matches = synthetic_matches(sport, count=per_sport)
+        for match in matches:
+            match['localteam']['name'] = f'{sport} team {rng.randrange(300)}'
+            match['awayteam']['name'] = f'{sport} team {rng.randrange(300)}'
+            match['category'] = {'name': f'{sport} league {rng.randrange(40)}'}
+            match['formatted_date'] = f'{rng.randint(1, 28):02d}.01.2030'
+        feed[sport] = matches
+    return json.dumps(feed)
+
+
+def event_dict(match, sport):
+    """The dict LiveOddsCacheService._parse_match_to_event builds (localteam/awayteam shape)"""
+    return {
+        'id': match.get('id', ''),
+        'sport': sport,
+        'status': match.get('status', 'Not Started'),
+        'time': match.get('time', ''),
+        'date': match.get('formatted_date', '') or match.get('date', ''),
+        'formatted_date': match.get('formatted_date', ''),
+        'league': match['category']['name'],
+        'home_team': match['localteam']['name'],
+        'away_team': match['awayteam']['name'],
+        'odds': get_odds_extractor(sport)(match) or {},
+    }
+
+
+def retained(feed_text, build):
+    """Bytes still allocated once the parsed feed is gone and only the cache remains"""
+    gc.collect()
+    tracemalloc.start()
+    feed = json.loads(feed_text)
+    cache = [build(event_dict(match, sport)) for sport, matches in feed.items() for match in matches]
+    del feed
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return cache, size
+
+
+def serialized(event):
+    """The JSON the API sends for an event (key order aside)"""
+    return json.dumps(event, sort_keys=True)
+
+
+def main():
+    feed_text = build_feed_text()
+    dicts, dict_bytes = retained(feed_text, lambda event: event)
+    compact, compact_bytes = retained(feed_text, lambda event: OddsEvent.from_dict(event, event_start_ts(event)))
+
+    print(f"{len(dicts)} events")
+    print(f"dict events     {dict_bytes / 1024 / 1024:8.1f} MB  ({dict_bytes / len(dicts):7.0f} B/event)")
+    print(f"OddsEvent       {compact_bytes / 1024 / 1024:8.1f} MB  ({compact_bytes / len(compact):7.0f} B/event)")
+    print(f"reduction       {dict_bytes / compact_bytes:8.1f}x")
+    identical = all(serialized(e.to_dict()) == serialized(d) for e, d in zip(compact, dicts))
+    print(f"to_dict() matches the dict events: {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Pre-match Feed Streaming Benchmark
+Compares peak memory and time of json.load against utils/json_stream.iter_feed_matches
+on a synthetic GoalServe-shaped feed (or a real one passed as an argument), and checks
+both yield the same (category, match) pairs
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.json_stream import iter_feed_matches, iter_feed_matches_from_data
+
+
+def build_feed(categories=400, matches_per_category=50):
+    """Synthetic feed: odds_data.scores.categories[].matches[] with a few markets each"""
+    rng = random.Random(42)
+    feed = {'odds_data': {'scores': {'sport': 'baseball', 'categories': []}}}
+    for c in range(categories):
+        matches = []
+        for m in range(matches_per_category):
+            markets = []
+            for t in range(12):
+                markets.append({
+                    'id': str(t + 1), 'value': f'Market {t}',
+                    'bookmakers': [{'name': 'bet365', 'odds': [
+                        {'name': 'Home', 'value': f'{rng.uniform(1.1, 5):.2f}'},
+                        {'name': 'Away', 'value': f'{rng.uniform(1.1, 5):.2f}'},
+                    ]}],
+                })
+            matches.append({
+                'id': f'{c}{m:04d}', 'status': '18:30', 'date': '01.01.2030', 'time': '18:30',
+                'localteam': {'name': f'Home {c}-{m}'}, 'awayteam': {'name': f'Away {c}-{m}'},
+                'odds': {'type': markets},
+            })
+        feed['odds_data']['scores']['categories'].append(
+            {'id': str(c), 'name': f'League {c}', 'matches': matches})
+    return feed
+
+
+def measure(label, fn):
+    # Timed without tracemalloc (it slows allocation-heavy code unevenly), then traced
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<12} {count:>8} matches  {elapsed:6.2f}s  peak {peak / 1024 / 1024:8.1f} MB")
+    return count
+
+
+def main():
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+        cleanup = False
+    else:
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(build_feed(), f)
+        cleanup = True
+
+    try:
+        print(f"Feed: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+        def full_load():
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return sum(1 for _ in iter_feed_matches_from_data(data))
+
+        def streamed():
+            return sum(1 for _ in iter_feed_matches(path))
+
+        loaded = measure('json.load', full_load)
+        streamed_count = measure('streaming', streamed)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            expected = list(iter_feed_matches_from_data(json.load(f)))
+        identical = expected == list(iter_feed_matches(path))
+        print(f"Counts match: {loaded == streamed_count}, identical output: {identical}")
+    finally:
+        if cleanup:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
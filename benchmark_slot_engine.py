@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Slot Engine Benchmark
+Compares spins/sec of the original per-request slot code against services/slot_engine.py
+and verifies both produce identical reels, wins and payouts for the same seed
+"""
+
+import io
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.services import slot_engine
+
+
+def legacy_spin_reels(target_rtp):
+    """Original spin_reels from casino_api.py (rebuilds the reel strip per spin)"""
+    reel_strip = []
+    reel_strip.extend(['💎'] * 1)
+    reel_strip.extend(['🍒'] * 7)
+    reel_strip.extend(['🍌'] * 7)
+    reel_strip.extend(['🍊'] * 7)
+    reel_strip.extend(['🍇'] * 7)
+    reel_strip.extend(['🍓'] * 19)
+    reel_strip.extend(['🍎'] * 18)
+    reel_strip.extend(['🥝'] * 17)
+    reel_strip.extend(['🍑'] * 17)
+    assert len(reel_strip) == 100
+
+    reels = []
+    for _ in range(5):
+        reel = []
+        for _ in range(3):
+            reel.append(random.choice(reel_strip))
+        reels.append(reel)
+    return reels
+
+
+def legacy_evaluate_slots(reels, stake):
+    """Original evaluate_slots from casino_api.py (tables and helpers rebuilt per call)"""
+    if not reels or len(reels) != 5:
+        return 0, []
+
+    print(f"🎰 Evaluating reels: {reels}")
+    print(f"🎰 Stake: {stake}")
+
+    LINES = [
+        [0,0,0,0,0], [1,1,1,1,1], [2,2,2,2,2], [0,0,0,1,2], [2,2,2,1,0],
+        [0,1,2,1,0], [2,1,0,1,2], [0,0,1,2,2], [2,2,1,0,0], [1,0,0,0,1],
+        [1,2,2,2,1], [0,1,1,1,0], [2,1,1,1,2], [1,1,0,1,1], [1,1,2,1,1],
+        [0,1,0,1,0], [2,1,2,1,2], [0,2,0,2,0], [2,0,2,0,2], [0,2,1,0,2]
+    ]
+    PAYTABLE = {
+        'diamond': {3: 81.0, 4: 400.0, 5: 4200.0},
+        'high': {3: 33.0, 4: 160.0, 5: 1005.0},
+        'medium': {3: 17.0, 4: 66.0, 5: 505.0}
+    }
+    ROYAL_PAYOUT = 2000.0
+    ROYAL_SEQUENCE = ['🍒', '🍌', '🍊', '🍇', '🍓']
+
+    def get_symbol_bucket(symbol):
+        if symbol == '💎':
+            return 'diamond'
+        elif symbol in ['🍒', '🍌', '🍊', '🍇']:
+            return 'high'
+        else:
+            return 'medium'
+
+    def longest_prefix_match(seq):
+        if not seq:
+            return 0
+        k = 1
+        for i in range(1, len(seq)):
+            if seq[i] == seq[0]:
+                k += 1
+            else:
+                break
+        return k
+
+    total_payout = 0.0
+    wins = []
+    line_bet = stake / 20.0
+
+    for line_idx, line in enumerate(LINES):
+        seq = [reels[reel][line[reel]] for reel in range(5)]
+        if line_idx == 1 and seq == ROYAL_SEQUENCE:
+            payout = line_bet * ROYAL_PAYOUT
+            total_payout += payout
+            wins.append({"symbol": "royal_sequence", "count": 5, "payout": payout,
+                         "line": "line_2_royal", "multiplier": ROYAL_PAYOUT})
+            print(f"🎰 Line {line_idx+1}: Royal Sequence = {payout:.2f} ({ROYAL_PAYOUT}x)")
+        else:
+            k = longest_prefix_match(seq)
+            if k >= 3:
+                symbol = seq[0]
+                multiplier = PAYTABLE[get_symbol_bucket(symbol)][k]
+                payout = line_bet * multiplier
+                total_payout += payout
+                wins.append({"symbol": symbol, "count": k, "payout": payout,
+                             "line": f"line_{line_idx+1}", "multiplier": multiplier})
+                print(f"🎰 Line {line_idx+1}: {symbol} {k} of a kind = {payout:.2f} ({multiplier}x)")
+
+    print(f"🎰 Final result: payout={total_payout:.2f}, wins={len(wins)}")
+    return total_payout, wins
+
+
+def check_identical(spins=100000, seed=1234):
+    """Same seed must give byte-identical reels, payouts and wins"""
+    random.seed(seed)
+    with redirect_stdout(io.StringIO()):
+        legacy = [legacy_evaluate_slots(r, 20.0) + (r,) for r in (legacy_spin_reels(0.96) for _ in range(spins))]
+    random.seed(seed)
+    engine = [slot_engine.evaluate(r, 20.0) + (r,) for r in (slot_engine.spin() for _ in range(spins))]
+
+    mismatches = sum(1 for a, b in zip(legacy, engine) if a != b)
+    print(f"🔍 Identity check over {spins:,} spins (seed={seed}): {mismatches} mismatches")
+    return mismatches == 0
+
+
+def bench(label, spin_fn, evaluate_fn, spins, seed=42):
+    random.seed(seed)
+    sink = io.StringIO()
+    started = time.perf_counter()
+    with redirect_stdout(sink):
+        for _ in range(spins):
+            evaluate_fn(spin_fn(), 20.0)
+    elapsed = time.perf_counter() - started
+    rate = spins / elapsed
+    print(f"   {label:<8} {rate:>12,.0f} spins/sec  ({elapsed:.2f}s)")
+    return rate
+
+
+if __name__ == "__main__":
+    spins = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    print("🎰 Slot Engine Benchmark")
+    print("=" * 50)
+    identical = check_identical()
+
+    print(f"\n⏱️  {spins:,} spin+evaluate cycles")
+    before = bench("before", lambda: legacy_spin_reels(0.96), legacy_evaluate_slots, spins)
+    after = bench("after", slot_engine.spin, slot_engine.evaluate, spins)
+    print(f"\n🚀 Speedup: {after / before:.1f}x")
+
+    sys.exit(0 if identical else 1)
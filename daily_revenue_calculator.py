@@ -2,18 +2,41 @@
 """
 Daily Revenue Calculator
 Updates revenue_calculations table with daily profit/loss calculations and revenue distribution
+
+Each calculation_date (UTC) covers the bets settled and the casino rounds played
+that day. The revenue of every active operator for the dates being processed
+comes from one grouped query per source - sportsbook, casino, wallets - run in
+parallel on their own connections, and the distribution is computed for all
+operators at once with numpy. total_revenue stays a running total: the
+operator's previous record plus the day.
+
+Dates are written in order, one transaction each, replacing that day's
+unprocessed ('false') rows, so re-running a date is idempotent and a failed run
+picks up again from the last date it recorded. Rows already processed ('true')
+are kept as they are.
+
+sportsbook_operators.total_revenue is not written here: bet settlement keeps it
+current (bet_settlement_service._update_operator_revenue) as bets settle.
 """
 
+import argparse
 import os
 import sys
-from datetime import datetime, date
-from decimal import Decimal, ROUND_HALF_UP
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, time, timedelta, timezone
+
+import numpy as np
 
 # Add the src directory to the path so we can import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src import sqlite3_shim as sqlite3
 
+MAX_BACKFILL_DAYS = 31  # dates a resumed run catches up on at most
+
+# Web3 rows share the table (web3_operator_wallet_service) but carry no total_revenue
+REVENUE_ROWS = "(calculation_metadata IS NULL OR calculation_metadata NOT IN ('web3_false', 'web3_true'))"
+
 def get_db_connection():
     """Get database connection using the same method as the main app"""
     conn = sqlite3.connect()
@@ -23,240 +46,263 @@ def get_db_connection():
 def get_operator_wallet_balances(operator_id, conn):
     """Get bookmaker_capital and liquidity_pool balances for an operator"""
     query = """
-    SELECT 
+    SELECT
         SUM(CASE WHEN wallet_type = 'bookmaker_capital' THEN current_balance ELSE 0 END) as bookmaker_capital,
         SUM(CASE WHEN wallet_type = 'liquidity_pool' THEN current_balance ELSE 0 END) as liquidity_pool
-    FROM operator_wallets 
+    FROM operator_wallets
     WHERE operator_id = ?
     """
-    
+
     result = conn.execute(query, (operator_id,)).fetchone()
-    
+
     bookmaker_capital = float(result['bookmaker_capital'] or 0)
     liquidity_pool = float(result['liquidity_pool'] or 0)
-    
+
     return bookmaker_capital, liquidity_pool
 
-def calculate_casino_revenue(operator_id, conn):
-    """Calculate casino revenue from game_round table for a specific operator"""
-    try:
-        # Calculate casino revenue from game_round table
-        # Revenue = Total stakes - Total payouts (same logic as sportsbook)
-        casino_query = """
-        SELECT 
-            SUM(gr.stake) as total_stakes,
-            SUM(gr.payout) as total_payouts
-        FROM game_round gr
-        JOIN users u ON gr.user_id = u.id::text
-        WHERE u.sportsbook_operator_id = ?
-        """
-        
-        result = conn.execute(casino_query, (operator_id,)).fetchone()
-        
-        total_stakes = float(result['total_stakes'] or 0)
-        total_payouts = float(result['total_payouts'] or 0)
-        
-        # Casino revenue = Money kept from losing games - Money paid to winners
-        casino_revenue = total_stakes - total_payouts
-        
-        return casino_revenue
-        
-    except Exception as e:
-        print(f"Error calculating casino revenue for operator {operator_id}: {e}")
-        return 0.0
+def distribute_revenue(profit, bookmaker_capital, liquidity_pool):
+    """Revenue distribution for arrays of operators (same rules as calculate_revenue_distribution)"""
+    profit = np.asarray(profit, dtype=np.float64)
+    bookmaker_capital = np.asarray(bookmaker_capital, dtype=np.float64)
+    liquidity_pool = np.asarray(liquidity_pool, dtype=np.float64)
 
-def calculate_sportsbook_revenue(operator_id, conn):
-    """Calculate sportsbook revenue from bets table for a specific operator"""
-    try:
-        # Calculate sportsbook revenue from settled bets
-        sportsbook_query = """
-        SELECT 
-            SUM(CASE WHEN b.status = 'lost' THEN b.stake ELSE 0 END) as total_stakes_lost,
-            SUM(CASE WHEN b.status = 'won' THEN b.actual_return - b.stake ELSE 0 END) as total_net_payouts
-        FROM bets b
-        JOIN users u ON b.user_id = u.id
-        WHERE b.status IN ('won', 'lost') AND u.sportsbook_operator_id = ?
-        """
-        
-        result = conn.execute(sportsbook_query, (operator_id,)).fetchone()
-        
-        total_stakes_lost = float(result['total_stakes_lost'] or 0)
-        total_net_payouts = float(result['total_net_payouts'] or 0)
-        
-        # Sportsbook revenue = Money kept from losing bets - Extra money paid to winners
-        sportsbook_revenue = total_stakes_lost - total_net_payouts
-        
-        return sportsbook_revenue
-        
-    except Exception as e:
-        print(f"Error calculating sportsbook revenue for operator {operator_id}: {e}")
-        return 0.0
+    # Operators without wallet balance get an all-zero distribution
+    total_wallet_balance = bookmaker_capital + liquidity_pool
+    funded = total_wallet_balance != 0
+    safe_total = np.where(funded, total_wallet_balance, 1.0)
+    bookmaker_ratio = np.where(funded, bookmaker_capital / safe_total, 0.0)
+    liquidity_ratio = np.where(funded, liquidity_pool / safe_total, 0.0)
 
-def calculate_total_combined_revenue(operator_id, conn):
-    """Calculate total revenue combining both sportsbook and casino"""
-    try:
-        sportsbook_revenue = calculate_sportsbook_revenue(operator_id, conn)
-        casino_revenue = calculate_casino_revenue(operator_id, conn)
-        
-        total_revenue = sportsbook_revenue + casino_revenue
-        
-        print(f"   📊 Sportsbook revenue: ${sportsbook_revenue:.2f}")
-        print(f"   🎰 Casino revenue: ${casino_revenue:.2f}")
-        print(f"   💰 Total combined revenue: ${total_revenue:.2f}")
-        
-        return total_revenue
-        
-    except Exception as e:
-        print(f"Error calculating total combined revenue for operator {operator_id}: {e}")
-        return 0.0
+    gain = profit > 0
+    # Profit: 90% / 60% of the bookmaker / liquidity parts, 10% fee, 30% community
+    # Loss:   95% / 65%, no fee, 35% community
+    bookmaker_own_share = np.where(gain, 0.90, 0.95) * profit * bookmaker_ratio + \
+        np.where(gain, 0.60, 0.65) * profit * liquidity_ratio
+    kryzel_fee_from_own = np.where(gain & funded, 0.10 * profit, 0.0)
+    community_share_30 = np.where(gain, 0.30, 0.35) * profit * liquidity_ratio
+    zeros = np.zeros_like(profit)
 
-def calculate_revenue_distribution(profit, bookmaker_capital, liquidity_pool):
-    """Calculate revenue distribution based on profit/loss and wallet balances"""
-    
-    # Avoid division by zero
-    total_wallet_balance = bookmaker_capital + liquidity_pool
-    if total_wallet_balance == 0:
-        return {
-            'bookmaker_own_share': 0.0,
-            'kryzel_fee_from_own': 0.0,
-            'bookmaker_net_own': 0.0,
-            'community_share_30': 0.0,
-            'remaining_profit': 0.0
-        }
-    
-    # Calculate ratios
-    bookmaker_ratio = bookmaker_capital / total_wallet_balance
-    liquidity_ratio = liquidity_pool / total_wallet_balance
-    
-    if profit > 0:
-        # Profit distribution
-        bookmaker_own_share = (0.90 * profit * bookmaker_ratio) + (0.60 * profit * liquidity_ratio)
-        kryzel_fee_from_own = 0.10 * profit
-        bookmaker_net_own = 0.0
-        community_share_30 = 0.30 * profit * liquidity_ratio
-        
-    else:
-        # Loss distribution
-        bookmaker_own_share = (0.95 * profit * bookmaker_ratio) + (0.65 * profit * liquidity_ratio)
-        kryzel_fee_from_own = 0.0
-        bookmaker_net_own = 0.0
-        community_share_30 = 0.35 * profit * liquidity_ratio
-    
     return {
-        'bookmaker_own_share': round(bookmaker_own_share, 2),
-        'kryzel_fee_from_own': round(kryzel_fee_from_own, 2),
-        'bookmaker_net_own': round(bookmaker_net_own, 2),
-        'community_share_30': round(community_share_30, 2),
-        'remaining_profit': 0.0  # Always 0 as requested
+        'bookmaker_own_share': np.round(bookmaker_own_share, 2),
+        'kryzel_fee_from_own': np.round(kryzel_fee_from_own, 2),
+        'bookmaker_net_own': zeros,
+        'community_share_30': np.round(community_share_30, 2),
+        'remaining_profit': zeros  # Always 0 as requested
     }
 
-def get_previous_total_revenue(operator_id, conn):
-    """Get the previous total_revenue from the last revenue_calculations record"""
-    query = """
-    SELECT total_revenue 
-    FROM revenue_calculations 
-    WHERE operator_id = ? 
-    ORDER BY calculation_date DESC, processed_at DESC 
+def calculate_revenue_distribution(profit, bookmaker_capital, liquidity_pool):
+    """Calculate revenue distribution based on profit/loss and wallet balances"""
+    distribution = distribute_revenue([profit], [bookmaker_capital], [liquidity_pool])
+    return {key: float(values[0]) for key, values in distribution.items()}
+
+def get_previous_total_revenue(operator_id, conn, before_date=None):
+    """Get the previous total_revenue from the last revenue_calculations record (before before_date if given)"""
+    query = f"""
+    SELECT total_revenue
+    FROM revenue_calculations
+    WHERE operator_id = ? AND {REVENUE_ROWS} AND calculation_date::date < ?
+    ORDER BY calculation_date DESC, processed_at DESC
     LIMIT 1
     """
-    
-    result = conn.execute(query, (operator_id,)).fetchone()
+
+    result = conn.execute(query, (operator_id, before_date or date.max)).fetchone()
     return float(result['total_revenue'] or 0) if result else 0.0
 
-def update_daily_revenue_calculations():
-    """Main function to update revenue_calculations table for all operators"""
-    
-    print(f"🔄 Starting daily revenue calculations for {date.today()}")
-    
+def _query_all(query, params=()):
+    """Run one read on its own connection (the window queries run in parallel)"""
     conn = get_db_connection()
-    
     try:
-        # Get all active operators
-        operators_query = """
-        SELECT id, sportsbook_name 
-        FROM sportsbook_operators 
+        return conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+def _window_bounds(first_date, last_date):
+    start = datetime.combine(first_date, time.min)
+    end = datetime.combine(last_date + timedelta(days=1), time.min)
+    return start, end
+
+def fetch_sportsbook_revenue(first_date, last_date):
+    """(operator_id, day, revenue) for bets settled as won/lost in the window"""
+    # settled_at is naive UTC (datetime.utcnow() at settlement)
+    return _query_all("""
+    SELECT
+        u.sportsbook_operator_id as operator_id,
+        b.settled_at::date as day,
+        SUM(CASE WHEN b.status = 'lost' THEN b.stake ELSE 0 END) -
+        SUM(CASE WHEN b.status = 'won' THEN b.actual_return - b.stake ELSE 0 END) as revenue
+    FROM bets b
+    JOIN users u ON b.user_id = u.id
+    WHERE b.status IN ('won', 'lost') AND b.settled_at >= ? AND b.settled_at < ?
+    GROUP BY u.sportsbook_operator_id, b.settled_at::date
+    """, _window_bounds(first_date, last_date))
+
+def fetch_casino_revenue(first_date, last_date):
+    """(operator_id, day, revenue) for casino rounds played in the window"""
+    start, end = _window_bounds(first_date, last_date)
+    return _query_all("""
+    SELECT
+        u.sportsbook_operator_id as operator_id,
+        (gr.created_at AT TIME ZONE 'UTC')::date as day,
+        SUM(gr.stake) - SUM(gr.payout) as revenue
+    FROM game_round gr
+    JOIN users u ON gr.user_id = u.id::text
+    WHERE gr.created_at >= ? AND gr.created_at < ?
+    GROUP BY u.sportsbook_operator_id, (gr.created_at AT TIME ZONE 'UTC')::date
+    """, (start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc)))
+
+def fetch_wallet_balances():
+    """bookmaker_capital and liquidity_pool per operator"""
+    return _query_all("""
+    SELECT
+        operator_id,
+        SUM(CASE WHEN wallet_type = 'bookmaker_capital' THEN current_balance ELSE 0 END) as bookmaker_capital,
+        SUM(CASE WHEN wallet_type = 'liquidity_pool' THEN current_balance ELSE 0 END) as liquidity_pool
+    FROM operator_wallets
+    GROUP BY operator_id
+    """)
+
+def _dates_to_process(conn, calculation_date):
+    """The requested date, or every date from the last recorded one (recomputed if still unprocessed) to today"""
+    if calculation_date:
+        return [calculation_date]
+    today = datetime.now(timezone.utc).date()
+    result = conn.execute(f"""
+    SELECT MAX(calculation_date::date) as last_date
+    FROM revenue_calculations
+    WHERE {REVENUE_ROWS}
+    """).fetchone()
+    last_date = result['last_date'] if result else None
+    first_date = today if last_date is None else \
+        max(min(last_date, today), today - timedelta(days=MAX_BACKFILL_DAYS))
+    return [first_date + timedelta(days=n) for n in range((today - first_date).days + 1)]
+
+def update_daily_revenue_calculations(calculation_date=None):
+    """Main function to update revenue_calculations table for all operators
+
+    Returns the calculation dates written, oldest first.
+    """
+
+    conn = get_db_connection()
+
+    try:
+        dates = _dates_to_process(conn, calculation_date)
+        print(f"🔄 Starting daily revenue calculations for {dates[0]}" +
+              (f" .. {dates[-1]}" if len(dates) > 1 else ""))
+
+        operators = conn.execute("""
+        SELECT id, sportsbook_name
+        FROM sportsbook_operators
         WHERE is_active = TRUE
-        """
-        
-        operators = conn.execute(operators_query).fetchall()
-        
+        ORDER BY id
+        """).fetchall()
+
         if not operators:
             print("❌ No active operators found")
-            return
-        
+            return []
+
         print(f"📊 Found {len(operators)} active operators")
-        
-        for operator in operators:
-            operator_id = operator['id']
-            operator_name = operator['sportsbook_name']
-            
-            print(f"\n🏢 Processing operator: {operator_name} (ID: {operator_id})")
-            
-            # Calculate current total revenue from both sportsbook and casino
-            current_total_revenue = calculate_total_combined_revenue(operator_id, conn)
-            
-            # Update the sportsbook_operators table with the new combined revenue
-            update_operator_revenue_query = """
-            UPDATE sportsbook_operators 
-            SET total_revenue = ? 
-            WHERE id = ?
-            """
-            conn.execute(update_operator_revenue_query, (current_total_revenue, operator_id))
-            
-            # Get previous total_revenue from last revenue_calculations record
-            previous_total_revenue = get_previous_total_revenue(operator_id, conn)
-            
-            # Calculate today's profit
-            todays_profit = current_total_revenue - previous_total_revenue
-            
-            print(f"   💰 Current total_revenue: ${current_total_revenue:.2f}")
-            print(f"   📈 Previous total_revenue: ${previous_total_revenue:.2f}")
-            print(f"   📊 Today's profit: ${todays_profit:.2f}")
-            
-            # Get wallet balances
-            bookmaker_capital, liquidity_pool = get_operator_wallet_balances(operator_id, conn)
-            
-            print(f"   🏦 Bookmaker capital: ${bookmaker_capital:.2f}")
-            print(f"   💧 Liquidity pool: ${liquidity_pool:.2f}")
-            
-            # Calculate revenue distribution
-            distribution = calculate_revenue_distribution(todays_profit, bookmaker_capital, liquidity_pool)
-            
-            print(f"   📋 Distribution:")
-            print(f"      - Bookmaker own share: ${distribution['bookmaker_own_share']:.2f}")
-            print(f"      - Kryzel fee: ${distribution['kryzel_fee_from_own']:.2f}")
-            print(f"      - Community share (30%): ${distribution['community_share_30']:.2f}")
-            print(f"      - Remaining profit: ${distribution['remaining_profit']:.2f}")
-            
-            # Insert new revenue calculation record
-            insert_query = """
-            INSERT INTO revenue_calculations (
-                operator_id, calculation_date, total_revenue, total_bets_amount, 
-                total_payouts, bookmaker_own_share, kryzel_fee_from_own, 
-                bookmaker_net_own, community_share_30, remaining_profit, calculation_metadata, processed_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            conn.execute(insert_query, (
-                operator_id,
-                date.today(),
-                current_total_revenue,
+
+        operator_ids = [operator['id'] for operator in operators]
+        position = {operator_id: i for i, operator_id in enumerate(operator_ids)}
+        day_index = {day: i for i, day in enumerate(dates)}
+
+        # One grouped pass per source for all operators and all dates
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            sportsbook_rows = pool.submit(fetch_sportsbook_revenue, dates[0], dates[-1])
+            casino_rows = pool.submit(fetch_casino_revenue, dates[0], dates[-1])
+            wallet_rows = pool.submit(fetch_wallet_balances)
+            sportsbook_rows, casino_rows, wallet_rows = \
+                sportsbook_rows.result(), casino_rows.result(), wallet_rows.result()
+
+        sportsbook = np.zeros((len(dates), len(operator_ids)))
+        casino = np.zeros((len(dates), len(operator_ids)))
+        for matrix, rows in ((sportsbook, sportsbook_rows), (casino, casino_rows)):
+            for row in rows:
+                op, day = position.get(row['operator_id']), day_index.get(row['day'])
+                if op is not None and day is not None:
+                    matrix[day, op] += float(row['revenue'] or 0)
+
+        bookmaker_capital = np.zeros(len(operator_ids))
+        liquidity_pool = np.zeros(len(operator_ids))
+        for row in wallet_rows:
+            op = position.get(row['operator_id'])
+            if op is not None:
+                bookmaker_capital[op] = float(row['bookmaker_capital'] or 0)
+                liquidity_pool[op] = float(row['liquidity_pool'] or 0)
+
+        # Running totals carried in from the last record before the first date
+        running_total = np.zeros(len(operator_ids))
+        for row in conn.execute(f"""
+        SELECT DISTINCT ON (operator_id) operator_id, total_revenue
+        FROM revenue_calculations
+        WHERE operator_id = ANY(?) AND {REVENUE_ROWS} AND calculation_date::date < ?
+        ORDER BY operator_id, calculation_date DESC, processed_at DESC
+        """, (operator_ids, dates[0])).fetchall():
+            running_total[position[row['operator_id']]] = float(row['total_revenue'] or 0)
+
+        # Already-distributed days are kept; their recorded totals carry forward
+        processed = {}
+        for row in conn.execute("""
+        SELECT operator_id, calculation_date::date as day, total_revenue
+        FROM revenue_calculations
+        WHERE operator_id = ANY(?) AND calculation_metadata = 'true'
+          AND calculation_date::date >= ? AND calculation_date::date <= ?
+        """, (operator_ids, dates[0], dates[-1])).fetchall():
+            processed[(row['day'], row['operator_id'])] = float(row['total_revenue'] or 0)
+
+        insert_query = """
+        INSERT INTO revenue_calculations (
+            operator_id, calculation_date, total_revenue, total_bets_amount,
+            total_payouts, bookmaker_own_share, kryzel_fee_from_own,
+            bookmaker_net_own, community_share_30, remaining_profit, calculation_metadata, processed_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+
+        for i, day in enumerate(dates):
+            todays_profit = sportsbook[i] + casino[i]
+            running_total = running_total + todays_profit
+            keep = np.array([(day, operator_id) in processed for operator_id in operator_ids])
+            for op in np.flatnonzero(keep):
+                running_total[op] = processed[(day, operator_ids[op])]
+
+            distribution = distribute_revenue(todays_profit, bookmaker_capital, liquidity_pool)
+            write = np.flatnonzero(~keep)
+            processed_at = datetime.now()
+            rows = [(
+                operator_ids[op],
+                day,
+                float(running_total[op]),
                 0.0,  # total_bets_amount - set to zero as requested
                 0.0,  # total_payouts - set to zero as requested
-                distribution['bookmaker_own_share'],
-                distribution['kryzel_fee_from_own'],
-                distribution['bookmaker_net_own'],
-                distribution['community_share_30'],
-                distribution['remaining_profit'],
+                float(distribution['bookmaker_own_share'][op]),
+                float(distribution['kryzel_fee_from_own'][op]),
+                float(distribution['bookmaker_net_own'][op]),
+                float(distribution['community_share_30'][op]),
+                float(distribution['remaining_profit'][op]),
                 'false',  # calculation_metadata - set to false to indicate not yet processed
-                datetime.now()
-            ))
-            
-            print(f"   ✅ Revenue calculation record created")
-        
-        # Commit all changes
-        conn.commit()
+                processed_at
+            ) for op in write]
+
+            # Replace the day's unprocessed rows in one transaction: re-runs don't duplicate
+            conn.execute("""
+            DELETE FROM revenue_calculations
+            WHERE operator_id = ANY(?) AND calculation_date::date = ? AND calculation_metadata = 'false'
+            """, ([operator_ids[op] for op in write], day))
+            if rows:
+                conn.executemany(insert_query, rows)
+            conn.commit()
+
+            print(f"\n📅 {day}: {len(rows)} records written, {int(keep.sum())} already processed")
+            print(f"   📊 Sportsbook revenue: ${sportsbook[i].sum():.2f}")
+            print(f"   🎰 Casino revenue: ${casino[i].sum():.2f}")
+            print(f"   💰 Total profit: ${todays_profit.sum():.2f}")
+            print(f"   📋 Bookmaker own share: ${distribution['bookmaker_own_share'][write].sum():.2f}, "
+                  f"Kryzel fee: ${distribution['kryzel_fee_from_own'][write].sum():.2f}, "
+                  f"Community share (30%): ${distribution['community_share_30'][write].sum():.2f}")
+
         print(f"\n🎉 Daily revenue calculations completed successfully!")
-        
+        return dates
+
     except Exception as e:
         print(f"❌ Error during revenue calculations: {e}")
         import traceback
@@ -268,8 +314,12 @@ def update_daily_revenue_calculations():
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Update revenue_calculations for all active operators")
+    parser.add_argument('--date', type=date.fromisoformat,
+                        help="Recompute one calculation date (YYYY-MM-DD, UTC); default: catch up to today")
+    args = parser.parse_args()
     try:
-        update_daily_revenue_calculations()
+        update_daily_revenue_calculations(args.date)
     except Exception as e:
         print(f"💥 Fatal error: {e}")
         sys.exit(1)
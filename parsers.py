@@ -1,6 +1,7 @@
 
 from datetime import datetime, timezone
 from dataclasses import dataclass, asdict, field
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple, Callable, Union
 import json
 import re
@@ -220,6 +221,7 @@ OUTCOME_ALIASES = {
     "no": {"no", "n"},
 }
 
+@lru_cache(maxsize=4096)
 def normalize_market_name(name: str) -> Optional[str]:
     if not name:
         return None
@@ -232,8 +234,11 @@ def normalize_market_name(name: str) -> Optional[str]:
 def normalize_outcome_key(label: str) -> Optional[str]:
     if label is None:
         return None
-    raw = str(label).strip().lower()
-    raw = re.sub(r"\s+", "", raw)
+    return _normalize_outcome_label(str(label))
+
+@lru_cache(maxsize=4096)
+def _normalize_outcome_label(label: str) -> Optional[str]:
+    raw = re.sub(r"\s+", "", label.strip().lower())
     for canon, alset in OUTCOME_ALIASES.items():
         if raw in alset:
             return canon
@@ -390,6 +395,88 @@ SPORT_MARKETS = {
     "rugbyleague": ["match_result", "over_under", "asian_handicap"],
 }
 
+# GoalServe pre-match feed -> frontend market keys (matched on the lower-cased
+# market name). Markets not listed here are not shown.
+GOALSERVE_MARKET_KEYS = {
+    # Match result / winner
+    "match winner": "match_result",
+    "3way result": "match_result",
+    "1x2": "match_result",
+    "match result": "match_result",
+    "match_result": "match_result",
+    "home/away": "home_away",
+    # Totals and handicaps
+    "over/under": "over_under",
+    "goals over/under": "goals_over_under",
+    "over/under 1st half": "over_under_first_half",
+    "over/under 1st qtr": "over_under_first_quarter",
+    "over/under by games in match": "games_over_under",
+    "over/under (1st set)": "over_under_first_set",
+    "asian handicap": "asian_handicap",
+    "asian handicap first half": "asian_handicap_first_half",
+    "asian handicap 1st qtr": "asian_handicap_first_quarter",
+    "asian handicap (sets)": "asian_handicap_sets",
+    "asian handicap (games)": "asian_handicap_games",
+    "handicap result": "handicap_result",
+    # Periods, sets and halves
+    "home/away - 1st half": "first_half_winner",
+    "home/away - 1st qtr": "first_quarter_winner",
+    "home/away (1st set)": "first_set",
+    "home/away (2nd set)": "second_set",
+    "1st half 3way result": "first_half_3way_result",
+    "ht/ft double": "ht_ft_double",
+    "highest scoring quarter": "highest_scoring_quarter",
+    "set betting": "set_betting",
+    "tie-break (1st set)": "tie_break_first_set",
+    "win at least one set (player 1)": "win_one_set_player1",
+    "win at least one set (player 2)": "win_one_set_player2",
+    # Scores, odd/even and specials
+    "correct score": "correct_score",
+    "correct score 1st half": "correct_score_first_half",
+    "odd/even (including ot)": "odd_even_including_ot",
+    "odd/even (1st set)": "odd_even_first_set",
+    "to qualify": "to_qualify",
+    "results/both teams to score": "results_both_teams_score",
+    "result/total goals": "result_total_goals",
+    "home team score a goal": "home_team_score_goal",
+    "away team score a goal": "away_team_score_goal",
+    "corners 1x2": "corners_1x2",
+    "corners over under": "corners_over_under",
+}
+
+# GoalServe outcome names of a winner market -> 1X2 slot
+GOALSERVE_1X2_OUTCOMES = {
+    "home": "1", "1": "1", "home win": "1",
+    "away": "2", "2": "2", "away win": "2",
+    "draw": "X", "x": "X", "tie": "X",
+}
+
+# Sports whose main market is one named 2-way market (3-way markets are ignored)
+GOALSERVE_PRIMARY_MARKET = {
+    "baseball": "home/away",
+}
+
+# Sports that never show a draw, whatever the feed offers
+GOALSERVE_NO_DRAW_SPORTS = frozenset([
+    "baseball", "tennis", "volleyball", "football", "table_tennis", "boxing", "mma", "darts", "esports",
+])
+
+# Cricket feeds (odds.type[]) are read by market id or name from bookmaker 16 (bet365)
+GOALSERVE_CRICKET_MARKETS = {
+    "2": "Home/Away",
+    "23512": "Most Sixes",
+    "23513": "Most Fours",
+    "23511": "Most Run Outs",
+}
+GOALSERVE_CRICKET_BOOKMAKER = "16"
+
+@lru_cache(maxsize=4096)
+def goalserve_market_key(name: str) -> Optional[str]:
+    """Frontend market key for a GoalServe market name, or None if it isn't shown"""
+    if not name:
+        return None
+    return GOALSERVE_MARKET_KEYS.get(name.lower())
+
 def parse_events_from_feed(data: Union[Dict[str, Any], List[Dict[str, Any]]]):
     if isinstance(data, list):
         return data
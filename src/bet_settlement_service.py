@@ -15,9 +15,16 @@ import threading
 from datetime import datetime, timedelta
 import json
 from src.goalserve_client import OptimizedGoalServeClient
+from src.services.event_bus import publish_user_event
+from src.utils import metrics, structured_log
+from src.utils import json_codec
 
 logger = logging.getLogger(__name__)
 
+SETTLEMENT_CYCLE_SECONDS = metrics.histogram(
+    "settlement_cycle_duration_seconds", "One check_for_completed_matches() pass",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+
 # Define final statuses for all sports
 FINAL_STATUSES = {
     "final", "finished", "ended", "ft", "full time", "game over", 
@@ -129,7 +136,7 @@ def robust_goalserve_parse(response_text, content_type=""):
     try:
         # Try JSON first if content type suggests it
         if "json" in content_type.lower() or response_text.strip().startswith("{"):
-            return json.loads(response_text)
+            return json_codec.loads(response_text)
     except (json.JSONDecodeError, ValueError):
         pass
     
@@ -168,6 +175,7 @@ class BetSettlementService:
         self.failed_settlements = 0
         self.last_error = None
         self.start_time = None
+        self._cycle_feeds = {}  # endpoint -> feed body, shared by every lookup in one settlement pass
         
     def start(self):
         """Start the automatic bet settlement service"""
@@ -222,7 +230,8 @@ class BetSettlementService:
                 except Exception as db_error:
                     logger.error(f"❌ Database access error: {db_error}")
                 
-                self.check_for_completed_matches()
+                with SETTLEMENT_CYCLE_SECONDS.time(), metrics.span("settlement.cycle", check=self.total_checks):
+                    self.check_for_completed_matches()
                 
                 # Log periodic status
                 if self.total_checks % 10 == 0:  # Every 10 checks (5 minutes)
@@ -300,6 +309,7 @@ class BetSettlementService:
     
     def check_for_completed_matches(self):
         """Check for completed matches and automatically settle bets"""
+        self._cycle_feeds = {}
         try:
             logger.info("🔍 Starting check_for_completed_matches...")
             
@@ -352,6 +362,7 @@ class BetSettlementService:
             sports_to_check = self._determine_sports_from_bets(pending_bets)
             logger.info(f"Checking historical data for sports: {sports_to_check}")
             
+            feeds_to_fetch = []  # (sport, endpoint)
             for sport in sports_to_check:
                 # Special handling for cricket - use the cricket/livescore feed
                 if sport == 'cricket':
@@ -363,46 +374,25 @@ class BetSettlementService:
                         logger.warning(f"Error fetching cricket data: {e}")
                     continue
                 
-                # First check the /home endpoint for each sport
+                # The /home feed plus the daily historical feeds for the last 7 days
+                feed = 'soccernew' if sport == 'soccer' else sport  # Use soccernew for soccer
+                feeds_to_fetch.append((sport, f'{feed}/home'))
+                feeds_to_fetch.extend((sport, f'{feed}/d-{days_ago}') for days_ago in range(1, 8))
+            
+            # Every sport's feeds in one concurrent batch
+            endpoints = [endpoint for _, endpoint in feeds_to_fetch]
+            for (sport, endpoint), data in zip(feeds_to_fetch, self._fetch_feeds(endpoints)):
+                if not data:
+                    continue
                 try:
-                    # Use soccernew for soccer, otherwise use sport/home
-                    if sport == 'soccer':
-                        home_endpoint = 'soccernew/home'
-                    else:
-                        home_endpoint = f'{sport}/home'
-                    
-                    logger.info(f"Checking {home_endpoint} for historical data")
-                    home_data = self.client._make_request(home_endpoint, use_cache=False)
-                    if home_data:
-                        matches = self.client._extract_matches_from_goalserve_data(home_data)
-                        for match in matches:
-                            # Parse match into event format for settlement (include completed matches)
-                            event = self._parse_match_for_settlement(match, sport, home_endpoint)
-                            if event:
-                                historical_events.append(event)
+                    matches = self.client._extract_matches_from_goalserve_data(data)
+                    for match in matches:
+                        # Parse match into event format for settlement (include completed matches)
+                        event = self._parse_match_for_settlement(match, sport, endpoint)
+                        if event:
+                            historical_events.append(event)
                 except Exception as e:
-                    logger.warning(f"Error fetching home data for {sport}: {e}")
-                
-                # Then check the daily historical feeds for the last 7 days
-                for days_ago in range(1, 8):  # Check last 7 days
-                    try:
-                        # Use soccernew for soccer, otherwise use sport/d-X
-                        if sport == 'soccer':
-                            endpoint = f'soccernew/d-{days_ago}'
-                        else:
-                            endpoint = f'{sport}/d-{days_ago}'
-                        
-                        historical_data = self.client._make_request(endpoint, use_cache=False)
-                        if historical_data:
-                            matches = self.client._extract_matches_from_goalserve_data(historical_data)
-                            for match in matches:
-                                # Parse match into event format for settlement (include completed matches)
-                                event = self._parse_match_for_settlement(match, sport, endpoint)
-                                if event:
-                                    historical_events.append(event)
-                    except Exception as e:
-                        logger.warning(f"Error fetching historical data for {sport} d-{days_ago}: {e}")
-                        continue
+                    logger.warning(f"Error reading historical data from {endpoint}: {e}")
             
             logger.info(f"Found {len(historical_events)} historical events to check for settlement")
             
@@ -436,7 +426,7 @@ class BetSettlementService:
             for match_name, bets in bets_by_match.items():
                 # 2) When checking each pending bet - CRITICAL LOG
                 for bet in bets:
-                    logger.info("🔎 Looking for event: bet_id=%s match_id=%s sport=%s",
+                    logger.debug("🔎 Looking for event: bet_id=%s match_id=%s sport=%s",
                                 bet.id, bet.match_id, bet.sport_name or "unknown")
                 self._check_match_completion(match_name, bets, historical_events)
             
@@ -448,6 +438,15 @@ class BetSettlementService:
                 
         except Exception as e:
             logger.error(f"Error checking for completed matches: {e}")
+        finally:
+            self._cycle_feeds = {}
+    
+    def _fetch_feeds(self, endpoints):
+        """Feed bodies for the endpoints, in order; each feed is fetched at most once per settlement pass"""
+        missing = [endpoint for endpoint in dict.fromkeys(endpoints) if endpoint not in self._cycle_feeds]
+        if missing:
+            self._cycle_feeds.update(zip(missing, self.client.fetch_many(missing, use_cache=False)))
+        return [self._cycle_feeds[endpoint] for endpoint in endpoints]
     
     def _determine_sports_from_bets(self, bets):
         """Determine which sports to check based on the pending bets - now uses stored sport_name"""
@@ -492,11 +491,11 @@ class BetSettlementService:
                 return
             
             selections = json.loads(combo_bet.combo_selections)
-            logger.info(f"Checking combo bet {combo_bet.id} with {len(selections)} selections")
+            logger.debug(f"Checking combo bet {combo_bet.id} with {len(selections)} selections")
             
             # Create sport to match ID mapping for this combo bet
             sport_match_mapping = self._create_sport_match_mapping(combo_bet)
-            logger.info(f"Sport mapping for combo bet {combo_bet.id}: {sport_match_mapping}")
+            logger.debug(f"Sport mapping for combo bet {combo_bet.id}: {sport_match_mapping}")
             
             # Check each selection for completion
             for selection in selections:
@@ -516,7 +515,7 @@ class BetSettlementService:
                 
                 # Get the sport for this specific match ID
                 sport = self._get_sport_for_match_id(match_id, sport_match_mapping)
-                logger.info(f"Checking match {match_id} in {sport} data")
+                logger.debug(f"Checking match {match_id} in {sport} data")
                 
                 # Find the match in current events or historical data
                 match_event = None
@@ -526,16 +525,17 @@ class BetSettlementService:
                         break
                 
                 if not match_event:
-                    logger.info(f"Match {match_id} not found in current events, checking {sport} historical data")
+                    structured_log.count('settlement.combo_match_historical_lookup')
+                    logger.debug(f"Match {match_id} not found in current events, checking {sport} historical data")
                     match_event = self._find_match_in_historical_data_for_combo(match_id, selection.get('match_name', ''), sport)
                 
                 if match_event and match_event.get('is_completed', False):
-                    logger.info(f"🎯 Combo bet {combo_bet.id}: Match {match_id} completed in {sport}, settling selection")
+                    logger.debug(f"🎯 Combo bet {combo_bet.id}: Match {match_id} completed in {sport}, settling selection")
                     self._settle_combo_bet(combo_bet, match_event, 
                                          match_event.get('home_score', 0), 
                                          match_event.get('away_score', 0))
                 elif match_event and match_event.get('is_cancelled', False):
-                    logger.info(f"❌ Combo bet {combo_bet.id}: Match {match_id} cancelled in {sport}, voiding selection")
+                    logger.debug(f"❌ Combo bet {combo_bet.id}: Match {match_id} cancelled in {sport}, voiding selection")
                     self._void_combo_bet(combo_bet, match_event)
                     
         except Exception as e:
@@ -569,10 +569,11 @@ class BetSettlementService:
                 composite_key = bet_key(bet)
                 match_event = by_composite.get(composite_key)
                 if match_event:
-                    logger.info("✅ Found match by composite key (league+teams+date) for bet_id=%s", bet.id)
+                    logger.debug("✅ Found match by composite key (league+teams+date) for bet_id=%s", bet.id)
             
             if not match_event:
-                logger.info(f"Match with ID {match_id} not found in current events: {match_name}")
+                structured_log.count('settlement.match_not_found')
+                logger.debug(f"Match with ID {match_id} not found in current events: {match_name}")
                 # Try to find in historical data
                 sport_name = getattr(bets[0], "sport_name", None) if bets else None
                 match_event = self._find_match_in_historical_data(match_id, match_name, sport_name)
@@ -596,12 +597,12 @@ class BetSettlementService:
                 is_completed = True
             
             # 3) Before deciding settlement - CRITICAL LOG
-            logger.info("📌 Event found for bet_id=%s: status=%s raw_status=%s id=%s",
+            logger.debug("📌 Event found for bet_id=%s: status=%s raw_status=%s id=%s",
                         bets[0].id if bets else "unknown", normalized_status, status, match_event.get('id'))
             
             # Check if status is final but not completed
             if normalized_status in FINAL_STATUSES and not is_completed:
-                logger.info("🔄 Status indicates final but not marked completed, forcing completion")
+                logger.debug("🔄 Status indicates final but not marked completed, forcing completion")
                 is_completed = True
             
             # Run settlement within Flask app context
@@ -614,7 +615,7 @@ class BetSettlementService:
                         logger.info(f"❌ MATCH CANCELLED: {match_name} - Auto-voiding bets")
                         self._auto_void_bets_for_match(match_event, bets)
                     else:
-                        logger.info(f"⏳ Present but not final (bet_id=%s, status=%s)", 
+                        logger.debug(f"⏳ Present but not final (bet_id=%s, status=%s)", 
                                   bets[0].id if bets else "unknown", normalized_status)
             else:
                 logger.error("❌ No Flask app instance available for database access")
@@ -630,64 +631,23 @@ class BetSettlementService:
                 logger.debug(f"Skipping search for invalid match_id: {match_id}")
                 return None
             
-            logger.info(f"🔍 Searching for match {match_id} in historical data")
+            logger.debug(f"🔍 Searching for match {match_id} in historical data")
             
             # Use stored sport_name if available (most reliable)
             if sport_name:
                 sports_to_check = [sport_name]
-                logger.info(f"Using stored sport_name: {sport_name}")
+                logger.debug(f"Using stored sport_name: {sport_name}")
             else:
                 # Fallback to match name analysis (for legacy bets)
                 sports_to_check = self._determine_sports_from_match_name(match_name)
-                logger.info(f"Using match name analysis for {match_name}: {sports_to_check}")
+                logger.debug(f"Using match name analysis for {match_name}: {sports_to_check}")
             
-            # Check historical feeds for each sport
+            # Check historical feeds for each sport: /home, then d-1 to d-7
             for sport in sports_to_check:
-                # First check the /home endpoint
-                home_endpoint = f'{sport}/home'
-                logger.debug(f"Checking {home_endpoint} for match {match_id}")
-                
-                try:
-                    home_data = self.client._make_request(home_endpoint, use_cache=False)
-                    if home_data:
-                        # Extract matches from home data
-                        matches = self.client._extract_matches_from_goalserve_data(home_data)
-                        
-                        # Look for the specific match ID
-                        for match in matches:
-                            if match.get('@id') == str(match_id):
-                                logger.info(f"✅ Found match {match_id} in {sport} home data")
-                                # Parse the match into event format for settlement
-                                event = self._parse_match_for_settlement(match, sport, home_endpoint)
-                                if event:
-                                    return event
-                except Exception as e:
-                    logger.warning(f"Error checking {home_endpoint} for match {match_id}: {e}")
-                
-                # Then check the daily historical feeds for the last 7 days
-                for days_ago in range(1, 8):  # d-1 to d-7
-                    endpoint = f'{sport}/d-{days_ago}'
-                    logger.debug(f"Checking {endpoint} for match {match_id}")
-                    
-                    try:
-                        historical_data = self.client._make_request(endpoint, use_cache=False)
-                        if not historical_data:
-                            continue
-                        
-                        # Extract matches from historical data
-                        matches = self.client._extract_matches_from_goalserve_data(historical_data)
-                        
-                        # Look for the specific match ID
-                        for match in matches:
-                            if match.get('@id') == str(match_id):
-                                logger.info(f"✅ Found match {match_id} in {sport} historical data {days_ago} days ago")
-                                # Parse the match into event format for settlement
-                                event = self._parse_match_for_settlement(match, sport, endpoint)
-                                if event:
-                                    return event
-                    except Exception as e:
-                        logger.warning(f"Error checking {endpoint} for match {match_id}: {e}")
-                        continue
+                endpoints = [f'{sport}/home'] + [f'{sport}/d-{days_ago}' for days_ago in range(1, 8)]
+                event = self._find_match_in_feeds(match_id, sport, endpoints)
+                if event:
+                    return event
                 
             logger.warning(f"❌ Match {match_id} not found in any historical feeds")
             return None
@@ -696,6 +656,29 @@ class BetSettlementService:
             logger.error(f"Error searching historical data for match {match_id}: {e}")
             return None
     
+    def _find_match_in_feeds(self, match_id, sport, endpoints):
+        """Return the match from the first feed (in order) that has it.
+
+        The first feed (/home) is checked on its own; the daily feeds after it are
+        only fetched, concurrently, if the match isn't there.
+        """
+        for batch in (endpoints[:1], endpoints[1:]):
+            for endpoint, data in zip(batch, self._fetch_feeds(batch)):
+                if not data:
+                    continue
+                try:
+                    # Look for the specific match ID
+                    for match in self.client._extract_matches_from_goalserve_data(data):
+                        if match.get('@id') == str(match_id):
+                            logger.debug(f"✅ Found match {match_id} in {sport} {endpoint}")
+                            # Parse the match into event format for settlement
+                            event = self._parse_match_for_settlement(match, sport, endpoint)
+                            if event:
+                                return event
+                except Exception as e:
+                    logger.warning(f"Error checking {endpoint} for match {match_id}: {e}")
+        return None
+    
     def _find_match_in_historical_data_for_combo(self, match_id, match_name, sport):
         """Find a match in historical data feeds for combo bets using sport-specific endpoints"""
         try:
@@ -704,7 +687,7 @@ class BetSettlementService:
                 logger.debug(f"Skipping search for invalid match_id: {match_id}")
                 return None
             
-            logger.info(f"🔍 Searching for match {match_id} in {sport} historical data")
+            logger.debug(f"🔍 Searching for match {match_id} in {sport} historical data")
             
             # Check sport-specific endpoints
             endpoints = [
@@ -714,28 +697,9 @@ class BetSettlementService:
                 f"{sport}/d-3"    # 3 days ago
             ]
             
-            for endpoint in endpoints:
-                logger.debug(f"Checking {endpoint} for match {match_id}")
-                
-                try:
-                    data = self.client._make_request(endpoint, use_cache=False)
-                    if not data:
-                        continue
-                    
-                    # Extract matches from data
-                    matches = self.client._extract_matches_from_goalserve_data(data)
-                    
-                    # Look for the specific match ID
-                    for match in matches:
-                        if match.get('@id') == str(match_id):
-                            logger.info(f"✅ Found match {match_id} in {sport} {endpoint}")
-                            # Parse the match into event format for settlement
-                            event = self._parse_match_for_settlement(match, sport, endpoint)
-                            if event:
-                                return event
-                except Exception as e:
-                    logger.warning(f"Error checking {endpoint} for match {match_id}: {e}")
-                    continue
+            event = self._find_match_in_feeds(match_id, sport, endpoints)
+            if event:
+                return event
             
             logger.warning(f"❌ Match {match_id} not found in {sport} historical feeds")
             return None
@@ -831,7 +795,8 @@ class BetSettlementService:
                                 
                                 current_app.db.session.add_all([user, transaction])
                                 won_count += 1
-                                logger.info("💰 Wallet updated u=%s Δ=%.2f new=%.2f bet=%s",
+                                structured_log.count('settlement.bets_won')
+                                logger.debug("💰 Wallet updated u=%s Δ=%.2f new=%.2f bet=%s",
                                             user.id, bet.actual_return, user.balance, bet.id)
                                 
                                 # Sync Web3 wallet credit (non-blocking)
@@ -841,22 +806,21 @@ class BetSettlementService:
                                 except Exception as web3_error:
                                     logger.warning(f"Web3 sync failed for bet win: {web3_error}")
                                 
-                                # Emit WebSocket balance update event
+                                # Emit WebSocket balance update event (via the socket tier)
                                 try:
-                                    from flask_socketio import emit
-                                    emit('bet:settled', {
+                                    publish_user_event(user.id, 'bet:settled', {
                                         'user_id': user.id,
                                         'bet_id': bet.id,
                                         'result': 'won',
                                         'payout': bet.actual_return,
                                         'new_balance': user.balance
-                                    }, room=f'user_{user.id}')
+                                    })
                                     
                                     # Also emit balance update
-                                    emit('balance:update', {
+                                    publish_user_event(user.id, 'balance:update', {
                                         'user_id': user.id,
                                         'balance': user.balance
-                                    }, room=f'user_{user.id}')
+                                    })
                                 except Exception as e:
                                     logger.warning(f"Failed to emit WebSocket events: {e}")
                         else:
@@ -864,20 +828,20 @@ class BetSettlementService:
                             bet.status = 'lost'
                             bet.actual_return = 0.0
                             lost_count += 1
-                            logger.info(f"❌ User LOST bet {bet.id} on {bet.match_name}")
+                            structured_log.count('settlement.bets_lost')
+                            logger.debug(f"❌ User LOST bet {bet.id} on {bet.match_name}")
                             
                             # Emit WebSocket balance update event for lost bet
                             try:
-                                from flask_socketio import emit
                                 user = current_app.db.session.get(User, bet.user_id)
                                 if user:
-                                    emit('bet:settled', {
+                                    publish_user_event(bet.user_id, 'bet:settled', {
                                         'user_id': bet.user_id,
                                         'bet_id': bet.id,
                                         'result': 'lost',
                                         'payout': 0,
                                         'new_balance': user.balance
-                                    }, room=f'user_{bet.user_id}')
+                                    })
                             except Exception as e:
                                 logger.warning(f"Failed to emit WebSocket events: {e}")
                         
@@ -938,25 +902,25 @@ class BetSettlementService:
                                     )
                                     
                                     current_app.db.session.add_all([user, transaction])
-                                    logger.info("💰 Wallet updated u=%s Δ=%.2f new=%.2f bet=%s (void)",
+                                    structured_log.count('settlement.bets_voided')
+                                    logger.debug("💰 Wallet updated u=%s Δ=%.2f new=%.2f bet=%s (void)",
                                                 user.id, bet.stake, user.balance, bet.id)
                                     
                                     # Emit WebSocket balance update event for voided bet
                                     try:
-                                        from flask_socketio import emit
-                                        emit('bet:settled', {
+                                        publish_user_event(user.id, 'bet:settled', {
                                             'user_id': user.id,
                                             'bet_id': bet.id,
                                             'result': 'void',
                                             'payout': bet.stake,
                                             'new_balance': user.balance
-                                        }, room=f'user_{user.id}')
+                                        })
                                         
                                         # Also emit balance update
-                                        emit('balance:update', {
+                                        publish_user_event(user.id, 'balance:update', {
                                             'user_id': user.id,
                                             'balance': user.balance
-                                        }, room=f'user_{user.id}')
+                                        })
                                     except Exception as e:
                                         logger.warning(f"Failed to emit WebSocket events: {e}")
                                 
@@ -1002,7 +966,7 @@ class BetSettlementService:
                     break
             
             if not current_selection:
-                logger.info(f"Match {current_match_id} not found in combo bet {bet.id} selections")
+                logger.debug(f"Match {current_match_id} not found in combo bet {bet.id} selections")
                 return
             
             # Mark this selection as voided
@@ -1036,7 +1000,8 @@ class BetSettlementService:
                 )
                 
                 current_app.db.session.add_all([user, transaction])
-                logger.info("💰 Wallet updated u=%s Δ=%.2f new=%.2f bet=%s (combo void)",
+                structured_log.count('settlement.combos_voided')
+                logger.debug("💰 Wallet updated u=%s Δ=%.2f new=%.2f bet=%s (combo void)",
                             user.id, bet.stake, user.balance, bet.id)
             
         except Exception as e:
@@ -1063,7 +1028,7 @@ class BetSettlementService:
                     break
             
             if not current_selection:
-                logger.info(f"Match {current_match_id} not found in combo bet {bet.id} selections")
+                logger.debug(f"Match {current_match_id} not found in combo bet {bet.id} selections")
                 return
             
             # Check if this selection won
@@ -1105,12 +1070,14 @@ class BetSettlementService:
                         )
                         
                         current_app.db.session.add(transaction)
-                        logger.info(f"🎯 User {user.username} WON combo bet {bet.id} - ${bet.actual_return}")
+                        structured_log.count('settlement.combos_won')
+                        logger.debug(f"🎯 User {user.username} WON combo bet {bet.id} - ${bet.actual_return}")
                 else:
                     # Combo bet lost - at least one selection lost
                     bet.status = 'lost'
                     bet.actual_return = 0.0
-                    logger.info(f"❌ Combo bet {bet.id} LOST - not all selections won")
+                    structured_log.count('settlement.combos_lost')
+                    logger.debug(f"❌ Combo bet {bet.id} LOST - not all selections won")
                 
                 bet.settled_at = datetime.utcnow()
                 bet.combo_selections = json.dumps(selections)  # Update with results
@@ -1136,17 +1103,14 @@ class BetSettlementService:
                         )
                         current_app.db.session.add_all([user, transaction])
                         
-                        logger.info(f"💰 Combo bet wallet updated u={user.id} Δ={bet.actual_return:.2f} new={user.balance:.2f} bet={bet.id}")
+                        logger.debug(f"💰 Combo bet wallet updated u={user.id} Δ={bet.actual_return:.2f} new={user.balance:.2f} bet={bet.id}")
                         
-                        # Emit WebSocket balance update event (only if in app context)
+                        # Emit WebSocket balance update event (via the socket tier)
                         try:
-                            from flask import current_app
-                            if current_app:
-                                from src.main import socketio
-                                socketio.emit('balance:update', {
-                                    'user_id': user.id,
-                                    'balance': user.balance
-                                }, to=f'user_{user.id}', namespace='/')
+                            publish_user_event(user.id, 'balance:update', {
+                                'user_id': user.id,
+                                'balance': user.balance
+                            })
                         except Exception as e:
                             logger.warning(f"Failed to emit WebSocket events: {e}")
                     
@@ -1157,11 +1121,11 @@ class BetSettlementService:
                     logger.error(f"Error updating wallet for combo bet {bet.id}: {e}")
                     current_app.db.session.rollback()
                 
-                logger.info(f"🎯 Combo bet {bet.id} fully settled: {'WON' if all_won else 'LOST'}")
+                logger.debug(f"🎯 Combo bet {bet.id} fully settled: {'WON' if all_won else 'LOST'}")
             else:
                 # Not all selections settled yet - update the combo bet with current progress
                 bet.combo_selections = json.dumps(selections)
-                logger.info(f"🎯 Combo bet {bet.id} selection {current_match_id} settled: {'WON' if selection_won else 'LOST'}")
+                logger.debug(f"🎯 Combo bet {bet.id} selection {current_match_id} settled: {'WON' if selection_won else 'LOST'}")
             
         except Exception as e:
             logger.error(f"Error settling combo bet {bet.id}: {e}")
@@ -1272,20 +1236,19 @@ class BetSettlementService:
                 
                 # Get historical events to check for completed matches
                 historical_events = []
-                for days_ago in range(1, 8):  # Check last 7 days
+                endpoints = [f'soccernew/d-{days_ago}' for days_ago in range(1, 8)]  # Check last 7 days
+                for endpoint, historical_data in zip(endpoints, self.client.fetch_many(endpoints, use_cache=False)):
+                    if not historical_data:
+                        continue
                     try:
-                        endpoint = f'soccernew/d-{days_ago}'
-                        historical_data = self.client._make_request(endpoint, use_cache=False)
-                        if historical_data:
-                            matches = self.client._extract_matches_from_goalserve_data(historical_data)
-                            for match in matches:
-                                # Parse match into event format for settlement (include completed matches)
-                                event = self._parse_match_for_settlement(match, 'soccer', endpoint)
-                                if event:
-                                    historical_events.append(event)
+                        matches = self.client._extract_matches_from_goalserve_data(historical_data)
+                        for match in matches:
+                            # Parse match into event format for settlement (include completed matches)
+                            event = self._parse_match_for_settlement(match, 'soccer', endpoint)
+                            if event:
+                                historical_events.append(event)
                     except Exception as e:
-                        logger.warning(f"Error fetching historical data for d-{days_ago}: {e}")
-                        continue
+                        logger.warning(f"Error fetching historical data for {endpoint}: {e}")
                 
                 self._check_match_completion(match_name, pending_bets, historical_events)
             else:
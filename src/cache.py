@@ -1,14 +1,24 @@
 """
 Cache management for public odds snapshot
 Provides fast access to odds data without authentication
+
+The snapshot is sharded: one pre-serialized, gzip-compressed JSON blob per sport,
+stored under a content-addressed key (odds:snapshot:v2:shard:<sport>:<hash>), plus
+a small manifest listing each sport's version, hash and sizes. A rebuild only
+writes the shards whose content changed; readers stream shards straight from
+their stored bytes and clients can re-fetch just the sports whose version moved.
 """
 
-import json
+import sys
 import time
 import os
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Iterable, Iterator, List
+
+from src.utils import json_codec, metrics
+from src.utils.cache_registry import register_cache
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +27,7 @@ try:
     from redis import Redis
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     redis = Redis.from_url(REDIS_URL, decode_responses=True)
+    redis_raw = Redis.from_url(REDIS_URL)  # shard blobs are compressed bytes
     USE_REDIS = True
     logger.info("✅ Redis cache enabled")
 except ImportError:
@@ -24,100 +35,185 @@ except ImportError:
     logger.warning("⚠️ Redis not available, using in-memory cache")
 
 # Cache configuration
-SNAPSHOT_KEY = "odds:snapshot:v1"
-SNAPSHOT_TTL = 20  # seconds (tune 10-30s)
+SNAPSHOT_PREFIX = "odds:snapshot:v2"
+MANIFEST_KEY = f"{SNAPSHOT_PREFIX}:manifest"
+SHARD_KEY = SNAPSHOT_PREFIX + ":shard:{sport}:{hash}"
+SNAPSHOT_TTL = 20   # seconds a manifest counts as fresh (tune 10-30s)
+SHARD_TTL = 3600    # shards outlive every manifest that can still reference them
+LOCAL_SHARDS = 64   # content-addressed, so a local copy never goes stale
+
+# Fallback in-memory cache (also the local tier in front of Redis for shards)
+_memory_manifest: Optional[Dict[str, Any]] = None
+_local_shards: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def _remember_shard(key: str, blob: bytes):
+    _local_shards[key] = blob
+    _local_shards.move_to_end(key)
+    while len(_local_shards) > LOCAL_SHARDS and USE_REDIS:
+        _local_shards.popitem(last=False)
+
+
+def cache_size_bytes() -> int:
+    return sum(len(blob) for blob in list(_local_shards.values()))
+
+
+def cache_entries() -> int:
+    return len(_local_shards)
+
 
-# Fallback in-memory cache
-_memory_cache = {}
-_memory_cache_timestamps = {}
+def shrink(nbytes: int) -> int:
+    """Memory budget: drop least recently used local shard copies (Redis still has them)"""
+    freed = 0
+    while USE_REDIS and _local_shards and freed < nbytes:
+        _, blob = _local_shards.popitem(last=False)
+        freed += len(blob)
+    return freed
 
-def get_snapshot_from_cache() -> Optional[Dict[str, Any]]:
-    """Get snapshot from cache (Redis or memory)"""
+
+# Without Redis the local shards are the only copy and shrink() leaves them alone
+register_cache("snapshot_shards", sys.modules[__name__], cost=1)
+
+
+def get_manifest() -> Optional[Dict[str, Any]]:
+    """Latest snapshot manifest, however old (see manifest_is_fresh)"""
     try:
         if USE_REDIS:
-            raw = redis.get(SNAPSHOT_KEY)
+            raw = redis.get(MANIFEST_KEY)
+            metrics.CACHE_REQUESTS.inc(cache="snapshot_manifest", result="hit" if raw else "miss")
             if raw:
-                return json.loads(raw)
+                return json_codec.loads(raw)
         else:
-            # Check in-memory cache
-            if SNAPSHOT_KEY in _memory_cache:
-                timestamp = _memory_cache_timestamps.get(SNAPSHOT_KEY, 0)
-                if time.time() - timestamp < SNAPSHOT_TTL:
-                    return _memory_cache[SNAPSHOT_KEY]
+            return _memory_manifest
     except Exception as e:
         logger.error(f"❌ Cache read error: {e}")
-    
     return None
 
-def save_snapshot_to_cache(data: Dict[str, Any]):
-    """Save snapshot to cache (Redis or memory)"""
+
+def manifest_is_fresh(manifest: Optional[Dict[str, Any]]) -> bool:
+    return bool(manifest) and time.time() - manifest.get("built_at", 0) < SNAPSHOT_TTL
+
+
+def get_shard(sport: str, digest: str) -> Optional[bytes]:
+    """Gzip-compressed JSON of one sport's shard"""
+    key = SHARD_KEY.format(sport=sport, hash=digest)
+    blob = _local_shards.get(key)
+    if blob is not None or not USE_REDIS:
+        metrics.CACHE_REQUESTS.inc(cache="snapshot_shard", result="local_hit" if blob is not None else "miss")
+        return blob
+    try:
+        blob = redis_raw.get(key)
+    except Exception as e:
+        logger.error(f"❌ Cache read error for shard {sport}: {e}")
+        return None
+    metrics.CACHE_REQUESTS.inc(cache="snapshot_shard", result="hit" if blob is not None else "miss")
+    if blob is not None:
+        _remember_shard(key, blob)
+    return blob
+
+
+def missing_shards(shards: Dict[str, str]) -> List[str]:
+    """Sports (from {sport: hash}) whose shard is no longer stored"""
+    if not USE_REDIS:
+        return [s for s, h in shards.items() if SHARD_KEY.format(sport=s, hash=h) not in _local_shards]
     try:
+        pipe = redis_raw.pipeline()
+        for sport, digest in shards.items():
+            pipe.exists(SHARD_KEY.format(sport=sport, hash=digest))
+        return [sport for sport, exists in zip(shards, pipe.execute()) if not exists]
+    except Exception as e:
+        logger.error(f"❌ Cache read error: {e}")
+        return list(shards)
+
+
+def save_snapshot(manifest: Dict[str, Any], new_shards: Dict[str, bytes]):
+    """Store changed shard blobs ({sport: gzip bytes}, matching the manifest hashes) and the manifest"""
+    global _memory_manifest
+    try:
+        shards = manifest.get("shards", {})
         if USE_REDIS:
-            redis.setex(SNAPSHOT_KEY, SNAPSHOT_TTL, json.dumps(data))
+            pipe = redis_raw.pipeline()
+            for sport, meta in shards.items():
+                key = SHARD_KEY.format(sport=sport, hash=meta["hash"])
+                if sport in new_shards:
+                    pipe.set(key, new_shards[sport], ex=SHARD_TTL)
+                else:
+                    pipe.expire(key, SHARD_TTL)
+            pipe.set(MANIFEST_KEY, json_codec.dumps_bytes(manifest))
+            pipe.execute()
         else:
-            # Save to in-memory cache
-            _memory_cache[SNAPSHOT_KEY] = data
-            _memory_cache_timestamps[SNAPSHOT_KEY] = time.time()
-        
-        logger.info(f"💾 Snapshot cached successfully (TTL: {SNAPSHOT_TTL}s)")
+            live = {SHARD_KEY.format(sport=s, hash=m["hash"]) for s, m in shards.items()}
+            for key in [k for k in _local_shards if k not in live]:
+                del _local_shards[key]
+            _memory_manifest = manifest
+        for sport, blob in new_shards.items():
+            _remember_shard(SHARD_KEY.format(sport=sport, hash=shards[sport]["hash"]), blob)
+
+        logger.info(f"💾 Snapshot cached: {len(shards)} shards, {len(new_shards)} rewritten")
     except Exception as e:
         logger.error(f"❌ Cache write error: {e}")
 
-def redact_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
-    """Redact sensitive data from snapshot for public access"""
-    try:
-        if not snapshot or 'data' not in snapshot:
-            return snapshot
-        
-        redacted = {
-            "ts": snapshot.get("ts"),
-            "cached_at": datetime.now().isoformat(),
-            "data": {}
-        }
-        
-        # Process each sport's data
-        for sport, sport_data in snapshot.get("data", {}).items():
-            if isinstance(sport_data, list):
-                # Limit to first 400 events per sport to bound payload
-                redacted["data"][sport] = sport_data[:400]
-            else:
-                redacted["data"][sport] = sport_data
-        
-        return redacted
-    except Exception as e:
-        logger.error(f"❌ Error redacting snapshot: {e}")
-        return snapshot
+
+def iter_shard_json(blob: bytes, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Decompress a stored shard in chunks"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for start in range(0, len(blob), chunk_size):
+        data = decompressor.decompress(blob[start:start + chunk_size])
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def iter_snapshot_json(manifest: Dict[str, Any], sports: Optional[Iterable[str]] = None) -> Iterator[bytes]:
+    """
+    Stream the public snapshot document for the given sports (default: all) as JSON
+
+    {"type": "snapshot", "ts": ..., "cached_at": ..., "manifest": {...}, "data": {sport: shard, ...}}
+    Shards are emitted in manifest order from their stored bytes; no combined dict is built.
+    """
+    shards = manifest.get("shards", {})
+    wanted = [s for s in shards if sports is None or s in sports]
+    header = {
+        "type": "snapshot",
+        "ts": manifest.get("ts"),
+        "cached_at": manifest.get("ts"),
+        "etag": manifest.get("etag"),
+        "manifest": {s: public_shard_meta(shards[s]) for s in wanted},
+    }
+    yield json_codec.dumps_bytes(header)[:-1] + b',"data":{'
+    first = True
+    for sport in wanted:
+        blob = get_shard(sport, shards[sport]["hash"])
+        if blob is None:
+            logger.warning(f"⚠️ Shard {sport} missing from cache, skipped")
+            continue
+        yield (b"" if first else b",") + json_codec.dumps_bytes(sport) + b":"
+        yield from iter_shard_json(blob)
+        first = False
+    yield b"}}"
+
+
+def public_shard_meta(meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: meta[k] for k in ("version", "hash", "bytes", "gzip_bytes", "updated_at") if k in meta}
+
 
 def get_cache_status() -> Dict[str, Any]:
     """Get cache status and statistics"""
     try:
-        if USE_REDIS:
-            ttl = redis.ttl(SNAPSHOT_KEY)
-            exists = redis.exists(SNAPSHOT_KEY)
-            return {
-                "type": "redis",
-                "exists": bool(exists),
-                "ttl": ttl if ttl > 0 else None,
-                "url": REDIS_URL
-            }
-        else:
-            if SNAPSHOT_KEY in _memory_cache:
-                timestamp = _memory_cache_timestamps.get(SNAPSHOT_KEY, 0)
-                age = time.time() - timestamp
-                ttl = max(0, SNAPSHOT_TTL - age)
-                return {
-                    "type": "memory",
-                    "exists": True,
-                    "ttl": ttl if ttl > 0 else None,
-                    "age": age
-                }
-            else:
-                return {
-                    "type": "memory",
-                    "exists": False,
-                    "ttl": None,
-                    "age": None
-                }
+        manifest = get_manifest()
+        status = {
+            "type": "redis" if USE_REDIS else "memory",
+            "exists": manifest is not None,
+            "fresh": manifest_is_fresh(manifest),
+            "age": time.time() - manifest["built_at"] if manifest else None,
+            "shards": len(manifest["shards"]) if manifest else 0,
+            "bytes": sum(m.get("bytes", 0) for m in manifest["shards"].values()) if manifest else 0,
+            "gzip_bytes": sum(m.get("gzip_bytes", 0) for m in manifest["shards"].values()) if manifest else 0,
+            "local_shards": len(_local_shards),
+        }
+        return status
     except Exception as e:
         logger.error(f"❌ Error getting cache status: {e}")
         return {"type": "error", "error": str(e)}
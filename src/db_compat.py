@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 print("db_compat loaded from:", __file__)
-import os, re
+import os, re, time
 import logging
 from contextlib import contextmanager
 from typing import Any, Iterable, Mapping, Sequence, Optional
@@ -12,6 +12,17 @@ import psycopg
 from psycopg.rows import dict_row
 from psycopg_pool import ConnectionPool
 
+from src.utils import metrics
+
+DB_QUERY_SECONDS = metrics.histogram(
+    "db_query_duration_seconds", "CompatCursor.execute/executemany time by statement type", ["statement"])
+DB_POOL_WAIT_SECONDS = metrics.histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection")
+DB_CONNECTION_HOLD_SECONDS = metrics.histogram(
+    "db_connection_hold_seconds", "Time a connection_ctx() connection was checked out")
+DB_POOL_STATS = metrics.gauge(
+    "db_pool", "psycopg_pool statistics at scrape time", ["stat"])
+
 # Compile regex patterns once and cache them
 _QMARK = re.compile(r"\?")
 _NAMED = re.compile(r"(?<!:):([a-zA-Z_]\w*)")
@@ -28,6 +39,12 @@ def adapt_sql(sql: str) -> str:
     s = _BOOL_0.sub(r"\1FALSE", s)
     return s
 
+@lru_cache(maxsize=1000)
+def statement_type(sql: str) -> str:
+    """First SQL keyword, the low-cardinality label for query timings"""
+    word = sql.lstrip(" \t\n(").split(None, 1)[:1]
+    return word[0].upper() if word else "EMPTY"
+
 def force_gc_collect():
     """Force garbage collection to free memory"""
     import gc
@@ -102,11 +119,14 @@ class CompatCursor:
         adapted_params = adapt_params(params) if params else None
         
         # Execute the query - try with prepare=False for PgBouncer compatibility
+        started = time.perf_counter()
         try:
             self._cursor.execute(adapted_sql, adapted_params, prepare=False)
         except TypeError:
             # Fallback if prepare parameter is not supported
             self._cursor.execute(adapted_sql, adapted_params)
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, statement=statement_type(adapted_sql))
         
         # Check if this is an INSERT with RETURNING
         if adapted_sql.strip().upper().startswith('INSERT') and 'RETURNING' in adapted_sql.upper():
@@ -154,7 +174,8 @@ class CompatCursor:
     def executemany(self, sql: str, seq: Iterable[Any]):
         adapted_sql = adapt_sql(sql)
         adapted_params = [adapt_params(params) for params in seq]
-        return self._cursor.executemany(adapted_sql, adapted_params)
+        with DB_QUERY_SECONDS.time(statement=statement_type(adapted_sql)):
+            return self._cursor.executemany(adapted_sql, adapted_params)
     
     def fetchone(self):
         # If we have a stored result from RETURNING, return it
@@ -300,14 +321,14 @@ def pool() -> ConnectionPool:
                 from psycopg.rows import dict_row
                 
                 # Determine process type and set appropriate pool size
-                process_type = os.getenv("PROCESS_TYPE", "web")  # web, worker_odds, worker_settlement
+                process_type = os.getenv("PROCESS_TYPE", "web")  # web, worker_odds, worker_settlement, worker_socket
                 
-                if process_type == "worker_odds":
-                    # Odds worker: small pool (only needs a few connections)
+                if process_type in ("worker_odds", "worker_socket"):
+                    # Odds / socket worker: small pool (only needs a few connections)
                     max_conn = int(os.getenv("DB_WORKER_POOL_MAX", "5"))
                     min_conn = 1
                     conn_timeout = 10.0
-                    print(f"Initializing ODDS WORKER pool")
+                    print(f"Initializing {process_type.upper()} pool")
                 elif process_type == "worker_settlement":
                     # Settlement worker: small pool
                     max_conn = int(os.getenv("DB_WORKER_POOL_MAX", "5"))
@@ -339,16 +360,19 @@ def connection_ctx(timeout=10):
     Canonical context manager for DB access - use everywhere
     Includes connection leak detection (warns if held > 300ms)
     """
-    import time
     p = pool()  # existing global Pool factory
-    start_time = time.time()
+    wait_start = time.perf_counter()
     raw = p.getconn(timeout=timeout)
+    start_time = time.perf_counter()
+    DB_POOL_WAIT_SECONDS.observe(start_time - wait_start)
     
     try:
         yield raw
     finally:
         # Calculate how long connection was held
-        hold_time_ms = (time.time() - start_time) * 1000
+        hold_seconds = time.perf_counter() - start_time
+        DB_CONNECTION_HOLD_SECONDS.observe(hold_seconds)
+        hold_time_ms = hold_seconds * 1000
         
         # Warn if connection held too long (potential leak or slow query)
         if hold_time_ms > 300:  # 300ms threshold
@@ -422,6 +446,15 @@ def log_pool_metrics():
         logging.error(f"Error getting pool metrics: {e}")
         return {}
 
+def collect_pool_metrics():
+    """Scrape-time collector: copy the pool's own counters into the db_pool gauge"""
+    if _POOL is None or not hasattr(_POOL, 'get_stats'):
+        return
+    for stat, value in _POOL.get_stats().items():
+        DB_POOL_STATS.set(value, stat=stat)
+
+metrics.register_collector(collect_pool_metrics)
+
 def debug_pool(tag=""):
     """Debug helper to log pool stats"""
     try:
@@ -450,7 +483,8 @@ def connect(dsn: Optional[str] = None, *, autocommit: bool = False, use_pool: bo
     Only use if caller will putconn() correctly.
     """
     if use_pool:
-        raw = pool().getconn()
+        with DB_POOL_WAIT_SECONDS.time():
+            raw = pool().getconn()
         conn = CompatConnection(raw)
         conn._pool = pool()
         if autocommit:
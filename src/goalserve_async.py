@@ -0,0 +1,238 @@
+"""
+Async GoalServe Feed Client
+Pooled httpx client that fetches many GoalServe endpoints concurrently
+
+All GoalServe traffic in the process goes through one httpx.AsyncClient running on
+a dedicated event-loop thread, so keep-alive connections are shared and a global
+token bucket (GOALSERVE_RATE_LIMIT requests/s, GOALSERVE_BURST burst) plus a
+concurrency cap (GOALSERVE_MAX_CONCURRENCY) bound what we send upstream no matter
+how many callers fetch at once. Sync code calls fetch_many(), which blocks until
+the whole batch is done: a batch costs its slowest request, not the sum.
+
+JSON bodies are decoded by ijson while they stream in; anything that isn't JSON
+(GoalServe sometimes answers json=1 with XML) is buffered and handed to
+robust_goalserve_parse. HTTP/2 is negotiated when the h2 package is installed and
+the base URL is https; the public GoalServe feed is plain http, so today that
+means HTTP/1.1 keep-alive.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT = float(os.getenv("GOALSERVE_RATE_LIMIT", "20"))        # requests per second
+BURST = int(os.getenv("GOALSERVE_BURST", "10"))
+MAX_CONCURRENCY = int(os.getenv("GOALSERVE_MAX_CONCURRENCY", "8"))
+BATCH_TIMEOUT = 60  # seconds a sync caller waits for a whole batch
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+FeedRequest = Union[str, Tuple[str, Optional[Dict[str, Any]]]]
+
+
+class AsyncRateLimiter:
+    """Token bucket shared by every request on the loop"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class _StreamReader:
+    """Async file-like view of a response body for ijson; keeps the chunks for fallback parsing"""
+
+    def __init__(self, first: bytes, chunks):
+        self.chunks = [first]
+        self._pending = first
+        self._iter = chunks
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:  # ijson probes the reader type with read(0)
+            return b""
+        if self._pending:
+            data, self._pending = self._pending, b""
+            return data
+        try:
+            chunk = await self._iter.__anext__()
+        except StopAsyncIteration:
+            return b""
+        self.chunks.append(chunk)
+        return chunk
+
+    async def read_all(self) -> bytes:
+        async for chunk in self._iter:
+            self.chunks.append(chunk)
+        return b"".join(self.chunks)
+
+
+class AsyncGoalServeClient:
+    def __init__(self, base_url: str, access_token: str, headers: Optional[Dict[str, str]] = None,
+                 timeout: Tuple[float, float] = (5, 15)):
+        self.base_url = base_url
+        self.access_token = access_token
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.http2 = HTTP2_AVAILABLE and base_url.startswith("https")
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name="goalserve-async")
+        self._thread.start()
+        # Loop-bound objects are created on the loop itself
+        asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+
+        self.requests_sent = 0
+        self.requests_failed = 0
+
+    async def _setup(self):
+        connect, read = self.timeout
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY),
+            http2=self.http2,
+        )
+        self._limiter = AsyncRateLimiter(RATE_LIMIT, BURST)
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    def fetch_many(self, requests: Sequence[FeedRequest], timeout: float = BATCH_TIMEOUT) -> List[Optional[Any]]:
+        """Fetch endpoints concurrently; results line up with requests, None for failures"""
+        if not requests:
+            return []
+        start_time = time.time()
+        future = asyncio.run_coroutine_threadsafe(self._fetch_all(requests), self._loop)
+        try:
+            results, latencies = future.result(timeout)
+        except Exception as e:
+            future.cancel()
+            logger.error(f"❌ GoalServe batch of {len(requests)} failed: {e}")
+            return [None] * len(requests)
+        logger.info(f"🌐 Fetched {len(requests)} GoalServe endpoints in {time.time() - start_time:.2f}s "
+                    f"(sequential would be ~{sum(latencies):.2f}s)")
+        return results
+
+    async def _fetch_all(self, requests: Iterable[FeedRequest]):
+        outcomes = await asyncio.gather(*(self.fetch(*_split(r)) for r in requests))
+        return [data for data, _ in outcomes], [elapsed for _, elapsed in outcomes]
+
+    async def fetch(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Any], float]:
+        """One endpoint -> (parsed body or None, seconds spent on the wire)"""
+        url = f"{self.base_url}/{self.access_token}/{endpoint}"
+        params = dict(params or {})
+        params["json"] = "1"  # Always request JSON format
+
+        async with self._semaphore:
+            await self._limiter.acquire()
+            start_time = time.monotonic()
+            self.requests_sent += 1
+            result = "error"
+            try:
+                async with self._client.stream("GET", url, params=params) as response:
+                    if response.status_code != 200:
+                        logger.error(f"API request failed with status {response.status_code} for {endpoint}")
+                        self.requests_failed += 1
+                        result = f"http_{response.status_code}"
+                        return None, time.monotonic() - start_time
+                    data = await self._decode(response)
+                result = "ok"
+                return data, time.monotonic() - start_time
+            except httpx.TimeoutException:
+                logger.error(f"Request timeout for {endpoint}")
+                result = "timeout"
+            except httpx.HTTPError as e:
+                logger.error(f"Request failed for {endpoint}: {e}")
+            except Exception as e:
+                logger.error(f"Failed to read response for {endpoint}: {e}")
+            finally:
+                metrics.FEED_FETCH_SECONDS.observe(time.monotonic() - start_time, feed="goalserve",
+                                                   endpoint=endpoint, result=result)
+            self.requests_failed += 1
+            return None, time.monotonic() - start_time
+
+    async def _decode(self, response: httpx.Response) -> Optional[Any]:
+        from src.goalserve_client import robust_goalserve_parse
+
+        chunks = response.aiter_bytes()
+        first = b""
+        async for chunk in chunks:
+            first += chunk
+            if first.lstrip(UTF8_BOM + b" \t\r\n"):
+                break
+        if first.startswith(UTF8_BOM):
+            first = first[len(UTF8_BOM):]
+        reader = _StreamReader(first, chunks)
+        content_type = response.headers.get("content-type", "").lower()
+
+        if ijson is not None and first.lstrip()[:1] in (b"{", b"["):
+            try:
+                async for document in ijson.items_async(reader, "", use_float=True):
+                    return document
+            except ijson.JSONError as e:
+                logger.warning(f"Streaming JSON decode failed, re-parsing buffered body: {e}")
+
+        body = await reader.read_all()
+        text = body.decode(response.encoding or "utf-8", errors="replace")
+        return await self._loop.run_in_executor(None, robust_goalserve_parse, text, content_type)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_sent": self.requests_sent,
+            "requests_failed": self.requests_failed,
+            "rate_limit": RATE_LIMIT,
+            "burst": BURST,
+            "max_concurrency": MAX_CONCURRENCY,
+            "http2": self.http2,
+        }
+
+
+def _split(request: FeedRequest) -> Tuple[str, Optional[Dict[str, Any]]]:
+    if isinstance(request, str):
+        return request, None
+    return request
+
+
+_async_client: Optional[AsyncGoalServeClient] = None
+_async_client_lock = threading.Lock()
+
+
+def get_async_goalserve_client(base_url: str, access_token: str, headers: Optional[Dict[str, str]] = None,
+                               timeout: Tuple[float, float] = (5, 15)) -> AsyncGoalServeClient:
+    """Process-wide client: one pool and one rate limit for every OptimizedGoalServeClient"""
+    global _async_client
+    with _async_client_lock:
+        if _async_client is None:
+            _async_client = AsyncGoalServeClient(base_url, access_token, headers, timeout)
+        return _async_client
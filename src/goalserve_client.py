@@ -14,10 +14,16 @@ import gzip
 from io import BytesIO
 from pathlib import Path
 
+from src.goalserve_async import get_async_goalserve_client
+from src.utils import json_codec
+from src.utils.cache_registry import deep_sizeof, register_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+RESPONSE_SIZE_NODES = 500_000  # feed responses are large; measure them fully
+
 def robust_goalserve_parse(response_text, content_type=""):
     """
     Robust parsing for Goalserve responses that might be JSON or XML
@@ -26,7 +32,7 @@ def robust_goalserve_parse(response_text, content_type=""):
     try:
         # Try JSON first if content type suggests it
         if "json" in content_type.lower() or response_text.strip().startswith("{"):
-            return json.loads(response_text)
+            return json_codec.loads(response_text)
     except (json.JSONDecodeError, ValueError):
         pass
     
@@ -59,6 +65,7 @@ class OptimizedGoalServeClient:
         self.cache = {}
         self.cache_duration = 300  # 5 minutes cache
         self.cache_lock = threading.Lock()
+        register_cache('goalserve_responses', self, cost=3)  # a miss is a rate-limited upstream call
         
         # Request configuration for faster responses
         self.session = requests.Session()
@@ -71,6 +78,13 @@ class OptimizedGoalServeClient:
         
         # Timeout settings
         self.timeout = (5, 15)  # (connect_timeout, read_timeout)
+
+        # Feed requests share one pooled, rate-limited async client per process
+        self.async_client = get_async_goalserve_client(
+            self.base_url, self.access_token,
+            headers={k: v for k, v in self.session.headers.items() if k != 'Connection'},
+            timeout=self.timeout,
+        )
         
         # Sports configuration with working endpoints
         self.sports_config = {
@@ -257,69 +271,32 @@ class OptimizedGoalServeClient:
 
     def _make_request(self, endpoint: str, params: Dict = None, use_cache: bool = True) -> Optional[Dict]:
         """Make optimized API request with caching"""
-        cache_key = self._get_cache_key(endpoint, params)
-        
-        # Check cache first
-        if use_cache:
-            cached_data = self._get_from_cache(cache_key)
-            if cached_data is not None:
-                return cached_data
+        return self.fetch_many([(endpoint, params)], use_cache=use_cache)[0]
 
-        # Build URL
-        url = f"{self.base_url}/{self.access_token}/{endpoint}"
-        if not params:
-            params = {}
-        params['json'] = '1'  # Always request JSON format
+    def fetch_many(self, requests: List, use_cache: bool = True) -> List[Optional[Dict]]:
+        """
+        Fetch several endpoints concurrently through the shared async client
 
-        try:
-            # Log the actual URL with parameters
-            full_url = f"{url}?json=1"
-            logger.info(f"Making API call to: {full_url}")
-            start_time = time.time()
-            
-            response = self.session.get(url, params=params, timeout=self.timeout)
-            
-            elapsed_time = time.time() - start_time
-            logger.info(f"API call completed in {elapsed_time:.2f} seconds")
-            
-            if response.status_code != 200:
-                logger.error(f"API request failed with status {response.status_code}")
-                return None
+        requests are endpoint strings or (endpoint, params) pairs; the result list lines
+        up with them, with None where a request failed.
+        """
+        requests = [(r, None) if isinstance(r, str) else r for r in requests]
+        results: List[Optional[Dict]] = [None] * len(requests)
+        to_fetch = []
+        for i, (endpoint, params) in enumerate(requests):
+            cached_data = self._get_from_cache(self._get_cache_key(endpoint, params)) if use_cache else None
+            if cached_data is not None:
+                results[i] = cached_data
+            else:
+                to_fetch.append(i)
 
-            # Parse response
-            try:
-                # Check if response is XML (common for GoalServe)
-                content_type = response.headers.get('content-type', '').lower()
-                if 'xml' in content_type or response.text.strip().startswith('<?xml'):
-                    logger.info("Detected XML response, converting to JSON")
-                    # Try to parse XML as JSON (sometimes GoalServe returns XML even with json=1)
-                    # For now, let's try to parse it anyway
-                    logger.warning("API returned XML despite json=1 parameter, attempting to parse anyway")
-                
-                # Handle UTF-8 BOM if present
-                text = response.text
-                if text.startswith('\ufeff'):
-                    text = text[1:]  # Remove BOM
-                
-                data = robust_goalserve_parse(text, content_type)
-                logger.info("Parsed JSON response successfully")
-                
-                # Cache the result
-                if use_cache:
-                    self._set_cache(cache_key, data)
-                
-                return data
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON: {e}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            logger.error(f"Request timeout for {url}")
-            return None
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {url}: {e}")
-            return None
+        if to_fetch:
+            fetched = self.async_client.fetch_many([requests[i] for i in to_fetch])
+            for i, data in zip(to_fetch, fetched):
+                results[i] = data
+                if use_cache and data is not None:
+                    self._set_cache(self._get_cache_key(*requests[i]), data)
+        return results
 
     def get_available_sports(self) -> List[Dict]:
         """Get available sports by scanning Sports Pre Match folder"""
@@ -444,9 +421,7 @@ class OptimizedGoalServeClient:
     def _count_events_in_json(self, json_file: Path) -> int:
         """Count events in a JSON file"""
         try:
-            import json
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = json_codec.load_path(json_file)
             
             # Handle different JSON structures
             if 'odds_data' in data and 'scores' in data['odds_data']:
@@ -619,9 +594,7 @@ class OptimizedGoalServeClient:
                 logger.warning(f"JSON file not found for {sport_name} in any expected location")
                 return []
 
-            import json
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = json_codec.load_path(json_file)
             
             # Extract events from the JSON data
             events = self._extract_events_from_json(data, sport_name, config, limit)
@@ -985,8 +958,7 @@ class OptimizedGoalServeClient:
                 logger.warning(f"High memory usage before loading {sport_name}, skipping")
                 return {}
             
-            with open(json_file, 'r', encoding='utf-8') as f:
-                odds_data = json.load(f)
+            odds_data = json_codec.load_path(json_file)
             
             log_mem(f"after loading {sport_name} JSON")
             
@@ -1295,6 +1267,33 @@ class OptimizedGoalServeClient:
     
 
 
+    def cache_size_bytes(self) -> int:
+        """Estimated memory held by cached responses (each response is measured once)"""
+        with self.cache_lock:
+            entries = list(self.cache.values())
+        total = 0
+        for entry in entries:
+            if 'bytes' not in entry:
+                entry['bytes'] = deep_sizeof(entry['data'], max_nodes=RESPONSE_SIZE_NODES)
+            total += entry['bytes']
+        return total
+
+    def cache_entries(self) -> int:
+        return len(self.cache)
+
+    def shrink(self, nbytes: int) -> int:
+        """Memory budget: drop expired responses, then the oldest, until about nbytes are freed"""
+        freed = 0
+        with self.cache_lock:
+            oldest_first = sorted(self.cache.items(),
+                                  key=lambda item: (self._is_cache_valid(item[1]), item[1]['timestamp']))
+            for cache_key, entry in oldest_first:
+                if freed >= nbytes:
+                    break
+                freed += entry.get('bytes') or deep_sizeof(entry['data'], max_nodes=RESPONSE_SIZE_NODES)
+                del self.cache[cache_key]
+        return freed
+
     def get_cache_stats(self) -> Dict:
         """Get cache statistics"""
         with self.cache_lock:
@@ -1304,6 +1303,7 @@ class OptimizedGoalServeClient:
         return {
             'total_entries': total_entries,
             'valid_entries': valid_entries,
-            'cache_duration': self.cache_duration
+            'cache_duration': self.cache_duration,
+            'http': self.async_client.stats()
         }
 
@@ -2,33 +2,241 @@
 Live Odds Cache Service - Manages in-memory cache of live odds and triggers UI updates
 """
 
-import json
 import logging
 import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+from datetime import datetime, timedelta, timezone
+from src.models.odds_event import OddsEvent
+from src.services.event_bus import SPLIT_WORKERS
+from src.utils import json_codec
+from src.utils.cache_registry import estimate_size, register_cache
 
 logger = logging.getLogger(__name__)
 
+# Live/finished statuses (case-insensitive substring match) - only pre-match events are cached
+SKIP_STATUSES = ['FT', 'HT', 'LIVE', 'Finished', 'Final', 'Ended', 'Completed',
+                 '1st Quarter', '2nd Quarter', '3rd Quarter', '4th Quarter',
+                 'Set 1', 'Set 2', 'Set 3', 'Overtime', 'In Progress']
+_SKIP_STATUS_RE = re.compile('|'.join(re.escape(s.lower()) for s in SKIP_STATUSES))
+
+_DATE_FORMATS = ('%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y', '%b %d')
+_NO_START = float('inf')  # events without a parseable start sort last and are never evicted as started
+MIN_EVENTS_PER_SPORT = 200  # the memory budget never trims a sport below this
+CAP_HOLD_SECONDS = 600      # a cap lowered by the memory budget lasts this long after the last trim
+
+
+def is_prematch_status(status: str) -> bool:
+    return not _SKIP_STATUS_RE.search((status or '').lower())
+
+
+def event_start_ts(event: Dict) -> float:
+    """UTC timestamp of an event's kick-off from its feed date/time, or inf if unknown"""
+    date_str = (event.get('formatted_date') or event.get('date') or '').strip()
+    if not date_str:
+        return _NO_START
+    time_str = (event.get('time') or '').strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            day = datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+        if fmt == '%b %d':
+            day = day.replace(year=datetime.now(timezone.utc).year)
+        try:
+            hours, minutes = (int(p) for p in time_str.split(':')[:2])
+            day = day.replace(hour=hours, minute=minutes)
+        except ValueError:
+            pass
+        return day.replace(tzinfo=timezone.utc).timestamp()
+    return _NO_START
+
+
+class SportEventIndex:
+    """
+    Compact events (OddsEvent) for one sport keyed by id, with secondary indexes
+
+    - by start time: sorted list of (start_ts, event_id), for date ranges and ordering
+    - by league / by status: sets of event ids
+    Feed updates are applied with sync(), which upserts changed events and deletes
+    the ones that disappeared, touching only the index entries that changed.
+    """
+
+    def __init__(self, sport_name: str):
+        self.sport_name = sport_name
+        self.events: Dict[str, OddsEvent] = {}
+        self._keys: Dict[str, Tuple[float, str, str]] = {}  # event_id -> (start_ts, league, status)
+        self._by_start: List[Tuple[float, str]] = []
+        self._by_league: Dict[str, set] = {}
+        self._by_status: Dict[str, set] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.events)
+
+    def upsert(self, event: OddsEvent) -> bool:
+        """Insert or replace one event; returns False if it was unchanged"""
+        event_id = str(event.id)
+        with self._lock:
+            if self.events.get(event_id) == event:
+                return False
+            keys = (event.start_ts, event.league, event.status)
+            old = self._keys.get(event_id)
+            if old != keys:
+                if old is not None:
+                    self._unindex(event_id, old)
+                insort(self._by_start, (keys[0], event_id))
+                self._by_league.setdefault(keys[1], set()).add(event_id)
+                self._by_status.setdefault(keys[2], set()).add(event_id)
+                self._keys[event_id] = keys
+            self.events[event_id] = event
+            return True
+
+    def remove(self, event_id: str) -> bool:
+        with self._lock:
+            keys = self._keys.pop(event_id, None)
+            if keys is None:
+                return False
+            self._unindex(event_id, keys)
+            del self.events[event_id]
+            return True
+
+    def _unindex(self, event_id: str, keys: Tuple[float, str, str]):
+        pos = bisect_left(self._by_start, (keys[0], event_id))
+        if pos < len(self._by_start) and self._by_start[pos] == (keys[0], event_id):
+            del self._by_start[pos]
+        for index, value in ((self._by_league, keys[1]), (self._by_status, keys[2])):
+            ids = index.get(value)
+            if ids is not None:
+                ids.discard(event_id)
+                if not ids:
+                    del index[value]
+
+    def sync(self, events: Iterable[OddsEvent]) -> Tuple[int, int, int]:
+        """Make the index match a full feed snapshot; returns (added, updated, removed)"""
+        added = updated = 0
+        seen = set()
+        with self._lock:
+            for event in events:
+                event_id = str(event.id)
+                seen.add(event_id)
+                existed = event_id in self.events
+                if self.upsert(event):
+                    if existed:
+                        updated += 1
+                    else:
+                        added += 1
+            gone = [event_id for event_id in self.events if event_id not in seen]
+            for event_id in gone:
+                self.remove(event_id)
+        return added, updated, len(gone)
+
+    def evict_started(self, now: float, grace_sec: float) -> int:
+        """Drop events whose kick-off is more than grace_sec in the past"""
+        cutoff = now - grace_sec
+        evicted = 0
+        with self._lock:
+            while self._by_start and self._by_start[0][0] < cutoff:
+                self.remove(self._by_start[0][1])
+                evicted += 1
+        return evicted
+
+    def trim(self, max_events: int) -> int:
+        """Bound memory by dropping the furthest-out events"""
+        dropped = 0
+        with self._lock:
+            while len(self.events) > max_events and self._by_start:
+                self.remove(self._by_start[-1][1])
+                dropped += 1
+        return dropped
+
+    def query(self, start_from: Optional[float] = None, start_to: Optional[float] = None,
+              league: Optional[str] = None, status: Optional[str] = None,
+              offset: int = 0, limit: int = 50) -> Tuple[List[Dict], int]:
+        """Events (as API dicts) ordered by start time within [start_from, start_to); returns (page, total)"""
+        with self._lock:
+            lo = 0 if start_from is None else bisect_left(self._by_start, (start_from, ''))
+            hi = len(self._by_start) if start_to is None else bisect_left(self._by_start, (start_to, ''))
+            candidates = self._by_start[lo:hi]
+            if league is not None or status is not None:
+                allowed = None
+                if league is not None:
+                    allowed = self._by_league.get(league, set())
+                if status is not None:
+                    status_ids = self._by_status.get(status, set())
+                    allowed = status_ids if allowed is None else allowed & status_ids
+                candidates = [c for c in candidates if c[1] in allowed]
+            total = len(candidates)
+            page = candidates[offset:offset + limit] if limit > 0 else candidates[offset:]
+            page_events = [self.events[event_id] for _, event_id in page]
+        return [event.to_dict() for event in page_events], total
+
+    def leagues(self) -> Dict[str, int]:
+        with self._lock:
+            return {league: len(ids) for league, ids in self._by_league.items()}
+
+
+def date_filter_range(date_filter: str, now: Optional[datetime] = None) -> Tuple[Optional[float], Optional[float]]:
+    """Map a date filter ('all', 'today', 'tomorrow', 'week', 'upcoming' or YYYY-MM-DD) to a UTC range"""
+    if not date_filter or date_filter == 'all':
+        return None, None
+    now = now or datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if date_filter == 'today':
+        start, days = today, 1
+    elif date_filter == 'tomorrow':
+        start, days = today + timedelta(days=1), 1
+    elif date_filter == 'week':
+        start, days = today, 7
+    elif date_filter == 'upcoming':
+        return now.timestamp(), None
+    else:
+        try:
+            start, days = datetime.strptime(date_filter, '%Y-%m-%d').replace(tzinfo=timezone.utc), 1
+        except ValueError:
+            raise ValueError(f"Invalid date filter: {date_filter}")
+    return start.timestamp(), (start + timedelta(days=days)).timestamp()
+
+
 class LiveOddsCacheService:
     def __init__(self):
-        self.cache_data = {}  # In-memory cache: {sport_name: {event_id: event_data}}
+        self.indexes: Dict[str, SportEventIndex] = {}  # sport_name -> indexed events
         self.cache_timestamps = {}  # Track when each sport's cache was last updated
         self.ui_update_callbacks = []  # Callbacks to trigger frontend updates
         self.running = False
         self.base_path = Path("Sports Pre Match")
         
         # Memory limits
-        self.max_events_per_sport = int(os.getenv('MAX_EVENTS_PER_SPORT', '2000'))
+        self.configured_max_events = int(os.getenv('MAX_EVENTS_PER_SPORT', '2000'))
+        self.max_events_per_sport = self.configured_max_events
+        self._cap_restore_at: Optional[float] = None
         self.cache_ttl_sec = int(os.getenv('CACHE_TTL_SEC', '180'))
+        self.started_grace_sec = int(os.getenv('STARTED_EVENT_GRACE_SEC', '300'))
+        # Refills only on the sport's next feed fetch, so the budget trims it last
+        register_cache('live_odds_events', self, cost=5)
         
-        # Initialize cache from existing JSON files
-        self._initialize_cache_from_files()
+        # Initialize cache from existing JSON files (split workers: odds_relay hydrates it from Redis)
+        if not SPLIT_WORKERS:
+            self._initialize_cache_from_files()
+    
+    @property
+    def cache_data(self) -> Dict[str, Dict[str, Dict]]:
+        """{sport_name: {event_id: OddsEvent}} view kept for existing callers"""
+        return {sport: index.events for sport, index in self.indexes.items()}
+    
+    def _index(self, sport_name: str) -> SportEventIndex:
+        index = self.indexes.get(sport_name)
+        if index is None:
+            index = self.indexes.setdefault(sport_name, SportEventIndex(sport_name))
+        return index
     
     def clear_cache(self):
         """Clear the entire cache"""
-        self.cache_data = {}
+        self.indexes = {}
         self.cache_timestamps = {}
         logger.info("🧹 Cache cleared")
     
@@ -36,7 +244,7 @@ class LiveOddsCacheService:
         """Reinitialize the cache from JSON files with current filtering"""
         try:
             logger.info("🔄 Reinitializing cache with current filtering...")
-            self.cache_data = {}
+            self.indexes = {}
             self.cache_timestamps = {}
             self._initialize_cache_from_files()
             logger.info("✅ Cache reinitialized successfully")
@@ -77,8 +285,7 @@ class LiveOddsCacheService:
                     
                     if json_file.exists():
                         try:
-                            with open(json_file, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
+                            data = json_codec.load_path(json_file)
                             
                             # Parse the data and populate cache
                             self._parse_and_cache_sport_data(sport_name, data)
@@ -87,47 +294,36 @@ class LiveOddsCacheService:
                         except Exception as e:
                             logger.error(f"❌ Error loading {sport_name} JSON: {e}")
             
-            logger.info(f"✅ Cache initialization complete. Sports loaded: {list(self.cache_data.keys())}")
+            logger.info(f"✅ Cache initialization complete. Sports loaded: {list(self.indexes.keys())}")
             
         except Exception as e:
             logger.error(f"❌ Error initializing cache from files: {e}")
     
+    def _iter_prematch_events(self, sport_name: str, data: Dict):
+        """Yield compact events for every pre-match (not live/finished) match in a feed payload"""
+        categories = data.get('odds_data', {}).get('scores', {}).get('categories', [])
+        for category in categories:
+            for match in category.get('matches', []):
+                # Filter out live/finished matches - only show pre-match odds
+                if not is_prematch_status(match.get('status', 'Not Started')):
+                    continue
+                event = self._parse_match_to_event(match, sport_name)
+                if event and event.get('id'):
+                    yield OddsEvent.from_dict(event, event_start_ts(event))
+    
     def _parse_and_cache_sport_data(self, sport_name: str, data: Dict):
-        """Parse JSON data and populate the cache for a specific sport"""
+        """Apply a full feed payload to the sport's index (incremental upsert/delete)"""
         try:
-            if 'odds_data' in data and 'scores' in data['odds_data']:
-                scores = data['odds_data']['scores']
-                if 'categories' in scores:
-                    for category in scores['categories']:
-                        if 'matches' in category:
-                            for match in category['matches']:
-                                # Filter out live/finished matches - only show pre-match odds
-                                status = match.get('status', 'Not Started')  # Default to 'Not Started' if no status
-                                skip_statuses = ['FT', 'HT', 'LIVE', 'Live', 'live', 'Finished', 'Final', 'Ended', 'Completed', 
-                                               '1st Quarter', '2nd Quarter', '3rd Quarter', '4th Quarter', 
-                                               'Set 1', 'Set 2', 'Set 3', 'Overtime', 'In Progress', 'in progress']
-                                
-                                # Debug logging for status filtering
-                                logger.info(f"🔍 Checking {sport_name} match {match.get('id', 'unknown')} status: '{status}'")
-                                
-                                # Case-insensitive filtering
-                                if any(skip_status.lower() in status.lower() for skip_status in skip_statuses):
-                                    logger.info(f"⏭️ Skipping {sport_name} match {match.get('id', 'unknown')} with status: {status}")
-                                    continue  # Skip this match
-                                else:
-                                    logger.info(f"✅ Accepting {sport_name} match {match.get('id', 'unknown')} with status: {status}")
-                                
-                                # Convert match to event format
-                                event = self._parse_match_to_event(match, sport_name)
-                                if event:
-                                    event_id = event.get('id')
-                                    if event_id:
-                                        if sport_name not in self.cache_data:
-                                            self.cache_data[sport_name] = {}
-                                        self.cache_data[sport_name][event_id] = event
+            if 'odds_data' not in data or 'scores' not in data['odds_data']:
+                return
+            index = self._index(sport_name)
+            added, updated, removed = index.sync(self._iter_prematch_events(sport_name, data))
+            evicted = index.evict_started(time.time(), self.started_grace_sec)
+            evicted += index.trim(self._event_cap())
             
             # Update timestamp
             self.cache_timestamps[sport_name] = datetime.now()
+            logger.info(f"📈 {sport_name}: +{added} ~{updated} -{removed} (evicted {evicted}), {len(index)} events cached")
             
         except Exception as e:
             logger.error(f"❌ Error parsing {sport_name} data: {e}")
@@ -204,24 +400,12 @@ class LiveOddsCacheService:
     def on_odds_updated(self, sport_name: str, odds_data: Dict):
         """Callback triggered when odds are updated by PrematchOddsService"""
         try:
-            logger.info(f"🎯 Live odds update received for {sport_name}")
-            logger.info(f"📊 Data received: {len(odds_data) if isinstance(odds_data, dict) else 'not dict'}")
-            
             # Parse and update the cache
             self._parse_and_cache_sport_data(sport_name, odds_data)
             
-            # Log cache status after update
-            if sport_name in self.cache_data:
-                logger.info(f"📈 Cache updated for {sport_name}: {len(self.cache_data[sport_name])} events")
-                # Log first few events to see their status
-                for i, (event_id, event) in enumerate(list(self.cache_data[sport_name].items())[:3]):
-                    logger.info(f"   Event {i+1}: {event.get('home_team', '?')} vs {event.get('away_team', '?')} - Status: {event.get('status', '?')}")
-            
             # Trigger UI update callbacks
             self._trigger_ui_updates(sport_name)
             
-            logger.info(f"✅ Cache updated and UI update triggered for {sport_name}")
-            
         except Exception as e:
             logger.error(f"❌ Error processing odds update for {sport_name}: {e}")
     
@@ -237,41 +421,90 @@ class LiveOddsCacheService:
                 except Exception as e:
                     logger.error(f"❌ Error in UI update callback: {e}")
             
-            logger.info(f"✅ UI update callbacks triggered for {sport_name}")
+            logger.debug(f"✅ UI update callbacks triggered for {sport_name}")
                 
         except Exception as e:
             logger.error(f"❌ Error triggering UI updates: {e}")
     
-    def get_sport_events(self, sport_name: str, date_filter: str = 'all', limit: int = 50) -> List[Dict]:
+    def query_events(self, sport_name: str, date_filter: str = 'all', league: Optional[str] = None,
+                     offset: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """Events ordered by start time with date/league filters and pagination"""
+        index = self.indexes.get(sport_name)
+        if index is None:
+            return {'events': [], 'total': 0, 'offset': offset, 'limit': limit}
+        index.evict_started(time.time(), self.started_grace_sec)
+        start_from, start_to = date_filter_range(date_filter)
+        events, total = index.query(start_from, start_to, league=league,
+                                    offset=max(0, offset), limit=limit)
+        return {'events': events, 'total': total, 'offset': offset, 'limit': limit}
+    
+    def get_sport_events(self, sport_name: str, date_filter: str = 'all', limit: int = 50,
+                         league: Optional[str] = None, offset: int = 0) -> List[Dict]:
         """Get events for a specific sport from the cache"""
         try:
-            if sport_name not in self.cache_data:
-                return []
-            
-            events = list(self.cache_data[sport_name].values())
-            
-            # Apply date filter if needed
-            if date_filter != 'all':
-                # Simple date filtering - could be enhanced
-                pass
-            
-            # Apply limit
-            if limit > 0:
-                events = events[:limit]
-            
-            return events
-            
+            return self.query_events(sport_name, date_filter, league, offset, limit)['events']
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"❌ Error getting events for {sport_name}: {e}")
             return []
     
+    def get_leagues(self, sport_name: str) -> Dict[str, int]:
+        index = self.indexes.get(sport_name)
+        return index.leagues() if index else {}
+    
+    def cache_size_bytes(self) -> int:
+        return sum(estimate_size(list(index.events.values())) for index in list(self.indexes.values()))
+
+    def cache_entries(self) -> int:
+        return sum(len(index) for index in list(self.indexes.values()))
+
+    def shrink(self, nbytes: int) -> int:
+        """
+        Memory budget: drop started events, then the furthest-out events of the largest sports
+
+        The per-sport cap is lowered to match so the next feed sync doesn't bring them back.
+        """
+        indexes = list(self.indexes.values())
+        now = time.time()
+        for index in indexes:
+            index.evict_started(now, self.started_grace_sec)
+        total = sum(len(index) for index in indexes)
+        if not total:
+            return 0
+        per_event = self.cache_size_bytes() / total
+        to_drop = int(nbytes / per_event) if per_event else 0
+        dropped = 0
+        for index in sorted(indexes, key=len, reverse=True):
+            if dropped >= to_drop:
+                break
+            keep = max(MIN_EVENTS_PER_SPORT, len(index) - (to_drop - dropped))
+            dropped += index.trim(keep)
+        if dropped:
+            largest = max(len(index) for index in indexes)
+            self.max_events_per_sport = max(MIN_EVENTS_PER_SPORT, min(self.max_events_per_sport, largest))
+            # Hold the lower cap while the budget keeps trimming; it lapses once pressure is gone
+            self._cap_restore_at = time.time() + CAP_HOLD_SECONDS
+            logger.warning(f"🧹 Trimmed {dropped} far-out events; per-sport cap now {self.max_events_per_sport} "
+                           f"for {CAP_HOLD_SECONDS}s")
+        return int(dropped * per_event)
+
+    def _event_cap(self) -> int:
+        """Per-sport event cap: MAX_EVENTS_PER_SPORT, or the budget's lower cap until it lapses"""
+        if self._cap_restore_at is not None and time.time() >= self._cap_restore_at:
+            self._cap_restore_at = None
+            self.max_events_per_sport = self.configured_max_events
+            logger.info(f"📈 Per-sport event cap restored to {self.max_events_per_sport}")
+        return self.max_events_per_sport
+
     def get_cache_stats(self) -> Dict:
         """Get statistics about the cache"""
         try:
-            total_events = sum(len(events) for events in self.cache_data.values())
+            total_events = sum(len(index) for index in self.indexes.values())
             return {
                 'running': self.running,
-                'sports_cached': list(self.cache_data.keys()),
+                'sports_cached': list(self.indexes.keys()),
+                'events_per_sport': {sport: len(index) for sport, index in self.indexes.items()},
                 'total_events': total_events,
                 'cache_timestamps': {sport: ts.isoformat() for sport, ts in self.cache_timestamps.items()}
             }
@@ -7,6 +7,10 @@ sys.path.insert(0, os.path.dirname(__file__))
 # Load environment variables deterministically (env.local wins locally)
 from src.config.env_loader import *  # noqa: F401 - just to execute the loader
 
+# Configure logging before anything logs: records go through a queue to a writer thread
+from src.utils.structured_log import configure_logging
+configure_logging()
+
 # Production guard: ensure DATABASE_URL is set
 if not os.getenv("DATABASE_URL"):
     raise RuntimeError("DATABASE_URL is not set; production must use Postgres, not sqlite.")
@@ -32,16 +36,6 @@ from src.prematch_odds_service import get_prematch_odds_service
 import logging
 from datetime import datetime, timezone
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('app.log', encoding='utf-8')
-    ]
-)
-
 # Set specific logger levels
 logging.getLogger('werkzeug').setLevel(logging.INFO)
 logging.getLogger('flask_socketio').setLevel(logging.INFO)
@@ -58,20 +52,17 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
 db = SQLAlchemy()
 
 # Custom JSON provider to handle PostgreSQL types (datetime, date, Decimal, UUID) for Flask ≥ 2.3 / 3.x
+# Encoding goes through src.utils.json_codec (orjson/msgspec when installed, stdlib otherwise)
 from flask.json.provider import DefaultJSONProvider
-from datetime import date, datetime
-from decimal import Decimal
-from uuid import UUID
+from src.utils import json_codec
 
 class CustomJSONProvider(DefaultJSONProvider):
-    def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()  # "2025-08-20T18:05:00+08:00"
-        if isinstance(obj, Decimal):
-            return float(obj)  # or str(obj) if you must keep precision
-        if isinstance(obj, UUID):
-            return str(obj)
-        return super().default(obj)
+    def dumps(self, obj, **kwargs):
+        # datetime/date -> "2025-08-20T18:05:00+08:00", Decimal -> float, UUID -> str
+        return json_codec.dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys), indent=kwargs.get('indent'))
+
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
 
 # Set the custom JSON provider for the Flask app
 app.json = CustomJSONProvider(app)
@@ -124,6 +115,45 @@ socketio = SocketIO(
     }
 )
 
+# Request metrics: latency per route template (the histogram count doubles as throughput), optional trace span,
+# and the slow-request sampler's registration when PROFILE_SLOW_REQUEST_MS is set
+from flask import g
+from src.utils import metrics, profiler
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    'http_request_duration_seconds', 'Request latency by route', ['method', 'route', 'status'])
+
+@app.before_request
+def _start_request_metrics():
+    g.request_started = time.perf_counter()
+    if metrics.TRACING or profiler.slow_requests.enabled:
+        label = f"{request.method} {request.url_rule.rule if request.url_rule else 'unmatched'}"
+        g.slow_request = profiler.slow_requests.request_started(label)
+        if metrics.TRACING:
+            g.request_span = metrics.span(label)
+            g.request_span.__enter__()
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route,
+                                     status=str(response.status_code))
+    return response
+
+@app.teardown_request
+def _end_request_span(exc=None):
+    profiler.slow_requests.request_finished(g.pop('slow_request', None))
+    request_span = g.pop('request_span', None)
+    if request_span is not None:
+        request_span.__exit__(type(exc) if exc else None, exc, exc.__traceback__ if exc else None)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return app.response_class(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 # Add lightweight health check endpoint (no DB access)
 @app.route('/health')
 @app.route('/healthz')
@@ -350,6 +380,7 @@ from src.routes.theme_customization import theme_bp
 from src.routes.public_apis import public_apis_bp
 from src.routes.casino_api import casino_bp
 from src.routes.health import health_bp
+from src.routes.snapshot_public import bp as snapshot_public_bp
 
 # Register blueprints in correct order - tenant_auth first to avoid conflicts
 app.register_blueprint(tenant_auth_bp)  # Tenant auth routes first (more specific)
@@ -367,6 +398,7 @@ app.register_blueprint(prematch_odds_bp, url_prefix='/api/prematch-odds')
 app.register_blueprint(sportsbook_bp, url_prefix='/api')
 app.register_blueprint(casino_bp)  # Casino API routes
 app.register_blueprint(health_bp)  # Lightweight health check (no DB dependency)
+app.register_blueprint(snapshot_public_bp)  # Public sharded odds snapshot (/api/public/snapshot)
 # app.register_blueprint(multitenant_bp)  # Disable old multitenant routing - REMOVED
 app.register_blueprint(clean_multitenant_bp)  # New clean URL routing
 app.register_blueprint(superadmin_bp)
@@ -453,7 +485,18 @@ else:
 live_odds_service = LiveOddsWebSocketService(socketio)
 init_websocket_handlers(socketio, live_odds_service)
 
+# Emit user events (bet settled, balance changes) queued by settlement, wherever it runs
+from src.services.event_bus import emit_user_events
+emit_user_events(socketio)
+
+# Initialize shared multiplayer crash rounds (tables start lazily on first join/bet)
+from src.services.crash_round_engine import init_crash_round_engine
+init_crash_round_engine(socketio)
+
 # Initialize Live Odds System
+from src.services.event_bus import SPLIT_WORKERS, get_event_bus
+from src.services.odds_relay import follow_prematch_odds
+
 def init_live_odds_system():
     """Initialize the live odds system with both services"""
     try:
@@ -471,9 +514,28 @@ def init_live_odds_system():
         
         logger.info("✅ Live Odds Cache Service started")
         
+        if SPLIT_WORKERS:
+            # The odds and socket workers fetch, build snapshots and price cash-outs; just follow their odds
+            # (and mirror them to disk for the routes that read the pre-match files)
+            follow_prematch_odds(cache_service, mirror_files=True)
+            logger.info("✅ Live Odds System following the odds worker")
+            return True
+        
         # Integrate the services: when odds are updated, update the cache
         prematch_service.add_odds_updated_callback(cache_service.on_odds_updated)
         
+        # Rebuild the public snapshot shards in the background when new odds land
+        from src.services.snapshot_refresher import get_snapshot_refresher
+        snapshot_refresher = get_snapshot_refresher()
+        prematch_service.add_odds_updated_callback(snapshot_refresher.on_odds_updated)
+        snapshot_refresher.start()
+        
+        # Reprice live cash-out offers when pre-match odds change
+        from src.services.cash_out_pricer import get_cash_out_pricer
+        cash_out_pricer = get_cash_out_pricer()
+        cache_service.ui_update_callbacks.append(cash_out_pricer.on_prematch_odds)
+        cash_out_pricer.start(socketio)
+        
         logger.info("✅ Live Odds System integrated successfully")
         logger.info("🎯 Live odds updates will now automatically update cache and trigger UI updates")
         
@@ -547,101 +609,87 @@ bet_settlement_service = BetSettlementService(app)
 from src.prematch_odds_service import get_prematch_odds_service
 prematch_odds_service = get_prematch_odds_service()
 
-# Start the bet settlement service automatically when the module is imported
-try:
-    bet_settlement_service.start()
-    logging.info("✅ Bet settlement service started automatically")
-except Exception as e:
-    logging.error(f"❌ Failed to start bet settlement service automatically: {e}")
+# Background work runs on the job runner: one scheduler per process, with
+# leader_only jobs and services running on a single web instance
+from src.services.job_runner import get_job_runner
+job_runner = get_job_runner()
+
+# With WORKER_TOPOLOGY=split settlement and the odds fetch run in src/worker.py instead
+if not SPLIT_WORKERS:
+    # Settlement credits users, so only the leader runs it; delayed to prevent startup overload
+    job_runner.add_service(
+        'bet-settlement',
+        start=bet_settlement_service.start,
+        stop=bet_settlement_service.stop,
+        is_running=lambda: bet_settlement_service.running,
+        leader_only=True,
+        start_delay=int(os.getenv('SETTLEMENT_START_DELAY', '30')),
+    )
+
+    # Every instance serves odds from its own files and cache
+    job_runner.add_service(
+        'prematch-odds',
+        start=prematch_odds_service.start,
+        stop=prematch_odds_service.stop,
+        is_running=lambda: prematch_odds_service.running,
+    )
+
+job_runner.add_service(
+    'live-odds-cache',
+    start=get_live_odds_cache_service().start,
+    stop=lambda: None,
+    is_running=lambda: get_live_odds_cache_service().running,
+)
 
-# Start the pre-match odds service automatically when the module is imported
-try:
-    prematch_odds_service.start()
-    logging.info("✅ Pre-match odds service started automatically")
-except Exception as e:
-    logging.error(f"❌ Failed to start pre-match odds service automatically: {e}")
+def _log_pool_metrics():
+    from src.db_compat import log_pool_metrics
+    log_pool_metrics()
 
-def ensure_settlement_service_running():
-    """Ensure the settlement service is running, restart if needed"""
-    if not bet_settlement_service.running:
-        logging.warning("🔄 Settlement service not running, attempting restart...")
-        try:
-            success = bet_settlement_service.start()
-            if success:
-                logging.info("✅ Settlement service restarted successfully")
-            else:
-                logging.error("❌ Failed to restart settlement service")
-        except Exception as e:
-            logging.error(f"❌ Error restarting settlement service: {e}")
+job_runner.add_job('pool-metrics', _log_pool_metrics, interval=60, jitter=5)
 
-def ensure_prematch_odds_service_running():
-    """Ensure the pre-match odds service is running, restart if needed"""
-    if not prematch_odds_service.running:
-        logging.warning("🔄 Pre-match odds service not running, attempting restart...")
-        try:
-            success = prematch_odds_service.start()
-            if success:
-                logging.info("✅ Pre-match odds service restarted successfully")
-            else:
-                logging.error("❌ Failed to restart pre-match odds service")
-        except Exception as e:
-            logging.error(f"❌ Error restarting pre-match odds service: {e}")
+# Refund crash bets left pending by a round whose process died before settling it
+from src.services.crash_round_engine import VOID_INTERVAL, get_crash_round_engine
+job_runner.add_job('crash-void-stale', lambda: get_crash_round_engine().void_stale_rounds(), interval=VOID_INTERVAL,
+                   jitter=30, leader_only=True, initial_delay=60)
 
-def ensure_live_odds_cache_service_running():
-    """Ensure the live odds cache service is running, restart if needed"""
-    try:
-        cache_service = get_live_odds_cache_service()
-        if not cache_service.running:
-            logging.warning("🔄 Live odds cache service not running, attempting restart...")
-            try:
-                success = cache_service.start()
-                if success:
-                    logging.info("✅ Live odds cache service restarted successfully")
-                else:
-                    logging.error("❌ Failed to restart live odds cache service")
-            except Exception as e:
-                logging.error(f"❌ Error restarting live odds cache service: {e}")
-    except Exception as e:
-        logging.error(f"❌ Error checking live odds cache service: {e}")
+def _warm_branding_cache():
+    from src.routes.branding import warm_branding_cache
+    warm_branding_cache()
+
+from src.utils import structured_log
+job_runner.add_job('log-counters', structured_log.flush_counters, interval=structured_log.COUNTER_INTERVAL)
+
+# Opt-in profiling: slow-request stacks and tracemalloc snapshots go to PROFILE_DIR as flamegraph input
+profiler.configure_profiling()
+job_runner.add_job('slow-request-profiles', profiler.slow_requests.flush, interval=profiler.SLOW_FLUSH_INTERVAL)
+job_runner.add_job('tracemalloc-snapshot', profiler.memory_profiler.snapshot, interval=profiler.MEMORY_INTERVAL)
 
+# Keep the registered in-process caches within CACHE_MEMORY_BUDGET_MB and the process under MEM_SOFT_LIMIT_MB
+from src.utils import cache_registry
+job_runner.add_job('cache-budget', cache_registry.enforce_budget, interval=cache_registry.BUDGET_INTERVAL)
 
+# Pre-warm branding cache in the background to prevent stampeding
+job_runner.add_job('branding-warmup', _warm_branding_cache, interval=None)
 
-# Schedule periodic health checks for services
+# Periodically recompute the per-user betting stats rollup from bets to catch drift
+if not SPLIT_WORKERS:
+    from src.services.bet_stats import VERIFY_INTERVAL, run_bet_stats_verification
+    job_runner.add_job('bet-stats-verify', run_bet_stats_verification, interval=VERIFY_INTERVAL,
+                       jitter=300, leader_only=True, initial_delay=VERIFY_INTERVAL)
+
+job_runner.start()
+
+# Stop background services on shutdown
 import atexit
 import signal
 import threading
 
-def periodic_health_check():
-    """Periodic health check for all services"""
-    while True:
-        try:
-            # Check settlement service
-            ensure_settlement_service_running()
-            
-                        # Check pre-match odds service
-            ensure_prematch_odds_service_running()
-            
-            # Check live odds cache service
-            ensure_live_odds_cache_service_running()
-            
-            # Wait 5 minutes before next check
-            time.sleep(300)
-        except Exception as e:
-            logging.error(f"❌ Error in periodic health check: {e}")
-            time.sleep(60)  # Wait 1 minute on error
-
-# Start periodic health check in background thread
-health_check_thread = threading.Thread(target=periodic_health_check, daemon=True)
-health_check_thread.start()
-logging.info("✅ Periodic health check service started")
-
 def cleanup_services():
     """Cleanup services on shutdown"""
     logging.info("🛑 Shutting down services...")
     try:
-        bet_settlement_service.stop()
+        job_runner.stop()
         live_odds_service.stop()
-        prematch_odds_service.stop()
         # Don't close the pool immediately - let it be cleaned up by the process
         logging.info("✅ Services stopped gracefully")
     except Exception as e:
@@ -812,7 +860,8 @@ def db_pool_reset():
 def start_websocket_service():
     """Start the WebSocket live odds service"""
     try:
-        live_odds_service.start()
+        if not job_runner.set_service_enabled('live-odds-websocket', True):
+            live_odds_service.start()
         return {'status': 'started', 'message': 'Live odds WebSocket service started'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
@@ -821,7 +870,8 @@ def start_websocket_service():
 def stop_websocket_service():
     """Stop the WebSocket live odds service"""
     try:
-        live_odds_service.stop()
+        if not job_runner.set_service_enabled('live-odds-websocket', False):
+            live_odds_service.stop()
         return {'status': 'stopped', 'message': 'Live odds WebSocket service stopped'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
@@ -835,12 +885,82 @@ def settlement_status():
         'stats': bet_settlement_service.get_settlement_stats()
     }
 
+@app.route('/api/jobs/status', methods=['GET'])
+def jobs_status():
+    """Background jobs and services on this instance: leadership, runs, durations and lag (super admin only)"""
+    from src.auth.session_utils import is_superadmin_logged_in
+    if not is_superadmin_logged_in():
+        return {'status': 'error', 'message': 'Super admin login required'}, 403
+    return {**job_runner.status(), 'events': get_event_bus().status()}
+
+@app.route('/api/logging', methods=['GET'])
+def logging_status():
+    """Log queue depth, dropped records, logger levels and counters (super admin only)"""
+    from src.auth.session_utils import is_superadmin_logged_in
+    if not is_superadmin_logged_in():
+        return {'status': 'error', 'message': 'Super admin login required'}, 403
+    return structured_log.status()
+
+@app.route('/api/logging/levels', methods=['POST'])
+def set_logging_levels():
+    """Change logger levels at runtime, e.g. {"src.routes.casino_api": "DEBUG"} (super admin only)"""
+    from src.auth.session_utils import is_superadmin_logged_in
+    if not is_superadmin_logged_in():
+        return {'status': 'error', 'message': 'Super admin login required'}, 403
+    levels = request.get_json(silent=True) or {}
+    try:
+        for name, level in levels.items():
+            structured_log.set_log_level(name, str(level))
+    except ValueError as e:
+        return {'status': 'error', 'message': str(e)}, 400
+    return {'status': 'ok', 'levels': structured_log.log_levels()}
+
+@app.route('/api/profiling', methods=['GET', 'POST'])
+def profiling_control():
+    """
+    This instance's profilers (super admin only). POST any of:
+    {"cpu": {"seconds": 30, "interval_ms": 10}} or {"cpu": "stop"}, {"slow_request_ms": 500} (0 = off),
+    {"tracemalloc": true|false}, {"snapshot": true} (tracemalloc snapshot now)
+    """
+    from src.auth.session_utils import is_superadmin_logged_in
+    if not is_superadmin_logged_in():
+        return {'status': 'error', 'message': 'Super admin login required'}, 403
+    if request.method == 'POST':
+        options = request.get_json(silent=True) or {}
+        try:
+            cpu = options.get('cpu')
+            if cpu == 'stop':
+                profiler.cpu_profiler.stop()
+            elif isinstance(cpu, dict) and not profiler.cpu_profiler.start(
+                    float(cpu.get('seconds', 30)), int(cpu['interval_ms']) if cpu.get('interval_ms') else None):
+                return {'status': 'error', 'message': 'CPU profiler already running'}, 409
+            if 'slow_request_ms' in options:
+                profiler.slow_requests.configure(int(options['slow_request_ms']))
+            if options.get('tracemalloc') is True:
+                profiler.memory_profiler.start()
+            elif options.get('tracemalloc') is False:
+                profiler.memory_profiler.stop()
+            if options.get('snapshot'):
+                profiler.memory_profiler.snapshot()
+        except (TypeError, ValueError) as e:
+            return {'status': 'error', 'message': str(e)}, 400
+    return profiler.status()
+
+@app.route('/api/profiling/files/<path:name>', methods=['GET'])
+def download_profile(name):
+    """Download a collapsed-stack profile (feed it to flamegraph.pl or speedscope)"""
+    from src.auth.session_utils import is_superadmin_logged_in
+    if not is_superadmin_logged_in():
+        return {'status': 'error', 'message': 'Super admin login required'}, 403
+    return send_from_directory(os.path.abspath(profiler.PROFILE_DIR), name, mimetype='text/plain', as_attachment=True)
+
 @app.route('/api/settlement/start', methods=['POST'])
 def start_settlement_service():
     """Start the automatic bet settlement service"""
     try:
-        bet_settlement_service.start()
-        return {'status': 'started', 'message': 'Automatic bet settlement service started'}
+        if not job_runner.set_service_enabled('bet-settlement', True):
+            return {'status': 'error', 'message': 'Settlement runs in the settlement worker'}, 409
+        return {'status': 'started', 'message': 'Automatic bet settlement service started (on the job leader)'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
 
@@ -848,7 +968,8 @@ def start_settlement_service():
 def stop_settlement_service():
     """Stop the automatic bet settlement service"""
     try:
-        bet_settlement_service.stop()
+        if not job_runner.set_service_enabled('bet-settlement', False):
+            return {'status': 'error', 'message': 'Settlement runs in the settlement worker'}, 409
         return {'status': 'stopped', 'message': 'Automatic bet settlement service stopped'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
@@ -1070,30 +1191,6 @@ if __name__ == '__main__':
     print("🚀 Starting GoalServe Sports Betting Platform...")
     print("🔧 Environment: Python", sys.version)
     
-    # Pre-warm branding cache in background to prevent stampeding
-    try:
-        import threading
-        from src.routes.branding import warm_branding_cache
-        threading.Thread(target=warm_branding_cache, daemon=True).start()
-    except Exception as e:
-        logger.warning(f"⚠️ Failed to start cache warming: {e}")
-    
-    # Start pool metrics logging (Phase 2)
-    try:
-        def log_pool_metrics_periodically():
-            while True:
-                try:
-                    from src.db_compat import log_pool_metrics
-                    log_pool_metrics()
-                except Exception as e:
-                    logger.error(f"Pool metrics error: {e}")
-                time.sleep(60)  # Log every minute
-        
-        threading.Thread(target=log_pool_metrics_periodically, daemon=True, name="pool-metrics").start()
-        logger.info("✅ Pool metrics logging started (every 60s)")
-    except Exception as e:
-        logger.warning(f"⚠️ Failed to start pool metrics: {e}")
-    
     try:
         print("🔧 Flask version:", Flask.__version__)
     except AttributeError:
@@ -1101,13 +1198,16 @@ if __name__ == '__main__':
     print("🔧 Working directory:", os.getcwd())
     print("🔧 Static folder:", app.static_folder)
     
-    # Start the WebSocket service
-    try:
-        live_odds_service.start()
-        print("✅ WebSocket service started successfully")
-    except Exception as e:
-        print(f"❌ Failed to start WebSocket service: {e}")
-        logging.error(f"Failed to start WebSocket service: {e}")
+    # Live odds are pushed to every client through the Redis message queue, so one poller is enough
+    if not SPLIT_WORKERS:
+        job_runner.add_service(
+            'live-odds-websocket',
+            start=live_odds_service.start,
+            stop=live_odds_service.stop,
+            is_running=lambda: live_odds_service.running,
+            leader_only=True,
+        )
+        print("✅ WebSocket service registered with the job runner")
 
     # Initialize database tables
     try:
@@ -1117,63 +1217,6 @@ if __name__ == '__main__':
         print(f"❌ Database initialization failed: {e}")
         logging.error(f"Database initialization failed: {e}")
 
-    # Start connection pool monitoring
-    def monitor_connection_pools():
-        """Monitor connection pool health and log warnings"""
-        import threading
-        
-        def monitor_loop():
-            while True:
-                try:
-                    from src.db_compat import pool as get_pool
-                    db_pool = get_pool()
-                    
-                    if hasattr(pool, 'get_pool_stats'):
-                        stats = pool.get_pool_stats()
-                        usage = stats.get('checked_out', 0) / max(stats.get('max_size', 100), 1) * 100
-                        
-                        if usage > 80:
-                            logging.warning(f"High connection pool usage: {usage:.1f}%")
-                        elif usage > 95:
-                            logging.error(f"Critical connection pool usage: {usage:.1f}%")
-                            
-                except Exception as e:
-                    logging.error(f"Connection pool monitoring error: {e}")
-                
-                time.sleep(30)  # Check every 30 seconds
-        
-        monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        monitor_thread.start()
-        print("✅ Connection pool monitoring started")
-
-    monitor_connection_pools()
-
-# Start the automatic bet settlement service with delay to prevent startup overload
-import threading
-import time
-
-def delayed_start_bet_settlement():
-    """Start bet settlement service after a delay to prevent startup overload"""
-    time.sleep(30)  # Wait 30 seconds after app starts
-    try:
-        bet_settlement_service.start()
-        print("✅ Bet settlement service started successfully (delayed)")
-        
-        # Verify the service is running
-        if bet_settlement_service.running:
-            print(f"✅ Settlement service is running (check interval: {bet_settlement_service.check_interval}s)")
-        else:
-            print("❌ Settlement service failed to start")
-            
-    except Exception as e:
-        print(f"❌ Failed to start bet settlement service: {e}")
-        logging.error(f"Failed to start bet settlement service: {e}")
-
-# Start bet settlement service in background thread with delay
-settlement_thread = threading.Thread(target=delayed_start_bet_settlement, daemon=True)
-settlement_thread.start()
-print("⏳ Bet settlement service will start in 30 seconds...")
-
 print("🌐 Flask application initialized successfully")
 print("🔧 Ready for SocketIO to start the server")
 
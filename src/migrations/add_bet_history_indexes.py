@@ -0,0 +1,128 @@
+"""
+Database migration: Index bets for keyset-paginated history and add per-user status counts
+
+Adds:
+- idx_bets_user_created: composite (user_id, created_at DESC, id DESC) index backing
+  cursor pagination in /api/betting/bets
+- idx_bets_user_status_created: the same with status, for the per-status history tabs
+- bet_user_status_counts: number of bets per user and status, kept in sync by a trigger
+  on bets (placement inserts, settlement/cash-out/void updates status), so history
+  totals never run COUNT(*) over bets
+"""
+
+import logging
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_add_bet_history_indexes():
+    """Create the history indexes, the counts table, its trigger, and backfill the counts"""
+    try:
+        with connection_ctx() as conn:
+            print("Starting migration: add_bet_history_indexes")
+
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    print("Creating index: idx_bets_user_created")
+                    cursor.execute("""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bets_user_created
+                        ON bets (user_id, created_at DESC, id DESC)
+                    """)
+                    print("Creating index: idx_bets_user_status_created")
+                    cursor.execute("""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bets_user_status_created
+                        ON bets (user_id, status, created_at DESC, id DESC)
+                    """)
+                    # Superseded by the composite indexes above
+                    cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_bets_user_id")
+            finally:
+                conn.autocommit = False
+
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS bet_user_status_counts (
+                        user_id INTEGER NOT NULL,
+                        status VARCHAR(20) NOT NULL,
+                        bets BIGINT NOT NULL DEFAULT 0,
+                        PRIMARY KEY (user_id, status)
+                    )
+                """)
+
+                cursor.execute("""
+                    CREATE OR REPLACE FUNCTION bet_user_status_counts_apply()
+                    RETURNS TRIGGER AS $$
+                    BEGIN
+                        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                            UPDATE bet_user_status_counts
+                            SET bets = bets - 1
+                            WHERE user_id = OLD.user_id AND status = COALESCE(OLD.status, 'pending');
+                        END IF;
+
+                        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                            INSERT INTO bet_user_status_counts (user_id, status, bets)
+                            VALUES (NEW.user_id, COALESCE(NEW.status, 'pending'), 1)
+                            ON CONFLICT (user_id, status) DO UPDATE
+                            SET bets = bet_user_status_counts.bets + 1;
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql
+                """)
+
+                cursor.execute("DROP TRIGGER IF EXISTS bet_user_status_counts_trigger ON bets")
+                cursor.execute("""
+                    CREATE TRIGGER bet_user_status_counts_trigger
+                        AFTER INSERT OR DELETE OR UPDATE OF status, user_id ON bets
+                        FOR EACH ROW
+                        EXECUTE FUNCTION bet_user_status_counts_apply()
+                """)
+
+                # Backfill in the same transaction as the trigger so no bet is counted twice
+                print("Backfilling bet_user_status_counts")
+                cursor.execute("""
+                    INSERT INTO bet_user_status_counts (user_id, status, bets)
+                    SELECT user_id, COALESCE(status, 'pending'), COUNT(*)
+                    FROM bets
+                    GROUP BY user_id, COALESCE(status, 'pending')
+                    ON CONFLICT (user_id, status) DO UPDATE
+                    SET bets = EXCLUDED.bets
+                """)
+                conn.commit()
+
+            print("Migration completed successfully")
+            return True
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return False
+
+
+def rollback_bet_history_indexes():
+    """Rollback: Drop the counts table, its trigger and the composite indexes"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                logger.info("🔄 Rolling back migration: add_bet_history_indexes")
+
+                cursor.execute("DROP TRIGGER IF EXISTS bet_user_status_counts_trigger ON bets")
+                cursor.execute("DROP FUNCTION IF EXISTS bet_user_status_counts_apply()")
+                cursor.execute("DROP TABLE IF EXISTS bet_user_status_counts")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_bets_user_id ON bets(user_id)")
+                cursor.execute("DROP INDEX IF EXISTS idx_bets_user_status_created")
+                cursor.execute("DROP INDEX IF EXISTS idx_bets_user_created")
+                conn.commit()
+
+                logger.info("✅ Rollback completed successfully")
+                return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Run migration directly
+    migrate_add_bet_history_indexes()
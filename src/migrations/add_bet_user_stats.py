@@ -0,0 +1,127 @@
+"""
+Database migration: Add the per-user betting stats rollup
+
+Adds:
+- bet_user_stats: settled bets, wins, total staked and total returned per user and
+  sport, kept in sync by a trigger on bets. The trigger runs inside the transaction
+  that settles (or voids / cashes out) a bet, so the rollup can never show a
+  settlement that was rolled back; /api/betting/stats reads it instead of loading
+  every settled bet. services/bet_stats.verify_bet_user_stats recomputes it from
+  bets to catch drift.
+
+A bet counts once its status leaves 'pending', matching the old endpoint.
+"""
+
+import logging
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_add_bet_user_stats():
+    """Create the rollup table and its trigger, and backfill it"""
+    try:
+        with connection_ctx() as conn:
+            print("Starting migration: add_bet_user_stats")
+
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS bet_user_stats (
+                        user_id INTEGER NOT NULL,
+                        sport_name VARCHAR(50) NOT NULL,
+                        settled_bets BIGINT NOT NULL DEFAULT 0,
+                        won_bets BIGINT NOT NULL DEFAULT 0,
+                        total_staked NUMERIC(14,2) NOT NULL DEFAULT 0,
+                        total_returned NUMERIC(14,2) NOT NULL DEFAULT 0,
+                        PRIMARY KEY (user_id, sport_name)
+                    )
+                """)
+
+                cursor.execute("""
+                    CREATE OR REPLACE FUNCTION bet_user_stats_apply()
+                    RETURNS TRIGGER AS $$
+                    BEGIN
+                        IF TG_OP IN ('UPDATE', 'DELETE') AND COALESCE(OLD.status, 'pending') <> 'pending' THEN
+                            UPDATE bet_user_stats
+                            SET settled_bets = settled_bets - 1,
+                                won_bets = won_bets - CASE WHEN OLD.status = 'won' THEN 1 ELSE 0 END,
+                                total_staked = total_staked - COALESCE(OLD.stake, 0),
+                                total_returned = total_returned - COALESCE(OLD.actual_return, 0)
+                            WHERE user_id = OLD.user_id AND sport_name = COALESCE(OLD.sport_name, '');
+                        END IF;
+
+                        IF TG_OP IN ('INSERT', 'UPDATE') AND COALESCE(NEW.status, 'pending') <> 'pending' THEN
+                            INSERT INTO bet_user_stats
+                                (user_id, sport_name, settled_bets, won_bets, total_staked, total_returned)
+                            VALUES (NEW.user_id, COALESCE(NEW.sport_name, ''), 1,
+                                    CASE WHEN NEW.status = 'won' THEN 1 ELSE 0 END,
+                                    COALESCE(NEW.stake, 0), COALESCE(NEW.actual_return, 0))
+                            ON CONFLICT (user_id, sport_name) DO UPDATE
+                            SET settled_bets = bet_user_stats.settled_bets + 1,
+                                won_bets = bet_user_stats.won_bets + EXCLUDED.won_bets,
+                                total_staked = bet_user_stats.total_staked + EXCLUDED.total_staked,
+                                total_returned = bet_user_stats.total_returned + EXCLUDED.total_returned;
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql
+                """)
+
+                cursor.execute("DROP TRIGGER IF EXISTS bet_user_stats_trigger ON bets")
+                cursor.execute("""
+                    CREATE TRIGGER bet_user_stats_trigger
+                        AFTER INSERT OR DELETE
+                        OR UPDATE OF status, stake, actual_return, user_id, sport_name ON bets
+                        FOR EACH ROW
+                        EXECUTE FUNCTION bet_user_stats_apply()
+                """)
+
+                # Backfill in the same transaction as the trigger so no bet is counted twice
+                print("Backfilling bet_user_stats")
+                cursor.execute("""
+                    INSERT INTO bet_user_stats
+                        (user_id, sport_name, settled_bets, won_bets, total_staked, total_returned)
+                    SELECT user_id, COALESCE(sport_name, ''), COUNT(*), COUNT(*) FILTER (WHERE status = 'won'),
+                           COALESCE(SUM(stake), 0), COALESCE(SUM(actual_return), 0)
+                    FROM bets
+                    WHERE COALESCE(status, 'pending') <> 'pending'
+                    GROUP BY user_id, COALESCE(sport_name, '')
+                    ON CONFLICT (user_id, sport_name) DO UPDATE
+                    SET settled_bets = EXCLUDED.settled_bets,
+                        won_bets = EXCLUDED.won_bets,
+                        total_staked = EXCLUDED.total_staked,
+                        total_returned = EXCLUDED.total_returned
+                """)
+                conn.commit()
+
+            print("Migration completed successfully")
+            return True
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return False
+
+
+def rollback_bet_user_stats():
+    """Rollback: Drop the rollup and its trigger"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                logger.info("🔄 Rolling back migration: add_bet_user_stats")
+
+                cursor.execute("DROP TRIGGER IF EXISTS bet_user_stats_trigger ON bets")
+                cursor.execute("DROP FUNCTION IF EXISTS bet_user_stats_apply()")
+                cursor.execute("DROP TABLE IF EXISTS bet_user_stats")
+                conn.commit()
+
+                logger.info("✅ Rollback completed successfully")
+                return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Run migration directly
+    migrate_add_bet_user_stats()
@@ -0,0 +1,69 @@
+"""
+Database migration: Add live cash-out offers
+
+Adds:
+- cash_out_offers: the current cash-out offer per open bet, written in batches by
+  services/cash_out_pricer.py whenever live odds move the bet's fair value. Each
+  change bumps version; accepting an offer is a single statement that only
+  succeeds if the version the user saw is still current and the bet is still
+  pending.
+"""
+
+import logging
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_add_cash_out_offers():
+    """Create the offers table"""
+    try:
+        with connection_ctx() as conn:
+            print("Starting migration: add_cash_out_offers")
+
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS cash_out_offers (
+                        bet_id INTEGER PRIMARY KEY REFERENCES bets(id) ON DELETE CASCADE,
+                        user_id INTEGER NOT NULL,
+                        amount NUMERIC(14,2) NOT NULL,
+                        version BIGINT NOT NULL DEFAULT 1,
+                        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+                    )
+                """)
+                print("Creating index: idx_cash_out_offers_user")
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_cash_out_offers_user
+                    ON cash_out_offers (user_id)
+                """)
+                conn.commit()
+
+            print("Migration completed successfully")
+            return True
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return False
+
+
+def rollback_cash_out_offers():
+    """Rollback: Drop the offers table"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                logger.info("🔄 Rolling back migration: add_cash_out_offers")
+
+                cursor.execute("DROP TABLE IF EXISTS cash_out_offers")
+                conn.commit()
+
+                logger.info("✅ Rollback completed successfully")
+                return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Run migration directly
+    migrate_add_cash_out_offers()
@@ -0,0 +1,64 @@
+"""
+Database migration: Index pending crash bets
+
+Adds:
+- idx_game_round_crash_pending: crash game_round rows still in status "pending"
+  (written with the stake debit, settled when the round crashes), by created_at,
+  so services/crash_round_engine.py's void_stale_rounds() finds bets orphaned by
+  a lost round without scanning game_round
+"""
+
+import logging
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_add_crash_pending_rounds():
+    """Create the pending crash bet index"""
+    try:
+        with connection_ctx() as conn:
+            print("Starting migration: add_crash_pending_rounds")
+
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    print("Creating index: idx_game_round_crash_pending")
+                    cursor.execute("""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_game_round_crash_pending
+                        ON game_round (created_at)
+                        WHERE game_key = 'crash' AND result_json->>'status' = 'pending'
+                    """)
+            finally:
+                conn.autocommit = False
+
+            print("Migration completed successfully")
+            return True
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return False
+
+
+def rollback_crash_pending_rounds():
+    """Rollback: Drop the pending crash bet index"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                logger.info("🔄 Rolling back migration: add_crash_pending_rounds")
+
+                cursor.execute("DROP INDEX IF EXISTS idx_game_round_crash_pending")
+                conn.commit()
+
+                logger.info("✅ Rollback completed successfully")
+                return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Run migration directly
+    migrate_add_crash_pending_rounds()
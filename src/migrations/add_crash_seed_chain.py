@@ -0,0 +1,80 @@
+"""
+Database migration: Add crash_seed table for provably-fair crash rounds
+
+Adds:
+- crash_seed: one row per server seed; exactly one 'active' seed per user whose
+  SHA-256 hash is published before play, revealed (status='revealed') on rotation
+- uq_crash_seed_active_user: partial unique index enforcing the single active seed
+  (also the ON CONFLICT target used by services/provably_fair.py)
+- idx_crash_seed_user_revealed: backs the revealed-seed listing
+"""
+
+import logging
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_add_crash_seed_chain():
+    """Create the crash_seed table and its indexes"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                print("Starting migration: add_crash_seed_chain")
+
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS crash_seed (
+                        id SERIAL PRIMARY KEY,
+                        user_id VARCHAR(100) NOT NULL,
+                        server_seed VARCHAR(128) NOT NULL,
+                        server_seed_hash VARCHAR(64) NOT NULL,
+                        client_seed VARCHAR(64) NOT NULL,
+                        next_nonce BIGINT NOT NULL DEFAULT 0,
+                        status VARCHAR(20) NOT NULL DEFAULT 'active',
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        revealed_at TIMESTAMP WITH TIME ZONE
+                    )
+                """)
+
+                print("Creating index: uq_crash_seed_active_user")
+                cursor.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS uq_crash_seed_active_user
+                    ON crash_seed (user_id) WHERE status = 'active'
+                """)
+
+                print("Creating index: idx_crash_seed_user_revealed")
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_crash_seed_user_revealed
+                    ON crash_seed (user_id, revealed_at DESC) WHERE status = 'revealed'
+                """)
+                conn.commit()
+
+                print("Migration completed successfully")
+                return True
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return False
+
+
+def rollback_crash_seed_chain():
+    """Rollback: Drop the crash_seed table"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                logger.info("🔄 Rolling back migration: add_crash_seed_chain")
+
+                cursor.execute("DROP TABLE IF EXISTS crash_seed")
+                conn.commit()
+
+                logger.info("✅ Rollback completed successfully")
+                return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Run migration directly
+    migrate_add_crash_seed_chain()
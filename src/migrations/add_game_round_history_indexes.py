@@ -0,0 +1,143 @@
+"""
+Database migration: Index game_round for keyset-paginated history and add per-user rollup
+
+Adds:
+- idx_game_round_user_created: composite (user_id, created_at DESC, id DESC) index backing
+  cursor pagination in /api/casino/history
+- game_round_user_stats: per-user, per-game aggregates (rounds, staked, paid out) kept in
+  sync by a trigger on game_round, so the history header never scans game_round
+
+game_round.user_id stays VARCHAR: admin, leaderboard and revenue queries join it as
+u.id::text, and the index is built on the column as those queries compare it.
+"""
+
+import logging
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_add_game_round_history_indexes():
+    """Create the history index, the rollup table, its trigger, and backfill the rollup"""
+    try:
+        with connection_ctx() as conn:
+            print("Starting migration: add_game_round_history_indexes")
+
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    print("Creating index: idx_game_round_user_created")
+                    cursor.execute("""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_game_round_user_created
+                        ON game_round (user_id, created_at DESC, id DESC)
+                    """)
+                    # Superseded by the composite index above
+                    cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_game_round_user_id")
+            finally:
+                conn.autocommit = False
+
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS game_round_user_stats (
+                        user_id VARCHAR(100) NOT NULL,
+                        game_key VARCHAR(50) NOT NULL,
+                        rounds BIGINT NOT NULL DEFAULT 0,
+                        total_stake NUMERIC(14,2) NOT NULL DEFAULT 0,
+                        total_payout NUMERIC(14,2) NOT NULL DEFAULT 0,
+                        wins BIGINT NOT NULL DEFAULT 0,
+                        last_played_at TIMESTAMP WITH TIME ZONE,
+                        PRIMARY KEY (user_id, game_key)
+                    )
+                """)
+
+                cursor.execute("""
+                    CREATE OR REPLACE FUNCTION game_round_user_stats_apply()
+                    RETURNS TRIGGER AS $$
+                    BEGIN
+                        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                            UPDATE game_round_user_stats
+                            SET rounds = rounds - 1,
+                                total_stake = total_stake - OLD.stake,
+                                total_payout = total_payout - OLD.payout,
+                                wins = wins - CASE WHEN OLD.payout > 0 THEN 1 ELSE 0 END
+                            WHERE user_id = OLD.user_id AND game_key = OLD.game_key;
+                        END IF;
+
+                        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                            INSERT INTO game_round_user_stats
+                                (user_id, game_key, rounds, total_stake, total_payout, wins, last_played_at)
+                            VALUES (NEW.user_id, NEW.game_key, 1, NEW.stake, NEW.payout,
+                                    CASE WHEN NEW.payout > 0 THEN 1 ELSE 0 END, NEW.created_at)
+                            ON CONFLICT (user_id, game_key) DO UPDATE
+                            SET rounds = game_round_user_stats.rounds + 1,
+                                total_stake = game_round_user_stats.total_stake + EXCLUDED.total_stake,
+                                total_payout = game_round_user_stats.total_payout + EXCLUDED.total_payout,
+                                wins = game_round_user_stats.wins + EXCLUDED.wins,
+                                last_played_at = GREATEST(game_round_user_stats.last_played_at,
+                                                          EXCLUDED.last_played_at);
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql
+                """)
+
+                cursor.execute("DROP TRIGGER IF EXISTS game_round_user_stats_trigger ON game_round")
+                cursor.execute("""
+                    CREATE TRIGGER game_round_user_stats_trigger
+                        AFTER INSERT OR DELETE OR UPDATE OF stake, payout, user_id, game_key ON game_round
+                        FOR EACH ROW
+                        EXECUTE FUNCTION game_round_user_stats_apply()
+                """)
+
+                # Backfill in the same transaction as the trigger so no round is counted twice
+                print("Backfilling game_round_user_stats")
+                cursor.execute("""
+                    INSERT INTO game_round_user_stats
+                        (user_id, game_key, rounds, total_stake, total_payout, wins, last_played_at)
+                    SELECT user_id, game_key, COUNT(*), COALESCE(SUM(stake), 0), COALESCE(SUM(payout), 0),
+                           COUNT(*) FILTER (WHERE payout > 0), MAX(created_at)
+                    FROM game_round
+                    GROUP BY user_id, game_key
+                    ON CONFLICT (user_id, game_key) DO UPDATE
+                    SET rounds = EXCLUDED.rounds,
+                        total_stake = EXCLUDED.total_stake,
+                        total_payout = EXCLUDED.total_payout,
+                        wins = EXCLUDED.wins,
+                        last_played_at = EXCLUDED.last_played_at
+                """)
+                conn.commit()
+
+            print("Migration completed successfully")
+            return True
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return False
+
+
+def rollback_game_round_history_indexes():
+    """Rollback: Drop the rollup, its trigger and the composite index"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                logger.info("🔄 Rolling back migration: add_game_round_history_indexes")
+
+                cursor.execute("DROP TRIGGER IF EXISTS game_round_user_stats_trigger ON game_round")
+                cursor.execute("DROP FUNCTION IF EXISTS game_round_user_stats_apply()")
+                cursor.execute("DROP TABLE IF EXISTS game_round_user_stats")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_game_round_user_id ON game_round(user_id)")
+                cursor.execute("DROP INDEX IF EXISTS idx_game_round_user_created")
+                conn.commit()
+
+                logger.info("✅ Rollback completed successfully")
+                return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Run migration directly
+    migrate_add_game_round_history_indexes()
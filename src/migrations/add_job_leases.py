@@ -0,0 +1,62 @@
+"""
+Database migration: Add job leases
+
+Adds:
+- job_leases: one row per lease (the job runner's leader for each process tier), claimed
+  and renewed by services/job_runner.py with a single upsert that only succeeds
+  for the current holder or once the lease has expired. Used when Redis isn't
+  configured; unlike session advisory locks it works through PgBouncer's
+  transaction pooling.
+"""
+
+import logging
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_add_job_leases():
+    """Create the leases table"""
+    try:
+        with connection_ctx() as conn:
+            print("Starting migration: add_job_leases")
+
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS job_leases (
+                        name VARCHAR(100) PRIMARY KEY,
+                        holder VARCHAR(200) NOT NULL,
+                        expires_at TIMESTAMPTZ NOT NULL
+                    )
+                """)
+                conn.commit()
+
+            print("Migration completed successfully")
+            return True
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return False
+
+
+def rollback_job_leases():
+    """Rollback: Drop the leases table"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                logger.info("🔄 Rolling back migration: add_job_leases")
+
+                cursor.execute("DROP TABLE IF EXISTS job_leases")
+                conn.commit()
+
+                logger.info("✅ Rollback completed successfully")
+                return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Run migration directly
+    migrate_add_job_leases()
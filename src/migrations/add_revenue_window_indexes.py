@@ -0,0 +1,69 @@
+"""
+Database migration: Index bets and game rounds by time for the daily revenue windows
+
+Adds:
+- idx_bets_settled_window: bets settled as won/lost by settled_at, so
+  daily_revenue_calculator.py reads one day of settlements instead of every bet
+- idx_game_round_created: game rounds by created_at for the same per-day window
+"""
+
+import logging
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_add_revenue_window_indexes():
+    """Create the time-window indexes"""
+    try:
+        with connection_ctx() as conn:
+            print("Starting migration: add_revenue_window_indexes")
+
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    print("Creating index: idx_bets_settled_window")
+                    cursor.execute("""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bets_settled_window
+                        ON bets (settled_at)
+                        WHERE status IN ('won', 'lost')
+                    """)
+                    print("Creating index: idx_game_round_created")
+                    cursor.execute("""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_game_round_created
+                        ON game_round (created_at)
+                    """)
+            finally:
+                conn.autocommit = False
+
+            print("Migration completed successfully")
+            return True
+
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return False
+
+
+def rollback_revenue_window_indexes():
+    """Rollback: Drop the time-window indexes"""
+    try:
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                logger.info("🔄 Rolling back migration: add_revenue_window_indexes")
+
+                cursor.execute("DROP INDEX IF EXISTS idx_game_round_created")
+                cursor.execute("DROP INDEX IF EXISTS idx_bets_settled_window")
+                conn.commit()
+
+                logger.info("✅ Rollback completed successfully")
+                return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Run migration directly
+    migrate_add_revenue_window_indexes()
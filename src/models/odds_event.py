@@ -0,0 +1,151 @@
+"""
+Compact in-memory odds events
+Slotted event objects for the live odds cache, rendered to the frontend JSON shape on demand
+
+A cached event used to be the dict the API returns: ten string fields plus an odds
+dict holding, per market, a list of price strings and a separate
+"<market>_market_id" entry. With thousands of events per sport that is mostly
+per-object overhead. Here an event is a __slots__ object with interned strings
+(sport, status, league, team names), all of its prices in one array('d'), and a
+layout - the market keys, ids, names and price counts - that is interned too, so
+the events of a sport that offer the same markets share one layout tuple.
+to_dict() rebuilds the original shape only for the events a request returns.
+
+Prices go back out exactly as the feed sent them: the layout records each string
+market's decimal places ("2.10" -> 2), and the prices are formatted back with
+them. An event whose prices can't be reproduced that way (non-numeric, or
+markets mixing "2.1" and "2.10") keeps them verbatim.
+"""
+
+import sys
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+EVENT_FIELDS = ('id', 'sport', 'status', 'time', 'date', 'formatted_date', 'league', 'home_team', 'away_team')
+
+# (market key, price count, market id, market name, decimal places if the prices were strings) per market
+MarketLayout = Tuple[Tuple[str, int, Any, Any, Optional[int]], ...]
+
+MAX_LAYOUTS = 50_000  # distinct market layouts kept for sharing
+_layouts: Dict[MarketLayout, MarketLayout] = {}
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _intern_layout(layout: MarketLayout) -> MarketLayout:
+    shared = _layouts.get(layout)
+    if shared is None:
+        if len(_layouts) >= MAX_LAYOUTS:
+            _layouts.clear()
+        shared = _layouts[layout] = layout
+    return shared
+
+
+def _decimals(values) -> Optional[int]:
+    """Decimal places shared by a market's price strings, if formatting the floats gives them back exactly"""
+    places = None
+    for text in values:
+        digits = len(text) - text.index('.') - 1 if '.' in text else 0
+        if places is None:
+            places = digits
+        elif digits != places:
+            return None
+        try:
+            if f"{float(text):.{digits}f}" != text:
+                return None
+        except ValueError:
+            return None
+    return places
+
+
+class OddsEvent:
+    """A cached pre-match event; to_dict() gives the API/frontend dict"""
+
+    __slots__ = EVENT_FIELDS + ('start_ts', 'layout', 'prices', 'has_draw', 'extra_odds')
+
+    def __init__(self, start_ts: float = float('inf'), **fields):
+        for field in EVENT_FIELDS:
+            setattr(self, field, _intern(fields.get(field, '')))
+        self.start_ts = start_ts
+        self.layout: MarketLayout = ()
+        self.prices = array('d')
+        self.has_draw: Optional[bool] = None
+        self.extra_odds: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, event: Dict[str, Any], start_ts: float = float('inf')) -> 'OddsEvent':
+        """Compact an event dict as built by LiveOddsCacheService._parse_match_to_event"""
+        compact = cls(start_ts, **event)
+        odds = event.get('odds') or {}
+        layout = []
+        prices = []
+        exact = True  # every string market formats back to the feed's text
+        for key, value in odds.items():
+            if key == 'has_draw':
+                compact.has_draw = value
+            elif isinstance(value, list):
+                decimals = None
+                if value and all(type(p) is str for p in value):
+                    decimals = _decimals(value)
+                    exact = exact and decimals is not None
+                layout.append((_intern(key), len(value), _intern(odds.get(f'{key}_market_id')),
+                               _intern(odds.get(f'{key}_market_name')), decimals))
+                prices.extend(value)
+
+        markets = {entry[0] for entry in layout}
+        extra = {}
+        for key, value in odds.items():
+            if key == 'has_draw' or key in markets:
+                continue
+            # Ids/names of a priced market are in the layout; keep orphans (e.g. a
+            # match_result id without a chosen winner market) and anything unexpected
+            base = key[:-len('_market_id')] if key.endswith('_market_id') else \
+                key[:-len('_market_name')] if key.endswith('_market_name') else None
+            if base not in markets:
+                extra[key] = value
+
+        try:
+            if not exact:
+                raise ValueError("prices don't round-trip")
+            compact.prices = array('d', [float(p) for p in prices])
+        except (TypeError, ValueError):
+            compact.prices = tuple(prices)
+        compact.layout = _intern_layout(tuple(layout))
+        compact.extra_odds = extra or None
+        return compact
+
+    def _state(self) -> Tuple:
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, OddsEvent) and self._state() == other._state()
+
+    def odds_dict(self) -> Dict[str, Any]:
+        odds: Dict[str, Any] = {}
+        numeric = type(self.prices) is array
+        pos = 0
+        for key, count, market_id, name, decimals in self.layout:
+            values = self.prices[pos:pos + count]
+            pos += count
+            if not numeric:
+                odds[key] = list(values)
+            elif decimals is not None:
+                odds[key] = [f"{p:.{decimals}f}" for p in values]
+            else:
+                odds[key] = values.tolist()
+            if market_id is not None:
+                odds[f'{key}_market_id'] = market_id
+            if name is not None:
+                odds[f'{key}_market_name'] = name
+        if self.extra_odds:
+            odds.update(self.extra_odds)
+        if self.has_draw is not None:
+            odds['has_draw'] = self.has_draw
+        return odds
+
+    def to_dict(self) -> Dict[str, Any]:
+        event = {field: getattr(self, field) for field in EVENT_FIELDS}
+        event['odds'] = self.odds_dict()
+        return event
@@ -8,6 +8,8 @@ from typing import Dict, List, Optional, Callable
 import threading
 from pathlib import Path
 
+from src.utils import json_codec, metrics
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -242,7 +244,17 @@ class PrematchOddsService:
                 else:
                     logger.info(f"🔄 Fetching {sport_name} odds (attempt {attempt + 1}/{max_retries})")
                 
-                response = self.session.get(url, timeout=self.timeout)
+                started = time.perf_counter()
+                try:
+                    response = self.session.get(url, timeout=self.timeout)
+                except requests.exceptions.RequestException as e:
+                    metrics.FEED_FETCH_SECONDS.observe(
+                        time.perf_counter() - started, feed="prematch_odds", endpoint=sport_name,
+                        result="timeout" if isinstance(e, requests.exceptions.Timeout) else "error")
+                    raise
+                metrics.FEED_FETCH_SECONDS.observe(
+                    time.perf_counter() - started, feed="prematch_odds", endpoint=sport_name,
+                    result="ok" if response.status_code == 200 else f"http_{response.status_code}")
                 
                 # Handle different HTTP status codes
                 if response.status_code == 200:
@@ -251,7 +263,7 @@ class PrematchOddsService:
                         text = response.text
                         if text.startswith('\ufeff'):
                             text = text[1:]  # Remove BOM
-                        data = json.loads(text)
+                        data = json_codec.loads(text)
                         
                         # Check if the response contains an error
                         if isinstance(data, dict):
@@ -498,8 +510,8 @@ class PrematchOddsService:
             }
             
             # Save to file (overwrites existing file)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data_with_metadata, f, indent=2, ensure_ascii=False)
+            with open(filepath, 'wb') as f:
+                f.write(json_codec.dumps_bytes(data_with_metadata, indent=2))
             
             logger.info(f"💾 Updated {sport_name} odds file: {filepath}")
             
@@ -529,7 +541,8 @@ class PrematchOddsService:
             logger.info(f"🌐 URL for {sport_name}: {url}")
             
             # Fetch odds with single attempt
-            odds_data = self._fetch_odds(sport_name, url)
+            with metrics.span("prematch_odds.fetch", sport=sport_name):
+                odds_data = self._fetch_odds(sport_name, url)
             
             if odds_data:
                 # Check if the data contains an error
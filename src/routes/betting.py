@@ -5,7 +5,10 @@ Betting API routes for sports betting platform
 from flask import Blueprint, request, jsonify, g, current_app, session
 from src.models.multitenant_models import User, Bet, Transaction, BetSlip, BetStatus
 from src.routes.tenant_auth import session_required
-from datetime import datetime
+from src.utils.pagination import encode_cursor, decode_cursor, keyset_condition, clamp_limit, InvalidCursor
+from src.services.bet_stats import get_user_betting_stats
+from src.services.cash_out_pricer import accept_cash_out, get_cash_out_offers
+from datetime import datetime, timezone
 import logging
 import json
 
@@ -594,72 +597,114 @@ def place_combo_bet():
             'message': f'Failed to place combo bet: {str(e)}'
         }), 500
 
+BET_HISTORY_COLUMNS = """id, match_name, selection, stake, odds, potential_return,
+                       status, created_at, settled_at, sport_name, bet_timing, combo_selections"""
+
+
+def _to_utc_iso(dt):
+    """dt may be naive (stored as UTC) or aware; ISO-8601 in UTC with a Z suffix"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    else:
+        dt = dt.astimezone(timezone.utc)
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _bet_history_row(row):
+    bet_dict = dict(row)
+    # Add UTC ISO-8601 timestamp (bulletproof for any user timezone)
+    if bet_dict.get('created_at'):
+        bet_dict["created_at_iso"] = _to_utc_iso(bet_dict['created_at'])
+        bet_dict["created_at"] = bet_dict["created_at_iso"]  # alias for compatibility
+    return bet_dict
+
+
+def _fetch_bet_page(cursor, user_id, status, limit, cursor_key=None, offset=0):
+    """
+    One page of a user's bets, newest first, ordered on (created_at, id)
+
+    With cursor_key (from decode_cursor) the page starts after that row, using
+    idx_bets_user_created / idx_bets_user_status_created; offset is only for
+    legacy page-number clients. Returns (bets, next_cursor).
+    """
+    where = ["user_id = %s"]
+    params = [user_id]
+    if status and status != 'all':
+        where.append("status = %s")
+        params.append(status)
+    if cursor_key:
+        condition, cursor_params = keyset_condition(cursor_key)
+        where.append(condition)
+        params.extend(cursor_params)
+
+    cursor.execute(f"""
+        SELECT {BET_HISTORY_COLUMNS}
+        FROM bets
+        WHERE {' AND '.join(where)}
+        ORDER BY created_at DESC, id DESC
+        LIMIT %s OFFSET %s
+    """, params + [limit + 1, offset])
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+    return [_bet_history_row(row) for row in rows], next_cursor
+
+
+_bet_counts_table_ready = False  # set once add_bet_history_indexes has been applied
+
+
+def _bet_status_counts(cursor, user_id):
+    """{status: bets, ..., 'all': total} from the trigger-maintained bet_user_status_counts"""
+    global _bet_counts_table_ready
+    if not _bet_counts_table_ready:
+        cursor.execute("SELECT to_regclass('bet_user_status_counts') IS NOT NULL AS ready")
+        _bet_counts_table_ready = bool(cursor.fetchone()['ready'])
+    if _bet_counts_table_ready:
+        cursor.execute("SELECT status, bets FROM bet_user_status_counts WHERE user_id = %s", (user_id,))
+    else:
+        # add_bet_history_indexes migration not applied yet
+        cursor.execute("SELECT status, COUNT(*) AS bets FROM bets WHERE user_id = %s GROUP BY status", (user_id,))
+    counts = {row['status']: int(row['bets']) for row in cursor.fetchall() if row['bets']}
+    counts['all'] = sum(counts.values())
+    return counts
+
+
 @betting_bp.route('/bets', methods=['GET'])
 @session_required
 def get_user_bets():
-    """Get user's betting history with connection pool optimization"""
+    """
+    Get user's betting history, newest first
+
+    Pass pagination.next_cursor back as ?cursor= for the next page (constant time at
+    any depth); ?page= is still accepted for older clients. The total comes from
+    bet_user_status_counts instead of a COUNT(*) per page.
+    """
     try:
         user_id = g.current_user.id
         
         # Get query parameters
         status = request.args.get('status')
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 20))
+        per_page = clamp_limit(request.args.get('per_page'), default=20)
+        try:
+            cursor_key = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        except InvalidCursor:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        page = 1 if cursor_key else max(1, int(request.args.get('page', 1)))
         
         # Use raw connection for better performance and connection management
         from src.database_config import get_raw_database_connection
         
         with get_raw_database_connection() as conn:
             cursor = conn.cursor()
-            
-            # Build base query
-            base_query = "FROM bets WHERE user_id = %s"
-            params = [user_id]
-            
-            if status and status != 'all':
-                base_query += " AND status = %s"
-                params.append(status)
-            
-            # Get total count
-            count_query = f"SELECT COUNT(*) as total {base_query}"
-            cursor.execute(count_query, params)
-            total_count = cursor.fetchone()['total']
-            
-            # Calculate pagination
-            offset = (page - 1) * per_page
-            total_pages = (total_count + per_page - 1) // per_page
-            
-            # Get paginated results
-            select_query = f"""
-                SELECT id, match_name, selection, stake, odds, potential_return, 
-                       status, created_at, settled_at, sport_name, bet_timing, combo_selections
-                {base_query}
-                ORDER BY created_at DESC
-                LIMIT %s OFFSET %s
-            """
-            cursor.execute(select_query, params + [per_page, offset])
-            
-            bets = []
-            for row in cursor.fetchall():
-                bet_dict = dict(row)
-                
-                # Add UTC ISO-8601 timestamp (bulletproof for any user timezone)
-                if bet_dict.get('created_at'):
-                    from datetime import timezone
-                    
-                    def to_utc_iso(dt):
-                        # dt may be naive or aware; normalize to UTC-aware, then ISO with Z
-                        if dt.tzinfo is None:
-                            dt = dt.replace(tzinfo=timezone.utc)
-                        else:
-                            dt = dt.astimezone(timezone.utc)
-                        return dt.isoformat().replace("+00:00", "Z")
-                    
-                    bet_dict["created_at_iso"] = to_utc_iso(bet_dict['created_at'])
-                    bet_dict["created_at"] = bet_dict["created_at_iso"]  # alias for compatibility
-                
-                bets.append(bet_dict)
+            bets, next_cursor = _fetch_bet_page(cursor, user_id, status, per_page, cursor_key,
+                                                offset=(page - 1) * per_page)
+            counts = _bet_status_counts(cursor, user_id)
         
+        total_count = counts.get(status, 0) if status and status != 'all' else counts['all']
+        total_pages = (total_count + per_page - 1) // per_page
         return jsonify({
             'success': True,
             'bets': bets,
@@ -668,8 +713,9 @@ def get_user_bets():
                 'per_page': per_page,
                 'total': total_count,
                 'pages': total_pages,
-                'has_next': page < total_pages,
-                'has_prev': page > 1
+                'has_next': next_cursor is not None,
+                'has_prev': page > 1 or cursor_key is not None,
+                'next_cursor': next_cursor
             }
         })
         
@@ -688,6 +734,48 @@ def get_user_bets():
             'error': 'Failed to get bets'
         }), 500
 
+@betting_bp.route('/bets/history', methods=['GET'])
+@session_required
+def get_user_bet_history():
+    """
+    Bet history page plus per-status counts in one round trip
+
+    Query params:
+        status: optional status filter ('all' for none)
+        limit: page size (default 20, max 200)
+        cursor: next_cursor from the previous page
+    """
+    try:
+        user_id = g.current_user.id
+        status = request.args.get('status')
+        limit = clamp_limit(request.args.get('limit'), default=20)
+        try:
+            cursor_key = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        except InvalidCursor:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        
+        from src.database_config import get_raw_database_connection
+        
+        with get_raw_database_connection() as conn:
+            cursor = conn.cursor()
+            bets, next_cursor = _fetch_bet_page(cursor, user_id, status, limit, cursor_key)
+            counts = _bet_status_counts(cursor, user_id)
+        
+        return jsonify({
+            'success': True,
+            'bets': bets,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+            'counts': counts
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting user bet history: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to get bet history'
+        }), 500
+
 @betting_bp.route('/test-connection', methods=['GET'])
 @session_required
 def test_betting_connection():
@@ -722,45 +810,12 @@ def test_betting_connection():
 @betting_bp.route('/stats', methods=['GET'])
 @session_required
 def get_user_stats():
-    """Get user's betting statistics"""
+    """Get user's betting statistics (read from the bet_user_stats rollup)"""
     try:
-        user_id = g.current_user.id
-        
-        # Get all settled bets
-        all_bets = current_app.db.session.query(Bet).filter_by(user_id=user_id).filter(
-            Bet.status != BetStatus.PENDING
-        ).all()
-        
-        if not all_bets:
-            return jsonify({
-                'success': True,
-                'stats': {
-                    'total_bets': 0,
-                    'win_rate': 0,
-                    'total_staked': 0,
-                    'total_returned': 0,
-                    'profit_loss': 0
-                }
-            })
-        
-        # Calculate statistics
-        total_bets = len(all_bets)
-        won_bets = len([b for b in all_bets if b.status == BetStatus.WON])
-        total_staked = sum(bet.stake for bet in all_bets)
-        total_returned = sum(bet.actual_return for bet in all_bets)
-        
-        win_rate = (won_bets / total_bets * 100) if total_bets > 0 else 0
-        profit_loss = total_returned - total_staked
-        
+        stats = get_user_betting_stats(g.current_user.id)
         return jsonify({
             'success': True,
-            'stats': {
-                'total_bets': total_bets,
-                'win_rate': round(win_rate, 1),
-                'total_staked': round(total_staked, 2),
-                'total_returned': round(total_returned, 2),
-                'profit_loss': round(profit_loss, 2)
-            }
+            'stats': stats
         })
         
     except Exception as e:
@@ -879,60 +934,77 @@ def determine_bet_result(bet, event, outcome, market):
         logger.error(f"Error determining bet result: {e}")
         return False
 
+@betting_bp.route('/cash-out/offers', methods=['GET'])
+@session_required
+def get_cash_out_offers_route():
+    """Current cash-out offers on the user's open bets (also pushed live as 'cashout:offers')"""
+    try:
+        return jsonify({
+            'success': True,
+            'offers': get_cash_out_offers(g.current_user.id)
+        })
+    except Exception as e:
+        logger.error(f"Error getting cash-out offers: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to get cash-out offers'
+        }), 500
+
 @betting_bp.route('/cash-out/<int:bet_id>', methods=['POST'])
 @session_required
 def cash_out_bet(bet_id):
-    """Cash out a bet early"""
+    """Cash out a bet early at its live offer (optionally pinned to the offer version the user saw)"""
     try:
-        user = g.current_user
-        
-        bet = current_app.db.session.query(Bet).filter_by(
-            id=bet_id,
-            user_id=user.id,
-            status=BetStatus.PENDING
-        ).first()
-        
-        if not bet:
+        user_id = g.current_user.id
+        data = request.get_json(silent=True) or {}
+        version = data.get('version')
+        
+        result = accept_cash_out(bet_id, user_id, int(version) if version is not None else None)
+        if not result['accepted']:
+            if result['offer'] is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Cash out not available for this bet'
+                }), 404
+            # The offer moved since the user saw it: return the current one to confirm
             return jsonify({
                 'success': False,
-                'error': 'Bet not found or already settled'
-            }), 404
+                'error': 'Cash out offer has changed',
+                'offer': result['offer']
+            }), 409
         
-        # Calculate cash out value (simplified - usually 80-90% of current value)
-        cash_out_value = bet.potential_return * 0.85
+        cash_out_value = result['cash_out_value']
+        new_balance = result['new_balance']
         
-        # Update bet status
-        bet.status = BetStatus.CASHED_OUT
-        bet.actual_return = cash_out_value
-        bet.settled_at = datetime.now()
-        
-        # Credit user account
-        user.balance += cash_out_value
+        # Sync Web3 wallet credit (non-blocking)
+        try:
+            from src.services.web3_sync_service import sync_web3_credit
+            sync_web3_credit(user_id, cash_out_value, f"Cash out - {result['match_name']}")
+        except Exception as web3_error:
+            logger.warning(f"Web3 sync failed for cash out: {web3_error}")
         
-        # Create transaction
-        transaction = Transaction(
-            user_id=user.id,
-            bet_id=bet.id,
-            amount=cash_out_value,
-            transaction_type='cash_out',
-            description=f'Cash out - {bet.match_name}',
-            balance_before=user.balance - cash_out_value,  # Balance before credit
-            balance_after=user.balance  # Balance after credit
-        )
-        current_app.db.session.add(transaction)
+        # DO NOT touch g.current_user - it's a SimpleNamespace! Refresh the session cache instead
+        if isinstance(session.get('user_data'), dict):
+            session['user_data'] = {**session['user_data'], 'balance': new_balance}
         
-        current_app.db.session.commit()
+        try:
+            from src.services.event_bus import publish_user_event
+            publish_user_event(user_id, 'balance:update', {
+                'user_id': user_id,
+                'balance': new_balance
+            })
+        except Exception as e:
+            logger.warning(f"Failed to emit socket events: {e}")
         
         return jsonify({
             'success': True,
             'message': 'Bet cashed out successfully',
             'cash_out_value': cash_out_value,
-            'new_balance': user.balance
+            'new_balance': new_balance
         })
         
     except Exception as e:
         logger.error(f"Error cashing out bet: {e}")
-        current_app.db.session.rollback()
         return jsonify({
             'success': False,
             'error': 'Failed to cash out bet'
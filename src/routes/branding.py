@@ -13,45 +13,11 @@ import time
 import logging
 
 branding_bp = Blueprint('branding', __name__)
+logger = logging.getLogger(__name__)
 
-# Two-tier cache: Redis (distributed) + in-process (fallback)
-# Branding rarely changes - cache for 1 hour
-_BRANDING_CACHE = {}  # In-process fallback cache
-_CACHE_TTL = 3600  # 1 hour (branding changes are rare)
-
-def _get_cached(key, loader):
-    """
-    Two-tier cache: Redis (distributed) + in-process (fallback)
-    1. Try Redis first (shared across all instances)
-    2. Fall back to in-process cache
-    3. If both miss, call loader and populate both caches
-    """
-    from src.utils.redis_cache import redis_cache_get, redis_cache_set
-    
-    # Tier 1: Try Redis (distributed cache)
-    redis_value = redis_cache_get(key)
-    if redis_value is not None:
-        # Also update in-process cache for faster subsequent access
-        _BRANDING_CACHE[key] = (time.time(), redis_value)
-        return redis_value
-    
-    # Tier 2: Try in-process cache
-    now = time.time()
-    if key in _BRANDING_CACHE:
-        cached_time, cached_data = _BRANDING_CACHE[key]
-        if now - cached_time < _CACHE_TTL:
-            # Warm Redis cache from in-process cache
-            redis_cache_set(key, cached_data, _CACHE_TTL)
-            return cached_data
-    
-    # Both caches miss - load from DB
-    data = loader()
-    
-    # Populate both caches
-    _BRANDING_CACHE[key] = (now, data)
-    redis_cache_set(key, data, _CACHE_TTL)
-    
-    return data
+# Branding lives in the versioned tenant-config cache (bounded local LRU + Redis,
+# invalidated on every instance via pub/sub) - see utils/tenant_config_cache.py
+_CACHE_NAMESPACE = 'branding'
 
 def get_db_connection():
     """
@@ -85,50 +51,39 @@ def _load_operator_branding_from_db(subdomain):
 def get_operator_branding_cached_only(subdomain):
     """
     Return cached branding if present; otherwise None (NEVER hits DB)
-    Checks both Redis and in-process cache
+    Checks both the in-process tier and Redis
     Use this for public/high-traffic endpoints to guarantee DB-free operation
     """
-    from src.utils.redis_cache import redis_cache_get
-    
-    key = f"branding:{subdomain}"
-    
-    # Try Redis first (distributed cache)
-    redis_value = redis_cache_get(key)
-    if redis_value is not None:
-        return redis_value
-    
-    # Fall back to in-process cache
-    now = time.time()
-    if key in _BRANDING_CACHE:
-        cached_time, cached_data = _BRANDING_CACHE[key]
-        if now - cached_time < _CACHE_TTL:
-            return cached_data
-    
-    return None
+    from src.utils.tenant_config_cache import get_tenant_config_cache
+    return get_tenant_config_cache().peek(_CACHE_NAMESPACE, subdomain, default=None)
 
 def get_operator_branding(subdomain):
     """Get operator branding and customization settings (cached)
     
     Degrades gracefully on DB pool exhaustion by serving cached/default values.
     """
-    cache_key = f"branding:{subdomain}"
-    operator = None
+    from src.utils.tenant_config_cache import get_tenant_config_cache
+    cache = get_tenant_config_cache()
+    
+    def load():
+        operator = _load_operator_branding_from_db(subdomain)
+        return _build_operator_branding(operator) if operator else None
     
     try:
-        # Try to load from cache or DB
-        operator = _get_cached(cache_key, lambda: _load_operator_branding_from_db(subdomain))
+        return cache.get(_CACHE_NAMESPACE, subdomain, load)
     except (PoolTimeout, OperationalError) as e:
         # DB unavailable - serve stale cache if present, otherwise return None
         logging.warning(f"⚠️ Branding DB unavailable ({type(e).__name__}). Serving cached/default for {subdomain}")
-        if cache_key in _BRANDING_CACHE:
-            _, operator = _BRANDING_CACHE[cache_key]
+        branding = cache.stale(_CACHE_NAMESPACE, subdomain)
+        if branding:
             logging.info(f"✅ Serving stale cache for {subdomain}")
+        return branding
     except Exception as e:
         logging.error(f"❌ Unexpected error loading branding for {subdomain}: {e}")
-    
-    if not operator:
         return None
-    
+
+def _build_operator_branding(operator):
+    """Merge an operator row's settings over the default branding (JSON-safe result)"""
     # Parse settings or use defaults
     settings = json.loads(operator['settings']) if operator['settings'] else {}
     
@@ -474,15 +429,10 @@ def update_branding(subdomain):
                 
                 conn.commit()
         
-        # Invalidate cache after update (both Redis and in-process)
+        # Invalidate cache after update (bumps the tenant version and notifies every instance)
         from src.utils.redis_cache import invalidate_tenant_cache
         invalidate_tenant_cache(subdomain)
         
-        # Also clear in-process cache
-        cache_key = f"branding:{subdomain}"
-        if cache_key in _BRANDING_CACHE:
-            del _BRANDING_CACHE[cache_key]
-        
         logger.info(f"🗑️ Invalidated branding cache for {subdomain} after update")
         
         return jsonify({
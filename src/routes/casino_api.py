@@ -18,9 +18,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Load environment variables
 from src.config.env_loader import *  # noqa: F401 - just to execute the loader
 
-from src.db_compat import get_connection
+from src.db_compat import get_connection, connection_ctx
+from src.services import slot_engine
+from src.services import provably_fair
+from src.services.provably_fair import hmac_sha256, hash_to_uniform_01, uniform_from_seeds, crash_multiplier
+from src.utils.db_retry import ro_connection_with_retry
+from src.utils.pagination import encode_cursor, decode_cursor, keyset_condition, clamp_limit, InvalidCursor
 import logging
 
+logger = logging.getLogger(__name__)
+
 casino_bp = Blueprint('casino', __name__, url_prefix='/api/casino')
 
 # Casino game utilities (simplified versions)
@@ -29,143 +36,18 @@ def new_ref(game_type):
 
 def spin_reels(target_rtp):
     """Generate 5-reel slot machine result with professional reel strips"""
-    import random
-    
-    # Professional reel strips: 100 stops per reel with exact distribution
-    # 🍓: 19%, 🍎: 18%, 🥝: 17%, 🍑: 17%, 🍒/🍌/🍊/🍇: 7% each, 💎: 1%
-    reel_strip = []
-    
-    # Diamond: 1 stop (1%)
-    reel_strip.extend(['💎'] * 1)
-    
-    # High value fruits: 7 stops each (7% each)
-    reel_strip.extend(['🍒'] * 7)  # Cherry
-    reel_strip.extend(['🍌'] * 7)  # Banana
-    reel_strip.extend(['🍊'] * 7)  # Orange
-    reel_strip.extend(['🍇'] * 7)  # Grape
-    
-    # Medium value fruits: 19, 18, 17, 17 stops
-    reel_strip.extend(['🍓'] * 19)  # Strawberry (19%)
-    reel_strip.extend(['🍎'] * 18)  # Apple (18%)
-    reel_strip.extend(['🥝'] * 17)  # Kiwi (17%)
-    reel_strip.extend(['🍑'] * 17)  # Peach (17%)
-    
-    # Verify we have exactly 100 stops
-    assert len(reel_strip) == 100, f"Reel strip should have 100 stops, got {len(reel_strip)}"
-    
-    # Generate 5 reels with 3 symbols each (3x5 = 15 total symbols)
-    reels = []
-    for _ in range(5):
-        reel = []
-        for _ in range(3):
-            # Randomly select from the weighted reel strip
-            symbol = random.choice(reel_strip)
-            reel.append(symbol)
-        reels.append(reel)
-    
-    return reels
+    return slot_engine.spin()
 
 def evaluate_slots(reels, stake):
     """Evaluate 5-reel slot machine with 20 fixed paylines (~96% RTP, ~28% hit rate)"""
-    if not reels or len(reels) != 5:
-        return 0, []
-    
-    print(f"🎰 Evaluating reels: {reels}")
-    print(f"🎰 Stake: {stake}")
-    
-    # 20 fixed paylines (row indices per reel)
-    LINES = [
-        [0,0,0,0,0], [1,1,1,1,1], [2,2,2,2,2], [0,0,0,1,2], [2,2,2,1,0],
-        [0,1,2,1,0], [2,1,0,1,2], [0,0,1,2,2], [2,2,1,0,0], [1,0,0,0,1],
-        [1,2,2,2,1], [0,1,1,1,0], [2,1,1,1,2], [1,1,0,1,1], [1,1,2,1,1],
-        [0,1,0,1,0], [2,1,2,1,2], [0,2,0,2,0], [2,0,2,0,2], [0,2,1,0,2]
-    ]
-    
-    # Paytable (multipliers per line bet) - 94% RTP
-    # Nice-number paytable that yields ~94% RTP
-    PAYTABLE = {
-        'diamond': {3: 81.0, 4: 400.0, 5: 4200.0},
-        'high': {3: 33.0, 4: 160.0, 5: 1005.0},      # 🍒🍌🍊🍇
-        'medium': {3: 17.0, 4: 66.0, 5: 505.0}    # 🍓🍎🥝🍑
-    }
-    
-    ROYAL_PAYOUT = 2000.0  # Royal sequence on line 2 (middle row)
-    ROYAL_SEQUENCE = ['🍒', '🍌', '🍊', '🍇', '🍓']
-    
-    def get_symbol_bucket(symbol):
-        """Get symbol bucket for paytable lookup"""
-        if symbol == '💎':
-            return 'diamond'
-        elif symbol in ['🍒', '🍌', '🍊', '🍇']:
-            return 'high'
-        else:  # 🍓, 🍎, 🥝, 🍑
-            return 'medium'
-    
-    def longest_prefix_match(seq):
-        """Find longest prefix of identical symbols"""
-        if not seq:
-            return 0
-        k = 1
-        for i in range(1, len(seq)):
-            if seq[i] == seq[0]:
-                k += 1
-            else:
-                break
-        return k
-    
-    total_payout = 0.0
-    wins = []
-    line_bet = stake / 20.0  # Total stake divided by 20 lines
-    
-    # Evaluate each payline
-    for line_idx, line in enumerate(LINES):
-        # Extract symbols along this payline
-        seq = [reels[reel][line[reel]] for reel in range(5)]
-        
-        # Check for Royal sequence first (highest priority) - only on line 2 (middle row)
-        if line_idx == 1 and seq == ROYAL_SEQUENCE:
-            # Royal sequence on middle row (line 2, 1-indexed)
-            payout = line_bet * ROYAL_PAYOUT
-            total_payout += payout
-            
-            wins.append({
-                "symbol": "royal_sequence",
-                "count": 5,
-                "payout": payout,
-                "line": "line_2_royal",
-                "multiplier": ROYAL_PAYOUT
-            })
-            print(f"🎰 Line {line_idx+1}: Royal Sequence = {payout:.2f} ({ROYAL_PAYOUT}x)")
-        else:
-            # Check for longest prefix match (3+ symbols) for all other cases
-            k = longest_prefix_match(seq)
-            
-            if k >= 3:
-                # Regular win: k-of-a-kind
-                symbol = seq[0]
-                bucket = get_symbol_bucket(symbol)
-                multiplier = PAYTABLE[bucket][k]
-                payout = line_bet * multiplier
-                total_payout += payout
-                
-                wins.append({
-                    "symbol": symbol,
-                    "count": k,
-                    "payout": payout,
-                    "line": f"line_{line_idx+1}",
-                    "multiplier": multiplier
-                })
-                print(f"🎰 Line {line_idx+1}: {symbol} {k} of a kind = {payout:.2f} ({multiplier}x)")
-    
-    print(f"🎰 Final result: payout={total_payout:.2f}, wins={len(wins)}")
-    return total_payout, wins
+    return slot_engine.evaluate(reels, stake)
 
 def evaluate_line(line, stake, get_payout_multiplier, line_name):
     """Evaluate a single line for winning combinations"""
     line_payout = 0
     line_wins = []
     
-    print(f"🎰 Evaluating {line_name} line: {line}")
+    logger.debug(f"🎰 Evaluating {line_name} line: {line}")
     
     # Check for 5 of a kind (JACKPOT)
     if len(set(line)) == 1:
@@ -174,7 +56,7 @@ def evaluate_line(line, stake, get_payout_multiplier, line_name):
         payout = stake * multiplier
         line_payout += payout
         line_wins.append({"symbol": symbol, "count": 5, "payout": payout, "line": line_name})
-        print(f"🎰 5 of a kind JACKPOT: {symbol} = {payout} ({multiplier}x)")
+        logger.debug(f"🎰 5 of a kind JACKPOT: {symbol} = {payout} ({multiplier}x)")
     
     # Check for 4 of a kind
     elif len(set(line[:4])) == 1:  # First 4 reels
@@ -183,7 +65,7 @@ def evaluate_line(line, stake, get_payout_multiplier, line_name):
         payout = stake * multiplier
         line_payout += payout
         line_wins.append({"symbol": symbol, "count": 4, "payout": payout, "line": line_name})
-        print(f"🎰 4 of a kind: {symbol} = {payout} ({multiplier}x)")
+        logger.debug(f"🎰 4 of a kind: {symbol} = {payout} ({multiplier}x)")
     
     # Check for 3 of a kind
     elif len(set(line[:3])) == 1:  # First 3 reels
@@ -192,7 +74,7 @@ def evaluate_line(line, stake, get_payout_multiplier, line_name):
         payout = stake * multiplier
         line_payout += payout
         line_wins.append({"symbol": symbol, "count": 3, "payout": payout, "line": line_name})
-        print(f"🎰 3 of a kind: {symbol} = {payout} ({multiplier}x)")
+        logger.debug(f"🎰 3 of a kind: {symbol} = {payout} ({multiplier}x)")
     
     # Check for royal sequence (🍒-🍌-🍊-🍇-🍓) - only on main payline
     if line_name == "middle":
@@ -202,7 +84,7 @@ def evaluate_line(line, stake, get_payout_multiplier, line_name):
             payout = stake * multiplier
             line_payout += payout
             line_wins.append({"symbol": "royal_sequence", "count": 5, "payout": payout, "line": line_name})
-            print(f"🎰 Royal sequence: {payout} ({multiplier}x)")
+            logger.debug(f"🎰 Royal sequence: {payout} ({multiplier}x)")
     
     return line_payout, line_wins
 
@@ -228,7 +110,7 @@ def fresh_shoe(decks=6):
 
 def bj_value(cards):
     """Calculate blackjack hand value"""
-    print(f"🃏 Calculating blackjack value for cards: {cards}")
+    logger.debug(f"🃏 Calculating blackjack value for cards: {cards}")
     value = 0
     aces = 0
     for card in cards:
@@ -237,31 +119,31 @@ def bj_value(cards):
             rank = card.get('r', card.get('rank', ''))
         else:
             rank = card[:-1]  # Remove suit from string format
-        print(f"🃏 Card: {card}, Rank: {rank}")
+        logger.debug(f"🃏 Card: {card}, Rank: {rank}")
         
         if rank in ['J', 'Q', 'K']:
             value += 10
-            print(f"🃏 Face card: +10, total: {value}")
+            logger.debug(f"🃏 Face card: +10, total: {value}")
         elif rank == 'A':
             aces += 1
             value += 11
-            print(f"🃏 Ace: +11, total: {value}, aces: {aces}")
+            logger.debug(f"🃏 Ace: +11, total: {value}, aces: {aces}")
         else:
             try:
                 value += int(rank)
-                print(f"🃏 Number card: +{rank}, total: {value}")
+                logger.debug(f"🃏 Number card: +{rank}, total: {value}")
             except ValueError:
-                print(f"🃏 Invalid rank: {rank}")
+                logger.debug(f"🃏 Invalid rank: {rank}")
     
-    print(f"🃏 Before ace adjustment: value={value}, aces={aces}")
+    logger.debug(f"🃏 Before ace adjustment: value={value}, aces={aces}")
     
     # Adjust for aces - convert 11 to 1 if over 21
     while value > 21 and aces > 0:
         value -= 10
         aces -= 1
-        print(f"🃏 Ace adjustment: value={value}, aces={aces}")
+        logger.debug(f"🃏 Ace adjustment: value={value}, aces={aces}")
     
-    print(f"🃏 Final blackjack value: {value}")
+    logger.debug(f"🃏 Final blackjack value: {value}")
     return value
 
 def settle_split_hands(split_hands, dealer, deck, stake, ref):
@@ -274,13 +156,13 @@ def settle_split_hands(split_hands, dealer, deck, stake, ref):
     total_payout = 0.0
     results = []
     
-    print(f"🃏 SPLIT SETTLEMENT - Dealer value: {dealer_value}")
+    logger.debug(f"🃏 SPLIT SETTLEMENT - Dealer value: {dealer_value}")
     
     for i, hand in enumerate(split_hands):
         hand_cards = hand['cards']
         hand_value = bj_value(hand_cards)
         
-        print(f"🃏 Split Hand {i+1}: {hand_cards} = {hand_value}")
+        logger.debug(f"🃏 Split Hand {i+1}: {hand_cards} = {hand_value}")
         
         if hand_value > 21:
             # Hand busted
@@ -312,7 +194,7 @@ def settle_split_hands(split_hands, dealer, deck, stake, ref):
             "result": result_type
         })
         
-        print(f"🃏 Split Hand {i+1} result: {result_type}, payout: {hand_payout}")
+        logger.debug(f"🃏 Split Hand {i+1} result: {result_type}, payout: {hand_payout}")
     
     # Credit total winnings
     if total_payout > 0:
@@ -322,7 +204,7 @@ def settle_split_hands(split_hands, dealer, deck, stake, ref):
             SET balance = balance + %s
             WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
         """, (total_payout, session.get('user_id'), session.get('operator_id')))
-        print(f"💰 Split hands total payout credited: +{total_payout}")
+        logger.debug(f"💰 Split hands total payout credited: +{total_payout}")
     
     return {
         "deck": deck,
@@ -360,48 +242,6 @@ def baccarat_total(cards):
             total += int(rank)
     return total % 10
 
-def hmac_sha256(key, msg):
-    """HMAC-SHA256 implementation"""
-    import hmac
-    import hashlib
-    return hmac.new(key.encode('utf-8'), msg.encode('utf-8'), hashlib.sha256).hexdigest()
-
-def hash_to_uniform_01(hex_string):
-    """Convert first 52 bits of hex string to float in [0,1)"""
-    # First 52 bits → 13 hex chars (13 * 4 = 52)
-    frac_hex = hex_string[:13]
-    h = int(frac_hex, 16)
-    E = 2 ** 52
-    return h / E  # r in [0, 1)
-
-def uniform_from_seeds(server_seed, client_seed, nonce):
-    """Generate provably fair uniform random number from seeds"""
-    msg = f"{client_seed}:{nonce}"
-    hex_hash = hmac_sha256(server_seed, msg)
-    return hash_to_uniform_01(hex_hash)
-
-def crash_multiplier(target_rtp, server_seed="default_server_seed", client_seed="default_client_seed", nonce=0):
-    """Provably fair crash multiplier with exact RTP = target_rtp"""
-    alpha = float(target_rtp)  # e.g. 0.96
-
-    # provably-fair r in [0,1)
-    r = uniform_from_seeds(server_seed, client_seed, nonce)
-
-    # ✅ Correct α-scaled fair crash:
-    #   M_fair = 1/(1-r) has tail P(M_fair >= x) = 1/x
-    #   M = α * M_fair  ⇒  P(M >= x) = α/x  ⇒ EV at any cashout x is α
-    denom = max(1e-12, 1.0 - r)
-    m = alpha / denom
-
-    # Map the <1x mass (prob = 1-α) to an explicit 1.00x insta-bust
-    if m < 1.0:
-        m = 1.0
-
-    # Cap at 20x for risk management (matches UI)
-    m = min(m, 20.0)
-
-    return round(m, 2)
-
 @casino_bp.route('/health')
 def health():
     return jsonify({"ok": True})
@@ -411,17 +251,15 @@ def get_user_info():
     """Get current user information from session"""
     try:
         # Enhanced debugging
-        print(f"🔍 Casino user/info - Full session: {dict(session)}")
-        print(f"🔍 Casino user/info - Session keys: {list(session.keys())}")
-        print(f"🔍 Casino user/info - Request headers: {dict(request.headers)}")
-        print(f"🔍 Casino user/info - Request URL: {request.url}")
-        print(f"🔍 Casino user/info - Request method: {request.method}")
+        logger.debug(f"🔍 Casino user/info - Session keys: {list(session.keys())}")
+        logger.debug(f"🔍 Casino user/info - Request URL: {request.url}")
+        logger.debug(f"🔍 Casino user/info - Request method: {request.method}")
         
         user_id = session.get('user_id')
-        print(f"🔍 Casino user/info - user_id from session: {user_id}")
+        logger.debug(f"🔍 Casino user/info - user_id from session: {user_id}")
         
         if not user_id:
-            print("❌ No user_id found in session")
+            logger.debug("❌ No user_id found in session")
             return jsonify({
                 "error": "Authentication required", 
                 "debug": {
@@ -432,10 +270,10 @@ def get_user_info():
             }), 401
         
         operator_id = session.get('operator_id')
-        print(f"🔍 Casino user/info - operator_id from session: {operator_id}")
+        logger.debug(f"🔍 Casino user/info - operator_id from session: {operator_id}")
         
         if not operator_id:
-            print("❌ No operator_id found in session")
+            logger.debug("❌ No operator_id found in session")
             return jsonify({
                 "error": "Sportsbook operator not found",
                 "debug": {
@@ -474,7 +312,7 @@ def get_user_info():
         })
         
     except Exception as e:
-        print(f"❌ Error getting user info: {e}")
+        logger.error(f"❌ Error getting user info: {e}")
         return jsonify({"error": f"Failed to get user info: {str(e)}"}), 500
 
 @casino_bp.route('/wallet/balance')
@@ -482,36 +320,34 @@ def get_balance():
     """Get user's wallet balance from shared sportsbook wallet"""
     try:
         # Debug logging
-        print(f"🔍 Casino balance request - Session: {dict(session)}")
-        print(f"🔍 Headers: {dict(request.headers)}")
-        print(f"🔍 Request URL: {request.url}")
-        print(f"🔍 Request method: {request.method}")
-        print(f"🔍 Session keys: {list(session.keys())}")
-        print(f"🔍 User ID in session: {session.get('user_id')}")
-        print(f"🔍 Tenant in session: {session.get('tenant')}")
+        logger.debug(f"🔍 Request URL: {request.url}")
+        logger.debug(f"🔍 Request method: {request.method}")
+        logger.debug(f"🔍 Session keys: {list(session.keys())}")
+        logger.debug(f"🔍 User ID in session: {session.get('user_id')}")
+        logger.debug(f"🔍 Tenant in session: {session.get('tenant')}")
         
         user_id = session.get('user_id')
         if not user_id:
             # Try to get user_id from request headers as fallback
             user_id = request.headers.get('X-User-Id')
             if not user_id:
-                print("❌ No user_id found in session or headers")
+                logger.debug("❌ No user_id found in session or headers")
                 return jsonify({"error": "Authentication required"}), 401
         
         # Get the operator_id for the sportsbook, not the user_id
         operator_id = session.get('operator_id')
         if not operator_id:
-            print("❌ No operator_id found in session")
+            logger.debug("❌ No operator_id found in session")
             return jsonify({"error": "Sportsbook operator not found"}), 401
         
-        print(f"✅ Using user_id: {user_id}, operator_id: {operator_id}")
+        logger.debug(f"✅ Using user_id: {user_id}, operator_id: {operator_id}")
         
         try:
             conn = get_connection()
-            print(f"✅ Database connection successful")
+            logger.debug(f"✅ Database connection successful")
             cursor = conn.cursor()
         except Exception as e:
-            print(f"❌ Database connection failed: {e}")
+            logger.error(f"❌ Database connection failed: {e}")
             return jsonify({"error": f"Database connection failed: {str(e)}"}), 500
         
         # Get balance from user's individual wallet (same as sportsbook)
@@ -523,23 +359,23 @@ def get_balance():
             
             result = cursor.fetchone()
             balance = result[0] if result else 1000.0  # Default starting balance
-            print(f"✅ User balance query successful: {balance}")
+            logger.debug(f"✅ User balance query successful: {balance}")
             
             cursor.close()
             conn.close()
             
             return jsonify({"balance": round(balance, 2), "currency": "USD"})
         except Exception as e:
-            print(f"❌ SQL query failed: {e}")
+            logger.error(f"❌ SQL query failed: {e}")
             cursor.close()
             conn.close()
             return jsonify({"error": f"Database query failed: {str(e)}"}), 500
         
     except Exception as e:
-        print(f"❌ Casino balance error: {e}")
-        print(f"❌ Error type: {type(e)}")
+        logger.error(f"❌ Casino balance error: {e}")
+        logger.error(f"❌ Error type: {type(e)}")
         import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.error(f"❌ Traceback: {traceback.format_exc()}")
         logging.error(f"Error getting casino balance: {e}")
         return jsonify({"error": f"Failed to get balance: {str(e)}"}), 500
 
@@ -688,14 +524,14 @@ def roulette_play():
             return jsonify({"error": "Sportsbook operator not found"}), 401
         
         data = request.get_json()
-        print(f"🎰 Roulette request data: {data}")
+        logger.debug(f"🎰 Roulette request data: {data}")
         bets = data.get('params', {}).get('bets', [])
         currency = data.get('currency', 'USD')
         
-        print(f"🎰 Roulette bets: {bets}")
+        logger.debug(f"🎰 Roulette bets: {bets}")
         
         if not bets:
-            print(f"❌ No bets provided")
+            logger.debug(f"❌ No bets provided")
             return jsonify({"error": "No bets provided"}), 400
         
         total_stake = sum(b.get('stake', b.get('amount', 0)) for b in bets)
@@ -786,10 +622,10 @@ def roulette_play():
 def roulette_win():
     """Credit winnings for roulette game"""
     try:
-        print(f"🎰 Roulette win API called")
+        logger.debug(f"🎰 Roulette win API called")
         user_id = session.get('user_id')
         if not user_id:
-            print(f"❌ No user_id in session")
+            logger.debug(f"❌ No user_id in session")
             return jsonify({"error": "Authentication required"}), 401
         
         operator_id = session.get('operator_id')
@@ -800,10 +636,10 @@ def roulette_win():
         ref = data.get('ref')
         payout = data.get('payout', 0.0)
         
-        print(f"🎰 Roulette win data: ref={ref}, payout={payout}")
+        logger.debug(f"🎰 Roulette win data: ref={ref}, payout={payout}")
         
         if not ref:
-            print(f"❌ No ref provided")
+            logger.debug(f"❌ No ref provided")
             return jsonify({"error": "Game reference required"}), 400
         
         conn = get_connection()
@@ -817,7 +653,7 @@ def roulette_win():
         
         result = cursor.fetchone()
         if not result:
-            print(f"❌ Game not found for ref: {ref}")
+            logger.debug(f"❌ Game not found for ref: {ref}")
             return jsonify({"error": "Game not found"}), 404
         
         stake, result_json = result
@@ -843,7 +679,7 @@ def roulette_win():
                 SET balance = balance + %s
                 WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
             """, (payout, user_id, operator_id))
-            print(f"💰 Roulette winnings credited: +{payout} for user {user_id}")
+            logger.debug(f"💰 Roulette winnings credited: +{payout} for user {user_id}")
         
         conn.commit()
         
@@ -862,9 +698,9 @@ def roulette_win():
         })
         
     except Exception as e:
-        print(f"❌ Roulette win error: {e}")
+        logger.error(f"❌ Roulette win error: {e}")
         import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.error(f"❌ Traceback: {traceback.format_exc()}")
         logging.error(f"Error in roulette win: {e}")
         return jsonify({"error": f"Win error: {str(e)}"}), 500
 
@@ -882,15 +718,14 @@ def blackjack_play():
             return jsonify({"error": "Sportsbook operator not found"}), 401
         
         data = request.get_json()
-        print(f"🔍 Blackjack request data: {data}")
-        print(f"🔍 Request headers: {dict(request.headers)}")
+        logger.debug(f"🔍 Blackjack request data: {data}")
         
         action = data.get('action', 'deal')
         stake = data.get('stake', 0)
         currency = data.get('currency', 'USD')
         state = data.get('state', {})
         
-        print(f"🔍 Parsed - action: {action}, stake: {stake}, currency: {currency}")
+        logger.debug(f"🔍 Parsed - action: {action}, stake: {stake}, currency: {currency}")
         
         ref = data.get('params', {}).get('ref') or new_ref("blackjack")
         payout = 0.0
@@ -921,16 +756,16 @@ def blackjack_play():
                 deck = data["state"]["deck"]
                 player = data["state"]["player"]
                 dealer = data["state"]["dealer_real"]
-                print(f"🃏 DEBUG: Using frontend cards - player: {player}, dealer: {dealer}")
+                logger.debug(f"🃏 DEBUG: Using frontend cards - player: {player}, dealer: {dealer}")
             else:
                 # Fallback: generate new cards
                 deck = fresh_shoe(6)
                 player = [deck.pop(), deck.pop()]
                 dealer = [deck.pop(), deck.pop()]
-                print(f"🃏 DEBUG: Generated new cards - player: {player}, dealer: {dealer}")
+                logger.debug(f"🃏 DEBUG: Generated new cards - player: {player}, dealer: {dealer}")
             
             pv, dv = bj_value(player), bj_value(dealer)
-            print(f"🃏 DEBUG: Player value: {pv}, Dealer value: {dv}")
+            logger.debug(f"🃏 DEBUG: Player value: {pv}, Dealer value: {dv}")
             
             result = {
                 "deck": deck,
@@ -950,26 +785,26 @@ def blackjack_play():
                     multiplier = "+0x"
                     payout = round(stake, 2)
                     result["final"] = True
-                    print(f"💰 BOTH BLACKJACK! Push - returning stake: {payout}")
+                    logger.debug(f"💰 BOTH BLACKJACK! Push - returning stake: {payout}")
                 else:
                     outcome = "Blackjack"
                     multiplier = "+1.5x"
                     payout = round(stake * 2.5, 2)
                     result["final"] = True
                     # Credit Blackjack winnings immediately
-                    print(f"💰 PLAYER BLACKJACK! Crediting winnings={payout}")
+                    logger.debug(f"💰 PLAYER BLACKJACK! Crediting winnings={payout}")
                     cursor.execute("""
                         UPDATE users 
                         SET balance = balance + %s
                         WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
                     """, (payout, user_id, operator_id))
-                    print(f"💰 Blackjack wallet updated: +{payout}")
+                    logger.debug(f"💰 Blackjack wallet updated: +{payout}")
                 
                 result["outcome"] = outcome
                 result["multiplier"] = multiplier
                 result["payout"] = payout
             else:
-                print(f"💰 No Blackjack. Player value: {pv}, Payout: 0")
+                logger.debug(f"💰 No Blackjack. Player value: {pv}, Payout: 0")
         else:
             # Hit, stand, double
             deck = state.get('deck', fresh_shoe(6))
@@ -991,7 +826,7 @@ def blackjack_play():
                 }
             elif action == "split":
                 # Handle split action
-                print(f"🃏 SPLIT ACTION - Player cards: {player}")
+                logger.debug(f"🃏 SPLIT ACTION - Player cards: {player}")
                 
                 # Check if we can split (same rank cards)
                 if len(player) != 2 or player[0]['r'] != player[1]['r']:
@@ -1015,7 +850,7 @@ def blackjack_play():
                     SET balance = balance - %s
                     WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
                 """, (stake, user_id, operator_id))
-                print(f"💰 Split additional bet debited: -{stake}")
+                logger.debug(f"💰 Split additional bet debited: -{stake}")
                 
                 # Create split hands
                 card1, card2 = player[0], player[1]
@@ -1043,7 +878,7 @@ def blackjack_play():
                     "can_split_hand2": split_hand2[0]['r'] == split_hand2[1]['r'] if len(split_hand2) == 2 else False
                 }
                 
-                print(f"🃏 SPLIT RESULT - Hand 1: {split_hand1} (value: {pv1}), Hand 2: {split_hand2} (value: {pv2})")
+                logger.debug(f"🃏 SPLIT RESULT - Hand 1: {split_hand1} (value: {pv1}), Hand 2: {split_hand2} (value: {pv2})")
             elif action in ["hit_split", "stand_split", "double_split"]:
                 # Handle split hand actions
                 split_hands = state.get('split_hands', [])
@@ -1092,7 +927,7 @@ def blackjack_play():
                         SET balance = balance - %s
                         WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
                     """, (stake, user_id, operator_id))
-                    print(f"💰 Split hand double bet debited: -{stake}")
+                    logger.debug(f"💰 Split hand double bet debited: -{stake}")
                     
                     current_cards.append(deck.pop())
                     current_split_hand['cards'] = current_cards
@@ -1155,19 +990,19 @@ def blackjack_play():
                 
                 pv = bj_value(player)
                 
-                print(f"🃏 Before dealer hits - Dealer cards: {dealer}")
-                print(f"🃏 Dealer value before hits: {bj_value(dealer)}")
+                logger.debug(f"🃏 Before dealer hits - Dealer cards: {dealer}")
+                logger.debug(f"🃏 Dealer value before hits: {bj_value(dealer)}")
                 
                 while bj_value(dealer) < 17:
                     new_card = deck.pop()
                     dealer.append(new_card)
-                    print(f"🃏 Dealer hit: {new_card}, new total: {bj_value(dealer)}")
+                    logger.debug(f"🃏 Dealer hit: {new_card}, new total: {bj_value(dealer)}")
                 
                 dv = bj_value(dealer)
                 
-                print(f"🃏 Final blackjack values - Player: {pv}, Dealer: {dv}")
-                print(f"🃏 Dealer cards: {dealer}")
-                print(f"🃏 Player cards: {player}")
+                logger.debug(f"🃏 Final blackjack values - Player: {pv}, Dealer: {dv}")
+                logger.debug(f"🃏 Dealer cards: {dealer}")
+                logger.debug(f"🃏 Player cards: {player}")
                 
                 # Determine outcome and payout
                 if pv > 21:
@@ -1197,7 +1032,7 @@ def blackjack_play():
                     multiplier = "-1x"
                     payout = 0.0
                 
-                print(f"🃏 Game result - Outcome: {outcome}, Multiplier: {multiplier}, Payout: {payout}")
+                logger.debug(f"🃏 Game result - Outcome: {outcome}, Multiplier: {multiplier}, Payout: {payout}")
                 
                 result = {
                     "deck": deck,
@@ -1223,13 +1058,13 @@ def blackjack_play():
         # Update wallet - proper flow: debit on bet, credit on win
         if action == "deal":
             # Debit wallet immediately when placing initial bet
-            print(f"💰 Blackjack wallet update: debiting stake={stake}")
+            logger.debug(f"💰 Blackjack wallet update: debiting stake={stake}")
             cursor.execute("""
                 UPDATE users 
                 SET balance = balance - %s
                 WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
             """, (stake, user_id, operator_id))
-            print(f"💰 Wallet updated: -{stake}")
+            logger.debug(f"💰 Wallet updated: -{stake}")
             
             # Sync Web3 wallet debit (non-blocking)
             try:
@@ -1240,13 +1075,13 @@ def blackjack_play():
                 
         elif action == "double":
             # Debit additional stake for double down
-            print(f"💰 Blackjack wallet update: debiting additional stake={stake}")
+            logger.debug(f"💰 Blackjack wallet update: debiting additional stake={stake}")
             cursor.execute("""
                 UPDATE users 
                 SET balance = balance - %s
                 WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
             """, (stake, user_id, operator_id))
-            print(f"💰 Wallet updated: -{stake}")
+            logger.debug(f"💰 Wallet updated: -{stake}")
             
             # Sync Web3 wallet debit for double down (non-blocking)
             try:
@@ -1257,13 +1092,13 @@ def blackjack_play():
         
         # Credit winnings only if player won (and game is final)
         if payout > 0 and result.get("final"):
-            print(f"💰 Blackjack wallet update: crediting winnings={payout}")
+            logger.debug(f"💰 Blackjack wallet update: crediting winnings={payout}")
             cursor.execute("""
                 UPDATE users 
                 SET balance = balance + %s
                 WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
             """, (payout, user_id, operator_id))
-            print(f"💰 Wallet updated: +{payout}")
+            logger.debug(f"💰 Wallet updated: +{payout}")
             
             # Sync Web3 wallet credit (non-blocking)
             try:
@@ -1272,7 +1107,7 @@ def blackjack_play():
             except Exception as web3_error:
                 logging.warning(f"Web3 sync failed for blackjack win: {web3_error}")
         else:
-            print(f"💰 Blackjack wallet update: no payout to credit (payout={payout}, final={result.get('final')})")
+            logger.debug(f"💰 Blackjack wallet update: no payout to credit (payout={payout}, final={result.get('final')})")
         
         conn.commit()
         
@@ -1450,13 +1285,14 @@ def crash_play():
         # Play crash - generate crash multiplier but DON'T credit winnings yet
         ref = new_ref("crash")
         
-        # Generate provably fair seeds
-        import time
-        server_seed = f"server_{int(time.time())}"
-        client_seed = f"client_{user_id}_{int(time.time())}"
-        nonce = int(time.time() * 1000) % 1000000  # Use timestamp as nonce
-        
-        multiplier = crash_multiplier(0.96, server_seed, client_seed, nonce)
+        # Next nonce on the user's committed seed chain (same transaction as the round insert)
+        fair = provably_fair.next_crash_round(cursor, user_id)
+        multiplier = fair["multiplier"]
+        proof = {
+            "server_seed_hash": fair["server_seed_hash"],
+            "client_seed": fair["client_seed"],
+            "nonce": fair["nonce"]
+        }
         
         # Store game round with 0 payout initially (winnings credited when player actually cashes out)
         cursor.execute("""
@@ -1465,6 +1301,8 @@ def crash_play():
         """, ("crash", user_id, stake, currency, 0.0, ref, json.dumps({
             "multiplier": multiplier,
             "auto_cashout": auto_cashout,
+            "seed_id": fair["seed_id"],
+            **proof,
             "status": "active"  # Game is active, not cashed out yet
         })))
         
@@ -1478,7 +1316,8 @@ def crash_play():
             "payout": 0.0,  # No payout until player cashes out
             "result": {
                 "multiplier": multiplier,
-                "auto_cashout": auto_cashout
+                "auto_cashout": auto_cashout,
+                "provably_fair": proof
             }
         })
         
@@ -1490,10 +1329,10 @@ def crash_play():
 def crash_cashout():
     """Cash out from crash game"""
     try:
-        print(f"🚀 Crash cashout API called")
+        logger.debug(f"🚀 Crash cashout API called")
         user_id = session.get('user_id')
         if not user_id:
-            print(f"❌ No user_id in session")
+            logger.debug(f"❌ No user_id in session")
             return jsonify({"error": "Authentication required"}), 401
         
         operator_id = session.get('operator_id')
@@ -1504,10 +1343,10 @@ def crash_cashout():
         ref = data.get('ref')
         cashout_multiplier = data.get('multiplier', 1.0)
         
-        print(f"🚀 Cashout data: ref={ref}, multiplier={cashout_multiplier}")
+        logger.debug(f"🚀 Cashout data: ref={ref}, multiplier={cashout_multiplier}")
         
         if not ref:
-            print(f"❌ No ref provided")
+            logger.debug(f"❌ No ref provided")
             return jsonify({"error": "Game reference required"}), 400
         
         conn = get_connection()
@@ -1541,7 +1380,7 @@ def crash_cashout():
         # Calculate payout based on cashout multiplier (convert to float to avoid decimal/float multiplication error)
         payout = round(float(stake) * float(cashout_multiplier), 2)
         
-        print(f"💰 Calculating payout: stake={stake} * multiplier={cashout_multiplier} = {payout}")
+        logger.debug(f"💰 Calculating payout: stake={stake} * multiplier={cashout_multiplier} = {payout}")
         
         # Update the game round with the actual payout
         updated_game_data = {**game_data, "cashout_multiplier": cashout_multiplier, "status": "cashed_out"}
@@ -1565,7 +1404,7 @@ def crash_cashout():
         except Exception as web3_error:
             logging.warning(f"Web3 sync failed for crash cashout: {web3_error}")
         
-        print(f"💰 Wallet credited: +{payout} for user {user_id}")
+        logger.debug(f"💰 Wallet credited: +{payout} for user {user_id}")
         
         conn.commit()
         
@@ -1578,16 +1417,180 @@ def crash_cashout():
         })
         
     except Exception as e:
-        print(f"❌ Crash cashout error: {e}")
+        logger.error(f"❌ Crash cashout error: {e}")
         import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.error(f"❌ Traceback: {traceback.format_exc()}")
         logging.error(f"Error in crash cashout: {e}")
         logging.error(f"Traceback: {traceback.format_exc()}")
         return jsonify({"error": f"Cashout error: {str(e)}"}), 500
 
+def _crash_table():
+    """Shared crash table for the session's operator, or None if unavailable"""
+    from src.services.crash_round_engine import get_crash_round_engine
+    engine = get_crash_round_engine()
+    operator_id = session.get('operator_id')
+    if engine is None or not operator_id:
+        return None
+    return engine.table(operator_id)
+
+@casino_bp.route('/crash/round')
+def crash_round_state():
+    """Current shared crash round for this sportsbook (state is also pushed over Socket.IO)"""
+    table = _crash_table()
+    if table is None:
+        return jsonify({"error": "Crash rounds unavailable"}), 503
+    return jsonify(table.state(session.get('user_id')))
+
+@casino_bp.route('/crash/round/bet', methods=['POST'])
+def crash_round_bet():
+    """Join the shared crash round during its betting window"""
+    from src.services.crash_round_engine import MIN_STAKE, MAX_STAKE
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({"error": "Authentication required"}), 401
+        
+        table = _crash_table()
+        if table is None:
+            return jsonify({"error": "Sportsbook operator not found"}), 401
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            stake = round(float(data.get('stake', 0)), 2)
+            auto_cashout = data.get('params', {}).get('auto_cashout')
+            auto_cashout = round(float(auto_cashout), 2) if auto_cashout else None
+        except (TypeError, ValueError, AttributeError):
+            return jsonify({"error": "Invalid bet"}), 400
+        
+        if not MIN_STAKE <= stake <= MAX_STAKE:
+            return jsonify({"error": f"Stake must be between {MIN_STAKE} and {MAX_STAKE}"}), 400
+        if auto_cashout is not None and auto_cashout < 1.01:
+            return jsonify({"error": "auto_cashout must be at least 1.01"}), 400
+        
+        try:
+            result = table.place_bet(user_id, stake, data.get('currency', 'USD'), auto_cashout)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result)
+        
+    except Exception as e:
+        logging.error(f"Error placing shared crash bet: {e}")
+        return jsonify({"error": "Game error"}), 500
+
+@casino_bp.route('/crash/round/cashout', methods=['POST'])
+def crash_round_cashout():
+    """Cash out of the shared crash round at the server's current multiplier"""
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({"error": "Authentication required"}), 401
+        
+        table = _crash_table()
+        if table is None:
+            return jsonify({"error": "Sportsbook operator not found"}), 401
+        
+        try:
+            return jsonify(table.cash_out(user_id))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+    except Exception as e:
+        logging.error(f"Error in shared crash cashout: {e}")
+        return jsonify({"error": "Cashout error"}), 500
+
+@casino_bp.route('/crash/seeds')
+def crash_seeds():
+    """
+    Active server seed commitment (hash only) plus recently revealed seeds
+
+    Read-only: active is null until the user's first round or a POST to
+    /crash/seeds/rotate commits them to a seed.
+    """
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({"error": "Authentication required"}), 401
+        
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                active = provably_fair.find_active_seed(cursor, user_id)
+                revealed = provably_fair.list_revealed_seeds(cursor, user_id)
+        
+        return jsonify({
+            "active": provably_fair.public_seed(active) if active else None,
+            "revealed": revealed
+        })
+        
+    except Exception as e:
+        logging.error(f"Error getting crash seeds: {e}")
+        return jsonify({"error": "Failed to get seeds"}), 500
+
+@casino_bp.route('/crash/seeds/rotate', methods=['POST'])
+def crash_seeds_rotate():
+    """Reveal the active server seed and commit to a new one (optionally with a new client seed)"""
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({"error": "Authentication required"}), 401
+        
+        data = request.get_json(silent=True) or {}
+        client_seed = data.get('client_seed')
+        if client_seed is not None and (not isinstance(client_seed, str) or not 1 <= len(client_seed) <= 64):
+            return jsonify({"error": "client_seed must be 1-64 characters"}), 400
+        
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                result = provably_fair.rotate_seed(cursor, user_id, client_seed)
+                conn.commit()
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logging.error(f"Error rotating crash seed: {e}")
+        return jsonify({"error": "Failed to rotate seed"}), 500
+
+@casino_bp.route('/crash/verify', methods=['POST'])
+def crash_verify():
+    """Re-derive a crash multiplier from revealed seeds (no auth, no DB)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        server_seed = str(data['server_seed'])
+        client_seed = str(data['client_seed'])
+        nonce = int(data['nonce'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "server_seed, client_seed and nonce are required"}), 400
+    
+    return jsonify(provably_fair.verify_round(server_seed, client_seed, nonce, data.get('server_seed_hash')))
+
+HISTORY_DEFAULT_LIMIT = 100
+HISTORY_MAX_LIMIT = 500
+
+def _history_row(row, include_result):
+    item = {
+        "id": row['id'],
+        "game_key": row['game_key'],
+        "user_id": row['user_id'],
+        "stake": float(row['stake']),
+        "currency": row['currency'],
+        "payout": float(row['payout']),
+        "ref": row['ref'],
+        "created_at": row['created_at'].isoformat() if row['created_at'] else None
+    }
+    if include_result:
+        item["result_json"] = row['result_json'] if row['result_json'] else {}
+    return item
+
 @casino_bp.route('/history')
 def get_game_history():
-    """Get user's game history"""
+    """
+    Get user's game history, newest first, keyset-paginated on (created_at, id)
+
+    Query params:
+        limit: page size (default 100, max 500)
+        cursor: next_cursor from the previous page
+        view: 'full' (default) or 'summary' to omit result_json
+        game_key: optional game filter
+    """
     try:
         user_id = session.get('user_id')
         if not user_id:
@@ -1598,43 +1601,99 @@ def get_game_history():
         if not operator_id:
             return jsonify({"error": "Sportsbook operator not found"}), 401
         
-        limit = request.args.get('limit', 500, type=int)  # Increased default from 100 to 500
-        
-        conn = get_connection()
-        cursor = conn.cursor()
+        limit = clamp_limit(request.args.get('limit'), HISTORY_DEFAULT_LIMIT, HISTORY_MAX_LIMIT)
+        include_result = request.args.get('view', 'full') != 'summary'
+        game_key = request.args.get('game_key')
         
-        # Get game history from database
-        print(f"🔍 Game history - user_id: {user_id} (type: {type(user_id)})")
-        print(f"🔍 Game history - operator_id: {operator_id} (type: {type(operator_id)})")
-        
-        cursor.execute("""
-            SELECT id, game_key, user_id, stake, currency, payout, ref, result_json, created_at
-            FROM game_round 
-            WHERE user_id = %s
-            ORDER BY created_at DESC 
-            LIMIT %s
-        """, (str(user_id), limit))
-        
-        rounds = cursor.fetchall()
-        print(f"🔍 Game history - Found {len(rounds)} rounds")
-        
-        history = []
-        for round_data in rounds:
-            history.append({
-                "id": round_data[0],
-                "game_key": round_data[1],
-                "user_id": round_data[2],
-                "stake": float(round_data[3]),
-                "currency": round_data[4],
-                "payout": float(round_data[5]),
-                "ref": round_data[6],
-                "result_json": round_data[7] if round_data[7] else {},
-                "created_at": round_data[8].isoformat() if round_data[8] else None
-            })
+        try:
+            cursor_key = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+        
+        columns = "id, game_key, user_id, stake, currency, payout, ref, created_at"
+        if include_result:
+            columns += ", result_json"
+        
+        # game_round.user_id is VARCHAR; compare as text so idx_game_round_user_created is used
+        where = ["user_id = %s"]
+        params = [str(user_id)]
+        if game_key:
+            where.append("game_key = %s")
+            params.append(game_key)
+        if cursor_key:
+            condition, cursor_params = keyset_condition(cursor_key)
+            where.append(condition)
+            params.extend(cursor_params)
+        
+        with ro_connection_with_retry() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT {columns}
+                    FROM game_round
+                    WHERE {' AND '.join(where)}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                """, (*params, limit + 1))
+                rounds = cursor.fetchall()
+        
+        has_more = len(rounds) > limit
+        rounds = rounds[:limit]
+        history = [_history_row(row, include_result) for row in rounds]
+        
+        next_cursor = None
+        if has_more and rounds:
+            last = rounds[-1]
+            next_cursor = encode_cursor(last['created_at'], last['id'])
         
-        conn.close()
-        return jsonify({"history": history})
+        return jsonify({
+            "history": history,
+            "next_cursor": next_cursor,
+            "has_more": has_more
+        })
         
     except Exception as e:
         logging.error(f"Error getting game history: {e}")
         return jsonify({"error": "Failed to get history"}), 500
+
+@casino_bp.route('/history/stats')
+def get_game_history_stats():
+    """Per-game aggregates for the history header, read from game_round_user_stats"""
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({"error": "Authentication required"}), 401
+        
+        with ro_connection_with_retry() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT game_key, rounds, total_stake, total_payout, wins, last_played_at
+                    FROM game_round_user_stats
+                    WHERE user_id = %s
+                    ORDER BY game_key
+                """, (str(user_id),))
+                rows = cursor.fetchall()
+        
+        games = {}
+        totals = {"rounds": 0, "total_stake": 0.0, "total_payout": 0.0, "wins": 0}
+        for row in rows:
+            stake = float(row['total_stake'])
+            payout = float(row['total_payout'])
+            games[row['game_key']] = {
+                "rounds": row['rounds'],
+                "total_stake": stake,
+                "total_payout": payout,
+                "net": round(payout - stake, 2),
+                "wins": row['wins'],
+                "last_played_at": row['last_played_at'].isoformat() if row['last_played_at'] else None
+            }
+            totals["rounds"] += row['rounds']
+            totals["total_stake"] += stake
+            totals["total_payout"] += payout
+            totals["wins"] += row['wins']
+        totals["net"] = round(totals["total_payout"] - totals["total_stake"], 2)
+        
+        return jsonify({"games": games, "totals": totals})
+        
+    except Exception as e:
+        logging.error(f"Error getting game history stats: {e}")
+        return jsonify({"error": "Failed to get history stats"}), 500
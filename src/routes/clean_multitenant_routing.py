@@ -15,24 +15,8 @@ import time
 
 clean_multitenant_bp = Blueprint('clean_multitenant', __name__)
 
-# Tenant metadata cache for multi-tenant scalability
-# Subdomain → operator mapping rarely changes (only when new operators register)
-_TENANT_CACHE = {}
-_TENANT_CACHE_TTL = 3600  # 1 hour
-
-
-def validate_subdomain(subdomain):
-    """Validate subdomain and return operator info (with aggressive caching)"""
-    # Check cache first (subdomain→operator mapping rarely changes)
-    cache_key = f"tenant:{subdomain}"
-    now = time.time()
-    
-    if cache_key in _TENANT_CACHE:
-        cached_time, cached_data = _TENANT_CACHE[cache_key]
-        if now - cached_time < _TENANT_CACHE_TTL:
-            return cached_data  # Return (operator, None) or (None, error)
-    
-    # Cache miss - query DB
+def _load_tenant(subdomain):
+    """Query the operator for a subdomain: (operator, None) or (None, error)"""
     from src.db_compat import connection_ctx
     
     with connection_ctx() as conn:
@@ -45,18 +29,20 @@ def validate_subdomain(subdomain):
             operator = cur.fetchone()
     
     if not operator:
-        result = (None, "Sportsbook not found")
-        _TENANT_CACHE[cache_key] = (now, result)  # Cache negative results too
-        return result
+        return (None, "Sportsbook not found")  # validate_subdomain caches this like a hit
     
     if not operator['is_active']:
-        result = (None, "This sportsbook is currently disabled")
-        _TENANT_CACHE[cache_key] = (now, result)
-        return result
+        return (None, "This sportsbook is currently disabled")
     
-    result = (dict(operator), None)
-    _TENANT_CACHE[cache_key] = (now, result)  # Cache successful result
-    return result
+    return (dict(operator), None)
+
+
+def validate_subdomain(subdomain):
+    """Validate subdomain and return operator info (with aggressive caching)"""
+    # Subdomain→operator mapping rarely changes; kept in-process only (the row holds
+    # password_hash) but versioned, so invalidate_tenant_cache() reaches every instance
+    from src.utils.tenant_config_cache import get_tenant_config_cache
+    return get_tenant_config_cache().get('tenant', subdomain, lambda: _load_tenant(subdomain), shared=False)
 
 # Customer betting interface - clean URL (works for both authenticated and non-authenticated users)
 @clean_multitenant_bp.route('/<subdomain>')
@@ -70,25 +56,19 @@ def sportsbook_home(subdomain):
     if not branding:
         return "Sportsbook not found or inactive", 404
     
-    # Serve the main betting interface with operator branding
-    static_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
+    from src.services.storefront_cache import (
+        get_storefront_cache, storefront_api_base, storefront_response, TEMPLATE_PATH
+    )
+    html_path = TEMPLATE_PATH
     
-    try:
-        html_path = os.path.join(static_folder, 'index.html')
-        print(f"📁 Reading HTML file: {html_path}")
-        
-        with open(html_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        print(f"✅ Successfully read HTML file, content length: {len(content)} characters")
-        
+    # Inject API base into meta tag for robust initialization (API_BASE_URL; empty = same origin)
+    api_base = storefront_api_base()
+    
+    def render(content):
         operator = branding['operator']
         
         # CRITICAL: Do NOT do global string replaces - they corrupt JavaScript!
         # Instead, inject branding via safe config block
-        
-        # Inject API base into meta tag for robust initialization
-        api_base = os.getenv('API_BASE_URL', request.host_url.rstrip('/'))
         content = content.replace('<meta name="api-base" content="">', 
                                 f'<meta name="api-base" content="{api_base}">')
         
@@ -112,9 +92,12 @@ def sportsbook_home(subdomain):
         
         # Inject custom JavaScript
         custom_js = generate_custom_js(branding)
-        content = content.replace('</body>', f'{branding_config}{custom_js}</body>')
-        
-        return content
+        return content.replace('</body>', f'{branding_config}{custom_js}</body>')
+    
+    try:
+        # Rendered once per tenant (and again only after a branding/theme change)
+        page = get_storefront_cache().get(subdomain, 'home', api_base, branding, render)
+        return storefront_response(page)
         
     except FileNotFoundError:
         print(f"❌ HTML file not found: {html_path}")
@@ -705,15 +688,13 @@ def load_public_theme_for_operator(subdomain):
     """
     from flask import jsonify, request, current_app
     from src.routes.branding import get_operator_branding_cached_only
-    from src.utils.redis_cache import redis_cache_get, redis_cache_set
     import os
     
     # Check for singleflight lock to prevent thundering herd
     lock_key = f"lock:branding:{subdomain}"
-    cache_key = f"branding:{subdomain}"
     
-    # Try to get cached value (stale is OK)
-    cached_branding = redis_cache_get(cache_key)
+    # Try to get cached value (local tier, then Redis - never the DB)
+    cached_branding = get_operator_branding_cached_only(subdomain)
     
     if cached_branding:
         # Serve cached value with stale-while-revalidate headers
@@ -748,7 +729,7 @@ def load_public_theme_for_operator(subdomain):
         import threading
         threading.Thread(
             target=_background_refresh_branding,
-            args=(subdomain, cache_key, lock_key),
+            args=(subdomain, lock_key),
             daemon=True
         ).start()
     except Exception as e:
@@ -773,16 +754,12 @@ def _get_default_theme_data():
         'sportsbookName': 'Your Sportsbook'
     }
 
-def _background_refresh_branding(subdomain, cache_key, lock_key):
+def _background_refresh_branding(subdomain, lock_key):
     """Background refresh of branding cache"""
     try:
-        # This will hit DB but in background thread
+        # This will hit DB but in background thread; populates both cache tiers
         from src.routes.branding import get_operator_branding
-        fresh_branding = get_operator_branding(subdomain)
-        
-        # Update cache
-        from src.utils.redis_cache import redis_cache_set
-        redis_cache_set(cache_key, fresh_branding, ttl=3600)
+        get_operator_branding(subdomain)
         
         # Release lock
         import redis
@@ -2,6 +2,8 @@
 import os
 from flask import Blueprint, jsonify
 
+from src.utils import cache_registry
+
 # Safe import of psutil
 try:
     import psutil
@@ -50,9 +52,10 @@ def memory_status():
                 'percent_used': round(system_percent, 2)
             },
             'memory_pressure': {
-                'is_high': process_rss_mb > 1400,  # 1.4GB threshold
-                'threshold_mb': 1400
+                'is_high': process_rss_mb > cache_registry.MEM_SOFT_LIMIT_MB,
+                'threshold_mb': cache_registry.MEM_SOFT_LIMIT_MB
             },
+            'caches': cache_registry.status(),
             'available': True
         })
     except Exception as e:
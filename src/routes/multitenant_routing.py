@@ -79,25 +79,19 @@ def sportsbook_home_clean(subdomain):
     if not branding:
         return "Sportsbook not found or inactive", 404
     
-    # Serve the main betting interface with operator branding
-    static_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
+    from src.services.storefront_cache import (
+        get_storefront_cache, storefront_api_base, storefront_response, TEMPLATE_PATH
+    )
+    html_path = TEMPLATE_PATH
     
-    try:
-        html_path = os.path.join(static_folder, 'index.html')
-        print(f"📁 Reading HTML file: {html_path}")
-        
-        with open(html_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        print(f"✅ Successfully read HTML file, content length: {len(content)} characters")
-        
+    # Inject API base into meta tag for robust initialization (API_BASE_URL; empty = same origin)
+    api_base = storefront_api_base()
+    
+    def render(content):
         operator = branding['operator']
         
         # CRITICAL: Do NOT do global string replaces - they corrupt JavaScript!
         # Instead, inject branding via safe config block
-        
-        # Inject API base into meta tag for robust initialization
-        api_base = os.getenv('API_BASE_URL', request.host_url.rstrip('/'))
         content = content.replace('<meta name="api-base" content="">', 
                                 f'<meta name="api-base" content="{api_base}">')
         
@@ -122,9 +116,12 @@ def sportsbook_home_clean(subdomain):
         
         # Inject custom JavaScript
         custom_js = generate_custom_js(branding)
-        content = content.replace('</body>', f'{branding_config}{custom_js}</body>')
-        
-        return content
+        return content.replace('</body>', f'{branding_config}{custom_js}</body>')
+    
+    try:
+        # Rendered once per tenant (and again only after a branding/theme change)
+        page = get_storefront_cache().get(subdomain, 'clean', api_base, branding, render)
+        return storefront_response(page)
         
     except FileNotFoundError:
         print(f"❌ HTML file not found: {html_path}")
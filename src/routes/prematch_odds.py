@@ -4,6 +4,7 @@ Pre-match odds service API routes
 
 from flask import Blueprint, jsonify, request
 from src.prematch_odds_service import get_prematch_odds_service
+from src.utils import json_codec
 import logging
 
 logger = logging.getLogger(__name__)
@@ -233,7 +234,6 @@ def test_odds_url(sport_name):
 def get_file_content():
     """Get the content of a specific odds file"""
     try:
-        import json
         from pathlib import Path
         
         file_path = request.args.get('path')
@@ -262,8 +262,7 @@ def get_file_content():
             }), 404
         
         # Read and return the file content
-        with open(requested_path, 'r', encoding='utf-8') as f:
-            content = json.load(f)
+        content = json_codec.load_path(requested_path)
         
         return jsonify({
             'success': True,
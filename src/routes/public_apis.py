@@ -4,8 +4,8 @@ Public APIs for non-authenticated users to view sports data
 
 from flask import Blueprint, request, jsonify
 from src.db_compat import connection_ctx
+from src.utils import json_codec
 import os
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,12 +56,11 @@ def get_public_sport_events(sport):
             if filename.endswith('.json'):
                 file_path = os.path.join(sport_dir, filename)
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if isinstance(data, list):
-                            events.extend(data)
-                        elif isinstance(data, dict) and 'events' in data:
-                            events.extend(data['events'])
+                    data = json_codec.load_path(file_path)
+                    if isinstance(data, list):
+                        events.extend(data)
+                    elif isinstance(data, dict) and 'events' in data:
+                        events.extend(data['events'])
                 except Exception as e:
                     logger.warning(f"Error reading {filename}: {e}")
                     continue
@@ -90,16 +89,15 @@ def get_public_events():
                     if filename.endswith('.json'):
                         file_path = os.path.join(sport_path, filename)
                         try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                                if isinstance(data, list):
-                                    for event in data:
-                                        event['sport'] = sport
-                                        all_events.append(event)
-                                elif isinstance(data, dict) and 'events' in data:
-                                    for event in data['events']:
-                                        event['sport'] = sport
-                                        all_events.append(event)
+                            data = json_codec.load_path(file_path)
+                            if isinstance(data, list):
+                                for event in data:
+                                    event['sport'] = sport
+                                    all_events.append(event)
+                            elif isinstance(data, dict) and 'events' in data:
+                                for event in data['events']:
+                                    event['sport'] = sport
+                                    all_events.append(event)
                         except Exception as e:
                             logger.warning(f"Error reading {sport}/{filename}: {e}")
                             continue
@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 import os
 from functools import wraps
 from werkzeug.security import check_password_hash, generate_password_hash
+import logging
+
+logger = logging.getLogger(__name__)
 
 rich_admin_bp = Blueprint('rich_admin', __name__)
 
@@ -268,28 +271,28 @@ def rich_admin_dashboard(subdomain):
 @rich_admin_bp.route('/<subdomain>/admin/api/betting-events')
 def get_tenant_betting_events(subdomain):
     """Get betting events filtered by tenant with bet-level information"""
-    print(f"🔍 DEBUG: get_tenant_betting_events called for subdomain: {subdomain}")
+    logger.debug(f"🔍 DEBUG: get_tenant_betting_events called for subdomain: {subdomain}")
     
     # Get operator from session
     operator = get_operator_from_session()
     if not operator:
-        print(f"🔍 DEBUG: No operator found in session")
+        logger.debug(f"🔍 DEBUG: No operator found in session")
         return jsonify({'error': 'Unauthorized'}), 401
     
-    print(f"🔍 DEBUG: Operator found: {operator['id']} ({operator['subdomain']})")
+    logger.debug(f"🔍 DEBUG: Operator found: {operator['id']} ({operator['subdomain']})")
     
     try:
         import os
         import json
         
         # Get database connection for checking disabled events and bet information
-        print(f"🔍 DEBUG: Getting database connection...")
+        logger.debug(f"🔍 DEBUG: Getting database connection...")
         conn = get_db_connection()
-        print(f"🔍 DEBUG: Database connection established")
+        logger.debug(f"🔍 DEBUG: Database connection established")
         
         # Path to Sports Pre Match directory - use absolute path from project root
         sports_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'Sports Pre Match')
-        print(f"🔍 DEBUG: Sports directory path: {sports_dir}")
+        logger.debug(f"🔍 DEBUG: Sports directory path: {sports_dir}")
         
         all_events = []
         
@@ -304,9 +307,9 @@ def get_tenant_betting_events(subdomain):
         sort_by = request.args.get('sort_by', 'event_id')
         sort_order = request.args.get('sort_order', 'asc')
         
-        print(f"🔍 DEBUG: Query params - page: {page}, per_page: {per_page}, sort_by: {sort_by}, sort_order: {sort_order}")
-        print(f"🔍 DEBUG: Filters - sport: {sport_filter}, market: {market_filter}, search: {search_query}")
-        print(f"🔍 DEBUG: Always showing only events with bets")
+        logger.debug(f"🔍 DEBUG: Query params - page: {page}, per_page: {per_page}, sort_by: {sort_by}, sort_order: {sort_order}")
+        logger.debug(f"🔍 DEBUG: Filters - sport: {sport_filter}, market: {market_filter}, search: {search_query}")
+        logger.debug(f"🔍 DEBUG: Always showing only events with bets")
         
         # Simple query: Get all pending bets grouped by event_id + market_id
         bet_events_query = """
@@ -328,13 +331,13 @@ def get_tenant_betting_events(subdomain):
             ORDER BY b.match_id, b.sport_name, b.market
         """
         
-        print(f"🔍 DEBUG: Executing SQL query for operator {operator['id']}")
+        logger.debug(f"🔍 DEBUG: Executing SQL query for operator {operator['id']}")
         bet_events_result = conn.execute(bet_events_query, (operator['id'],)).fetchall()
-        print(f"🔍 DEBUG: Found {len(bet_events_result)} event_market combinations with pending bets")
+        logger.debug(f"🔍 DEBUG: Found {len(bet_events_result)} event_market combinations with pending bets")
         
         # If no pending bets, return empty but properly structured response
         if len(bet_events_result) == 0:
-            print(f"🔍 DEBUG: No pending bets found for operator {operator['id']}, returning empty events list")
+            logger.debug(f"🔍 DEBUG: No pending bets found for operator {operator['id']}, returning empty events list")
             conn.close()
             return jsonify({
                 'success': True,
@@ -451,7 +454,7 @@ def get_tenant_betting_events(subdomain):
         })
         
     except Exception as e:
-        print(f"Error in get_tenant_betting_events: {e}")
+        logger.error(f"Error in get_tenant_betting_events: {e}")
         return jsonify({'error': str(e)}), 500
 
 
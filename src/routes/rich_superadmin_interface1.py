@@ -1001,22 +1001,36 @@ def run_daily_revenue_calculator():
             update_daily_revenue_calculations
         )
         
-        # Call the main function from the script
-        update_daily_revenue_calculations()
+        # Call the main function from the script (it catches up on any missed dates)
+        processed_dates = update_daily_revenue_calculations()
         
         # Create parallel Web3 revenue calculations
         try:
             from src.services.web3_operator_wallet_service import create_web3_revenue_calculation
             with connection_ctx() as conn:
                 with conn.cursor() as cursor:
-                    # Get all operators and their revenue calculations for today
+                    # Re-running a date replaces its unprocessed Web3 rows, like the Web2 ones
+                    cursor.execute("""
+                        DELETE FROM revenue_calculations
+                        WHERE calculation_metadata = 'web3_false'
+                        AND DATE(calculation_date) = ANY(%s::date[])
+                    """, (processed_dates,))
+                    conn.commit()
+
+                    # Get all operators and their revenue calculations for the dates just processed
                     cursor.execute("""
                         SELECT DISTINCT rc.operator_id, rc.calculation_date, 
                                rc.bookmaker_own_share, rc.community_share_30
                         FROM revenue_calculations rc
                         WHERE rc.calculation_metadata = 'false' 
-                        AND DATE(rc.calculation_date) = CURRENT_DATE
-                    """)
+                        AND DATE(rc.calculation_date) = ANY(%s::date[])
+                        AND NOT EXISTS (
+                            SELECT 1 FROM revenue_calculations w
+                            WHERE w.operator_id = rc.operator_id
+                            AND DATE(w.calculation_date) = DATE(rc.calculation_date)
+                            AND w.calculation_metadata = 'web3_true'
+                        )
+                    """, (processed_dates,))
                     
                     web2_calculations = cursor.fetchall()
                     
@@ -1,28 +1,47 @@
 """
 Public snapshot routes
 Provides public access to cached odds data without authentication
+
+The cache status and warmup routes are operator tools and need a super admin session.
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 import logging
 import time
-from threading import Thread
 
-from ..cache import get_snapshot_from_cache, save_snapshot_to_cache, redact_snapshot, get_cache_status
-from ..services.snapshot_builder import build_full_snapshot
+from .. import cache
+from ..auth.session_utils import is_superadmin_logged_in
+from ..cache import (
+    get_manifest, manifest_is_fresh, get_shard, iter_shard_json, iter_snapshot_json,
+    public_shard_meta, get_cache_status
+)
+from ..services.snapshot_refresher import get_snapshot_refresher
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint("snapshot_public", __name__, url_prefix="/api")
 
-# Simple rate limiting (in-memory)
+COLD_START_WAIT = 10  # seconds a request may wait for the very first snapshot
+
+# Fallback rate limiting (in-memory) when Redis is unreachable
 _rate_limits = {}
 
 def rate_limit_simple(key: str, per_min: int = 10) -> bool:
-    """Simple in-memory rate limiting"""
+    """Per-client rate limit shared across instances (Redis fixed window), in-memory fallback"""
     client_ip = request.remote_addr
     rate_key = f"{key}:{client_ip}"
     current_time = time.time()
+
+    if cache.USE_REDIS:
+        try:
+            window_key = f"ratelimit:{rate_key}:{int(current_time // 60)}"
+            pipe = cache.redis.pipeline()
+            pipe.incr(window_key)
+            pipe.expire(window_key, 61)
+            count, _ = pipe.execute()
+            return count <= per_min
+        except Exception as e:
+            logger.debug(f"Rate limit falling back to in-memory: {e}")
     
     # Clean old entries
     if rate_key in _rate_limits:
@@ -41,54 +60,134 @@ def rate_limit_simple(key: str, per_min: int = 10) -> bool:
     _rate_limits[rate_key].append(current_time)
     return True
 
+def _current_manifest():
+    """
+    Last stored manifest, served immediately however old
+
+    A stale manifest only nudges the background refresher; requests never build
+    the snapshot themselves. Only a cold start (nothing stored yet) waits, and it
+    waits for the refresher's single build rather than starting its own.
+    """
+    refresher = get_snapshot_refresher()
+    manifest = get_manifest()
+    if manifest is None:
+        logger.info("💾 No snapshot stored yet, waiting for the refresher")
+        return refresher.wait_for_snapshot(COLD_START_WAIT)
+    if not manifest_is_fresh(manifest):
+        refresher.request_refresh()
+    return manifest
+
+def _snapshot_unavailable():
+    response = jsonify({"error": "Snapshot not built yet, retry shortly", "ts": time.time()})
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
 @bp.route("/public/snapshot", methods=["GET"])
 def public_snapshot():
-    """Get public odds snapshot (no auth required)"""
+    """
+    Get public odds snapshot (no auth required)
+
+    Streams every sport's shard (or only ?sports=a,b) in manifest order. Clients
+    that keep the previous manifest can instead poll /public/snapshot/manifest
+    and fetch /public/snapshot/<sport> for the sports whose version changed.
+    """
     try:
         # Rate limiting
         if not rate_limit_simple("public_snapshot", per_min=10):
             return jsonify({"error": "Rate limit exceeded"}), 429
-        
-        logger.info("📡 Public snapshot requested")
-        
-        # Try cache first
-        snap = get_snapshot_from_cache()
-        
-        if not snap:
-            logger.info("💾 Cache miss, building fresh snapshot")
-            snap = build_full_snapshot()
-            if snap:
-                save_snapshot_to_cache(snap)
+
+        manifest = _current_manifest()
+        if not manifest:
+            return _snapshot_unavailable()
+
+        sports = request.args.get("sports")
+        sports = {s.strip() for s in sports.split(",") if s.strip()} if sports else None
+        etag = manifest["etag"] if sports is None else f"{manifest['etag']}-{','.join(sorted(sports))}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
         else:
-            logger.info("⚡ Cache hit, serving from cache")
-        
-        if not snap:
-            return jsonify({
-                "error": "Unable to build snapshot",
-                "ts": time.time()
-            }), 500
-        
-        # Redact sensitive data for public access
-        redacted = redact_snapshot(snap)
-        
-        response = jsonify({
-            "type": "snapshot",
-            **redacted
-        })
-        
+            response = Response(stream_with_context(iter_snapshot_json(manifest, sports)),
+                                mimetype="application/json")
+        response.set_etag(etag)
+        response.headers['X-Snapshot-Age'] = str(int(time.time() - manifest.get("built_at", time.time())))
+
         # Add caching headers for CDN optimization
         response.headers['Cache-Control'] = 'public, max-age=5, stale-while-revalidate=15'
         response.headers['Vary'] = 'Accept'
-        
         return response
-        
+
     except Exception as e:
         logger.error(f"❌ Error serving public snapshot: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@bp.route("/public/snapshot/manifest", methods=["GET"])
+def public_snapshot_manifest():
+    """Per-sport shard versions and hashes of the current snapshot"""
+    try:
+        if not rate_limit_simple("public_snapshot_manifest", per_min=60):
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        manifest = _current_manifest()
+        if not manifest:
+            return _snapshot_unavailable()
+
+        response = jsonify({
+            "ts": manifest["ts"],
+            "etag": manifest["etag"],
+            "shards": {s: public_shard_meta(m) for s, m in manifest["shards"].items()},
+        })
+        response.set_etag(manifest["etag"])
+        response.headers['Cache-Control'] = 'public, max-age=5, stale-while-revalidate=15'
+        return response.make_conditional(request)
+
+    except Exception as e:
+        logger.error(f"❌ Error serving snapshot manifest: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@bp.route("/public/snapshot/<sport>", methods=["GET"])
+def public_snapshot_shard(sport):
+    """One sport's shard, served from its stored gzip bytes (ETag is the shard hash, -gzip suffixed when compressed)"""
+    try:
+        if not rate_limit_simple("public_snapshot_shard", per_min=120):
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        manifest = _current_manifest()
+        if not manifest:
+            return _snapshot_unavailable()
+        meta = manifest["shards"].get(sport)
+        if not meta:
+            return jsonify({"error": f"No snapshot for {sport}"}), 404
+
+        # Each encoding is a different representation, so it gets its own strong ETag
+        gzipped = bool(request.accept_encodings["gzip"])
+        etag = f"{meta['hash']}-gzip" if gzipped else meta["hash"]
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            blob = get_shard(sport, meta["hash"])
+            if blob is None:
+                return jsonify({"error": "Shard not available, retry shortly"}), 503
+            if gzipped:
+                response = Response(blob, mimetype="application/json")
+                response.headers['Content-Encoding'] = 'gzip'
+            else:
+                response = Response(stream_with_context(iter_shard_json(blob)), mimetype="application/json")
+        response.set_etag(etag)
+        response.headers['X-Shard-Version'] = str(meta["version"])
+        response.headers['Cache-Control'] = 'public, max-age=5, stale-while-revalidate=15'
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    except Exception as e:
+        logger.error(f"❌ Error serving snapshot shard {sport}: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @bp.route("/cache/warmup", methods=["POST"])
 def cache_warmup():
-    """Trigger background cache warmup (no auth required, rate limited)"""
+    """Trigger background cache warmup (super admin only, rate limited)"""
+    if not is_superadmin_logged_in():
+        return jsonify({"status": "error", "message": "Super admin login required"}), 403
     try:
         # Rate limiting
         if not rate_limit_simple("warmup", per_min=4):
@@ -96,21 +195,8 @@ def cache_warmup():
         
         logger.info("🔥 Cache warmup requested")
         
-        # Trigger background refresh
-        def _warmup_job():
-            try:
-                logger.info("🔄 Starting background cache warmup...")
-                snap = build_full_snapshot()
-                if snap:
-                    save_snapshot_to_cache(snap)
-                    logger.info("✅ Background cache warmup completed")
-                else:
-                    logger.warning("⚠️ Background cache warmup failed - no snapshot built")
-            except Exception as e:
-                logger.error(f"❌ Background cache warmup error: {e}")
-        
-        # Start background thread
-        Thread(target=_warmup_job, daemon=True).start()
+        # The refresher coalesces these; only the leader instance rebuilds
+        get_snapshot_refresher().request_refresh()
         
         return jsonify({"ok": True, "message": "Cache warmup started"})
         
@@ -120,13 +206,16 @@ def cache_warmup():
 
 @bp.route("/cache/status", methods=["GET"])
 def cache_status():
-    """Get cache status information"""
+    """Get cache status information (super admin only)"""
+    if not is_superadmin_logged_in():
+        return jsonify({"status": "error", "message": "Super admin login required"}), 403
     try:
         # Rate limiting
         if not rate_limit_simple("cache_status", per_min=20):
             return jsonify({"error": "Rate limit exceeded"}), 429
         
         status = get_cache_status()
+        status["refresher"] = get_snapshot_refresher().status()
         return jsonify(status)
         
     except Exception as e:
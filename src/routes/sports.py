@@ -53,9 +53,13 @@ def get_sport_events(sport_name):
         from src.live_odds_cache_service import get_live_odds_cache_service
         cache_service = get_live_odds_cache_service()
         
-        # Get events from cache service (which reads from JSON files directly)
-        events = cache_service.get_sport_events(sport_name, date_filter, limit)
-        logger.info(f"Cache service events returned: {len(events) if events else 0}")
+        # Indexed query: ordered by start time, filtered by date/league, paginated
+        try:
+            events = cache_service.get_sport_events(sport_name, date_filter, limit,
+                                                    league=request.args.get('league'),
+                                                    offset=int(request.args.get('offset', 0)))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         logger.info(f"=== RETURNING {len(events)} CACHED EVENTS ===")
         return jsonify(events)
@@ -156,9 +160,13 @@ def get_sport_data(sport_name):
         from src.live_odds_cache_service import get_live_odds_cache_service
         cache_service = get_live_odds_cache_service()
         
-        # Get events from cache service (which reads from JSON files directly)
-        events = cache_service.get_sport_events(sport_name, date_filter, limit)
-        logger.info(f"Cache service events returned: {len(events) if events else 0}")
+        # Indexed query: ordered by start time, filtered by date/league, paginated
+        try:
+            events = cache_service.get_sport_events(sport_name, date_filter, limit,
+                                                    league=request.args.get('league'),
+                                                    offset=int(request.args.get('offset', 0)))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         logger.info(f"=== RETURNING {len(events)} EVENTS ===")
         return jsonify(events)
@@ -193,6 +193,10 @@ def save_theme():
         conn.commit()
         conn.close()
         
+        # Operator is resolved by id here, so invalidate every tenant's cached branding
+        from src.utils.redis_cache import invalidate_all_branding_cache
+        invalidate_all_branding_cache()
+        
         return jsonify({'success': True, 'message': 'Theme saved successfully'})
         
     except Exception as e:
@@ -348,6 +352,9 @@ def save_theme_for_operator(subdomain):
         conn.commit()
         conn.close()
         
+        from src.utils.redis_cache import invalidate_tenant_cache
+        invalidate_tenant_cache(subdomain)
+        
         return jsonify({'success': True, 'message': 'Theme saved successfully'})
         
     except Exception as e:
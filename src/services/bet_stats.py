@@ -0,0 +1,185 @@
+"""
+Bet stats service
+Per-user betting stats read from the bet_user_stats rollup, plus the drift check that recomputes it from bets
+
+bet_user_stats (migrations/add_bet_user_stats.py) is maintained by a trigger on
+bets, so reading a user's stats is one indexed lookup of a few rows (one per
+sport) however many bets they have settled. Casino totals come from the
+game_round_user_stats rollup the same way.
+
+verify_bet_user_stats() compares the rollup with a GROUP BY over bets and, when
+asked to, repairs drifted rows one (user, sport) at a time while holding the
+rollup row lock, so a settlement committing at the same moment is never lost.
+main.py schedules run_bet_stats_verification() on the job runner's leader
+(services/job_runner.py) every VERIFY_INTERVAL seconds.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict
+
+from src.db_compat import connection_ctx
+from src.utils.db_retry import ro_connection_with_retry
+
+logger = logging.getLogger(__name__)
+
+VERIFY_INTERVAL = int(os.getenv("BET_STATS_VERIFY_INTERVAL", "21600"))  # seconds between drift checks
+
+_tables_present = set()
+
+_SOURCE_SQL = """
+    SELECT user_id, COALESCE(sport_name, '') AS sport_name,
+           COUNT(*) AS settled_bets,
+           COUNT(*) FILTER (WHERE status = 'won') AS won_bets,
+           COALESCE(SUM(stake), 0) AS total_staked,
+           COALESCE(SUM(actual_return), 0) AS total_returned
+    FROM bets
+    WHERE COALESCE(status, 'pending') <> 'pending' {extra}
+    GROUP BY user_id, COALESCE(sport_name, '')
+"""
+
+
+def _table_exists(cursor, table: str) -> bool:
+    """Cached once true: the migrations only ever add these tables"""
+    if table not in _tables_present:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL AS present", (table,))
+        if cursor.fetchone()['present']:
+            _tables_present.add(table)
+    return table in _tables_present
+
+
+def _summary(settled: int, won: int, staked: float, returned: float) -> Dict[str, Any]:
+    return {
+        'total_bets': settled,
+        'won_bets': won,
+        'win_rate': round(won / settled * 100, 1) if settled else 0,
+        'total_staked': round(staked, 2),
+        'total_returned': round(returned, 2),
+        'profit_loss': round(returned - staked, 2),
+    }
+
+
+def get_user_betting_stats(user_id: int) -> Dict[str, Any]:
+    """Totals plus per-sport and casino breakdowns for one user"""
+    with ro_connection_with_retry() as conn:
+        with conn.cursor() as cursor:
+            if _table_exists(cursor, 'bet_user_stats'):
+                cursor.execute("""
+                    SELECT sport_name, settled_bets, won_bets, total_staked, total_returned
+                    FROM bet_user_stats
+                    WHERE user_id = %s
+                """, (user_id,))
+            else:
+                # add_bet_user_stats migration not applied yet: aggregate in SQL
+                cursor.execute(_SOURCE_SQL.format(extra="AND user_id = %s"), (user_id,))
+            sport_rows = cursor.fetchall()
+
+            casino_rows = []
+            if _table_exists(cursor, 'game_round_user_stats'):
+                cursor.execute("""
+                    SELECT rounds, total_stake, total_payout, wins
+                    FROM game_round_user_stats
+                    WHERE user_id = %s
+                """, (str(user_id),))
+                casino_rows = cursor.fetchall()
+
+    by_sport = {}
+    totals = [0, 0, 0.0, 0.0]
+    for row in sport_rows:
+        values = (int(row['settled_bets']), int(row['won_bets']),
+                  float(row['total_staked']), float(row['total_returned']))
+        if not values[0]:
+            continue
+        by_sport[row['sport_name'] or 'unknown'] = _summary(*values)
+        totals = [a + b for a, b in zip(totals, values)]
+
+    casino = [0, 0, 0.0, 0.0]
+    for row in casino_rows:
+        casino = [a + b for a, b in zip(casino, (int(row['rounds']), int(row['wins']),
+                                                 float(row['total_stake']), float(row['total_payout'])))]
+
+    stats = _summary(*totals)
+    stats['by_sport'] = by_sport
+    stats['casino'] = _summary(*casino)
+    return stats
+
+
+def verify_bet_user_stats(repair: bool = True, sample_limit: int = 20) -> Dict[str, Any]:
+    """Recompute the rollup from bets; returns drift counts and a sample of drifted rows"""
+    started = time.time()
+    with connection_ctx() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                WITH source AS ({_SOURCE_SQL.format(extra="")})
+                SELECT COALESCE(s.user_id, r.user_id) AS user_id,
+                       COALESCE(s.sport_name, r.sport_name) AS sport_name,
+                       COALESCE(s.settled_bets, 0) AS expected_bets, COALESCE(r.settled_bets, 0) AS rollup_bets,
+                       COALESCE(s.total_staked, 0) AS expected_staked, COALESCE(r.total_staked, 0) AS rollup_staked,
+                       COALESCE(s.total_returned, 0) AS expected_returned,
+                       COALESCE(r.total_returned, 0) AS rollup_returned
+                FROM source s
+                FULL OUTER JOIN bet_user_stats r
+                    ON r.user_id = s.user_id AND r.sport_name = s.sport_name
+                WHERE (COALESCE(s.settled_bets, 0), COALESCE(s.won_bets, 0),
+                       COALESCE(s.total_staked, 0), COALESCE(s.total_returned, 0))
+                   IS DISTINCT FROM
+                      (COALESCE(r.settled_bets, 0), COALESCE(r.won_bets, 0),
+                       COALESCE(r.total_staked, 0), COALESCE(r.total_returned, 0))
+            """)
+            drifted = cursor.fetchall()
+            conn.commit()
+
+            repaired = 0
+            if repair:
+                for row in drifted:
+                    repaired += _repair_row(conn, cursor, row['user_id'], row['sport_name'])
+
+    result = {
+        'drifted': len(drifted),
+        'repaired': repaired,
+        'sample': [dict(row) for row in drifted[:sample_limit]],
+        'elapsed': round(time.time() - started, 2),
+    }
+    if drifted:
+        logger.warning(f"⚠️ bet_user_stats drift: {len(drifted)} rows, {repaired} repaired")
+    else:
+        logger.info(f"✅ bet_user_stats matches bets ({result['elapsed']}s)")
+    return result
+
+
+def _repair_row(conn, cursor, user_id: int, sport_name: str) -> int:
+    """Rewrite one rollup row from bets while holding its lock (settlement triggers wait on it)"""
+    try:
+        cursor.execute("""
+            INSERT INTO bet_user_stats (user_id, sport_name) VALUES (%s, %s)
+            ON CONFLICT (user_id, sport_name) DO NOTHING
+        """, (user_id, sport_name))
+        cursor.execute("SELECT 1 FROM bet_user_stats WHERE user_id = %s AND sport_name = %s FOR UPDATE",
+                       (user_id, sport_name))
+        cursor.execute(_SOURCE_SQL.format(extra="AND user_id = %s AND COALESCE(sport_name, '') = %s"),
+                       (user_id, sport_name))
+        source = cursor.fetchone()
+        cursor.execute("""
+            UPDATE bet_user_stats
+            SET settled_bets = %s, won_bets = %s, total_staked = %s, total_returned = %s
+            WHERE user_id = %s AND sport_name = %s
+        """, (source['settled_bets'] if source else 0, source['won_bets'] if source else 0,
+              source['total_staked'] if source else 0, source['total_returned'] if source else 0,
+              user_id, sport_name))
+        conn.commit()
+        return 1
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Failed to repair bet_user_stats for user {user_id} / {sport_name!r}: {e}")
+        return 0
+
+
+def run_bet_stats_verification():
+    """Job runner entry point: repair drift once the rollup table exists"""
+    with connection_ctx() as conn:
+        with conn.cursor() as cursor:
+            present = _table_exists(cursor, 'bet_user_stats')
+        conn.commit()
+    if present:
+        verify_bet_user_stats(repair=True)
@@ -0,0 +1,614 @@
+"""
+Cash-out pricer
+Live cash-out offers for every open bet, repriced in vectorized batches as odds move
+
+The fair value of an open bet is what its stake is worth at today's prices:
+stake * placed odds / current odds, multiplied over the legs of a combo (a leg
+that already won is priced at 1.0). The offer is that value less CASH_OUT_MARGIN,
+never more than the bet's potential return.
+
+The book of open bets is held as flat numpy arrays - one row per bet, one per
+leg, and a leg -> quote slot index - so a reprice is a gather from the quote
+array, a log, and a bincount over legs, however many bets are open. Odds updates
+(the pre-match cache callback and the live odds loop) only write into the quote
+array and wake the pricer; updates arriving within REPRICE_INTERVAL are repriced
+together. Offers whose amount changed are upserted into cash_out_offers in one
+statement, which bumps their version, and pushed to the owner's Socket.IO room.
+
+Prices are resolved for the match winner market (1 / X / 2, or a team name from
+"Home vs Away"), the selections settlement understands. Before kick-off a leg
+with no current quote keeps its placement odds, so its bet is offered its stake
+less the margin. Once a leg's match has started its price moves with play, so a
+bet with a started leg that has no quote from the last QUOTE_MAX_AGE seconds is
+suspended: its offer is deleted until fresh prices arrive.
+
+Offers are only listed or accepted while the pricer is alive: after every pass
+(and at least every OFFER_MAX_AGE / 2 seconds, a few REPRICE_INTERVALs) the
+leader refreshes a heartbeat key in Redis that expires after OFFER_MAX_AGE, so a
+stopped pricer can't leave old prices on the table. Offer rows themselves are
+only written when their price changes.
+
+Across instances only the holder of a Redis leader lock writes offers (same
+scheme as the snapshot refresher); without Redis the process is the leader.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src import cache
+from src.db_compat import connection_ctx
+
+logger = logging.getLogger(__name__)
+
+CASH_OUT_MARGIN = float(os.getenv("CASH_OUT_MARGIN", "0.05"))
+REPRICE_INTERVAL = float(os.getenv("CASH_OUT_REPRICE_INTERVAL", "1.0"))  # min seconds between reprices
+BOOK_REFRESH_INTERVAL = int(os.getenv("CASH_OUT_BOOK_REFRESH", "15"))     # reload open bets this often
+OFFER_MAX_AGE = float(os.getenv("CASH_OUT_OFFER_MAX_AGE", str(REPRICE_INTERVAL * 5)))  # heartbeat lifetime
+QUOTE_MAX_AGE = float(os.getenv("CASH_OUT_QUOTE_MAX_AGE", "30"))  # an in-play quote older than this is stale
+
+SUSPENDED = -1.0  # last_offer marker: the bet's offer was withdrawn
+
+LEADER_KEY = "cashout:pricer:leader"
+HEARTBEAT_KEY = "cashout:pricer:heartbeat"
+LEADER_TTL = 30  # seconds
+
+# Renew only if we still hold the lock
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_OUTCOMES = {'1': '1', 'home': '1', 'x': 'X', 'draw': 'X', 'tie': 'X', '2': '2', 'away': '2'}
+
+
+def selection_outcome(selection: Optional[str], match_name: Optional[str]) -> Optional[str]:
+    """'1', 'X' or '2' for a match winner selection, None for anything else"""
+    sel = str(selection or '').strip().lower()
+    if sel in _OUTCOMES:
+        return _OUTCOMES[sel]
+    home, _, away = str(match_name or '').partition(' vs ')
+    if sel and sel == home.strip().lower():
+        return '1'
+    if sel and sel == away.strip().lower():
+        return '2'
+    return None
+
+
+def start_timestamp(value: Any) -> float:
+    """Epoch seconds for an event_time (datetime or ISO string, naive = UTC); NaN if unknown"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return float('nan')
+    if not isinstance(value, datetime):
+        return float('nan')
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def winner_prices(odds: Dict[str, Any]) -> Dict[str, Any]:
+    """Outcome -> price from a cached event's odds dict (match_result is 1/X/2, home_away is home/away[/draw])"""
+    home_away = odds.get('home_away')
+    if home_away and len(home_away) >= 2:
+        prices = {'1': home_away[0], '2': home_away[1]}
+        if len(home_away) > 2:
+            prices['X'] = home_away[2]
+        return prices
+    match_result = odds.get('match_result')
+    if match_result and len(match_result) == 3:
+        return {'1': match_result[0], 'X': match_result[1], '2': match_result[2]}
+    return {}
+
+
+class _Book(NamedTuple):
+    """Open bets as arrays; leg_* arrays are aligned, leg_bet indexes the bet arrays"""
+    bet_ids: np.ndarray        # int64
+    user_ids: np.ndarray       # int64
+    stakes: np.ndarray         # float64
+    caps: np.ndarray           # potential return
+    last_offer: np.ndarray     # float64, NaN until written, SUSPENDED once withdrawn
+    leg_bet: np.ndarray        # int64
+    leg_log_placed: np.ndarray  # log of the leg's placement odds (0 for a neutral leg)
+    leg_default: np.ndarray    # price used when the slot has no quote (placed odds, 1.0 once won)
+    leg_slot: np.ndarray       # int64 quote slot, -1 if the leg is never quoted
+    leg_open: np.ndarray       # bool, the leg is unsettled and moves the value
+    leg_start: np.ndarray      # float64 kick-off epoch seconds, NaN if unknown
+
+
+class CashOutPricer:
+    def __init__(self):
+        self.token = uuid.uuid4().hex
+        self.is_leader = False
+        self.socketio = None
+        self._slots: Dict[Tuple[str, str], int] = {}   # (match_id, outcome) -> quote slot
+        self._quotes = np.full(0, np.nan)
+        self._quoted_at = np.full(0, np.nan)            # when each slot last got a price
+        self._book: Optional[_Book] = None
+        self._legs_cache: Dict[int, Tuple[Any, List[Tuple]]] = {}  # bet_id -> (updated_at, legs)
+        self._quotes_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._next_book = 0.0
+        self._last_reprice = 0.0
+        self._next_heartbeat = 0.0
+        self.reprices = 0
+        self.suspended = 0
+        self.offers_written = 0
+        self.last_reprice_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def start(self, socketio=None):
+        with self._lock:
+            if socketio is not None:
+                self.socketio = socketio
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="cash-out-pricer")
+                self._thread.start()
+                logger.info("✅ Cash-out pricer started")
+
+    # ------------------------------------------------------------------
+    # Odds feeds
+
+    def update_quotes(self, match_id: Any, prices: Dict[str, Any]) -> bool:
+        """Record current winner prices for a match; only matches with open bets are kept"""
+        changed = False
+        match_id = str(match_id)
+        now = time.time()
+        with self._quotes_lock:
+            for outcome, price in prices.items():
+                slot = self._slots.get((match_id, outcome))
+                if slot is None:
+                    continue
+                try:
+                    price = float(price)
+                except (TypeError, ValueError):
+                    continue
+                self._quoted_at[slot] = now
+                if self._quotes[slot] != price:
+                    self._quotes[slot] = price
+                    changed = True
+        if changed:
+            self._wake.set()
+        return changed
+
+    def on_prematch_odds(self, sport_name: str):
+        """LiveOddsCacheService UI callback: re-read the winner prices of matches we hold bets on"""
+        try:
+            from src.live_odds_cache_service import get_live_odds_cache_service
+            index = get_live_odds_cache_service().indexes.get(sport_name)
+            if index is None:
+                return
+            for match_id in self._quoted_matches():
+                event = index.events.get(match_id)
+                if event is not None:
+                    self.update_quotes(match_id, winner_prices(event.odds_dict()))
+        except Exception as e:
+            logger.error(f"❌ Cash-out pricer failed to read {sport_name} odds: {e}")
+
+    def on_live_odds(self, sport_name: str, live_odds: Iterable[Dict[str, Any]]):
+        """LiveOddsWebSocketService hook: in-play 1x2 / match_winner prices"""
+        for match in live_odds or ():
+            prices = {}
+            for market in ('match_winner', '1x2'):
+                for name, price in (match.get('live_odds') or {}).get(market, {}).items():
+                    outcome = _OUTCOMES.get(str(name).lower())
+                    if outcome:
+                        prices[outcome] = price
+            if not prices:
+                continue
+            for match_id in (match.get('match_id'), match.get('pregame_match_id')):
+                if match_id:
+                    self.update_quotes(match_id, prices)
+
+    def _quoted_matches(self) -> List[str]:
+        with self._quotes_lock:
+            return list({match_id for match_id, _ in self._slots})
+
+    # ------------------------------------------------------------------
+    # Book
+
+    def _bet_legs(self, row: Dict[str, Any]) -> Optional[List[Tuple]]:
+        """[(match_id, outcome, placed odds, result, start)] or None if a leg already lost"""
+        cached = self._legs_cache.get(row['id'])
+        if cached is not None and cached[0] == row['updated_at']:
+            return cached[1]
+
+        if row['bet_type'] == 'combo' and row['combo_selections']:
+            try:
+                selections = json.loads(row['combo_selections'])
+            except (TypeError, ValueError):
+                selections = []
+            legs = []
+            for selection in selections if isinstance(selections, list) else ():
+                if not isinstance(selection, dict):
+                    continue
+                result = selection.get('result') if selection.get('settled') else None
+                if result == 'lost':
+                    legs = None
+                    break
+                try:
+                    placed = float(selection.get('odds') or 0)
+                except (TypeError, ValueError):
+                    placed = 0.0
+                legs.append((str(selection.get('match_id') or ''),
+                             selection_outcome(selection.get('selection'), selection.get('match_name')),
+                             placed, result, start_timestamp(selection.get('event_time') or row['event_time'])))
+        else:
+            legs = [(str(row['match_id'] or ''), selection_outcome(row['selection'], row['match_name']),
+                     float(row['odds'] or 0), None, start_timestamp(row['event_time']))]
+
+        self._legs_cache[row['id']] = (row['updated_at'], legs)
+        return legs
+
+    def _load_book(self):
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT id, user_id, stake, odds, potential_return, bet_type,
+                           match_id, match_name, selection, combo_selections, event_time, updated_at
+                    FROM bets
+                    WHERE status = 'pending'
+                """)
+                rows = cursor.fetchall()
+                # Offers of bets that settled, voided or cashed out since the last load
+                cursor.execute("""
+                    DELETE FROM cash_out_offers o
+                    WHERE NOT EXISTS (SELECT 1 FROM bets b WHERE b.id = o.bet_id AND b.status = 'pending')
+                """)
+                conn.commit()
+
+        previous = self._book
+        last_offers = dict(zip(previous.bet_ids.tolist(), previous.last_offer.tolist())) if previous else {}
+        bet_ids, user_ids, stakes, caps = [], [], [], []
+        leg_bet, leg_log_placed, leg_default, leg_keys, leg_open, leg_start = [], [], [], [], [], []
+        for row in rows:
+            legs = self._bet_legs(row)
+            if not legs:
+                continue
+            position = len(bet_ids)
+            bet_ids.append(row['id'])
+            user_ids.append(row['user_id'])
+            stakes.append(float(row['stake'] or 0))
+            caps.append(float(row['potential_return'] or 0))
+            for match_id, outcome, placed, result, start in legs:
+                leg_bet.append(position)
+                leg_start.append(start)
+                if placed <= 1.0 or result == 'void':
+                    # Unknown placement odds or void leg: it doesn't move the value
+                    leg_log_placed.append(0.0)
+                    leg_default.append(1.0)
+                    leg_keys.append(None)
+                    leg_open.append(False)
+                else:
+                    leg_log_placed.append(float(np.log(placed)))
+                    leg_default.append(1.0 if result == 'won' else placed)
+                    leg_keys.append((match_id, outcome) if outcome and not result else None)
+                    leg_open.append(not result)
+
+        live_ids = set(bet_ids)
+        self._legs_cache = {bet_id: legs for bet_id, legs in self._legs_cache.items() if bet_id in live_ids}
+
+        with self._quotes_lock:
+            slots: Dict[Tuple[str, str], int] = {}
+            for key in leg_keys:
+                if key is not None and key not in slots:
+                    slots[key] = len(slots)
+            quotes = np.full(len(slots), np.nan)
+            quoted_at = np.full(len(slots), np.nan)
+            for key, slot in slots.items():
+                old = self._slots.get(key)
+                if old is not None:
+                    quotes[slot] = self._quotes[old]
+                    quoted_at[slot] = self._quoted_at[old]
+            self._slots, self._quotes, self._quoted_at = slots, quotes, quoted_at
+
+        self._book = _Book(
+            bet_ids=np.array(bet_ids, dtype=np.int64),
+            user_ids=np.array(user_ids, dtype=np.int64),
+            stakes=np.array(stakes, dtype=np.float64),
+            caps=np.array(caps, dtype=np.float64),
+            last_offer=np.array([last_offers.get(bet_id, np.nan) for bet_id in bet_ids], dtype=np.float64),
+            leg_bet=np.array(leg_bet, dtype=np.int64),
+            leg_log_placed=np.array(leg_log_placed, dtype=np.float64),
+            leg_default=np.array(leg_default, dtype=np.float64),
+            leg_slot=np.array([-1 if key is None else slots[key] for key in leg_keys], dtype=np.int64),
+            leg_open=np.array(leg_open, dtype=bool),
+            leg_start=np.array(leg_start, dtype=np.float64),
+        )
+
+    # ------------------------------------------------------------------
+    # Pricing
+
+    def price_book(self, book: _Book, quotes: np.ndarray) -> np.ndarray:
+        """Offer per bet (rounded to cents, capped at potential return)"""
+        if not len(book.bet_ids):
+            return np.zeros(0)
+        current = np.full(len(book.leg_slot), np.nan)
+        quoted = book.leg_slot >= 0
+        current[quoted] = quotes[book.leg_slot[quoted]]
+        current = np.where(np.isfinite(current) & (current > 1.0), current, book.leg_default)
+        log_ratio = np.bincount(book.leg_bet, weights=book.leg_log_placed - np.log(current),
+                                minlength=len(book.bet_ids))
+        value = book.stakes * np.exp(log_ratio) * (1.0 - CASH_OUT_MARGIN)
+        return np.round(np.minimum(value, book.caps), 2)
+
+    def suspended_bets(self, book: _Book, quoted_at: np.ndarray, now: float) -> np.ndarray:
+        """Per bet: True if an open leg's match has started and the leg has no fresh quote"""
+        if not len(book.bet_ids):
+            return np.zeros(0, dtype=bool)
+        stale = np.ones(len(book.leg_slot), dtype=bool)
+        quoted = book.leg_slot >= 0
+        stale[quoted] = ~(now - quoted_at[book.leg_slot[quoted]] <= QUOTE_MAX_AGE)  # NaN: never quoted
+        in_play = book.leg_open & (book.leg_start <= now)
+        return np.bincount(book.leg_bet, weights=(in_play & stale).astype(np.float64),
+                           minlength=len(book.bet_ids)) > 0
+
+    def _reprice(self):
+        book = self._book
+        if book is None or not len(book.bet_ids):
+            self._heartbeat()
+            return
+        started = time.time()
+        with self._quotes_lock:
+            quotes = self._quotes.copy()
+            quoted_at = self._quoted_at.copy()
+        offers = self.price_book(book, quotes)
+        suspended = self.suspended_bets(book, quoted_at, started)
+
+        withdrawn = np.flatnonzero(suspended & (book.last_offer != SUSPENDED))
+        if len(withdrawn):
+            self._withdraw_offers(book.bet_ids[withdrawn], book.user_ids[withdrawn])
+            book.last_offer[withdrawn] = SUSPENDED
+        changed = np.flatnonzero(~suspended & ~(np.abs(offers - book.last_offer) < 0.005))
+        if len(changed):
+            self._write_offers(book.bet_ids[changed], book.user_ids[changed], offers[changed])
+            book.last_offer[changed] = offers[changed]
+        self._heartbeat()
+        self.suspended = int(suspended.sum())
+        self.reprices += 1
+        self.last_reprice_ms = round((time.time() - started) * 1000, 1)
+
+    def _write_offers(self, bet_ids: np.ndarray, user_ids: np.ndarray, amounts: np.ndarray):
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO cash_out_offers (bet_id, user_id, amount)
+                    SELECT o.bet_id, o.user_id, o.amount
+                    FROM unnest(%s::int[], %s::int[], %s::numeric[]) AS o(bet_id, user_id, amount)
+                    JOIN bets b ON b.id = o.bet_id AND b.status = 'pending'
+                    ON CONFLICT (bet_id) DO UPDATE
+                    SET amount = EXCLUDED.amount,
+                        version = cash_out_offers.version + 1,
+                        updated_at = NOW()
+                    WHERE cash_out_offers.amount IS DISTINCT FROM EXCLUDED.amount
+                    RETURNING bet_id, user_id, amount, version
+                """, (bet_ids.tolist(), user_ids.tolist(), amounts.tolist()))
+                written = cursor.fetchall()
+                conn.commit()
+
+        self.offers_written += len(written)
+        if self.socketio is None or not written:
+            return
+        by_user: Dict[int, List[Dict[str, Any]]] = {}
+        for row in written:
+            by_user.setdefault(row['user_id'], []).append(
+                {'bet_id': row['bet_id'], 'amount': float(row['amount']), 'version': row['version']})
+        for user_id, offers in by_user.items():
+            try:
+                self.socketio.emit('cashout:offers', {'offers': offers}, to=f'user_{user_id}', namespace='/')
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to push cash-out offers to user {user_id}: {e}")
+
+    def _withdraw_offers(self, bet_ids: np.ndarray, user_ids: np.ndarray):
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM cash_out_offers WHERE bet_id = ANY(%s::int[]) RETURNING bet_id, user_id",
+                               (bet_ids.tolist(),))
+                withdrawn = cursor.fetchall()
+                conn.commit()
+        if self.socketio is None or not withdrawn:
+            return
+        by_user: Dict[int, List[Dict[str, Any]]] = {}
+        for row in withdrawn:
+            by_user.setdefault(row['user_id'], []).append({'bet_id': row['bet_id'], 'amount': None, 'suspended': True})
+        for user_id, offers in by_user.items():
+            try:
+                self.socketio.emit('cashout:offers', {'offers': offers}, to=f'user_{user_id}', namespace='/')
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to push cash-out suspension to user {user_id}: {e}")
+
+    def _heartbeat(self):
+        """Mark the offers as live for another OFFER_MAX_AGE seconds"""
+        global _heartbeat_at
+        _heartbeat_at = time.time()
+        self._next_heartbeat = _heartbeat_at + OFFER_MAX_AGE / 2
+        if cache.USE_REDIS:
+            cache.redis.set(HEARTBEAT_KEY, self.token, px=int(OFFER_MAX_AGE * 1000))
+
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            wait = min(self._next_book, self._next_heartbeat if self.is_leader else self._next_book) - time.time()
+            woke = self._wake.wait(timeout=max(0.0, wait))
+            if woke:
+                # Coalesce the odds updates of the next REPRICE_INTERVAL into one pass
+                time.sleep(max(0.0, self._last_reprice + REPRICE_INTERVAL - time.time()))
+            self._wake.clear()
+            try:
+                if time.time() >= self._next_book:
+                    self._next_book = time.time() + BOOK_REFRESH_INTERVAL
+                    if not self._acquire_leadership():
+                        self._book = None
+                        continue
+                    self._load_book()
+                if self.is_leader:
+                    self._reprice()
+                    self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Cash-out repricing failed: {e}")
+                time.sleep(5)
+            finally:
+                self._last_reprice = time.time()
+
+    def _acquire_leadership(self) -> bool:
+        if not cache.USE_REDIS:
+            self.is_leader = True
+            return True
+        try:
+            ttl_ms = LEADER_TTL * 1000
+            if self.is_leader and cache.redis.eval(_RENEW_SCRIPT, 1, LEADER_KEY, self.token, ttl_ms):
+                return True
+            was_leader = self.is_leader
+            self.is_leader = bool(cache.redis.set(LEADER_KEY, self.token, nx=True, px=ttl_ms))
+            if self.is_leader != was_leader:
+                logger.info("👑 Cash-out pricer is now the leader" if self.is_leader
+                            else "👥 Cash-out pricer lost leadership")
+            return self.is_leader
+        except Exception as e:
+            logger.warning(f"⚠️ Cash-out leader lock unavailable, pricing locally: {e}")
+            self.is_leader = True
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        book = self._book
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "leader": self.is_leader,
+            "open_bets": len(book.bet_ids) if book else 0,
+            "legs": len(book.leg_bet) if book else 0,
+            "quoted_selections": len(self._slots),
+            "suspended": self.suspended,
+            "reprices": self.reprices,
+            "last_reprice_ms": self.last_reprice_ms,
+            "offers_written": self.offers_written,
+            "last_error": self.last_error,
+            "margin": CASH_OUT_MARGIN,
+            "offer_max_age": OFFER_MAX_AGE,
+            "alive": pricer_alive(),
+        }
+
+
+_heartbeat_at = 0.0  # this process's last pricer pass (used when Redis isn't configured)
+
+
+def pricer_alive() -> bool:
+    """True if the leading pricer has made a pass within OFFER_MAX_AGE"""
+    if cache.USE_REDIS:
+        try:
+            return bool(cache.redis.exists(HEARTBEAT_KEY))
+        except Exception as e:
+            logger.warning(f"⚠️ Cash-out heartbeat unreadable, treating offers as stale: {e}")
+            return False
+    return time.time() - _heartbeat_at <= OFFER_MAX_AGE
+
+
+def get_cash_out_offers(user_id: int) -> List[Dict[str, Any]]:
+    """Current offers on a user's open bets (none while the pricer is down)"""
+    if not pricer_alive():
+        return []
+    with connection_ctx() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT bet_id, amount, version, updated_at
+                FROM cash_out_offers
+                WHERE user_id = %s
+                ORDER BY bet_id
+            """, (user_id,))
+            rows = cursor.fetchall()
+    return [{'bet_id': row['bet_id'], 'amount': float(row['amount']), 'version': row['version'],
+             'updated_at': row['updated_at'].isoformat() if row['updated_at'] else None} for row in rows]
+
+
+def accept_cash_out(bet_id: int, user_id: int, version: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Accept the offer on a bet. Consuming the offer, settling the bet, crediting the
+    balance and writing the transaction are one statement, which does nothing unless
+    the offer is still at `version` (the current one if None) and the bet still
+    pending. Nothing is accepted while the pricer's heartbeat has lapsed.
+
+    Returns {'accepted': True, 'cash_out_value', 'new_balance', 'match_name'} or
+    {'accepted': False, 'offer': current offer or None}.
+    """
+    if not pricer_alive():
+        return {'accepted': False, 'offer': None}
+    with connection_ctx() as conn:
+        with conn.cursor() as cursor:
+            if version is None:
+                cursor.execute("SELECT version FROM cash_out_offers WHERE bet_id = %s AND user_id = %s",
+                               (bet_id, user_id))
+                row = cursor.fetchone()
+                version = row['version'] if row else -1
+
+            cursor.execute("""
+                WITH offer AS (
+                    DELETE FROM cash_out_offers
+                    WHERE bet_id = %(bet_id)s AND user_id = %(user_id)s AND version = %(version)s
+                    RETURNING amount
+                ), bet AS (
+                    UPDATE bets b
+                    SET status = 'cashed_out', actual_return = offer.amount,
+                        settled_at = NOW(), updated_at = NOW()
+                    FROM offer
+                    WHERE b.id = %(bet_id)s AND b.user_id = %(user_id)s AND b.status = 'pending'
+                    RETURNING b.id, b.actual_return, b.match_name, b.sportsbook_operator_id
+                ), credited AS (
+                    UPDATE users u
+                    SET balance = u.balance + bet.actual_return
+                    FROM bet
+                    WHERE u.id = %(user_id)s
+                    RETURNING u.balance
+                ), recorded AS (
+                    INSERT INTO transactions (user_id, bet_id, sportsbook_operator_id, amount, transaction_type,
+                                              description, balance_before, balance_after, created_at)
+                    SELECT %(user_id)s, bet.id, bet.sportsbook_operator_id, bet.actual_return, 'cash_out',
+                           LEFT('Cash out - ' || COALESCE(bet.match_name, ''), 200),
+                           credited.balance - bet.actual_return, credited.balance, NOW()
+                    FROM bet, credited
+                    RETURNING id
+                )
+                SELECT bet.actual_return, bet.match_name, credited.balance
+                FROM bet, credited
+            """, {'bet_id': bet_id, 'user_id': user_id, 'version': version})
+            accepted = cursor.fetchone()
+
+            if accepted:
+                conn.commit()
+                return {'accepted': True, 'cash_out_value': float(accepted['actual_return']),
+                        'new_balance': float(accepted['balance']), 'match_name': accepted['match_name']}
+
+            conn.rollback()
+            cursor.execute("""
+                SELECT o.amount, o.version
+                FROM cash_out_offers o
+                JOIN bets b ON b.id = o.bet_id AND b.status = 'pending'
+                WHERE o.bet_id = %s AND o.user_id = %s
+            """, (bet_id, user_id))
+            current = cursor.fetchone()
+    return {'accepted': False,
+            'offer': {'bet_id': bet_id, 'amount': float(current['amount']), 'version': current['version']}
+            if current else None}
+
+
+_cash_out_pricer: Optional[CashOutPricer] = None
+
+
+def get_cash_out_pricer() -> CashOutPricer:
+    global _cash_out_pricer
+    if _cash_out_pricer is None:
+        _cash_out_pricer = CashOutPricer()
+    return _cash_out_pricer
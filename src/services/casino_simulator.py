@@ -0,0 +1,456 @@
+"""
+Casino RTP Simulator
+Vectorized Monte Carlo engine for validating casino game RTP, hit rate and volatility
+
+Mirrors the game rules in routes/casino_api.py but evaluates whole batches of
+rounds as NumPy integer arrays instead of one spin at a time, so paytable
+changes can be validated over 10^8 rounds in minutes.
+
+Usage:
+    python -m src.services.casino_simulator slots --rounds 100000000
+    python -m src.services.casino_simulator all --rounds 10000000 --seed 42
+"""
+
+import argparse
+import logging
+import math
+import time
+from statistics import NormalDist
+from typing import Dict, Any, Optional, Callable
+
+import numpy as np
+
+from src.services import slot_engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1_000_000
+
+# ---------------------------------------------------------------------------
+# Slots tables (compiled from services/slot_engine.py)
+# ---------------------------------------------------------------------------
+
+SLOT_SYMBOLS = list(slot_engine.SYMBOLS)
+SLOT_STOPS = list(slot_engine.SYMBOL_STOPS)
+SLOT_LINES = np.array(slot_engine.LINES, dtype=np.intp)
+SLOT_PAYTABLE = slot_engine.PAYTABLE
+SLOT_BUCKETS = list(slot_engine.SYMBOL_BUCKETS)
+
+ROYAL_LINE = slot_engine.ROYAL_LINE
+ROYAL_PAYOUT = slot_engine.ROYAL_PAYOUT
+ROYAL_SEQUENCE = np.array([slot_engine.SYMBOLS.index(s) for s in slot_engine.ROYAL_SEQUENCE], dtype=np.uint8)
+
+
+def build_reel_strip(stops=SLOT_STOPS) -> np.ndarray:
+    """Expand per-symbol stop counts into a reel strip of symbol indices"""
+    return np.repeat(np.arange(len(stops), dtype=np.uint8), stops)
+
+
+def build_pay_matrix(paytable: Dict[str, Dict[int, float]] = SLOT_PAYTABLE,
+                     buckets=SLOT_BUCKETS) -> np.ndarray:
+    """Build a [symbol, run_length] multiplier matrix (run lengths 0-5)"""
+    matrix = np.zeros((len(buckets), 6), dtype=np.float64)
+    for symbol_idx, bucket in enumerate(buckets):
+        for count, multiplier in paytable[bucket].items():
+            matrix[symbol_idx, count] = multiplier
+    return matrix
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+class RoundStats:
+    """Streaming accumulator for per-round return (payout / stake)"""
+
+    def __init__(self):
+        self.rounds = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.hits = 0
+        self.max_return = 0.0
+
+    def add(self, returns: np.ndarray):
+        self.rounds += int(returns.size)
+        self.total += float(returns.sum())
+        self.total_sq += float(np.square(returns).sum())
+        self.hits += int(np.count_nonzero(returns > 0))
+        if returns.size:
+            self.max_return = max(self.max_return, float(returns.max()))
+
+    def summary(self, confidence: float = 0.95) -> Dict[str, Any]:
+        if self.rounds == 0:
+            return {'rounds': 0}
+        mean = self.total / self.rounds
+        variance = max(0.0, self.total_sq / self.rounds - mean * mean)
+        std = math.sqrt(variance)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+        half_width = z * std / math.sqrt(self.rounds)
+        return {
+            'rounds': self.rounds,
+            'rtp': mean,
+            'hit_rate': self.hits / self.rounds,
+            'variance': variance,
+            'std_dev': std,
+            'max_return': self.max_return,
+            'confidence': confidence,
+            'ci_low': mean - half_width,
+            'ci_high': mean + half_width,
+        }
+
+
+def _run_batches(simulate_batch: Callable[[np.random.Generator, int], np.ndarray],
+                 rounds: int, batch_size: int, seed: Optional[int],
+                 confidence: float) -> Dict[str, Any]:
+    """Drive a batch simulator in fixed-size chunks so memory stays bounded"""
+    rng = np.random.default_rng(seed)
+    stats = RoundStats()
+    started = time.perf_counter()
+    remaining = rounds
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        stats.add(simulate_batch(rng, n))
+        remaining -= n
+    elapsed = time.perf_counter() - started
+    result = stats.summary(confidence)
+    result['elapsed_sec'] = elapsed
+    result['rounds_per_sec'] = rounds / elapsed if elapsed > 0 else None
+    return result
+
+
+def _draw_from_shoe(counts: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Draw one card per row without replacement from per-row rank counts (mutates counts)"""
+    n = counts.shape[0]
+    cumulative = np.cumsum(counts, axis=1)
+    u = rng.random(n) * cumulative[:, -1]
+    drawn = (cumulative <= u[:, None]).sum(axis=1)
+    counts[np.arange(n), drawn] -= 1
+    return drawn
+
+
+# ---------------------------------------------------------------------------
+# Slots
+# ---------------------------------------------------------------------------
+
+def slots_line_multipliers(grid: np.ndarray, pay_matrix: np.ndarray,
+                           lines: np.ndarray = SLOT_LINES) -> np.ndarray:
+    """
+    Evaluate all paylines for a batch of spins
+
+    Args:
+        grid: (n, 5, 3) array of symbol indices, grid[spin, reel, row]
+        pay_matrix: [symbol, run_length] multipliers from build_pay_matrix
+
+    Returns:
+        (n, len(lines)) array of line-bet multipliers
+    """
+    seq = grid[:, np.arange(5)[None, :], lines]  # (n, lines, 5)
+    same = seq[..., 1:] == seq[..., :1]
+    run_length = 1 + np.cumprod(same, axis=-1).sum(axis=-1)
+    multipliers = pay_matrix[seq[..., 0], run_length]
+
+    royal = (seq[:, ROYAL_LINE, :] == ROYAL_SEQUENCE).all(axis=-1)
+    multipliers[:, ROYAL_LINE] = np.where(royal, ROYAL_PAYOUT, multipliers[:, ROYAL_LINE])
+    return multipliers
+
+
+def simulate_slots(rounds: int, batch_size: int = DEFAULT_BATCH_SIZE, seed: Optional[int] = None,
+                   paytable: Optional[Dict[str, Dict[int, float]]] = None,
+                   stops=None, confidence: float = 0.95) -> Dict[str, Any]:
+    """Simulate the 20-line, 5x3 slot machine; returns RTP, hit rate and variance per spin"""
+    strip = build_reel_strip(stops or SLOT_STOPS)
+    pay_matrix = build_pay_matrix(paytable or SLOT_PAYTABLE)
+    lines_count = len(SLOT_LINES)
+
+    def batch(rng, n):
+        grid = strip[rng.integers(0, strip.size, size=(n, 5, 3))]
+        return slots_line_multipliers(grid, pay_matrix).sum(axis=1) / lines_count
+
+    result = _run_batches(batch, rounds, batch_size, seed, confidence)
+    result['game'] = 'slots'
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Roulette (single-zero, as roulette_spin(european=True))
+# ---------------------------------------------------------------------------
+
+RED_POCKETS = np.zeros(37, dtype=bool)
+RED_POCKETS[[1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36]] = True
+
+
+def simulate_roulette(rounds: int, bet_type: str = 'single', bet_value: Any = 17,
+                      batch_size: int = DEFAULT_BATCH_SIZE, seed: Optional[int] = None,
+                      confidence: float = 0.95) -> Dict[str, Any]:
+    """Simulate one roulette bet type ('single', 'color' or 'even_odd') per round"""
+    def batch(rng, n):
+        pocket = rng.integers(0, 37, size=n)
+        if bet_type == 'single':
+            return np.where(pocket == int(bet_value), 36.0, 0.0)
+        if bet_type == 'color':
+            win = RED_POCKETS[pocket] if bet_value == 'red' else (~RED_POCKETS[pocket] & (pocket != 0))
+            return np.where(win, 2.0, 0.0)
+        if bet_type == 'even_odd':
+            parity = 0 if bet_value == 'even' else 1
+            return np.where((pocket != 0) & (pocket % 2 == parity), 2.0, 0.0)
+        raise ValueError(f"Unknown roulette bet type: {bet_type}")
+
+    result = _run_batches(batch, rounds, batch_size, seed, confidence)
+    result.update({'game': 'roulette', 'bet_type': bet_type, 'bet_value': bet_value})
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Baccarat (two cards each from a fresh 6-deck shoe, as baccarat_deal)
+# ---------------------------------------------------------------------------
+
+# Baccarat point value -> cards in a 6-deck shoe (10/J/Q/K count 0)
+BACCARAT_SHOE = np.array([16 * 6] + [4 * 6] * 9, dtype=np.int32)
+BACCARAT_PAYOUTS = {'player': 2.0, 'banker': 1.95, 'tie': 9.0}
+
+
+def simulate_baccarat(rounds: int, bet_on: str = 'player', batch_size: int = DEFAULT_BATCH_SIZE,
+                      seed: Optional[int] = None, confidence: float = 0.95) -> Dict[str, Any]:
+    """Simulate baccarat with the casino_api two-card rules"""
+    payout = BACCARAT_PAYOUTS[bet_on]
+
+    def batch(rng, n):
+        counts = np.tile(BACCARAT_SHOE, (n, 1))
+        player = (_draw_from_shoe(counts, rng) + _draw_from_shoe(counts, rng)) % 10
+        banker = (_draw_from_shoe(counts, rng) + _draw_from_shoe(counts, rng)) % 10
+        if bet_on == 'player':
+            win = player > banker
+        elif bet_on == 'banker':
+            win = banker > player
+        else:
+            win = player == banker
+        return np.where(win, payout, 0.0)
+
+    result = _run_batches(batch, rounds, batch_size, seed, confidence)
+    result.update({'game': 'baccarat', 'bet_on': bet_on})
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Blackjack (6 decks, dealer stands on all 17s, 3:2 natural, basic strategy)
+# ---------------------------------------------------------------------------
+
+# Rank index -> hard value (index 0 = ace counted as 1, 9 = ten-valued cards)
+BLACKJACK_SHOE = np.array([4 * 6] * 9 + [16 * 6], dtype=np.int32)
+BJ_STAND, BJ_HIT, BJ_DOUBLE = 0, 1, 2
+
+
+def _build_basic_strategy():
+    """Basic strategy tables indexed [player_total, dealer_upcard_value] (upcard 2-11)"""
+    hard = np.full((32, 12), BJ_STAND, dtype=np.int8)
+    soft = np.full((32, 12), BJ_STAND, dtype=np.int8)
+    for up in range(2, 12):
+        for total in range(4, 22):
+            if total <= 8:
+                action = BJ_HIT
+            elif total == 9:
+                action = BJ_DOUBLE if 3 <= up <= 6 else BJ_HIT
+            elif total == 10:
+                action = BJ_DOUBLE if up <= 9 else BJ_HIT
+            elif total == 11:
+                action = BJ_DOUBLE if up <= 10 else BJ_HIT
+            elif total == 12:
+                action = BJ_STAND if 4 <= up <= 6 else BJ_HIT
+            elif total <= 16:
+                action = BJ_STAND if up <= 6 else BJ_HIT
+            else:
+                action = BJ_STAND
+            hard[total, up] = action
+        for total in range(12, 22):
+            if total <= 14:
+                action = BJ_DOUBLE if 5 <= up <= 6 else BJ_HIT
+            elif total <= 16:
+                action = BJ_DOUBLE if 4 <= up <= 6 else BJ_HIT
+            elif total == 17:
+                action = BJ_DOUBLE if 3 <= up <= 6 else BJ_HIT
+            elif total == 18:
+                action = BJ_DOUBLE if 3 <= up <= 6 else (BJ_HIT if up >= 9 else BJ_STAND)
+            else:
+                action = BJ_STAND
+            soft[total, up] = action
+    return hard, soft
+
+
+BJ_HARD_STRATEGY, BJ_SOFT_STRATEGY = _build_basic_strategy()
+
+
+def _bj_hand_value(hard_total: np.ndarray, has_ace: np.ndarray):
+    """Best blackjack value and softness from hard totals (aces counted as 1)"""
+    soft = has_ace & (hard_total + 10 <= 21)
+    return np.where(soft, hard_total + 10, hard_total), soft
+
+
+def simulate_blackjack(rounds: int, batch_size: int = DEFAULT_BATCH_SIZE, seed: Optional[int] = None,
+                       confidence: float = 0.95) -> Dict[str, Any]:
+    """
+    Simulate blackjack hands played with basic strategy under the casino_api rules
+
+    Splits are not modelled; pairs are played as their hard/soft total.
+    """
+    def batch(rng, n):
+        counts = np.tile(BLACKJACK_SHOE, (n, 1))
+        rows = np.arange(n)
+
+        def draw():
+            rank = _draw_from_shoe(counts, rng)
+            return rank + 1, rank == 0  # hard value, is_ace
+
+        p1, a1 = draw()
+        d1, da1 = draw()
+        p2, a2 = draw()
+        d2, da2 = draw()
+
+        p_hard, p_ace = p1 + p2, a1 | a2
+        d_hard, d_ace = d1 + d2, da1 | da2
+        upcard = np.where(da1, 11, d1)
+
+        p_value, _ = _bj_hand_value(p_hard, p_ace)
+        d_value, _ = _bj_hand_value(d_hard, d_ace)
+        player_natural = p_value == 21
+
+        wager = np.ones(n)
+        active = ~player_natural
+        first_decision = True
+        while active.any():
+            value, soft = _bj_hand_value(p_hard, p_ace)
+            action = np.where(soft, BJ_SOFT_STRATEGY[value, upcard], BJ_HARD_STRATEGY[value, upcard])
+            if not first_decision:
+                # Doubling is only allowed on the first two cards; soft 18 stands instead
+                action = np.where(action == BJ_DOUBLE,
+                                  np.where(soft & (value == 18), BJ_STAND, BJ_HIT), action)
+            action = np.where(active, action, BJ_STAND)
+
+            takes_card = action != BJ_STAND
+            card, is_ace = draw()
+            p_hard = np.where(takes_card, p_hard + card, p_hard)
+            p_ace = p_ace | (takes_card & is_ace)
+            # The shoe only loses a card for rows that actually took one
+            counts[rows[~takes_card], card[~takes_card] - 1] += 1
+
+            doubled = action == BJ_DOUBLE
+            wager = np.where(doubled, 2.0, wager)
+            p_value, _ = _bj_hand_value(p_hard, p_ace)
+            active = active & (action == BJ_HIT) & (p_value < 21)
+            first_decision = False
+
+        p_value, _ = _bj_hand_value(p_hard, p_ace)
+        player_bust = p_value > 21
+
+        # Dealer draws to 17 unless the hand is already settled
+        dealer_plays = ~player_bust & ~player_natural
+        while True:
+            d_value, _ = _bj_hand_value(d_hard, d_ace)
+            hitting = dealer_plays & (d_value < 17)
+            if not hitting.any():
+                break
+            card, is_ace = draw()
+            d_hard = np.where(hitting, d_hard + card, d_hard)
+            d_ace = d_ace | (hitting & is_ace)
+            counts[rows[~hitting], card[~hitting] - 1] += 1
+
+        d_value, _ = _bj_hand_value(d_hard, d_ace)
+        dealer_two_card_21 = (d1 + d2 + 10 * (da1 | da2) == 21)
+
+        returns = np.zeros(n)
+        # Naturals: 3:2 unless the dealer also has a two-card 21 (push)
+        returns = np.where(player_natural & dealer_two_card_21, 1.0, returns)
+        returns = np.where(player_natural & ~dealer_two_card_21, 2.5, returns)
+        settled = ~player_natural & ~player_bust
+        returns = np.where(settled & ((d_value > 21) | (p_value > d_value)), 2.0 * wager, returns)
+        returns = np.where(settled & (d_value <= 21) & (p_value == d_value), wager, returns)
+        # Express return per unit of initial stake, net of the doubled wager
+        return returns - (wager - 1.0)
+
+    result = _run_batches(batch, rounds, batch_size, seed, confidence)
+    result['game'] = 'blackjack'
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Crash (same distribution as crash_multiplier, visual multiplier capped at 20x)
+# ---------------------------------------------------------------------------
+
+def crash_multipliers(r: np.ndarray, target_rtp: float = 0.96, cap: float = 20.0) -> np.ndarray:
+    """Vectorized crash_multiplier for uniform draws r in [0, 1)"""
+    m = target_rtp / np.maximum(1e-12, 1.0 - r)
+    m = np.where(m < 1.0, 1.0, m)
+    return np.round(np.minimum(m, cap), 2)
+
+
+def simulate_crash(rounds: int, cashout: float = 2.0, target_rtp: float = 0.96,
+                   batch_size: int = DEFAULT_BATCH_SIZE, seed: Optional[int] = None,
+                   confidence: float = 0.95) -> Dict[str, Any]:
+    """Simulate a fixed auto-cashout strategy against the crash multiplier distribution"""
+    def batch(rng, n):
+        # 52-bit uniforms, matching hash_to_uniform_01's resolution
+        r = rng.integers(0, 2 ** 52, size=n, dtype=np.int64) / float(2 ** 52)
+        return np.where(crash_multipliers(r, target_rtp) >= cashout, cashout, 0.0)
+
+    result = _run_batches(batch, rounds, batch_size, seed, confidence)
+    result.update({'game': 'crash', 'cashout': cashout})
+    return result
+
+
+GAMES = {
+    'slots': simulate_slots,
+    'roulette': simulate_roulette,
+    'baccarat': simulate_baccarat,
+    'blackjack': simulate_blackjack,
+    'crash': simulate_crash,
+}
+
+
+def _print_result(result: Dict[str, Any]):
+    label = result['game']
+    for key in ('bet_type', 'bet_on', 'cashout'):
+        if key in result:
+            label += f" ({key}={result[key]})"
+    print(f"🎰 {label}")
+    print(f"   Rounds:     {result['rounds']:,}")
+    print(f"   RTP:        {result['rtp'] * 100:.4f}%  "
+          f"[{result['ci_low'] * 100:.4f}%, {result['ci_high'] * 100:.4f}%] @ {result['confidence']:.0%}")
+    print(f"   Hit rate:   {result['hit_rate'] * 100:.3f}%")
+    print(f"   Variance:   {result['variance']:.4f}  (std dev {result['std_dev']:.4f})")
+    print(f"   Max return: {result['max_return']:.2f}x")
+    if result.get('rounds_per_sec'):
+        print(f"   Speed:      {result['rounds_per_sec']:,.0f} rounds/sec ({result['elapsed_sec']:.1f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized casino RTP simulator")
+    parser.add_argument('game', choices=list(GAMES) + ['all'])
+    parser.add_argument('--rounds', type=int, default=10_000_000)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--cashout', type=float, default=2.0, help="crash auto-cashout target")
+    args = parser.parse_args(argv)
+
+    common = dict(batch_size=args.batch_size, seed=args.seed, confidence=args.confidence)
+    runs = []
+    if args.game in ('slots', 'all'):
+        runs.append(lambda: simulate_slots(args.rounds, **common))
+    if args.game in ('roulette', 'all'):
+        runs.append(lambda: simulate_roulette(args.rounds, 'single', 17, **common))
+        runs.append(lambda: simulate_roulette(args.rounds, 'color', 'red', **common))
+        runs.append(lambda: simulate_roulette(args.rounds, 'even_odd', 'even', **common))
+    if args.game in ('baccarat', 'all'):
+        for side in ('player', 'banker', 'tie'):
+            runs.append(lambda side=side: simulate_baccarat(args.rounds, side, **common))
+    if args.game in ('blackjack', 'all'):
+        runs.append(lambda: simulate_blackjack(args.rounds, **common))
+    if args.game in ('crash', 'all'):
+        runs.append(lambda: simulate_crash(args.rounds, args.cashout, **common))
+
+    for run in runs:
+        _print_result(run())
+        print()
+
+
+if __name__ == "__main__":
+    main()
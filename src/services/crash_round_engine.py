@@ -0,0 +1,672 @@
+"""
+Crash Round Engine
+Shared, real-time crash rounds: one round per tenant on a fixed tick schedule
+
+Each sportsbook operator gets a CrashTable that cycles betting -> running -> crashed.
+Cash-outs live in memory for the duration of a round; the multiplier is pushed to
+the `crash_<operator_id>` Socket.IO room every tick, and when the round crashes
+every bet's game_round row is settled (and every winner credited) in one batch.
+
+Stakes are debited when the bet is placed - a conditional UPDATE, so a player can
+never stake money they don't have - and the same transaction inserts the bet's
+game_round row with status "pending", so a stake is never taken without a record
+of it. Settlement updates those rows; only pending rows are settled, so a retry
+can't pay twice. Rows still pending after PENDING_VOID_SECONDS belong to a round
+whose process died before settling: void_stale_rounds() (a leader-only job)
+refunds their stakes.
+
+Each tenant's table runs in exactly one process, the one holding the tenant's
+crash lease (a job_runner.LeaderElection named crash_<operator_id>, claimed by
+the first process to take a bet and released when the table goes idle). Other
+web instances forward bets, cash-outs and state reads to the owner over Redis:
+the request goes on the tenant's request list, the owner's table serves it and
+pushes the reply to a per-request key. Both sides poll with LPOP and
+socketio.sleep() rather than BLPOP: the server runs on eventlet without
+monkey patching, so a blocking Redis read would stall every green thread. Ticks reach clients connected anywhere
+through the Socket.IO message queue. Without Redis every table is local, as on
+a single instance.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, List
+
+from src import cache
+from src.db_compat import connection_ctx
+from src.services import provably_fair
+from src.services.job_runner import LEADER_RENEW, LeaderElection
+from src.utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+BETTING_SECONDS = 6.0        # betting window before the multiplier starts
+TICK_SECONDS = 0.1           # multiplier broadcast interval
+COOLDOWN_SECONDS = 3.0       # pause after a crash before the next betting window
+GROWTH_RATE = 0.06           # m(t) = e^(GROWTH_RATE * t): ~11.5s to 2x, ~50s to 20x
+IDLE_ROUNDS_BEFORE_STOP = 5  # stop a table's loop after this many rounds without bets
+
+MIN_STAKE = 0.1
+MAX_STAKE = 10000.0
+
+REQUEST_KEY = "crash:requests:{operator_id}"
+REPLY_KEY = "crash:reply:{request_id}"
+FORWARD_TIMEOUT = 5          # seconds a forwarded request waits for the owner's reply
+FORWARD_POLL = 0.05          # seconds between non-blocking polls of the request / reply lists
+
+PENDING_VOID_SECONDS = 900   # a pending bet this old lost its round; refund it
+VOID_INTERVAL = 300          # seconds between void_stale_rounds() runs
+
+
+def multiplier_at(elapsed: float) -> float:
+    """Displayed multiplier after `elapsed` seconds of a running round"""
+    return math.floor(math.exp(GROWTH_RATE * max(0.0, elapsed)) * 100) / 100
+
+
+def seconds_to_reach(multiplier: float) -> float:
+    """Inverse of multiplier_at: how long a round runs before hitting `multiplier`"""
+    return math.log(max(1.0, multiplier)) / GROWTH_RATE
+
+
+class CrashRound:
+    """In-memory state for a single shared round"""
+
+    def __init__(self, operator_id: int, number: int):
+        self.operator_id = operator_id
+        self.number = number
+        self.id = f"crash_{operator_id}_{int(time.time())}_{number}"
+        # Fresh server seed per round: its hash is published now, the seed itself on crash
+        self.server_seed = provably_fair.new_server_seed()
+        self.server_seed_hash = provably_fair.hash_server_seed(self.server_seed)
+        self.client_seed = f"operator_{operator_id}"
+        self.nonce = number
+        self.crash_point = provably_fair.crash_multiplier(
+            provably_fair.CRASH_TARGET_RTP, self.server_seed, self.client_seed, self.nonce)
+
+        self.phase = 'betting'
+        self.betting_ends_at = time.time() + BETTING_SECONDS
+        self.started_at: Optional[float] = None
+        self.crashed_at: Optional[float] = None
+        self.bets: Dict[str, Dict[str, Any]] = {}
+
+    def current_multiplier(self, now: Optional[float] = None) -> float:
+        if self.phase == 'betting' or self.started_at is None:
+            return 1.0
+        if self.phase == 'crashed':
+            return self.crash_point
+        return min(multiplier_at((now or time.time()) - self.started_at), self.crash_point)
+
+    def public_state(self, user_id=None) -> Dict[str, Any]:
+        state = {
+            "round_id": self.id,
+            "phase": self.phase,
+            "server_seed_hash": self.server_seed_hash,
+            "client_seed": self.client_seed,
+            "nonce": self.nonce,
+            "betting_ends_at": self.betting_ends_at,
+            "started_at": self.started_at,
+            "multiplier": self.current_multiplier(),
+            "players": len(self.bets),
+        }
+        if self.phase == 'crashed':
+            state["crash_point"] = self.crash_point
+            state["server_seed"] = self.server_seed
+        if user_id is not None and str(user_id) in self.bets:
+            state["my_bet"] = self.bets[str(user_id)]
+        return state
+
+
+class CrashTable:
+    """Runs the round loop for one operator and accepts bets/cash-outs"""
+
+    def __init__(self, engine: "CrashRoundEngine", operator_id: int):
+        self.engine = engine
+        self.operator_id = operator_id
+        self.room = f"crash_{operator_id}"
+        self.round: Optional[CrashRound] = None
+        self.round_number = 0
+        self.running = False
+        self._lock = threading.Lock()
+        self._idle_rounds = 0
+        self._unsettled: List[Dict[str, Any]] = []
+        self.lease = LeaderElection(f"crash_{operator_id}", backend="redis") if cache.USE_REDIS else None
+
+    # ------------------------------------------------------------------
+    # Ownership
+    # ------------------------------------------------------------------
+
+    def owned(self) -> bool:
+        """True if this process runs (or has just claimed) the tenant's table"""
+        if self.lease is None:
+            return True
+        if self.running:
+            return self.lease.is_leader
+        return self.lease.renew()
+
+    def owner_elsewhere(self) -> bool:
+        try:
+            return bool(cache.redis.exists(self.lease.key))
+        except Exception as e:
+            logger.warning(f"⚠️ Crash lease lookup failed for operator {self.operator_id}: {e}")
+            return False
+
+    def _serve_forwarded(self):
+        """Owner side: answer requests forwarded by other instances, renewing the lease as we go"""
+        key = REQUEST_KEY.format(operator_id=self.operator_id)
+        next_renew = time.time() + LEADER_RENEW
+        while self.running:
+            if time.time() >= next_renew:
+                if not self.lease.renew():
+                    logger.warning(f"⚠️ Lost crash lease for operator {self.operator_id}; stopping after this round")
+                next_renew = time.time() + LEADER_RENEW
+            try:
+                item = cache.redis.lpop(key)
+            except Exception as e:
+                logger.warning(f"⚠️ Crash request queue read failed for operator {self.operator_id}: {e}")
+                self.engine.socketio.sleep(1)
+                continue
+            if item:
+                self.engine.socketio.start_background_task(self._answer, json_codec.loads(item))
+            else:
+                self.engine.socketio.sleep(FORWARD_POLL)
+
+    def _answer(self, request: Dict[str, Any]):
+        if request["deadline"] < time.time():
+            return  # the caller has given up; acting on it now would surprise the player
+        handler = {"place_bet": self._place_bet, "cash_out": self._cash_out_now, "state": self._state}[request["action"]]
+        try:
+            reply = {"result": handler(**request["args"])}
+        except ValueError as e:
+            reply = {"error": str(e)}
+        except Exception as e:
+            logger.error(f"❌ Forwarded crash {request['action']} failed: {e}")
+            reply = {"error": "Game error"}
+        reply_key = REPLY_KEY.format(request_id=request["id"])
+        try:
+            cache.redis.rpush(reply_key, json_codec.dumps(reply))
+            cache.redis.expire(reply_key, FORWARD_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not reply to forwarded crash {request['action']}: {e}")
+
+    def _forward(self, action: str, **args) -> Dict[str, Any]:
+        """Run an action on the owning instance and return its result (ValueError for its errors)"""
+        request_id = uuid.uuid4().hex
+        request_key = REQUEST_KEY.format(operator_id=self.operator_id)
+        reply_key = REPLY_KEY.format(request_id=request_id)
+        deadline = time.time() + FORWARD_TIMEOUT
+        item = None
+        try:
+            cache.redis.rpush(request_key, json_codec.dumps({
+                "id": request_id, "action": action, "args": args, "deadline": deadline,
+            }))
+            cache.redis.expire(request_key, FORWARD_TIMEOUT * 2)
+            # Poll, yielding to the hub in between: a blocking read here would freeze the whole server
+            while item is None and time.time() < deadline:
+                item = cache.redis.lpop(reply_key)
+                if item is None:
+                    self.engine.socketio.sleep(FORWARD_POLL)
+        except Exception as e:
+            logger.error(f"❌ Forwarding crash {action} for operator {self.operator_id} failed: {e}")
+            raise ValueError("Crash table unavailable, try again")
+        if item is None:
+            raise ValueError("Crash table unavailable, try again")
+        reply = json_codec.loads(item)
+        if "error" in reply:
+            raise ValueError(reply["error"])
+        return reply["result"]
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+
+    def ensure_running(self):
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self._idle_rounds = 0
+            self._new_round()
+        self.engine.socketio.start_background_task(self._loop)
+        if self.lease is not None:
+            self.engine.socketio.start_background_task(self._serve_forwarded)
+        logger.info(f"🚀 Crash table started for operator {self.operator_id}")
+
+    def _new_round(self):
+        self.round_number += 1
+        self.round = CrashRound(self.operator_id, self.round_number)
+
+    def _emit(self, event: str, payload: Dict[str, Any], to: Optional[str] = None):
+        try:
+            self.engine.socketio.emit(event, payload, to=to or self.room, namespace='/')
+        except Exception as e:
+            logger.warning(f"Failed to emit {event}: {e}")
+
+    def _loop(self):
+        sleep = self.engine.socketio.sleep
+        while self.running:
+            rnd = self.round
+            self._emit('crash:round', rnd.public_state())
+
+            # Betting window
+            while time.time() < rnd.betting_ends_at:
+                sleep(min(TICK_SECONDS, rnd.betting_ends_at - time.time()))
+
+            with self._lock:
+                rnd.phase = 'running'
+                rnd.started_at = time.time()
+            self._emit('crash:start', {"round_id": rnd.id, "started_at": rnd.started_at})
+
+            # Running: tick until the crash point, settling auto cash-outs as they pass
+            crash_after = seconds_to_reach(rnd.crash_point)
+            while True:
+                elapsed = time.time() - rnd.started_at
+                if elapsed >= crash_after:
+                    break
+                multiplier = multiplier_at(elapsed)
+                with self._lock:
+                    self._run_auto_cashouts(rnd, multiplier)
+                self._emit('crash:tick', {"round_id": rnd.id, "multiplier": multiplier})
+                sleep(min(TICK_SECONDS, crash_after - elapsed))
+
+            with self._lock:
+                self._run_auto_cashouts(rnd, rnd.crash_point)
+                rnd.phase = 'crashed'
+                rnd.crashed_at = time.time()
+                bets = list(rnd.bets.values())
+            self._emit('crash:crashed', {
+                "round_id": rnd.id,
+                "crash_point": rnd.crash_point,
+                "server_seed": rnd.server_seed,
+                "server_seed_hash": rnd.server_seed_hash,
+                "client_seed": rnd.client_seed,
+                "nonce": rnd.nonce,
+            })
+
+            self._settle(rnd, bets)
+
+            self._idle_rounds = 0 if bets else self._idle_rounds + 1
+            sleep(COOLDOWN_SECONDS)
+            with self._lock:
+                if self.lease is not None and not self.lease.is_leader:
+                    # Another instance holds the lease now; it runs the next round
+                    self.running = False
+                    logger.info(f"👥 Crash table handed off for operator {self.operator_id}")
+                    break
+                if self._idle_rounds >= IDLE_ROUNDS_BEFORE_STOP and not self._unsettled:
+                    self.running = False
+                    logger.info(f"💤 Crash table idle, stopping loop for operator {self.operator_id}")
+                    if self.lease is not None:
+                        self.lease.release()
+                    break
+                self._new_round()
+
+    def _run_auto_cashouts(self, rnd: CrashRound, multiplier: float):
+        for bet in rnd.bets.values():
+            target = bet["auto_cashout"]
+            if bet["cashout_multiplier"] is None and target and target <= multiplier:
+                self._cash_out(rnd, bet, target)
+
+    def _cash_out(self, rnd: CrashRound, bet: Dict[str, Any], multiplier: float):
+        bet["cashout_multiplier"] = multiplier
+        bet["payout"] = round(bet["stake"] * multiplier, 2)
+        self._emit('crash:cashout', {
+            "round_id": rnd.id,
+            "user_id": bet["user_id"],
+            "multiplier": multiplier,
+            "payout": bet["payout"],
+        })
+
+    # ------------------------------------------------------------------
+    # Player actions
+    # ------------------------------------------------------------------
+
+    def place_bet(self, user_id, stake: float, currency: str = 'USD',
+                  auto_cashout: Optional[float] = None) -> Dict[str, Any]:
+        """Debit the stake and join the round in its betting window (on the owning instance)"""
+        if not self.owned():
+            return self._forward('place_bet', user_id=str(user_id), stake=stake, currency=currency,
+                                 auto_cashout=auto_cashout)
+        return self._place_bet(user_id, stake, currency, auto_cashout)
+
+    def cash_out(self, user_id) -> Dict[str, Any]:
+        """Cash out at the owning instance's current multiplier"""
+        with self._lock:
+            # A bet in the round this process is running is cashed out here, even mid hand-off
+            local = self.round is not None and self.running and str(user_id) in self.round.bets
+        if local or self.lease is None:
+            return self._cash_out_now(user_id)
+        return self._forward('cash_out', user_id=str(user_id))
+
+    def state(self, user_id=None) -> Dict[str, Any]:
+        if self.lease is not None and not self.running and self.owner_elsewhere():
+            try:
+                return self._forward('state', user_id=None if user_id is None else str(user_id))
+            except ValueError:
+                pass
+        return self._state(user_id)
+
+    def _place_bet(self, user_id, stake: float, currency: str = 'USD',
+                   auto_cashout: Optional[float] = None) -> Dict[str, Any]:
+        self.ensure_running()
+        key = str(user_id)
+
+        with self._lock:
+            rnd = self.round
+            if rnd.phase != 'betting':
+                raise ValueError("Betting is closed for this round")
+            if key in rnd.bets:
+                raise ValueError("Already bet on this round")
+
+        ref = f"{rnd.id}_{key}"
+        debited = self.engine.debit(user_id, self.operator_id, stake, currency, ref, {
+            "round_id": rnd.id,
+            "auto_cashout": auto_cashout,
+            "server_seed_hash": rnd.server_seed_hash,
+            "client_seed": rnd.client_seed,
+            "nonce": rnd.nonce,
+            "status": "pending",
+        })
+        if debited is None:
+            raise ValueError("Insufficient funds")
+        balance, row_id = debited
+
+        with self._lock:
+            if self.round is not rnd or rnd.phase != 'betting' or key in rnd.bets:
+                # Window closed (or a double submit) while the debit was in flight
+                refund = True
+            else:
+                refund = False
+                bet = {
+                    "user_id": key,
+                    "stake": stake,
+                    "currency": currency,
+                    "auto_cashout": auto_cashout,
+                    "cashout_multiplier": None,
+                    "payout": 0.0,
+                    "ref": ref,
+                    "row_id": row_id,
+                }
+                rnd.bets[key] = bet
+
+        if refund:
+            self.engine.refund_bet(self.operator_id, row_id)
+            raise ValueError("Betting is closed for this round")
+
+        self._emit('crash:bet', {"round_id": rnd.id, "user_id": key, "stake": stake})
+        return {"round_id": rnd.id, "ref": bet["ref"], "stake": stake,
+                "auto_cashout": auto_cashout, "balance": balance}
+
+    def _cash_out_now(self, user_id) -> Dict[str, Any]:
+        key = str(user_id)
+        with self._lock:
+            rnd = self.round
+            if rnd is None or rnd.phase != 'running':
+                raise ValueError("Round is not running")
+            bet = rnd.bets.get(key)
+            if bet is None:
+                raise ValueError("No bet on this round")
+            if bet["cashout_multiplier"] is not None:
+                raise ValueError("Already cashed out")
+            now = time.time()
+            multiplier = multiplier_at(now - rnd.started_at)
+            if now - rnd.started_at >= seconds_to_reach(rnd.crash_point):
+                raise ValueError("Cashout after crash is invalid")
+            self._cash_out(rnd, bet, multiplier)
+            return {"round_id": rnd.id, "ref": bet["ref"], "stake": bet["stake"],
+                    "cashout_multiplier": multiplier, "payout": bet["payout"]}
+
+    def _state(self, user_id=None) -> Dict[str, Any]:
+        with self._lock:
+            if self.round is None:
+                return {"phase": "idle", "operator_id": self.operator_id}
+            return self.round.public_state(user_id)
+
+    # ------------------------------------------------------------------
+    # Settlement
+    # ------------------------------------------------------------------
+
+    def _settle(self, rnd: CrashRound, bets: List[Dict[str, Any]]):
+        rows = self._unsettled + [{
+            "row_id": bet["row_id"],
+            "user_id": bet["user_id"],
+            "payout": bet["payout"],
+            "result_json": json.dumps({
+                "round_id": rnd.id,
+                "multiplier": rnd.crash_point,
+                "auto_cashout": bet["auto_cashout"],
+                "cashout_multiplier": bet["cashout_multiplier"],
+                "server_seed": rnd.server_seed,
+                "server_seed_hash": rnd.server_seed_hash,
+                "client_seed": rnd.client_seed,
+                "nonce": rnd.nonce,
+                "status": "cashed_out" if bet["cashout_multiplier"] is not None else "crashed",
+            }),
+        } for bet in bets]
+        if not rows:
+            return
+
+        try:
+            balances, settled = self.engine.settle_batch(self.operator_id, rows)
+            self._unsettled = []
+        except Exception as e:
+            # Keep the rows and retry after the next round (they stay pending in the DB meanwhile)
+            logger.error(f"❌ Crash settlement failed for {rnd.id} ({len(rows)} bets): {e}")
+            self._unsettled = rows
+            return
+
+        logger.info(f"✅ Crash round {rnd.id} settled: {len(rows)} bets, crash @ {rnd.crash_point}x")
+        for user_id, balance in balances.items():
+            self._emit('balance:update', {"user_id": user_id, "balance": balance}, to=f"user_{user_id}")
+        self.engine.sync_web3_credits(settled)
+
+
+class CrashRoundEngine:
+    """Owns one CrashTable per operator and the batched DB writes they share"""
+
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self._tables: Dict[int, CrashTable] = {}
+        self._lock = threading.Lock()
+
+    def table(self, operator_id) -> CrashTable:
+        operator_id = int(operator_id)
+        table = self._tables.get(operator_id)
+        if table is None:
+            with self._lock:
+                table = self._tables.setdefault(operator_id, CrashTable(self, operator_id))
+        return table
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tables": len(self._tables),
+            "running": sum(1 for t in self._tables.values() if t.running),
+            "players": sum(len(t.round.bets) for t in self._tables.values() if t.round),
+        }
+
+    # Wallet helpers --------------------------------------------------------
+
+    def debit(self, user_id, operator_id: int, stake: float, currency: str, ref: str,
+              result: Dict[str, Any]) -> Optional[tuple]:
+        """
+        Conditionally debit a stake and record the pending bet in one transaction
+
+        Returns (new balance, game_round id), or None if the balance is insufficient.
+        """
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE users
+                    SET balance = balance - %s
+                    WHERE id = %s AND sportsbook_operator_id = %s AND is_active = true
+                      AND balance >= %s
+                    RETURNING balance
+                """, (stake, int(user_id), operator_id, stake))
+                row = cursor.fetchone()
+                if row is None:
+                    conn.rollback()
+                    return None
+                cursor.execute("""
+                    INSERT INTO game_round (game_key, user_id, stake, currency, payout, ref, result_json)
+                    VALUES ('crash', %s, %s, %s, 0, %s, %s::jsonb)
+                    RETURNING id
+                """, (str(user_id), stake, currency, ref, json.dumps(result)))
+                row_id = cursor.fetchone()['id']
+                conn.commit()
+
+        try:
+            from src.services.web3_sync_service import sync_web3_debit
+            sync_web3_debit(int(user_id), stake, "Crash bet")
+        except Exception as web3_error:
+            logger.warning(f"Web3 sync failed for crash bet: {web3_error}")
+        return float(row['balance']), row_id
+
+    def refund_bet(self, operator_id: int, row_id: int):
+        """Undo a bet that missed its round: drop the pending row and return the stake"""
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM game_round
+                    WHERE id = %s AND game_key = 'crash' AND result_json->>'status' = 'pending'
+                    RETURNING user_id, stake
+                """, (row_id,))
+                row = cursor.fetchone()
+                if row is not None:
+                    self.credit_many(operator_id, {row['user_id']: float(row['stake'])}, cursor=cursor)
+                conn.commit()
+
+    def credit_many(self, operator_id: int, amounts: Dict[str, float], cursor=None) -> Dict[str, float]:
+        """Credit several users in one UPDATE; returns their new balances"""
+        amounts = {k: v for k, v in amounts.items() if v > 0}
+        if not amounts:
+            return {}
+        sql = """
+            UPDATE users u
+            SET balance = u.balance + v.amount
+            FROM unnest(%s::int[], %s::numeric[]) AS v(id, amount)
+            WHERE u.id = v.id AND u.sportsbook_operator_id = %s AND u.is_active = true
+            RETURNING u.id, u.balance
+        """
+        params = ([int(k) for k in amounts], list(amounts.values()), operator_id)
+        if cursor is not None:
+            cursor.execute(sql, params)
+            return {str(r['id']): float(r['balance']) for r in cursor.fetchall()}
+        with connection_ctx() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                balances = {str(r['id']): float(r['balance']) for r in cur.fetchall()}
+                conn.commit()
+        return balances
+
+    def settle_batch(self, operator_id: int, rows: List[Dict[str, Any]]) -> tuple:
+        """Settle every pending round row and credit every winner in one transaction; returns (balances, rows settled)"""
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                # Only pending rows: a row voided meanwhile (or settled by an earlier try) is skipped
+                cursor.execute("""
+                    UPDATE game_round g
+                    SET payout = r.payout, result_json = r.result_json::jsonb
+                    FROM unnest(%s::int[], %s::numeric[], %s::text[]) AS r(id, payout, result_json)
+                    WHERE g.id = r.id AND g.game_key = 'crash' AND g.result_json->>'status' = 'pending'
+                    RETURNING g.id, g.user_id, g.payout
+                """, (
+                    [r["row_id"] for r in rows],
+                    [r["payout"] for r in rows],
+                    [r["result_json"] for r in rows],
+                ))
+                settled = cursor.fetchall()
+                payouts: Dict[str, float] = {}
+                for row in settled:
+                    payouts[row["user_id"]] = payouts.get(row["user_id"], 0.0) + float(row["payout"])
+                balances = self.credit_many(operator_id, payouts, cursor=cursor)
+                conn.commit()
+        settled_ids = {row["id"] for row in settled}
+        return balances, [r for r in rows if r["row_id"] in settled_ids]
+
+    def void_stale_rounds(self, max_age: float = PENDING_VOID_SECONDS) -> int:
+        """Refund bets still pending long after their round should have settled; returns rows voided"""
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE game_round
+                    SET payout = stake,
+                        result_json = result_json || '{"status": "void"}'::jsonb
+                    WHERE game_key = 'crash' AND result_json->>'status' = 'pending'
+                      AND created_at < NOW() - make_interval(secs => %s)
+                    RETURNING user_id, payout
+                """, (max_age,))
+                voided = cursor.fetchall()
+                refunds: Dict[int, float] = {}
+                for row in voided:
+                    refunds[int(row["user_id"])] = refunds.get(int(row["user_id"]), 0.0) + float(row["payout"])
+                if refunds:
+                    cursor.execute("""
+                        UPDATE users u
+                        SET balance = u.balance + v.amount
+                        FROM unnest(%s::int[], %s::numeric[]) AS v(id, amount)
+                        WHERE u.id = v.id
+                    """, (list(refunds), list(refunds.values())))
+                conn.commit()
+        if voided:
+            logger.warning(f"⚠️ Voided {len(voided)} crash bets left pending by a lost round "
+                           f"(refunded {sum(refunds.values()):.2f})")
+            self.sync_web3_credits([{"user_id": row["user_id"], "payout": float(row["payout"])} for row in voided],
+                                   "Crash round voided")
+        return len(voided)
+
+    def sync_web3_credits(self, rows: List[Dict[str, Any]], reason: str = "Crash cashout win"):
+        try:
+            from src.services.web3_sync_service import sync_web3_credit
+        except Exception:
+            return
+        for row in rows:
+            if row["payout"] > 0:
+                try:
+                    sync_web3_credit(int(row["user_id"]), row["payout"], reason)
+                except Exception as web3_error:
+                    logger.warning(f"Web3 sync failed for crash cashout: {web3_error}")
+
+
+_crash_round_engine: Optional[CrashRoundEngine] = None
+
+
+def init_crash_round_engine(socketio) -> CrashRoundEngine:
+    """Create the engine and register its Socket.IO handlers"""
+    global _crash_round_engine
+    _crash_round_engine = CrashRoundEngine(socketio)
+
+    @socketio.on('crash:join')
+    def handle_crash_join(data=None):
+        """Join the tenant's crash room and receive the current round state"""
+        try:
+            from flask import session
+            from flask_socketio import join_room, emit
+            operator_id = session.get('operator_id') or (data or {}).get('operator_id')
+            if not operator_id:
+                emit('error', {'message': 'Sportsbook operator not found'})
+                return
+            table = _crash_round_engine.table(operator_id)
+            join_room(table.room)
+            emit('crash:state', table.state(session.get('user_id')))
+        except Exception as e:
+            logger.error(f"Error in crash:join handler: {e}")
+
+    @socketio.on('crash:leave')
+    def handle_crash_leave(data=None):
+        try:
+            from flask import session
+            from flask_socketio import leave_room
+            operator_id = session.get('operator_id') or (data or {}).get('operator_id')
+            if operator_id:
+                leave_room(f"crash_{int(operator_id)}")
+        except Exception as e:
+            logger.error(f"Error in crash:leave handler: {e}")
+
+    logger.info("✅ Crash round engine initialized")
+    return _crash_round_engine
+
+
+def get_crash_round_engine() -> Optional[CrashRoundEngine]:
+    return _crash_round_engine
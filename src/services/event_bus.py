@@ -0,0 +1,166 @@
+"""
+Event bus
+Redis streams between the web, odds, settlement and socket processes
+
+Two kinds of stream:
+- broadcast (subscribe without a group): every subscribed process sees every
+  message, read from the tail of the stream with XREAD. Used for "new pre-match
+  odds for a sport", which every odds cache needs.
+- work (subscribe with a group): each message goes to one consumer of the group
+  (XREADGROUP), so an event is handled once however many processes subscribe.
+  Used for user notifications (bet settled, balance changed) that must be
+  emitted to the user's socket room exactly once.
+
+Streams are capped at STREAM_MAXLEN entries. Without Redis, publish() calls the
+process's own subscribers directly, which is all a single combined process
+needs.
+
+WORKER_TOPOLOGY=split moves the fetchers, settlement and socket fan-out out of
+the web process into the workers in src/worker.py; the default, combined, keeps
+them in the web process as before.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src import cache
+from src.utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+SPLIT_WORKERS = os.getenv("WORKER_TOPOLOGY", "combined").lower() == "split"
+PROCESS_TYPE = os.getenv("PROCESS_TYPE", "web")
+
+PREMATCH_ODDS_STREAM = "events:odds:prematch"
+USER_EVENTS_STREAM = "events:user"
+SOCKET_GROUP = "socket"
+
+STREAM_MAXLEN = int(os.getenv("EVENT_STREAM_MAXLEN", "1000"))
+BLOCK_MS = 5000
+RETRY_SECONDS = 5
+
+Handler = Callable[[Dict[str, Any]], None]
+
+
+class EventBus:
+    def __init__(self):
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers: Dict[Tuple[str, Optional[str]], List[Handler]] = {}
+        self._threads: Dict[Tuple[str, Optional[str]], threading.Thread] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def publish(self, stream: str, payload: Dict[str, Any]):
+        if cache.USE_REDIS:
+            try:
+                cache.redis.xadd(stream, {"data": json_codec.dumps(payload)}, maxlen=STREAM_MAXLEN, approximate=True)
+                self.published += 1
+                return
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"⚠️ Event publish to {stream} failed, delivering locally: {e}")
+        self.published += 1
+        for (subscribed, _), handlers in list(self._handlers.items()):
+            if subscribed == stream:
+                for handler in handlers:
+                    self._deliver(handler, payload)
+
+    def subscribe(self, stream: str, handler: Handler, group: Optional[str] = None):
+        """Call handler(payload) for new messages; with a group, one subscriber per message fleet-wide"""
+        key = (stream, group)
+        with self._lock:
+            self._handlers.setdefault(key, []).append(handler)
+            if cache.USE_REDIS and key not in self._threads:
+                thread = threading.Thread(target=self._consume, args=(stream, group), daemon=True,
+                                          name=f"events-{stream}")
+                self._threads[key] = thread
+                thread.start()
+
+    # ------------------------------------------------------------------
+
+    def _deliver(self, handler: Handler, payload: Dict[str, Any]):
+        try:
+            handler(payload)
+            self.delivered += 1
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.error(f"❌ Event handler failed: {e}")
+
+    def _consume(self, stream: str, group: Optional[str]):
+        last_id = "$"  # broadcast readers start at the tail: only what's published from now on
+        group_ready = False
+        while True:
+            try:
+                if group:
+                    if not group_ready:
+                        try:
+                            cache.redis.xgroup_create(stream, group, id="$", mkstream=True)
+                        except Exception as e:
+                            if "BUSYGROUP" not in str(e):
+                                raise
+                        group_ready = True
+                    batches = cache.redis.xreadgroup(group, self.consumer, {stream: ">"}, count=100, block=BLOCK_MS)
+                else:
+                    batches = cache.redis.xread({stream: last_id}, count=100, block=BLOCK_MS)
+                for _, messages in batches or []:
+                    for message_id, fields in messages:
+                        last_id = message_id
+                        try:
+                            payload = json_codec.loads(fields["data"])
+                        except Exception as e:
+                            logger.error(f"❌ Unreadable event {message_id} on {stream}: {e}")
+                            payload = None
+                        if payload is not None:
+                            for handler in list(self._handlers.get((stream, group), [])):
+                                self._deliver(handler, payload)
+                        if group:
+                            # Notifications are best effort: ack even if the handler failed
+                            cache.redis.xack(stream, group, message_id)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.warning(f"⚠️ Event stream {stream} read failed, retrying in {RETRY_SECONDS}s: {e}")
+                group_ready = False
+                time.sleep(RETRY_SECONDS)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis" if cache.USE_REDIS else "local",
+            "topology": "split" if SPLIT_WORKERS else "combined",
+            "process_type": PROCESS_TYPE,
+            "subscriptions": [f"{stream}@{group}" if group else stream for stream, group in self._handlers],
+            "published": self.published,
+            "delivered": self.delivered,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+_event_bus: Optional[EventBus] = None
+
+
+def get_event_bus() -> EventBus:
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = EventBus()
+    return _event_bus
+
+
+def publish_user_event(user_id: Any, event: str, data: Dict[str, Any]):
+    """Queue a socket event for a user's room; emitted once by whichever process has a socket server"""
+    get_event_bus().publish(USER_EVENTS_STREAM, {"user_id": user_id, "event": event, "data": data})
+
+
+def emit_user_events(socketio):
+    """Subscribe this process's socketio to the user event queue"""
+    def _emit(payload: Dict[str, Any]):
+        socketio.emit(payload["event"], payload["data"], to=f"user_{payload['user_id']}", namespace="/")
+    get_event_bus().subscribe(USER_EVENTS_STREAM, _emit, group=SOCKET_GROUP)
@@ -0,0 +1,418 @@
+"""
+Job runner
+One scheduler per process for periodic jobs and long-running services, with fleet-wide leader election
+
+Jobs are functions run every `interval` seconds (plus up to `jitter` seconds, so
+instances don't fire in lockstep), measured from the end of the previous run so
+a slow run never overlaps the next. Services are objects with their own loop
+(settlement, the odds fetcher, ...) that the runner starts and keeps running.
+
+Anything registered with leader_only=True runs on one process of its tier (web,
+worker_settlement, ... - PROCESS_TYPE) at a time: the leader, which holds that
+tier's lease, renewed every LEADER_RENEW seconds - in
+Redis when it is configured, otherwise in the job_leases table
+(migrations/add_job_leases.py). A single-statement lease works through
+PgBouncer's transaction pooling, where session advisory locks don't. The store
+is fixed when the process starts (JOB_LEADER_BACKEND=local makes a single
+process its own leader): if it can't be reached the process steps down rather
+than falling back to another store, where a second leader could be elected. If
+the leader dies its lease expires after LEADER_TTL and another process takes
+over; leader services are stopped on a process that loses the lease.
+
+Every job and service reports runs, failures, durations and lag (how late a run
+started against its schedule) through status(), served at /api/jobs/status.
+Intervals can be overridden per job with JOB_INTERVAL_<NAME> (e.g.
+JOB_INTERVAL_POOL_METRICS=120).
+"""
+
+import heapq
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src import cache
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "jobs:leader:{name}"
+LEADER_TTL = int(os.getenv("JOB_LEADER_TTL", "30"))          # seconds a lease survives its holder
+LEADER_RENEW = max(1, LEADER_TTL // 3)
+SUPERVISE_INTERVAL = int(os.getenv("JOB_SUPERVISE_INTERVAL", "15"))  # seconds between service checks
+TICK = 0.5
+WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+
+JOB_SECONDS = metrics.histogram("job_duration_seconds", "Background job run time", ["job"],
+                                buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+
+# Renew only if we still hold the lock
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderElection:
+    """Fleet-wide leader lease in one store for the life of the process: Redis if configured, else job_leases"""
+
+    def __init__(self, name: str, backend: Optional[str] = None):
+        self.name = name
+        self.key = LEADER_KEY.format(name=name)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.backend = backend or os.getenv("JOB_LEADER_BACKEND") or ("redis" if cache.USE_REDIS else "postgres")
+        self._renew_backend = getattr(self, f"_renew_{self.backend}")
+        self.changed_at: Optional[float] = None
+
+    def renew(self) -> bool:
+        was_leader = self.is_leader
+        try:
+            self.is_leader = self._renew_backend()
+        except Exception as e:
+            # Can't prove we still hold it: step down until the store answers again
+            logger.warning(f"⚠️ Job leader lease unavailable in {self.backend}: {e}")
+            self.is_leader = False
+        if self.is_leader != was_leader:
+            self.changed_at = time.time()
+            logger.info(f"👑 {self.holder} is now the job leader ({self.backend})" if self.is_leader
+                        else f"👥 {self.holder} lost job leadership")
+        return self.is_leader
+
+    def _renew_redis(self) -> bool:
+        ttl_ms = LEADER_TTL * 1000
+        if self.is_leader and cache.redis.eval(_RENEW_SCRIPT, 1, self.key, self.holder, ttl_ms):
+            return True
+        return bool(cache.redis.set(self.key, self.holder, nx=True, px=ttl_ms))
+
+    def _renew_postgres(self) -> bool:
+        from src.db_compat import connection_ctx
+        with connection_ctx() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO job_leases (name, holder, expires_at)
+                    VALUES (%s, %s, NOW() + make_interval(secs => %s))
+                    ON CONFLICT (name) DO UPDATE
+                    SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at
+                    WHERE job_leases.holder = EXCLUDED.holder OR job_leases.expires_at < NOW()
+                    RETURNING holder
+                """, (self.name, self.holder, LEADER_TTL))
+                claimed = cursor.fetchone() is not None
+                conn.commit()
+        return claimed
+
+    def _renew_local(self) -> bool:
+        return True
+
+    def release(self):
+        if not self.is_leader:
+            return
+        try:
+            if self.backend == "redis":
+                cache.redis.eval(_RELEASE_SCRIPT, 1, self.key, self.holder)
+            elif self.backend == "postgres":
+                from src.db_compat import connection_ctx
+                with connection_ctx() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("UPDATE job_leases SET expires_at = NOW() WHERE name = %s AND holder = %s",
+                                       (self.name, self.holder))
+                        conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to release job leadership: {e}")
+        self.is_leader = False
+
+
+def _interval_override(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(f"JOB_INTERVAL_{name.upper().replace('-', '_')}")
+    return float(value) if value else default
+
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], Any], interval: Optional[float], jitter: float,
+                 leader_only: bool, initial_delay: float):
+        self.name = name
+        self.func = func
+        self.interval = _interval_override(name, interval)  # None: run once
+        self.jitter = jitter
+        self.leader_only = leader_only
+        self.initial_delay = initial_delay
+        self.running = False
+        self.done = False
+        self.next_run: Optional[float] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_lag: Optional[float] = None
+        self.max_lag = 0.0
+        self.last_error: Optional[str] = None
+
+    def schedule(self, after: float, first: bool = False):
+        delay = self.initial_delay if first else (self.interval or 0)
+        self.next_run = after + delay + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "interval": self.interval,
+            "jitter": self.jitter,
+            "leader_only": self.leader_only,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_run_age": round(now - self.last_started, 1) if self.last_started else None,
+            "next_run_in": round(self.next_run - now, 1) if self.next_run and not self.done else None,
+            "last_duration": self.last_duration,
+            "avg_duration": round(self.total_duration / self.runs, 3) if self.runs else None,
+            "max_duration": round(self.max_duration, 3),
+            "last_lag": self.last_lag,
+            "max_lag": round(self.max_lag, 3),
+            "last_error": self.last_error,
+        }
+
+
+class Service:
+    def __init__(self, name: str, start: Callable[[], Any], stop: Callable[[], Any],
+                 is_running: Callable[[], bool], leader_only: bool, start_delay: float):
+        self.name = name
+        self.start = start
+        self.stop = stop
+        self.is_running = is_running
+        self.leader_only = leader_only
+        self.start_delay = start_delay
+        self.enabled = True
+        self.stopping = False
+        self.starts = 0
+        self.restarts = 0
+        self.started_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        try:
+            running = bool(self.is_running())
+        except Exception:
+            running = False
+        return {
+            "leader_only": self.leader_only,
+            "enabled": self.enabled,
+            "running": running,
+            "stopping": self.stopping,
+            "starts": self.starts,
+            "restarts": self.restarts,
+            "uptime": round(time.time() - self.started_at, 1) if running and self.started_at else None,
+            "last_error": self.last_error,
+        }
+
+
+class JobRunner:
+    def __init__(self, tier: Optional[str] = None):
+        self.leader = LeaderElection(tier or os.getenv("PROCESS_TYPE", "web"))
+        self.jobs: Dict[str, Job] = {}
+        self.services: Dict[str, Service] = {}
+        self._queue: List[Tuple[float, str]] = []
+        self._executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="job")
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.started_at: Optional[float] = None
+        self._next_renew = 0.0
+        self._next_supervise = 0.0
+
+    def add_job(self, name: str, func: Callable[[], Any], interval: Optional[float], jitter: float = 0.0,
+                leader_only: bool = False, initial_delay: float = 0.0) -> Job:
+        """Run func every interval seconds (once if interval is None)"""
+        job = Job(name, func, interval, jitter, leader_only, initial_delay)
+        with self._lock:
+            self.jobs[name] = job
+            if self.started_at is not None:
+                job.schedule(time.time(), first=True)
+                heapq.heappush(self._queue, (job.next_run, name))
+        return job
+
+    def add_service(self, name: str, start: Callable[[], Any], stop: Callable[[], Any],
+                    is_running: Callable[[], bool], leader_only: bool = False, start_delay: float = 0.0) -> Service:
+        """Keep a service with its own loop running (on the leader only if leader_only)"""
+        service = Service(name, start, stop, is_running, leader_only, start_delay)
+        with self._lock:
+            self.services[name] = service
+            self._next_supervise = 0.0
+        return service
+
+    def set_service_enabled(self, name: str, enabled: bool) -> bool:
+        """Admin start/stop: a disabled service is stopped and not restarted until enabled again"""
+        service = self.services.get(name)
+        if service is None:
+            return False
+        service.enabled = enabled
+        if enabled:
+            self._next_supervise = 0.0
+        elif service.is_running():
+            service.stop()
+        return True
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.started_at = time.time()
+            for job in self.jobs.values():
+                job.schedule(self.started_at, first=True)
+                heapq.heappush(self._queue, (job.next_run, job.name))
+            self._thread = threading.Thread(target=self._run, daemon=True, name="job-runner")
+            self._thread.start()
+        logger.info(f"✅ Job runner started ({len(self.jobs)} jobs, {len(self.services)} services)")
+
+    def stop(self):
+        self._stopped.set()
+        for service in self.services.values():
+            try:
+                if service.is_running():
+                    service.stop()
+            except Exception as e:
+                logger.error(f"❌ Failed to stop service {service.name}: {e}")
+        self.leader.release()
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stopped.is_set():
+            now = time.time()
+            try:
+                if now >= self._next_renew:
+                    self._next_renew = now + LEADER_RENEW
+                    self.leader.renew()
+                if now >= self._next_supervise:
+                    self._next_supervise = now + SUPERVISE_INTERVAL
+                    self._supervise(now)
+                self._dispatch(now)
+            except Exception as e:
+                logger.error(f"❌ Job runner tick failed: {e}")
+            self._stopped.wait(TICK)
+
+    def _dispatch(self, now: float):
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > now:
+                    return
+                scheduled, name = heapq.heappop(self._queue)
+            job = self.jobs.get(name)
+            if job is None:
+                continue
+            if job.leader_only and not self.leader.is_leader:
+                job.skipped += 1
+                self._reschedule(job, now)
+                continue
+            job.running = True
+            self._executor.submit(self._execute, job, scheduled)
+
+    def _execute(self, job: Job, scheduled: float):
+        started = time.time()
+        job.last_started = started
+        job.last_lag = round(max(0.0, started - scheduled), 3)
+        job.max_lag = max(job.max_lag, job.last_lag)
+        try:
+            job.func()
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"❌ Job {job.name} failed: {e}")
+        finally:
+            duration = time.time() - started
+            JOB_SECONDS.observe(duration, job=job.name)
+            job.runs += 1
+            job.last_duration = round(duration, 3)
+            job.total_duration += duration
+            job.max_duration = max(job.max_duration, duration)
+            job.running = False
+            self._reschedule(job, time.time())
+
+    def _reschedule(self, job: Job, after: float):
+        if job.interval is None and job.runs:
+            job.done = True
+            return
+        job.schedule(after)
+        with self._lock:
+            heapq.heappush(self._queue, (job.next_run, job.name))
+
+    def _supervise(self, now: float):
+        leader_since = self.leader.changed_at or self.started_at
+        for service in list(self.services.values()):
+            if service.stopping:
+                continue
+            try:
+                running = bool(service.is_running())
+            except Exception as e:
+                service.last_error = str(e)
+                continue
+            wanted = service.enabled and (self.leader.is_leader or not service.leader_only)
+            if running and not wanted:
+                # Lost leadership (or disabled): stop off the tick thread, loops can take a while to exit
+                service.stopping = True
+                self._executor.submit(self._stop_service, service)
+            elif wanted and not running and now - max(self.started_at, leader_since) >= service.start_delay:
+                self._executor.submit(self._start_service, service)
+
+    def _start_service(self, service: Service):
+        try:
+            if service.starts:
+                service.restarts += 1
+                logger.warning(f"🔄 Service {service.name} not running, restarting")
+            service.start()
+            service.starts += 1
+            service.started_at = time.time()
+            service.last_error = None
+        except Exception as e:
+            service.last_error = str(e)
+            logger.error(f"❌ Failed to start service {service.name}: {e}")
+
+    def _stop_service(self, service: Service):
+        try:
+            service.stop()
+            logger.info(f"🛑 Service {service.name} stopped")
+        except Exception as e:
+            service.last_error = str(e)
+            logger.error(f"❌ Failed to stop service {service.name}: {e}")
+        finally:
+            service.stopping = False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "tier": self.leader.name,
+            "holder": self.leader.holder,
+            "leader": self.leader.is_leader,
+            "leader_backend": self.leader.backend,
+            "uptime": round(time.time() - self.started_at, 1) if self.started_at else None,
+            "jobs": {name: job.status() for name, job in self.jobs.items()},
+            "services": {name: service.status() for name, service in self.services.items()},
+        }
+
+
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner()
+    return _job_runner
@@ -0,0 +1,193 @@
+"""
+Market Extractors
+Per-sport odds extractors for GoalServe pre-match matches, compiled from the market tables in parsers.py
+
+The market name -> frontend key table, the 1X2 outcome names and the per-sport
+rules (primary market, no-draw sports, cricket targets) live in parsers.py next
+to the generic normalizer. Each sport gets one extractor closure built from those
+tables on first use; market names are resolved through the memoized
+parsers.goalserve_market_key, so the per-match work is a single pass over the
+markets with dict lookups and no logging.
+
+The output is the odds dict json_sports.extract_odds_from_match has always
+returned: <market_key> -> odds list, <market_key>_market_id and has_draw.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from parsers import (
+    GOALSERVE_1X2_OUTCOMES,
+    GOALSERVE_CRICKET_BOOKMAKER,
+    GOALSERVE_CRICKET_MARKETS,
+    GOALSERVE_NO_DRAW_SPORTS,
+    GOALSERVE_PRIMARY_MARKET,
+    goalserve_market_key,
+)
+
+_CRICKET_MARKET_NAMES = frozenset(GOALSERVE_CRICKET_MARKETS.values())
+
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _valid_price(value) -> bool:
+    try:
+        return float(value) > 1.0
+    except (ValueError, TypeError):
+        return False
+
+
+def _cricket_bookmaker(bookmaker_field) -> Optional[Dict[str, Any]]:
+    for bookmaker in _as_list(bookmaker_field):
+        if isinstance(bookmaker, dict) and str(bookmaker.get('id')) == GOALSERVE_CRICKET_BOOKMAKER:
+            return bookmaker
+    return None
+
+
+def extract_cricket_specific_markets(match_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cricket markets (odds.type[] feed shape) from the bet365 bookmaker:
+    Home/Away ("2"), Most Run Outs ("23511"), Most Sixes ("23512"), Most Fours ("23513")
+    """
+    cricket_markets = {}
+    odds = match_data.get('odds')
+    if not isinstance(odds, dict) or 'type' not in odds:
+        return cricket_markets
+
+    for odd_type in _as_list(odds.get('type')):
+        if not isinstance(odd_type, dict):
+            continue
+        tid = str(odd_type.get('id'))
+        tval = odd_type.get('value')
+        if tid not in GOALSERVE_CRICKET_MARKETS and tval not in _CRICKET_MARKET_NAMES:
+            continue
+        bookmaker = _cricket_bookmaker(odd_type.get('bookmaker'))
+        if not bookmaker:
+            continue
+
+        selections = {}
+        for o in _as_list(bookmaker.get('odd')):
+            if isinstance(o, dict):
+                selections[str(o.get('name')).lower()] = o.get('value')
+
+        market = GOALSERVE_CRICKET_MARKETS.get(tid) or tval
+        market_key = market.lower().replace(' ', '_').replace('/', '_')
+        cricket_markets[market_key] = {
+            'market_id': tid,
+            'market_name': tval,
+            # Frontend expects a plain odds array: home, away, draw
+            'odds': [selections[name] for name in ('home', 'away', 'draw') if name in selections],
+        }
+
+    return cricket_markets
+
+
+def _cricket_odds(match: Dict[str, Any]) -> Dict[str, Any]:
+    cricket_markets = extract_cricket_specific_markets(match)
+    all_odds = {}
+    for market_key, market_data in cricket_markets.items():
+        if market_data['odds']:
+            all_odds[market_key] = market_data['odds']
+            all_odds[f"{market_key}_market_id"] = market_data['market_id']
+            all_odds[f"{market_key}_market_name"] = market_data['market_name']
+
+    # Legacy support: also publish match_result for backward compatibility
+    if 'home_away' in cricket_markets:
+        home_away = cricket_markets['home_away']
+        all_odds['match_result'] = home_away['odds']
+        all_odds['match_result_market_id'] = home_away['market_id']
+        all_odds['home_away'] = home_away['odds']
+        all_odds['home_away_market_id'] = home_away['market_id']
+    return all_odds
+
+
+def compile_odds_extractor(sport_name: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Build the odds extractor for one sport from the parsers.py tables"""
+    primary_market = GOALSERVE_PRIMARY_MARKET.get(sport_name)
+    no_draw = sport_name in GOALSERVE_NO_DRAW_SPORTS
+    outcome_slots = GOALSERVE_1X2_OUTCOMES
+    market_key_for = goalserve_market_key
+
+    def extract(match: Dict[str, Any]) -> Dict[str, Any]:
+        if 'odds' not in match:
+            return {}
+        markets = match['odds']
+        if isinstance(markets, dict) and 'type' in markets:
+            return _cricket_odds(match)
+
+        all_odds = {}
+        chosen_3way = None   # (odds, market_id)
+        chosen_2way = None
+
+        for market in _as_list(markets):
+            if not isinstance(market, dict) or not market.get('bookmakers'):
+                continue
+            bookmaker = _as_list(market['bookmakers'])[0]
+            if not isinstance(bookmaker, dict) or 'odds' not in bookmaker:
+                continue
+
+            slots = {}
+            prices = []
+            for outcome in _as_list(bookmaker['odds']):
+                if not isinstance(outcome, dict):
+                    continue
+                value = outcome.get('value', '')
+                if not _valid_price(value):
+                    continue
+                prices.append(value)
+                slot = outcome_slots.get(str(outcome.get('name', '')).lower())
+                if slot:
+                    slots[slot] = value
+
+            market_name = market.get('value', '')
+            market_id = market.get('id', '')
+
+            if '1' in slots and '2' in slots:
+                # Winner-style market: candidate for match_result / home_away
+                is_3way = 'X' in slots
+                odds = [slots['1'], slots['X'], slots['2']] if is_3way else [slots['1'], slots['2']]
+                if primary_market is not None:
+                    if not is_3way and primary_market in market_name.lower():
+                        chosen_2way = (odds, market_id)
+                elif is_3way:
+                    # Prefer the first valid 3-way market; never overwrite with 2-way later
+                    if chosen_3way is None:
+                        chosen_3way = (odds, market_id)
+                elif chosen_2way is None and chosen_3way is None:
+                    chosen_2way = (odds, market_id)
+            elif prices:
+                frontend_key = market_key_for(market_name)
+                if frontend_key:
+                    if frontend_key != 'match_result':  # match_result is set by priority below
+                        all_odds[frontend_key] = prices
+                    if market_id:
+                        all_odds[f"{frontend_key}_market_id"] = market_id
+
+        if chosen_3way is not None:
+            all_odds['match_result'] = chosen_3way[0]
+            all_odds['match_result_market_id'] = str(chosen_3way[1])
+            all_odds['has_draw'] = True
+        elif chosen_2way is not None:
+            # 2-way markets are published as home_away only, to avoid 1X2 UI confusion
+            all_odds['home_away'] = chosen_2way[0]
+            all_odds['home_away_market_id'] = str(chosen_2way[1])
+            all_odds['has_draw'] = False
+
+        if no_draw:
+            all_odds['has_draw'] = False
+        return all_odds
+
+    return extract
+
+
+_extractors: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+
+def get_odds_extractor(sport_name: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    extractor = _extractors.get(sport_name)
+    if extractor is None:
+        extractor = _extractors[sport_name] = compile_odds_extractor(sport_name)
+    return extractor
@@ -0,0 +1,106 @@
+"""
+Odds relay
+Hands pre-match odds from the odds worker to the caches in the web and socket processes
+
+With WORKER_TOPOLOGY=split only the odds worker fetches from GoalServe, and its
+files live on its own volume. After each sport is fetched it stores the payload
+gzip-compressed in Redis (one key per sport, replaced on every fetch) and
+announces it on the pre-match odds stream; every subscribed process loads the
+payload and feeds it to its LiveOddsCacheService exactly as the in-process
+fetcher callback does. A process that starts later hydrates from the stored
+payloads instead of reading files, so it serves odds as soon as it is up.
+
+The web process also mirrors each payload to its own Sports Pre Match folder,
+byte for byte what the odds worker wrote, because the JSON sports routes, the
+public APIs and the sports listing read those files directly. Files are
+replaced atomically, so a response streaming the old file finishes on it.
+"""
+
+import gzip
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src import cache
+from src.services.event_bus import PREMATCH_ODDS_STREAM, get_event_bus
+from src.utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_KEY = "odds:prematch:payload:{sport}"
+PAYLOAD_TTL = 6 * 3600   # seconds; a sport the fetcher stops returning ages out
+MIRROR_PATH = Path(__file__).parent.parent.parent / "Sports Pre Match"
+
+
+def publish_prematch_odds(sport_name: str, odds_data: Dict[str, Any]):
+    """PrematchOddsService callback (odds worker): store the payload and announce it"""
+    if not cache.USE_REDIS:
+        return
+    blob = gzip.compress(json_codec.dumps_bytes(odds_data), compresslevel=6)
+    cache.redis_raw.set(PAYLOAD_KEY.format(sport=sport_name), blob, ex=PAYLOAD_TTL)
+    get_event_bus().publish(PREMATCH_ODDS_STREAM, {"sport": sport_name, "ts": time.time(), "bytes": len(blob)})
+
+
+def _load_raw(sport_name: str) -> Optional[bytes]:
+    blob = cache.redis_raw.get(PAYLOAD_KEY.format(sport=sport_name))
+    return gzip.decompress(blob) if blob else None
+
+
+def load_prematch_odds(sport_name: str) -> Optional[Dict[str, Any]]:
+    raw = _load_raw(sport_name)
+    return json_codec.loads(raw) if raw else None
+
+
+def _mirror_to_file(sport_name: str, raw: bytes):
+    """Replace Sports Pre Match/<sport>/<sport>_odds.json with the relayed payload"""
+    folder = MIRROR_PATH / sport_name
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{sport_name}_odds.json"
+    tmp_path = folder / f".{sport_name}_odds.json.{os.getpid()}.tmp"
+    tmp_path.write_bytes(raw)
+    os.replace(tmp_path, path)
+
+
+def stored_sports() -> List[str]:
+    prefix = PAYLOAD_KEY.format(sport="")
+    return [key.decode("utf-8")[len(prefix):] for key in cache.redis_raw.scan_iter(match=prefix + "*", count=100)]
+
+
+def follow_prematch_odds(cache_service, mirror_files: bool = False):
+    """
+    Keep a LiveOddsCacheService fed from the odds worker: hydrate now, then apply every update
+
+    mirror_files: also keep the local Sports Pre Match files current (web processes)
+    """
+    if not cache.USE_REDIS:
+        logger.warning("⚠️ Redis not configured: pre-match odds can't be relayed from the odds worker")
+        return
+
+    def _apply(payload: Dict[str, Any]):
+        sport_name = payload["sport"]
+        raw = _load_raw(sport_name)
+        if raw is None:
+            return
+        if mirror_files:
+            try:
+                _mirror_to_file(sport_name, raw)
+            except OSError as e:
+                logger.error(f"❌ Could not mirror {sport_name} odds to disk: {e}")
+        cache_service.on_odds_updated(sport_name, json_codec.loads(raw))
+
+    get_event_bus().subscribe(PREMATCH_ODDS_STREAM, _apply)
+
+    def _hydrate():
+        started = time.time()
+        try:
+            sports = stored_sports()
+            for sport_name in sports:
+                _apply({"sport": sport_name})
+            logger.info(f"✅ Odds cache hydrated from Redis: {len(sports)} sports in {time.time() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"❌ Odds cache hydration failed: {e}")
+
+    threading.Thread(target=_hydrate, daemon=True, name="odds-hydrate").start()
@@ -0,0 +1,293 @@
+"""
+Provably Fair Service
+Committed server-seed chains and precomputed crash multipliers
+
+Each user has one active server seed whose SHA-256 hash is published before any
+round is played. Rounds consume an incrementing nonce, and the multiplier for
+(server_seed, client_seed, nonce) is read from a per-seed table precomputed in
+batches. Rotating a seed reveals the old server seed so every past round can be
+re-derived offline:
+
+    python -m src.services.provably_fair verify --server-seed <seed> --client-seed <seed> --nonce 7
+"""
+
+import argparse
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+CRASH_TARGET_RTP = 0.96
+CRASH_MAX_MULTIPLIER = 20.0
+
+# ---------------------------------------------------------------------------
+# Crash math (moved from casino_api.py; unchanged)
+# ---------------------------------------------------------------------------
+
+def hmac_sha256(key, msg):
+    """HMAC-SHA256 implementation"""
+    return hmac.new(key.encode('utf-8'), msg.encode('utf-8'), hashlib.sha256).hexdigest()
+
+def hash_to_uniform_01(hex_string):
+    """Convert first 52 bits of hex string to float in [0,1)"""
+    # First 52 bits → 13 hex chars (13 * 4 = 52)
+    frac_hex = hex_string[:13]
+    h = int(frac_hex, 16)
+    E = 2 ** 52
+    return h / E  # r in [0, 1)
+
+def uniform_from_seeds(server_seed, client_seed, nonce):
+    """Generate provably fair uniform random number from seeds"""
+    msg = f"{client_seed}:{nonce}"
+    hex_hash = hmac_sha256(server_seed, msg)
+    return hash_to_uniform_01(hex_hash)
+
+def crash_multiplier(target_rtp, server_seed="default_server_seed", client_seed="default_client_seed", nonce=0):
+    """Provably fair crash multiplier with exact RTP = target_rtp"""
+    alpha = float(target_rtp)  # e.g. 0.96
+
+    # provably-fair r in [0,1)
+    r = uniform_from_seeds(server_seed, client_seed, nonce)
+
+    # ✅ Correct α-scaled fair crash:
+    #   M_fair = 1/(1-r) has tail P(M_fair >= x) = 1/x
+    #   M = α * M_fair  ⇒  P(M >= x) = α/x  ⇒ EV at any cashout x is α
+    denom = max(1e-12, 1.0 - r)
+    m = alpha / denom
+
+    # Map the <1x mass (prob = 1-α) to an explicit 1.00x insta-bust
+    if m < 1.0:
+        m = 1.0
+
+    # Cap at 20x for risk management (matches UI)
+    m = min(m, CRASH_MAX_MULTIPLIER)
+
+    return round(m, 2)
+
+def hash_server_seed(server_seed: str) -> str:
+    """Public commitment for a server seed"""
+    return hashlib.sha256(server_seed.encode('utf-8')).hexdigest()
+
+def new_server_seed() -> str:
+    return secrets.token_hex(32)
+
+def new_client_seed() -> str:
+    return secrets.token_hex(8)
+
+# ---------------------------------------------------------------------------
+# Precomputed multiplier store
+# ---------------------------------------------------------------------------
+
+class CrashRoundStore:
+    """
+    Bounded in-process table of precomputed multipliers per seed
+
+    Multipliers are a pure function of the seeds, so every instance derives the
+    same values locally; a shared store would only add a network round trip.
+    """
+
+    def __init__(self, batch_size: int = 256, max_seeds: int = 2000):
+        self.batch_size = batch_size
+        self.max_seeds = max_seeds
+        self._tables: "OrderedDict[int, tuple]" = OrderedDict()  # seed_id -> (start_nonce, array('d'))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def precompute(self, seed_id: int, server_seed: str, client_seed: str, start_nonce: int) -> array:
+        """Compute (and return) the next batch of multipliers starting at start_nonce"""
+        table = array('d', (
+            crash_multiplier(CRASH_TARGET_RTP, server_seed, client_seed, nonce)
+            for nonce in range(start_nonce, start_nonce + self.batch_size)
+        ))
+        with self._lock:
+            self._tables[seed_id] = (start_nonce, table)
+            self._tables.move_to_end(seed_id)
+            while len(self._tables) > self.max_seeds:
+                self._tables.popitem(last=False)
+        return table
+
+    def get(self, seed_id: int, server_seed: str, client_seed: str, nonce: int) -> float:
+        """O(1) multiplier lookup; refills the batch on a miss"""
+        entry = self._tables.get(seed_id)
+        if entry is not None:
+            start, table = entry
+            offset = nonce - start
+            if 0 <= offset < len(table):
+                self.hits += 1
+                return table[offset]
+        self.misses += 1
+        # Use the batch we computed: another thread may have replaced or evicted the entry already
+        return self.precompute(seed_id, server_seed, client_seed, nonce)[0]
+
+    def evict(self, seed_id: int):
+        with self._lock:
+            self._tables.pop(seed_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'seeds_cached': len(self._tables),
+            'batch_size': self.batch_size,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+_round_store = CrashRoundStore()
+
+def get_crash_round_store() -> CrashRoundStore:
+    return _round_store
+
+# ---------------------------------------------------------------------------
+# Seed chain (crash_seed table, see migrations/add_crash_seed_chain.py)
+# ---------------------------------------------------------------------------
+
+def public_seed(row) -> Dict[str, Any]:
+    """Client-safe view of a seed row (never includes the unrevealed server seed)"""
+    return {
+        'seed_id': row['id'],
+        'server_seed_hash': row['server_seed_hash'],
+        'client_seed': row['client_seed'],
+        'next_nonce': row['next_nonce'],
+        'created_at': row['created_at'].isoformat() if row.get('created_at') else None,
+    }
+
+def _create_active_seed(cursor, user_id, client_seed: Optional[str] = None):
+    server_seed = new_server_seed()
+    cursor.execute("""
+        INSERT INTO crash_seed (user_id, server_seed, server_seed_hash, client_seed, next_nonce, status)
+        VALUES (%s, %s, %s, %s, 0, 'active')
+        ON CONFLICT (user_id) WHERE status = 'active' DO NOTHING
+        RETURNING id, server_seed, server_seed_hash, client_seed, next_nonce, created_at
+    """, (str(user_id), server_seed, hash_server_seed(server_seed), client_seed or new_client_seed()))
+    row = cursor.fetchone()
+    if row:
+        _round_store.precompute(row['id'], row['server_seed'], row['client_seed'], 0)
+    return row
+
+def find_active_seed(cursor, user_id):
+    """Return the user's active seed row, or None if they don't have one yet (read-only)"""
+    cursor.execute("""
+        SELECT id, server_seed, server_seed_hash, client_seed, next_nonce, created_at
+        FROM crash_seed
+        WHERE user_id = %s AND status = 'active'
+    """, (str(user_id),))
+    return cursor.fetchone()
+
+def get_active_seed(cursor, user_id):
+    """Return the user's active seed row, creating (and committing to) one if needed"""
+    row = find_active_seed(cursor, user_id)
+    if row:
+        return row
+    # Lost a creation race to another request: read the winner's row
+    return _create_active_seed(cursor, user_id) or get_active_seed(cursor, user_id)
+
+def next_crash_round(cursor, user_id) -> Dict[str, Any]:
+    """
+    Claim the next nonce on the user's active seed and look up its multiplier
+
+    Runs on the caller's cursor so the nonce is consumed in the same transaction
+    as the game_round insert.
+    """
+    row = None
+    for _ in range(2):
+        cursor.execute("""
+            UPDATE crash_seed
+            SET next_nonce = next_nonce + 1
+            WHERE user_id = %s AND status = 'active'
+            RETURNING id, server_seed, server_seed_hash, client_seed, next_nonce - 1 AS nonce
+        """, (str(user_id),))
+        row = cursor.fetchone()
+        if row:
+            break
+        # First round for this user (or a concurrent rotation): commit to a seed and retry
+        get_active_seed(cursor, user_id)
+    if row is None:
+        raise RuntimeError(f"No active crash seed for user {user_id} after retrying")
+    multiplier = _round_store.get(row['id'], row['server_seed'], row['client_seed'], row['nonce'])
+    return {
+        'seed_id': row['id'],
+        'server_seed_hash': row['server_seed_hash'],
+        'client_seed': row['client_seed'],
+        'nonce': row['nonce'],
+        'multiplier': multiplier,
+    }
+
+def rotate_seed(cursor, user_id, client_seed: Optional[str] = None) -> Dict[str, Any]:
+    """Reveal the active server seed and commit to a fresh one"""
+    cursor.execute("""
+        UPDATE crash_seed
+        SET status = 'revealed', revealed_at = CURRENT_TIMESTAMP
+        WHERE user_id = %s AND status = 'active'
+        RETURNING id, server_seed, server_seed_hash, client_seed, next_nonce, created_at, revealed_at
+    """, (str(user_id),))
+    revealed = cursor.fetchone()
+    if revealed:
+        _round_store.evict(revealed['id'])
+
+    active = _create_active_seed(cursor, user_id, client_seed)
+    return {
+        'revealed': {
+            **public_seed(revealed),
+            'server_seed': revealed['server_seed'],
+            'rounds_played': revealed['next_nonce'],
+            'revealed_at': revealed['revealed_at'].isoformat() if revealed['revealed_at'] else None,
+        } if revealed else None,
+        'active': public_seed(active) if active else None,
+    }
+
+def list_revealed_seeds(cursor, user_id, limit: int = 20) -> List[Dict[str, Any]]:
+    cursor.execute("""
+        SELECT id, server_seed, server_seed_hash, client_seed, next_nonce, created_at, revealed_at
+        FROM crash_seed
+        WHERE user_id = %s AND status = 'revealed'
+        ORDER BY revealed_at DESC
+        LIMIT %s
+    """, (str(user_id), limit))
+    return [{
+        **public_seed(row),
+        'server_seed': row['server_seed'],
+        'rounds_played': row['next_nonce'],
+        'revealed_at': row['revealed_at'].isoformat() if row['revealed_at'] else None,
+    } for row in cursor.fetchall()]
+
+def verify_round(server_seed: str, client_seed: str, nonce: int,
+                 server_seed_hash: Optional[str] = None) -> Dict[str, Any]:
+    """Re-derive a round's multiplier from revealed seeds (no DB access)"""
+    result = {
+        'server_seed_hash': hash_server_seed(server_seed),
+        'client_seed': client_seed,
+        'nonce': nonce,
+        'multiplier': crash_multiplier(CRASH_TARGET_RTP, server_seed, client_seed, nonce),
+    }
+    if server_seed_hash is not None:
+        result['hash_matches'] = hmac.compare_digest(result['server_seed_hash'], server_seed_hash)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline provably-fair crash verification")
+    sub = parser.add_subparsers(dest='command', required=True)
+    verify = sub.add_parser('verify', help="re-derive crash multipliers from revealed seeds")
+    verify.add_argument('--server-seed', required=True)
+    verify.add_argument('--client-seed', required=True)
+    verify.add_argument('--nonce', type=int, required=True)
+    verify.add_argument('--count', type=int, default=1, help="verify this many consecutive nonces")
+    verify.add_argument('--hash', default=None, help="published server seed hash to check against")
+    args = parser.parse_args(argv)
+
+    for nonce in range(args.nonce, args.nonce + args.count):
+        result = verify_round(args.server_seed, args.client_seed, nonce, args.hash)
+        check = ''
+        if 'hash_matches' in result:
+            check = '  ✅ hash matches' if result['hash_matches'] else '  ❌ hash mismatch'
+        print(f"nonce={nonce:<8} multiplier={result['multiplier']:.2f}x{check}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Slot Engine
+5-reel, 20-payline slot machine with reel strips, paylines and paytable compiled once at import
+
+Used by the /api/casino/slots endpoints and by the RTP tools (casino_simulator,
+analyze_20_payline_rtp.py). For a given random seed, spin() and evaluate()
+produce exactly the same reels, wins and payouts as the original
+spin_reels / evaluate_slots implementation.
+"""
+
+import random
+from typing import List, Tuple, Dict, Any
+
+# Symbols and their stops on the 100-stop reel strip
+# 🍓: 19%, 🍎: 18%, 🥝: 17%, 🍑: 17%, 🍒/🍌/🍊/🍇: 7% each, 💎: 1%
+SYMBOLS = ('💎', '🍒', '🍌', '🍊', '🍇', '🍓', '🍎', '🥝', '🍑')
+SYMBOL_STOPS = (1, 7, 7, 7, 7, 19, 18, 17, 17)
+SYMBOL_BUCKETS = ('diamond', 'high', 'high', 'high', 'high', 'medium', 'medium', 'medium', 'medium')
+
+REELS = 5
+ROWS = 3
+
+# 20 fixed paylines (row index per reel)
+LINES = (
+    (0,0,0,0,0), (1,1,1,1,1), (2,2,2,2,2), (0,0,0,1,2), (2,2,2,1,0),
+    (0,1,2,1,0), (2,1,0,1,2), (0,0,1,2,2), (2,2,1,0,0), (1,0,0,0,1),
+    (1,2,2,2,1), (0,1,1,1,0), (2,1,1,1,2), (1,1,0,1,1), (1,1,2,1,1),
+    (0,1,0,1,0), (2,1,2,1,2), (0,2,0,2,0), (2,0,2,0,2), (0,2,1,0,2)
+)
+
+# Paytable (multipliers per line bet) - ~96% RTP, ~28% hit rate
+PAYTABLE = {
+    'diamond': {3: 81.0, 4: 400.0, 5: 4200.0},
+    'high': {3: 33.0, 4: 160.0, 5: 1005.0},      # 🍒🍌🍊🍇
+    'medium': {3: 17.0, 4: 66.0, 5: 505.0}       # 🍓🍎🥝🍑
+}
+
+ROYAL_LINE = 1  # middle row (line 2, 1-indexed)
+ROYAL_PAYOUT = 2000.0
+ROYAL_SEQUENCE = ('🍒', '🍌', '🍊', '🍇', '🍓')
+
+# ---------------------------------------------------------------------------
+# Compiled tables
+# ---------------------------------------------------------------------------
+
+REEL_STRIP = tuple(symbol for symbol, stops in zip(SYMBOLS, SYMBOL_STOPS) for _ in range(stops))
+assert len(REEL_STRIP) == 100, f"Reel strip should have 100 stops, got {len(REEL_STRIP)}"
+
+# symbol -> multiplier indexed by run length (0-5)
+_PAY_BY_SYMBOL = {
+    symbol: tuple(PAYTABLE[bucket].get(k, 0.0) for k in range(6))
+    for symbol, bucket in zip(SYMBOLS, SYMBOL_BUCKETS)
+}
+
+# Per line: (line_index, line_name, row on reel 0..4)
+_COMPILED_LINES = tuple(
+    (idx, f"line_{idx + 1}", line[0], line[1], line[2], line[3], line[4])
+    for idx, line in enumerate(LINES)
+)
+_MEDIUM_PAYS = tuple(PAYTABLE['medium'].get(k, 0.0) for k in range(6))
+_ROYAL_ROW = LINES[ROYAL_LINE][0]
+_R0, _R1, _R2, _R3, _R4 = ROYAL_SEQUENCE
+
+
+def spin(rng: random.Random = None) -> List[List[str]]:
+    """Generate a 5x3 grid of symbols (reels[reel][row]) from the weighted reel strip"""
+    choice = (rng or random).choice
+    strip = REEL_STRIP
+    return [
+        [choice(strip), choice(strip), choice(strip)]
+        for _ in range(REELS)
+    ]
+
+
+def evaluate(reels, stake) -> Tuple[float, List[Dict[str, Any]]]:
+    """Evaluate all 20 paylines; returns (total_payout, wins) in payline order"""
+    if not reels or len(reels) != REELS:
+        return 0, []
+
+    reel0, reel1, reel2, reel3, reel4 = reels
+    line_bet = stake / 20.0
+    total_payout = 0.0
+    wins = []
+
+    # Royal sequence on the middle row takes priority over a regular line win
+    royal = (reel0[_ROYAL_ROW] == _R0 and reel1[_ROYAL_ROW] == _R1 and reel2[_ROYAL_ROW] == _R2
+             and reel3[_ROYAL_ROW] == _R3 and reel4[_ROYAL_ROW] == _R4)
+
+    for idx, name, a, b, c, d, e in _COMPILED_LINES:
+        if royal and idx == ROYAL_LINE:
+            payout = line_bet * ROYAL_PAYOUT
+            total_payout += payout
+            wins.append({
+                "symbol": "royal_sequence",
+                "count": 5,
+                "payout": payout,
+                "line": "line_2_royal",
+                "multiplier": ROYAL_PAYOUT
+            })
+            continue
+
+        symbol = reel0[a]
+        if reel1[b] != symbol or reel2[c] != symbol:
+            continue
+        if reel3[d] != symbol:
+            k = 3
+        elif reel4[e] != symbol:
+            k = 4
+        else:
+            k = 5
+
+        multiplier = _PAY_BY_SYMBOL.get(symbol, _MEDIUM_PAYS)[k]
+        payout = line_bet * multiplier
+        total_payout += payout
+        wins.append({
+            "symbol": symbol,
+            "count": k,
+            "payout": payout,
+            "line": name,
+            "multiplier": multiplier
+        })
+
+    return total_payout, wins
+
+
+def spin_and_evaluate(stake, rng: random.Random = None):
+    """Spin once and evaluate; returns (reels, payout, wins)"""
+    reels = spin(rng)
+    payout, wins = evaluate(reels, stake)
+    return reels, payout, wins
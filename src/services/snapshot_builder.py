@@ -1,113 +1,136 @@
 """
 Snapshot builder service
-Builds a full odds snapshot from all sports data
+Builds the sharded public odds snapshot (one shard per sport) from the pre-match files
+
+Each shard is the sport's odds_data serialized once and gzip-compressed. A sport
+whose file is unchanged since the previous manifest (same mtime and size) is not
+re-read, and a shard whose content hash is unchanged keeps its version, so a
+rebuild usually touches only the sports GoalServe actually updated.
 """
 
+import gzip
+import hashlib
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
-import os
 from pathlib import Path
-import json
+import time
+
+from src import cache
+from src.utils import json_codec
 
 logger = logging.getLogger(__name__)
 
-def build_full_snapshot() -> Dict[str, Any]:
-    """Build a complete odds snapshot from all available sports data"""
-    try:
-        logger.info("🔄 Building full odds snapshot...")
-        
-        snapshot = {
-            "ts": datetime.now().isoformat(),
-            "type": "snapshot",
-            "data": {}
-        }
-        
-        # Find the Sports Pre Match folder
-        sports_folders = [
-            Path("Sports Pre Match"),
-            Path("src/Sports Pre Match"),
-            Path(__file__).parent.parent.parent / "Sports Pre Match",
-            Path.cwd() / "Sports Pre Match"
-        ]
-        
-        sports_folder = None
-        for folder in sports_folders:
-            if folder.exists() and folder.is_dir():
-                sports_folder = folder
-                break
-        
-        if not sports_folder:
-            logger.warning("⚠️ Sports Pre Match folder not found, returning empty snapshot")
-            return snapshot
-        
-        logger.info(f"📁 Using sports folder: {sports_folder}")
-        
-        # Scan all sport directories
-        sports_processed = 0
-        for sport_dir in sports_folder.iterdir():
+MAX_EVENTS_PER_SHARD = 400  # list-shaped sport data is capped to bound the payload
+
+def find_sports_folder() -> Optional[Path]:
+    """Locate the Sports Pre Match folder"""
+    sports_folders = [
+        Path("Sports Pre Match"),
+        Path("src/Sports Pre Match"),
+        Path(__file__).parent.parent.parent / "Sports Pre Match",
+        Path.cwd() / "Sports Pre Match"
+    ]
+    for folder in sports_folders:
+        if folder.exists() and folder.is_dir():
+            return folder
+    return None
+
+def _load_odds_data(odds_file: Path) -> Any:
+    sport_data = json_codec.load_path(odds_file)
+    # Extract the actual odds data
+    if isinstance(sport_data, dict) and 'odds_data' in sport_data:
+        return sport_data['odds_data']
+    return sport_data
+
+def serialize_shard(odds_data: Any) -> Tuple[bytes, int, str]:
+    """(gzip blob, uncompressed size, content hash) for one sport's odds data"""
+    if isinstance(odds_data, list):
+        odds_data = odds_data[:MAX_EVENTS_PER_SHARD]
+    raw = json_codec.dumps_bytes(odds_data)
+    # mtime=0 keeps the blob deterministic for identical content
+    return gzip.compress(raw, compresslevel=6, mtime=0), len(raw), hashlib.sha256(raw).hexdigest()[:32]
+
+def build_snapshot_shards(previous: Optional[Dict[str, Any]] = None,
+                          force: Tuple[str, ...] = ()) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+    """
+    Build the manifest and the shards that changed since `previous`
+
+    Returns (manifest, {sport: gzip blob}); sports in `force` are re-read even if
+    their file looks unchanged (e.g. their stored shard expired).
+    """
+    now = datetime.now().isoformat()
+    prev_shards = (previous or {}).get('shards', {})
+    shards: Dict[str, Dict[str, Any]] = {}
+    new_blobs: Dict[str, bytes] = {}
+
+    sports_folder = find_sports_folder()
+    if not sports_folder:
+        logger.warning("⚠️ Sports Pre Match folder not found, returning empty snapshot")
+    else:
+        for sport_dir in sorted(sports_folder.iterdir()):
             if not sport_dir.is_dir():
                 continue
-                
             sport_name = sport_dir.name
-            
-            # Look for the main odds file
             odds_file = sport_dir / f"{sport_name}_odds.json"
             if not odds_file.exists():
                 continue
-            
+
+            stat = odds_file.stat()
+            prev = prev_shards.get(sport_name)
+            if (prev and sport_name not in force and prev.get('file_mtime_ns') == stat.st_mtime_ns
+                    and prev.get('file_size') == stat.st_size):
+                shards[sport_name] = prev
+                continue
+
             try:
-                # Read the odds data
-                with open(odds_file, 'r', encoding='utf-8') as f:
-                    sport_data = json.load(f)
-                
-                # Extract the actual odds data
-                if isinstance(sport_data, dict) and 'odds_data' in sport_data:
-                    odds_data = sport_data['odds_data']
-                else:
-                    odds_data = sport_data
-                
-                # Add to snapshot
-                snapshot["data"][sport_name] = odds_data
-                sports_processed += 1
-                
-                logger.debug(f"✅ Added {sport_name} to snapshot")
-                
+                blob, size, digest = serialize_shard(_load_odds_data(odds_file))
             except Exception as e:
                 logger.error(f"❌ Error reading {sport_name} odds: {e}")
+                if prev:
+                    shards[sport_name] = prev  # keep serving the last good shard
                 continue
-        
-        logger.info(f"✅ Built snapshot with {sports_processed} sports")
-        return snapshot
-        
-    except Exception as e:
-        logger.error(f"❌ Error building snapshot: {e}")
-        return {
-            "ts": datetime.now().isoformat(),
-            "type": "snapshot",
-            "data": {},
-            "error": str(e)
-        }
+
+            changed = not prev or prev['hash'] != digest
+            shards[sport_name] = {
+                'version': (prev['version'] + 1 if changed else prev['version']) if prev else 1,
+                'hash': digest,
+                'bytes': size,
+                'gzip_bytes': len(blob),
+                'updated_at': now if changed else prev.get('updated_at', now),
+                'file_mtime_ns': stat.st_mtime_ns,
+                'file_size': stat.st_size,
+            }
+            if changed or sport_name in force:
+                new_blobs[sport_name] = blob
+
+    manifest = {
+        'ts': now,
+        'built_at': time.time(),
+        'etag': hashlib.sha1('|'.join(f"{s}:{m['hash']}" for s, m in shards.items()).encode('utf-8')).hexdigest()[:32],
+        'shards': shards,
+    }
+    return manifest, new_blobs
+
+def refresh_snapshot() -> Dict[str, Any]:
+    """Rebuild changed shards, store them with a new manifest and return the manifest"""
+    started = time.time()
+    previous = cache.get_manifest()
+    missing = ()
+    if previous and previous.get('shards'):
+        missing = tuple(cache.missing_shards({s: m['hash'] for s, m in previous['shards'].items()}))
+    manifest, new_blobs = build_snapshot_shards(previous, force=missing)
+    cache.save_snapshot(manifest, new_blobs)
+    logger.info(f"✅ Built snapshot with {len(manifest['shards'])} sports "
+                f"({len(new_blobs)} shards rebuilt) in {time.time() - started:.2f}s")
+    return manifest
 
 def build_sport_snapshot(sport_name: str) -> Dict[str, Any]:
     """Build a snapshot for a specific sport"""
     try:
         logger.info(f"🔄 Building snapshot for {sport_name}...")
         
-        # Find the Sports Pre Match folder
-        sports_folders = [
-            Path("Sports Pre Match"),
-            Path("src/Sports Pre Match"),
-            Path(__file__).parent.parent.parent / "Sports Pre Match",
-            Path.cwd() / "Sports Pre Match"
-        ]
-        
-        sports_folder = None
-        for folder in sports_folders:
-            if folder.exists() and folder.is_dir():
-                sports_folder = folder
-                break
-        
+        sports_folder = find_sports_folder()
         if not sports_folder:
             logger.warning(f"⚠️ Sports Pre Match folder not found for {sport_name}")
             return None
@@ -123,15 +146,7 @@ def build_sport_snapshot(sport_name: str) -> Dict[str, Any]:
             logger.warning(f"⚠️ Odds file not found: {odds_file}")
             return None
         
-        # Read the odds data
-        with open(odds_file, 'r', encoding='utf-8') as f:
-            sport_data = json.load(f)
-        
-        # Extract the actual odds data
-        if isinstance(sport_data, dict) and 'odds_data' in sport_data:
-            return sport_data['odds_data']
-        else:
-            return sport_data
+        return _load_odds_data(odds_file)
             
     except Exception as e:
         logger.error(f"❌ Error building {sport_name} snapshot: {e}")
@@ -0,0 +1,160 @@
+"""
+Snapshot refresher
+Single background builder for the sharded public odds snapshot
+
+One thread per process waits for PrematchOddsService to report new odds (or for
+REFRESH_INTERVAL to pass) and then rebuilds the changed shards. Across instances
+only the holder of a Redis leader lock rebuilds; the lock is renewed every
+LEADER_RENEW seconds (between passes too, since REFRESH_INTERVAL is longer than
+the TTL) and expires if the leader dies, so another instance takes over within
+LEADER_TTL. Readers never build: they serve the last stored manifest, however
+old, and at most nudge the refresher, so a burst of requests can't turn into a
+burst of rebuilds.
+
+In the combined topology each instance runs its own GoalServe fetch loop, so the
+leader's pre-match files are the snapshot's source. With WORKER_TOPOLOGY=split
+only the odds worker builds, and it hands leadership to its job runner
+(leader_check) so the builder is always the instance that fetches; web
+processes just read. Without Redis the process is always the leader.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from src import cache
+from src.services.event_bus import PROCESS_TYPE, SPLIT_WORKERS
+from src.services.snapshot_builder import refresh_snapshot
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "odds:snapshot:refresher:leader"
+LEADER_TTL = 30                                                      # seconds
+LEADER_RENEW = LEADER_TTL // 3                                       # heartbeat between passes
+REFRESH_INTERVAL = int(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "60"))  # rebuild at least this often
+DEBOUNCE_SECONDS = 1.0   # coalesce the per-sport callbacks of one fetch
+
+# Renew only if we still hold the lock
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class SnapshotRefresher:
+    def __init__(self):
+        self.token = uuid.uuid4().hex
+        self.is_leader = False
+        self.leader_check: Optional[Callable[[], bool]] = None  # replaces the Redis lock when set
+        self._wake = threading.Event()
+        self._built = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.last_refresh: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.refreshes = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="snapshot-refresher")
+                self._thread.start()
+                logger.info("✅ Snapshot refresher started")
+
+    def on_odds_updated(self, sport_name: str, odds_data: Dict[str, Any]):
+        """PrematchOddsService callback: new odds on disk for a sport"""
+        self._wake.set()
+
+    def request_refresh(self):
+        """Ask for a rebuild soon (no-op on instances that aren't the leader)"""
+        if SPLIT_WORKERS and PROCESS_TYPE != "worker_odds":
+            return  # the odds worker builds; it has the files
+        self.start()
+        self._wake.set()
+
+    def wait_for_snapshot(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Cold start only: wait for a first manifest to appear (built here or by the leader)"""
+        self.request_refresh()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            manifest = cache.get_manifest()
+            if manifest:
+                return manifest
+            self._built.wait(min(0.5, max(0.0, deadline - time.time())))
+        return cache.get_manifest()
+
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        self._wake.set()  # build once at startup if we are the leader
+        next_refresh = 0.0
+        while True:
+            woke = self._wake.wait(timeout=max(0.0, min(LEADER_RENEW, next_refresh - time.time())))
+            if woke:
+                time.sleep(DEBOUNCE_SECONDS)
+            self._wake.clear()
+            try:
+                was_leader = self.is_leader
+                if not self._acquire_leadership():
+                    next_refresh = time.time() + LEADER_RENEW  # try for the lock again at the next heartbeat
+                    continue
+                # Heartbeats only renew; build when woken, when due, or on taking over
+                if woke or not was_leader or time.time() >= next_refresh:
+                    next_refresh = time.time() + REFRESH_INTERVAL
+                    refresh_snapshot()
+                    self.last_refresh = time.time()
+                    self.refreshes += 1
+                    self.last_error = None
+                    self._built.set()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Snapshot refresh failed: {e}")
+                time.sleep(5)
+
+    def _acquire_leadership(self) -> bool:
+        if self.leader_check is not None:
+            self.is_leader = bool(self.leader_check())
+            return self.is_leader
+        if not cache.USE_REDIS:
+            self.is_leader = True
+            return True
+        try:
+            ttl_ms = LEADER_TTL * 1000
+            if self.is_leader and cache.redis.eval(_RENEW_SCRIPT, 1, LEADER_KEY, self.token, ttl_ms):
+                return True
+            was_leader = self.is_leader
+            self.is_leader = bool(cache.redis.set(LEADER_KEY, self.token, nx=True, px=ttl_ms))
+            if self.is_leader != was_leader:
+                logger.info("👑 Snapshot refresher is now the leader" if self.is_leader
+                            else "👥 Snapshot refresher lost leadership")
+            return self.is_leader
+        except Exception as e:
+            # Redis unreachable: readers can't see a shared manifest either, so build locally
+            logger.warning(f"⚠️ Snapshot leader lock unavailable, refreshing locally: {e}")
+            self.is_leader = True
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "leader": self.is_leader,
+            "refreshes": self.refreshes,
+            "last_refresh_age": time.time() - self.last_refresh if self.last_refresh else None,
+            "last_error": self.last_error,
+            "refresh_interval": REFRESH_INTERVAL,
+        }
+
+
+_snapshot_refresher: Optional[SnapshotRefresher] = None
+
+
+def get_snapshot_refresher() -> SnapshotRefresher:
+    global _snapshot_refresher
+    if _snapshot_refresher is None:
+        _snapshot_refresher = SnapshotRefresher()
+    return _snapshot_refresher
@@ -0,0 +1,258 @@
+"""
+Storefront Cache
+Pre-rendered, per-tenant customer landing pages
+
+The betting interface is static/index.html with the operator's API base, custom
+CSS/JS and branding config injected. Rendering it reads the template, runs the
+injections and regenerates the CSS/JS strings, so it is done once per tenant and
+kept here together with gzip (and, when the brotli package is installed, br)
+variants, each with its own strong ETag (the identity ETag plus -gzip / -br).
+Page views become a dict lookup and a 304 when the browser already has the
+current page.
+
+Entries are keyed by (subdomain, variant, api_base) and remember a fingerprint of
+the branding they were rendered from, so a changed branding always re-renders.
+The API base comes from API_BASE_URL only, never from the request's Host (which
+ProxyFix takes from X-Forwarded-Host): unset, pages carry an empty base and the
+page script uses its own origin.
+Tenant invalidations (local or broadcast from another instance through
+utils/tenant_config_cache.py) drop the tenant's pages immediately.
+
+Set STOREFRONT_CACHE_DIR to also write rendered pages (and their compressed
+variants) to disk, e.g. for a fronting web server.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable
+
+from src.utils import metrics
+from src.utils.cache_registry import register_cache
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'index.html')
+TEMPLATE_CHECK_SECONDS = 5.0   # how often to stat index.html for changes
+MAX_PAGES = 1000               # bounded LRU across tenants/variants
+CACHE_DIR = os.getenv('STOREFRONT_CACHE_DIR')
+
+
+class RenderedPage:
+    __slots__ = ('body', 'gzip', 'br', 'etag', 'fingerprint', 'rendered_at')
+
+    def __init__(self, body: bytes, fingerprint: str):
+        self.body = body
+        self.gzip = gzip.compress(body, compresslevel=9)
+        self.br = brotli.compress(body, quality=11) if brotli else None
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.fingerprint = fingerprint
+        self.rendered_at = time.time()
+
+
+class StorefrontCache:
+    """Bounded in-memory cache of rendered storefront pages"""
+
+    def __init__(self, max_pages: int = MAX_PAGES, cache_dir: Optional[str] = CACHE_DIR):
+        self.max_pages = max_pages
+        self.cache_dir = cache_dir
+        self._pages: "OrderedDict[tuple, RenderedPage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._template: Optional[str] = None
+        self._template_mtime = 0.0
+        self._template_checked = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def template(self) -> str:
+        """index.html contents, re-read only when the file changes"""
+        now = time.time()
+        if self._template is not None and now - self._template_checked < TEMPLATE_CHECK_SECONDS:
+            return self._template
+        mtime = os.stat(TEMPLATE_PATH).st_mtime
+        self._template_checked = now
+        if self._template is None or mtime != self._template_mtime:
+            with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+                self._template = f.read()
+            if self._template_mtime:
+                logger.info("🔄 Storefront template changed, clearing rendered pages")
+                self.clear()
+            self._template_mtime = mtime
+        return self._template
+
+    def get(self, subdomain: str, variant: str, api_base: str, branding: Dict[str, Any],
+            render: Callable[[str], str]) -> RenderedPage:
+        """Return the cached page, rendering it with render(template) on a miss"""
+        key = (subdomain, variant, api_base)
+        fingerprint = _fingerprint(branding)
+        template = self.template()
+
+        page = self._pages.get(key)
+        if page is not None and page.fingerprint == fingerprint:
+            self.hits += 1
+            metrics.CACHE_REQUESTS.inc(cache="storefront", result="hit")
+            return page
+
+        self.misses += 1
+        metrics.CACHE_REQUESTS.inc(cache="storefront", result="miss")
+        page = RenderedPage(render(template).encode('utf-8'), fingerprint)
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        self._write_to_disk(key, page)
+        logger.info(f"🎨 Rendered storefront for {subdomain} ({variant}): "
+                    f"{len(page.body)} bytes, gzip {len(page.gzip)}")
+        return page
+
+    def invalidate(self, subdomain: str) -> int:
+        with self._lock:
+            keys = [k for k in self._pages if k[0] == subdomain]
+            for key in keys:
+                del self._pages[key]
+        for key in keys:
+            self._remove_from_disk(key)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._pages)
+            self._pages.clear()
+        for key in keys:
+            self._remove_from_disk(key)
+
+    def cache_size_bytes(self) -> int:
+        return sum(_page_bytes(page) for page in list(self._pages.values()))
+
+    def cache_entries(self) -> int:
+        return len(self._pages)
+
+    def shrink(self, nbytes: int) -> int:
+        """Memory budget: drop least recently rendered pages (the disk copy is left alone)"""
+        freed = 0
+        with self._lock:
+            while self._pages and freed < nbytes:
+                _, page = self._pages.popitem(last=False)
+                freed += _page_bytes(page)
+        return freed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pages': len(self._pages),
+            'bytes': self.cache_size_bytes(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'brotli': brotli is not None,
+        }
+
+    # Optional disk copy ------------------------------------------------------
+
+    def _disk_path(self, key: tuple) -> str:
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key[0]}-{key[1]}-{name}.html")
+
+    def _write_to_disk(self, key: tuple, page: RenderedPage):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key)
+            for suffix, data in (('', page.body), ('.gz', page.gzip), ('.br', page.br)):
+                if data is None:
+                    continue
+                tmp = f"{path}{suffix}.tmp"
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path + suffix)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write storefront cache file: {e}")
+
+    def _remove_from_disk(self, key: tuple):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        for suffix in ('', '.gz', '.br'):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+
+def _page_bytes(page: RenderedPage) -> int:
+    return len(page.body) + len(page.gzip) + len(page.br or b'')
+
+
+def _fingerprint(branding: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(branding, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def storefront_api_base() -> str:
+    """API base injected into storefront pages (and part of their cache key)"""
+    return os.getenv('API_BASE_URL', '').rstrip('/')
+
+
+def storefront_response(page: RenderedPage):
+    """Build the response for a cached page: 304, br, gzip or identity"""
+    from flask import request, make_response
+
+    accepted = request.accept_encodings
+    if page.br is not None and accepted['br']:
+        encoding, body, etag = 'br', page.br, f"{page.etag}-br"
+    elif accepted['gzip']:
+        encoding, body, etag = 'gzip', page.gzip, f"{page.etag}-gzip"
+    else:
+        encoding, body, etag = None, page.body, page.etag
+
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(body)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Always revalidate so branding changes show up on the next view (cheap 304 otherwise)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+_storefront_cache = StorefrontCache()
+register_cache('storefront_pages', _storefront_cache, cost=1)
+
+
+def _on_tenant_invalidated(subdomain: Optional[str]):
+    if subdomain is None:
+        _storefront_cache.clear()
+    else:
+        _storefront_cache.invalidate(subdomain)
+
+
+# Branding saves on any instance arrive here through the tenant-config cache
+try:
+    from src.utils.tenant_config_cache import get_tenant_config_cache
+    get_tenant_config_cache().add_invalidation_listener(_on_tenant_invalidated)
+except ImportError as e:
+    logger.warning(f"⚠️ Storefront cache not linked to tenant invalidation: {e}")
+
+
+def get_storefront_cache() -> StorefrontCache:
+    return _storefront_cache
+
+
+def invalidate_storefront(subdomain: str):
+    """Drop every rendered page for a tenant (call after branding/theme saves)"""
+    dropped = _storefront_cache.invalidate(subdomain)
+    logger.info(f"🗑️ Invalidated {dropped} storefront page(s) for {subdomain}")
@@ -9,8 +9,12 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
 import threading
 
+from src.utils.cache_registry import deep_sizeof, estimate_size, register_cache
+
 logger = logging.getLogger(__name__)
 
+EVICT_IDLE_SECONDS = 1800  # the memory budget only drops sessions idle at least this long
+
 class MultiUserSessionManager:
     """Manages multiple concurrent user sessions"""
     
@@ -19,6 +23,8 @@ class MultiUserSessionManager:
         self._lock = threading.Lock()
         self._cleanup_interval = 3600  # 1 hour
         self._session_timeout = 86400   # 24 hours
+        # Live state, not a cache: only long-idle sessions are evictable, and last
+        register_cache('user_sessions', self, cost=10)
         
     def create_session(self, user_id: int, operator_id: int, username: str, subdomain: str) -> str:
         """Create a new user session"""
@@ -88,6 +94,28 @@ class MultiUserSessionManager:
         with self._lock:
             return len(self._sessions)
     
+    def cache_size_bytes(self) -> int:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return estimate_size(sessions)
+
+    def cache_entries(self) -> int:
+        return len(self._sessions)
+
+    def shrink(self, nbytes: int) -> int:
+        """Memory budget: drop the most idle sessions (idle >= EVICT_IDLE_SECONDS) until about nbytes are freed"""
+        cutoff = datetime.utcnow() - timedelta(seconds=EVICT_IDLE_SECONDS)
+        freed = 0
+        with self._lock:
+            idle = sorted((s for s in self._sessions.items() if s[1]['last_activity'] < cutoff),
+                          key=lambda item: item[1]['last_activity'])
+            for session_id, session_data in idle:
+                if freed >= nbytes:
+                    break
+                freed += deep_sizeof(session_data)
+                del self._sessions[session_id]
+        return freed
+
     def get_session_info(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session info without updating last_activity"""
         with self._lock:
@@ -0,0 +1,224 @@
+"""
+Cache registry
+In-process caches under one memory budget
+
+Every long-lived in-process cache registers here with a name, a miss cost and an
+optional floor, and implements three methods:
+
+    cache_size_bytes() -> int   estimated memory held (estimate_size() helps)
+    cache_entries() -> int
+    shrink(nbytes) -> int       drop its own lowest-value entries (expired,
+                                least recently used, furthest out...) until
+                                about nbytes are freed; returns bytes freed
+
+enforce_budget() runs on the job runner every BUDGET_INTERVAL seconds. When the
+caches together exceed CACHE_MEMORY_BUDGET_MB, or the process RSS is above
+MEM_SOFT_LIMIT_MB, it works out how much to free and splits it across caches in
+proportion to size / cost: a cache that is cheap to refill (a re-render, a
+Redis read) gives up more than one whose misses go to GoalServe or that only
+refills on the next feed fetch. Each cache picks which of its own entries go.
+No cache is shrunk below its floor. A second pass covers any shortfall,
+cheapest first.
+
+Caches are held by weak reference, so short-lived instances drop out on their
+own; several instances under one name are reported together.
+"""
+
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.utils import metrics
+
+try:
+    import psutil
+    _process = psutil.Process(os.getpid())
+except ImportError:
+    _process = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_BUDGET_MB = int(os.getenv("CACHE_MEMORY_BUDGET_MB", "300"))
+MEM_SOFT_LIMIT_MB = int(os.getenv("MEM_SOFT_LIMIT_MB", "1400"))
+RSS_TARGET = 0.9            # under RSS pressure, aim this far below the soft limit
+BUDGET_INTERVAL = 30        # seconds between enforce_budget() runs
+SAMPLE_SIZE = 24            # entries measured per estimate
+MAX_NODES = 20000           # objects visited per measured entry
+
+MB = 1024 * 1024
+
+CACHE_BYTES = metrics.gauge("cache_memory_bytes", "Estimated memory held by each in-process cache", ["cache"])
+CACHE_EVICTED = metrics.counter("cache_evicted_bytes_total", "Bytes freed by the memory budget", ["cache"])
+
+
+def deep_sizeof(obj: Any, max_nodes: int = MAX_NODES) -> int:
+    """sys.getsizeof over containers, __dict__ and __slots__, visiting at most max_nodes objects"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < max_nodes:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            if hasattr(item, "__dict__"):
+                stack.append(item.__dict__)
+            for cls in type(item).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    value = getattr(item, slot, None)
+                    if value is not None:
+                        stack.append(value)
+    return total
+
+
+def estimate_size(values: Sequence[Any], count: Optional[int] = None) -> int:
+    """Extrapolate the deep size of `count` (default len(values)) items from an evenly spaced sample"""
+    count = len(values) if count is None else count
+    if not values or not count:
+        return 0
+    step = max(1, len(values) // SAMPLE_SIZE)
+    sample = values[::step][:SAMPLE_SIZE]
+    return int(sum(deep_sizeof(value) for value in sample) / len(sample) * count)
+
+
+class _Registration:
+    def __init__(self, name: str, cache: Any, cost: float, floor_bytes: int):
+        self.name = name
+        self.ref = weakref.ref(cache)
+        self.cost = cost
+        self.floor_bytes = floor_bytes
+
+
+_registrations: List[_Registration] = []
+_lock = threading.Lock()
+_last_run: Dict[str, Any] = {}
+
+
+def register_cache(name: str, cache: Any, cost: float = 1.0, floor_bytes: int = 0):
+    """
+    Put a cache under the budget
+
+    cost: relative price of a miss (1 = cheap to refill); higher-cost caches give up less
+    floor_bytes: never shrink this cache below this size
+    """
+    with _lock:
+        _registrations[:] = [r for r in _registrations if r.ref() is not None and r.ref() is not cache]
+        _registrations.append(_Registration(name, cache, cost, floor_bytes))
+
+
+def _live() -> List[tuple]:
+    live = []
+    with _lock:
+        _registrations[:] = [r for r in _registrations if r.ref() is not None]
+        registrations = list(_registrations)
+    for registration in registrations:
+        cache = registration.ref()
+        if cache is None:
+            continue
+        try:
+            live.append((registration, cache, int(cache.cache_size_bytes())))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not size cache {registration.name}: {e}")
+    return live
+
+
+def rss_mb() -> Optional[float]:
+    return _process.memory_info().rss / MB if _process is not None else None
+
+
+def enforce_budget() -> int:
+    """Shrink caches if they are over budget or the process is over its soft limit; returns bytes freed"""
+    live = _live()
+    total = sum(size for _, _, size in live)
+    # Sizes are measured here, not on every /metrics scrape
+    by_name: Dict[str, int] = {}
+    for registration, _, size in live:
+        by_name[registration.name] = by_name.get(registration.name, 0) + size
+    for name, size in by_name.items():
+        CACHE_BYTES.set(size, cache=name)
+    rss = rss_mb()
+    need = total - CACHE_BUDGET_MB * MB
+    if rss is not None and rss > MEM_SOFT_LIMIT_MB:
+        need = max(need, int((rss - MEM_SOFT_LIMIT_MB * RSS_TARGET) * MB))
+    _last_run.update({"at": time.time(), "total_bytes": total, "rss_mb": round(rss, 1) if rss else None,
+                      "need_bytes": max(0, need)})
+    if need <= 0:
+        return 0
+
+    spare = {id(cache): max(0, size - registration.floor_bytes) for registration, cache, size in live}
+    weights = {id(cache): spare[id(cache)] / max(registration.cost, 0.01) for registration, cache, _ in live}
+    total_weight = sum(weights.values()) or 1
+    by_cost = sorted(live, key=lambda item: item[0].cost)
+    freed_by: Dict[str, int] = {}
+
+    def _shrink(registration, cache, nbytes: int) -> int:
+        nbytes = min(nbytes, spare[id(cache)])
+        if nbytes <= 0:
+            return 0
+        try:
+            freed = max(0, int(cache.shrink(nbytes)))
+        except Exception as e:
+            logger.error(f"❌ Shrinking cache {registration.name} failed: {e}")
+            freed = 0
+        spare[id(cache)] = 0 if freed < nbytes else spare[id(cache)] - freed
+        freed_by[registration.name] = freed_by.get(registration.name, 0) + freed
+        CACHE_EVICTED.inc(freed, cache=registration.name)
+        return freed
+
+    freed = 0
+    for registration, cache, _ in by_cost:
+        freed += _shrink(registration, cache, int(need * weights[id(cache)] / total_weight))
+    for registration, cache, _ in by_cost:
+        if freed >= need:
+            break
+        freed += _shrink(registration, cache, need - freed)
+
+    if rss is not None and rss > MEM_SOFT_LIMIT_MB:
+        gc.collect()
+    summary = ", ".join(f"{name}={size / MB:.1f}MB" for name, size in sorted(freed_by.items()) if size)
+    rss_text = f"{rss:.0f}MB" if rss is not None else "n/a"
+    logger.warning(f"🧹 Memory budget: caches {total / MB:.0f}MB, RSS {rss_text} - "
+                   f"freed {freed / MB:.1f}MB of {need / MB:.1f}MB ({summary or 'nothing evictable'})")
+    _last_run["freed_bytes"] = freed
+    return freed
+
+
+def cache_sizes() -> Dict[str, Dict[str, Any]]:
+    sizes: Dict[str, Dict[str, Any]] = {}
+    for registration, cache, size in _live():
+        entry = sizes.setdefault(registration.name, {"bytes": 0, "entries": 0, "instances": 0,
+                                                     "cost": registration.cost})
+        entry["bytes"] += size
+        entry["instances"] += 1
+        try:
+            entry["entries"] += int(cache.cache_entries())
+        except Exception:
+            pass
+    return sizes
+
+
+def status() -> Dict[str, Any]:
+    sizes = cache_sizes()
+    for entry in sizes.values():
+        entry["mb"] = round(entry["bytes"] / MB, 2)
+    return {
+        "budget_mb": CACHE_BUDGET_MB,
+        "soft_limit_mb": MEM_SOFT_LIMIT_MB,
+        "total_mb": round(sum(entry["bytes"] for entry in sizes.values()) / MB, 2),
+        "caches": sizes,
+        "last_run": dict(_last_run),
+    }
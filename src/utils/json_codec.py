@@ -0,0 +1,151 @@
+"""
+JSON codec
+One place to encode/decode JSON, backed by the fastest library installed
+
+orjson is preferred, then msgspec, then the stdlib json module; JSON_CODEC=stdlib
+(or orjson / msgspec) forces a backend. All backends produce the same documents:
+datetimes/dates as ISO 8601, Decimal as a JSON number, UUID as a string, non-str
+dict keys stringified, UTF-8 output (no \\u escapes). Anything a fast backend
+can't encode (e.g. integers wider than 64 bits) or decode (e.g. NaN literals) is
+retried with the stdlib, so decode errors are always json.JSONDecodeError (a
+ValueError).
+
+Decoding does not round-trip integers wider than 64 bits: orjson accepts them
+and returns a float (123456789012345678901234567890 -> 1.2345678901234568e+29),
+and msgspec may do the same, so no retry happens. Documents that need such
+integers exactly must be read with json.loads (or JSON_CODEC=stdlib).
+"""
+
+import dataclasses
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, IO, Union
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _default(obj: Any) -> Any:
+    """Types the encoders don't handle natively"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()  # "2025-08-20T18:05:00+08:00"
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# -- stdlib -------------------------------------------------------------------
+
+def _std_dumps(obj: Any, sort_keys: bool = False, indent: int = None) -> str:
+    separators = None if indent else (",", ":")
+    return json.dumps(obj, default=_default, ensure_ascii=False, sort_keys=sort_keys,
+                      indent=indent, separators=separators)
+
+
+def _std_dumps_bytes(obj: Any, sort_keys: bool = False, indent: int = None) -> bytes:
+    return _std_dumps(obj, sort_keys, indent).encode("utf-8")
+
+
+# -- orjson -------------------------------------------------------------------
+
+def _orjson_dumps_bytes(obj: Any, sort_keys: bool = False, indent: int = None) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(obj, default=_default, option=option)
+    except TypeError:  # orjson.JSONEncodeError: e.g. int wider than 64 bits
+        return _std_dumps_bytes(obj, sort_keys, indent)
+
+
+def _orjson_loads(data: Union[str, bytes, bytearray]) -> Any:
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
+# -- msgspec ------------------------------------------------------------------
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder(enc_hook=_default, decimal_format="number")
+    _msgspec_sorted_encoder = msgspec.json.Encoder(enc_hook=_default, decimal_format="number", order="sorted")
+    _msgspec_decoder = msgspec.json.Decoder()
+
+
+def _msgspec_dumps_bytes(obj: Any, sort_keys: bool = False, indent: int = None) -> bytes:
+    try:
+        raw = (_msgspec_sorted_encoder if sort_keys else _msgspec_encoder).encode(obj)
+    except (TypeError, OverflowError, msgspec.EncodeError):  # non-str keys, wide ints
+        return _std_dumps_bytes(obj, sort_keys, indent)
+    return msgspec.json.format(raw, indent=indent) if indent else raw
+
+
+def _msgspec_loads(data: Union[str, bytes, bytearray]) -> Any:
+    try:
+        return _msgspec_decoder.decode(data)
+    except msgspec.DecodeError:
+        return json.loads(data)
+
+
+# -- backend selection ----------------------------------------------------------
+
+_requested = os.getenv("JSON_CODEC", "").lower()
+if orjson is not None and _requested in ("", "orjson"):
+    BACKEND = "orjson"
+    _dumps_bytes, _loads = _orjson_dumps_bytes, _orjson_loads
+elif msgspec is not None and _requested in ("", "orjson", "msgspec"):
+    BACKEND = "msgspec"
+    _dumps_bytes, _loads = _msgspec_dumps_bytes, _msgspec_loads
+else:
+    BACKEND = "stdlib"
+    _dumps_bytes, _loads = _std_dumps_bytes, json.loads
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Decode a JSON document (str or UTF-8 bytes)"""
+    return _loads(data)
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False, indent: int = None) -> bytes:
+    """Encode to UTF-8 JSON bytes; compact unless indent is given (always 2 spaces)"""
+    return _dumps_bytes(obj, sort_keys, indent)
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: int = None) -> str:
+    """Encode to a JSON str"""
+    if BACKEND == "stdlib":
+        return _std_dumps(obj, sort_keys, indent)
+    return _dumps_bytes(obj, sort_keys, indent).decode("utf-8")
+
+
+def load(fp: IO) -> Any:
+    """Decode a whole file object (text or binary mode)"""
+    return loads(fp.read())
+
+
+def load_path(path: Union[str, os.PathLike]) -> Any:
+    """Decode a JSON file; read as bytes so the fast backends skip the str round-trip"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:]
+    return loads(data)
@@ -1,5 +1,5 @@
 # JSON streaming utilities to reduce memory usage
-from typing import Iterator, Dict, Any
+from typing import Iterator, Dict, Any, Iterable, Tuple
 import json
 import os
 
@@ -65,3 +65,76 @@ def stream_filtered_events(json_file: str, sport_name: str, filters: Dict[str, A
     except Exception as e:
         print(f"Error streaming {json_file}: {e}")
         return
+
+
+# GoalServe pre-match feeds nest matches under categories in a few shapes:
+#   odds_data.scores.categories[].matches[]        (standard)
+#   odds_data.scores.category[].matches.match      (cricket)
+# A single category/match may appear as an object instead of a one-item array.
+FEED_MATCH_PATHS = (
+    ('odds_data.scores.categories', 'matches'),
+    ('odds_data.scores.category', 'matches.match'),
+)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _category_matches(category: Dict, child_path: str) -> Iterator[Tuple[Dict, Dict]]:
+    if not isinstance(category, dict):
+        return
+    matches = category
+    for key in child_path.split('.'):
+        matches = matches.get(key) if isinstance(matches, dict) else None
+    header = {k: v for k, v in category.items() if not isinstance(v, (dict, list))}
+    for match in _as_list(matches):
+        if isinstance(match, dict):
+            yield header, match
+
+
+def iter_feed_matches_from_data(data: Dict, paths: Iterable[Tuple[str, str]] = FEED_MATCH_PATHS) -> Iterator[Tuple[Dict, Dict]]:
+    """Yield (category, match) from an already-loaded feed; category has its scalar fields only"""
+    if not isinstance(data, dict):
+        return
+    for parent_path, child_path in paths:
+        node = data
+        for key in parent_path.split('.'):
+            node = node.get(key) if isinstance(node, dict) else None
+        for category in _as_list(node):
+            yield from _category_matches(category, child_path)
+
+
+def iter_feed_matches(path: str, paths: Iterable[Tuple[str, str]] = FEED_MATCH_PATHS) -> Iterator[Tuple[Dict, Dict]]:
+    """
+    Stream (category, match) pairs from a feed file without loading it whole
+
+    Categories (leagues) are built one at a time by ijson's C backend, so memory is
+    bounded by the largest single league rather than by the file.
+    """
+    try:
+        import ijson
+    except ImportError:
+        print("Warning: ijson not available, falling back to full load")
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from iter_feed_matches_from_data(json.load(f), paths)
+        return
+
+    # A short scan up to the first category tells us which shape the file has and
+    # whether categories are an array or a single object
+    child_paths = dict(paths)
+    prefix = child_path = None
+    with open(path, 'rb') as f:
+        for event_prefix, event, _ in ijson.parse(f):
+            if event_prefix in child_paths and event in ('start_array', 'start_map'):
+                child_path = child_paths[event_prefix]
+                prefix = f"{event_prefix}.item" if event == 'start_array' else event_prefix
+                break
+    if prefix is None:
+        return
+
+    with open(path, 'rb') as f:
+        for category in ijson.items(f, prefix, use_float=True):
+            yield from _category_matches(category, child_path)
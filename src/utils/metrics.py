@@ -0,0 +1,273 @@
+"""
+Metrics
+Prometheus counters, gauges and histograms plus optional tracing spans
+
+A small dependency-free registry: instruments are module-level objects created
+once (metrics.histogram("db_query_duration_seconds", ...)) and updated from the
+hot path with a dict lookup and a lock, so instrumented code pays a couple of
+microseconds per observation. render() produces the Prometheus text exposition
+format served at /metrics (web) or by start_metrics_server() (workers).
+
+- METRICS_ENABLED=0 turns every update into a no-op and /metrics into an empty
+  page.
+- register_collector(fn) runs fn() at scrape time, for gauges read from
+  somewhere else (connection pool stats, queue depths).
+- span("settlement.cycle", matches=12) opens an OpenTelemetry span when
+  OTEL_TRACING=1 and opentelemetry-api is installed; otherwise it is a no-op
+  context manager. Exporter setup is left to the OpenTelemetry SDK's own
+  environment variables (OTEL_EXPORTER_OTLP_ENDPOINT, ...).
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9091"))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a cached read (~1ms) through a slow feed fetch (10s+)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+try:
+    if os.getenv("OTEL_TRACING", "0").lower() not in ("1", "true", "yes"):
+        raise ImportError("tracing disabled")
+    from opentelemetry import trace as _otel_trace
+    _tracer = _otel_trace.get_tracer("goalserve")
+except ImportError:
+    _tracer = None
+
+TRACING = _tracer is not None
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str):
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str):
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+_registry: Dict[str, _Metric] = {}
+_collectors: List[Callable[[], None]] = []
+_registry_lock = threading.Lock()
+
+
+def _register(cls, name: str, *args, **kwargs):
+    with _registry_lock:
+        existing = _registry.get(name)
+        if existing is None:
+            existing = _registry[name] = cls(name, *args, **kwargs)
+        elif not isinstance(existing, cls):
+            raise ValueError(f"metric {name!r} already registered as a {existing.kind}")
+        return existing
+
+
+def counter(name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+    return _register(Counter, name, documentation, labels)
+
+
+def gauge(name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+    return _register(Gauge, name, documentation, labels)
+
+
+def histogram(name: str, documentation: str, labels: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, documentation, labels, buckets=buckets)
+
+
+def register_collector(collector: Callable[[], None]):
+    """Call collector() before every scrape (it sets gauges from another source)"""
+    _collectors.append(collector)
+
+
+# Shared by every cache (snapshot shards, tenant config, storefront, @cached): hit ratio per cache label
+CACHE_REQUESTS = counter("cache_requests_total", "Cache lookups by cache and result", ["cache", "result"])
+# Shared by the GoalServe clients (pre-match fetcher, async feed client)
+FEED_FETCH_SECONDS = histogram("feed_fetch_duration_seconds", "Upstream feed request time by outcome",
+                               ["feed", "endpoint", "result"])
+
+
+def render() -> str:
+    if not ENABLED:
+        return ""
+    for collector in list(_collectors):
+        try:
+            collector()
+        except Exception as e:
+            logger.debug(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def span(name: str, **attributes):
+    """An OpenTelemetry span when tracing is on, otherwise a no-op context manager"""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would drown the log
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int = METRICS_PORT):
+    """Serve /metrics on its own port (worker processes, which have no Flask app)"""
+    global _server
+    if _server is not None or not ENABLED:
+        return
+    try:
+        _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"⚠️ Metrics server not started on port {port}: {e}")
+        return
+    threading.Thread(target=_server.serve_forever, daemon=True, name="metrics-server").start()
+    logger.info(f"📈 Metrics served on :{port}/metrics")
@@ -0,0 +1,57 @@
+"""
+Keyset (cursor) pagination helpers
+
+Cursors are opaque, URL-safe tokens wrapping the sort key of the last row
+returned, e.g. (created_at, id). Clients pass them back unchanged to get the
+next page, so deep pages cost the same as the first one.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a malformed or tampered cursor"""
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """Encode a (created_at, id) sort key as an opaque cursor token"""
+    payload = {"t": created_at.isoformat() if created_at else None, "i": int(row_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor token back into its (created_at, id) sort key"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(payload["t"]) if payload.get("t") else None
+        return created_at, int(payload["i"])
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+
+def keyset_condition(cursor_key: Tuple[Optional[datetime], int]) -> Tuple[str, List]:
+    """
+    SQL condition and params selecting the rows after cursor_key in
+    ORDER BY created_at DESC, id DESC
+
+    PostgreSQL puts NULL created_at first in that order, so a cursor taken from such
+    a row continues with the remaining undated rows (by id) and then every dated one.
+    """
+    created_at, row_id = cursor_key
+    if created_at is None:
+        return "(created_at IS NOT NULL OR id < %s)", [row_id]
+    return "(created_at, id) < (%s, %s)", [created_at, row_id]
+
+
+def clamp_limit(value, default: int = 50, maximum: int = 200) -> int:
+    """Clamp a client-supplied page size into [1, maximum]"""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(value, maximum))
@@ -0,0 +1,373 @@
+"""
+Profiling
+Opt-in CPU sampling, slow-request stack capture and tracemalloc diffs for one instance
+
+Nothing here runs until it is switched on, either at startup (env) or per
+instance through the super admin endpoints under /api/profiling (on Fly, pin the
+request to a machine with the fly-force-instance-id header):
+
+- cpu_profiler: a thread records every other thread's stack each
+  PROFILE_INTERVAL_MS for a fixed number of seconds. It is a wall-clock
+  profile: threads blocked in a wait show up as the wait. Under eventlet the
+  main thread's stack is whichever greenlet is running.
+- slow_requests (PROFILE_SLOW_REQUEST_MS): every request registers on entry and
+  a watchdog samples the stack of any request still running past the
+  threshold until it finishes, so the stacks are taken while the request is
+  slow. They are rooted at "METHOD route" and written out every
+  SLOW_FLUSH_INTERVAL seconds by the job runner.
+- memory_profiler (PROFILE_TRACEMALLOC=1): tracemalloc snapshots every
+  PROFILE_MEMORY_INTERVAL seconds, each diffed against the previous one for the
+  allocation sites that grew the most.
+
+Profiles are written to PROFILE_DIR in the collapsed-stack format ("frame;frame
+count" per line) that flamegraph.pl, speedscope and inferno read directly;
+memory profiles are weighted in bytes.
+"""
+
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+try:
+    import greenlet
+except ImportError:
+    greenlet = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+KEEP_FILES = int(os.getenv("PROFILE_KEEP_FILES", "50"))
+SAMPLE_INTERVAL = int(os.getenv("PROFILE_INTERVAL_MS", "10")) / 1000
+SLOW_REQUEST_MS = int(os.getenv("PROFILE_SLOW_REQUEST_MS", "0"))   # 0 = off
+SLOW_FLUSH_INTERVAL = 60                                            # seconds between slow-request files
+MEMORY_INTERVAL = int(os.getenv("PROFILE_MEMORY_INTERVAL", "300"))
+TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "25"))
+MAX_CPU_SECONDS = 600
+MAX_DEPTH = 128
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_TRACEMALLOC_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _short_path(path: str) -> str:
+    if path.startswith(_ROOT):
+        return os.path.relpath(path, _ROOT)
+    parent, name = os.path.split(path)
+    return f"{os.path.basename(parent)}/{name}"   # site-packages/<pkg>/<file> -> <pkg>/<file>
+
+
+@lru_cache(maxsize=16384)
+def _code_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame, root: str) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_code_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+def _fold_traceback(traceback: tracemalloc.Traceback) -> str:
+    # tracemalloc tracebacks run oldest frame first
+    return ";".join(["memory"] + [f"{_short_path(f.filename)}:{f.lineno}" for f in traceback])
+
+
+def _write(kind: str, stacks: Counter) -> Optional[str]:
+    """Write a collapsed-stack file; returns its name, or None when there is nothing to write"""
+    if not stacks:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    now = time.time()
+    name = f"{kind}-{socket.gethostname()}-{time.strftime('%Y%m%d-%H%M%S', time.gmtime(now))}-{int(now * 1000) % 1000:03d}.folded"
+    with open(os.path.join(PROFILE_DIR, name), "w", encoding="utf-8") as f:
+        for stack, weight in stacks.most_common():
+            if weight > 0:
+                f.write(f"{stack} {weight}\n")
+    _prune()
+    logger.info(f"🔥 Profile written: {name} ({len(stacks)} stacks)")
+    return name
+
+
+def _prune():
+    files = list_profiles()
+    for entry in files[KEEP_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, entry["name"]))
+        except OSError:
+            pass
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Profile files on this instance, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    files = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(".folded"):
+            stat = os.stat(os.path.join(PROFILE_DIR, name))
+            files.append({"name": name, "bytes": stat.st_size, "modified": stat.st_mtime})
+    return sorted(files, key=lambda entry: entry["modified"], reverse=True)
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.interval = SAMPLE_INTERVAL
+        self.started_at: Optional[float] = None
+        self.until: Optional[float] = None
+        self.last_file: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float = 30, interval_ms: Optional[int] = None) -> bool:
+        """Sample for `seconds` (capped at MAX_CPU_SECONDS); False if already sampling"""
+        if self.running:
+            return False
+        self.stacks = Counter()
+        self.samples = 0
+        self.interval = (interval_ms or SAMPLE_INTERVAL * 1000) / 1000
+        self.started_at = time.time()
+        self.until = self.started_at + min(max(1.0, float(seconds)), MAX_CPU_SECONDS)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="cpu-profiler")
+        self._thread.start()
+        logger.info(f"🔥 CPU profiling for {self.until - self.started_at:.0f}s every {self.interval * 1000:.0f}ms")
+        return True
+
+    def stop(self) -> Optional[str]:
+        """Stop early and write what was sampled"""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout=5)
+        return self.last_file
+
+    def _run(self):
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        names_at = 0.0
+        while not self._stop.wait(self.interval) and time.time() < self.until:
+            if time.time() - names_at > 1:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                names_at = time.time()
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.stacks[_fold(frame, names.get(ident, f"thread-{ident}"))] += 1
+            self.samples += 1
+        try:
+            self.last_file = _write("cpu", self.stacks)
+        except OSError as e:
+            logger.error(f"❌ Could not write CPU profile: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "samples": self.samples,
+            "interval_ms": round(self.interval * 1000),
+            "seconds_left": round(max(0.0, self.until - time.time()), 1) if self.running else 0,
+            "last_file": self.last_file,
+        }
+
+
+class _ActiveRequest:
+    __slots__ = ("label", "started", "thread_id", "greenlet", "stacks", "samples")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.monotonic()
+        self.thread_id = threading.get_ident()
+        self.greenlet = greenlet.getcurrent() if greenlet is not None else None
+        self.stacks: Optional[Counter] = None
+        self.samples = 0
+
+
+class SlowRequestSampler:
+    def __init__(self):
+        self.threshold_ms = 0
+        self.stacks: Counter = Counter()
+        self.recent: deque = deque(maxlen=50)
+        self.captured = 0
+        self.last_file: Optional[str] = None
+        self._active: Dict[int, _ActiveRequest] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def configure(self, threshold_ms: int):
+        """Sample requests running longer than threshold_ms (0 turns it off)"""
+        self.threshold_ms = max(0, int(threshold_ms))
+        if self.enabled and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._watch, daemon=True, name="slow-request-sampler")
+            self._thread.start()
+        logger.info(f"🐢 Slow request sampling {'above ' + str(self.threshold_ms) + 'ms' if self.enabled else 'off'}")
+
+    def request_started(self, label: str) -> Optional[_ActiveRequest]:
+        if not self.enabled:
+            return None
+        entry = _ActiveRequest(label)
+        with self._lock:
+            self._active[id(entry)] = entry
+        return entry
+
+    def request_finished(self, entry: Optional[_ActiveRequest]):
+        if entry is None:
+            return
+        with self._lock:
+            self._active.pop(id(entry), None)
+            if entry.stacks is None:
+                return
+            self.stacks.update(entry.stacks)
+            self.captured += 1
+        duration_ms = (time.monotonic() - entry.started) * 1000
+        self.recent.append({"request": entry.label, "duration_ms": round(duration_ms), "samples": entry.samples,
+                            "at": time.time()})
+        logger.warning(f"🐢 Slow request {entry.label}: {duration_ms:.0f}ms ({entry.samples} stack samples)")
+
+    def flush(self) -> Optional[str]:
+        """Write the stacks captured since the last flush (job runner, every SLOW_FLUSH_INTERVAL)"""
+        with self._lock:
+            stacks, self.stacks = self.stacks, Counter()
+        name = _write("slow", stacks)
+        if name:
+            self.last_file = name
+        return name
+
+    def _watch(self):
+        while self.enabled:
+            time.sleep(SAMPLE_INTERVAL)
+            cutoff = time.monotonic() - self.threshold_ms / 1000
+            with self._lock:
+                overdue = [entry for entry in self._active.values() if entry.started <= cutoff]
+                if not overdue:
+                    continue
+                frames = sys._current_frames()
+                for entry in overdue:
+                    # A suspended greenlet keeps its own frame; a running one is its thread's current frame
+                    frame = entry.greenlet.gr_frame if entry.greenlet is not None else None
+                    if frame is None:
+                        frame = frames.get(entry.thread_id)
+                    if frame is None:
+                        continue
+                    if entry.stacks is None:
+                        entry.stacks = Counter()
+                    entry.stacks[_fold(frame, entry.label)] += 1
+                    entry.samples += 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "in_flight": len(self._active),
+            "captured": self.captured,
+            "recent": list(self.recent)[-10:],
+            "last_file": self.last_file,
+        }
+
+
+class MemoryProfiler:
+    def __init__(self):
+        self.snapshots = 0
+        self.top_growth: List[Dict[str, Any]] = []
+        self.last_file: Optional[str] = None
+        self.last_growth_file: Optional[str] = None
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = TRACEMALLOC_FRAMES):
+        if not self.tracing:
+            tracemalloc.start(frames)
+            self._previous = None
+            logger.info(f"🧠 tracemalloc started ({frames} frames)")
+
+    def stop(self):
+        if self.tracing:
+            tracemalloc.stop()
+            self._previous = None
+            logger.info("🧠 tracemalloc stopped")
+
+    def snapshot(self, limit: int = 25) -> Optional[List[Dict[str, Any]]]:
+        """Write the live allocations and their growth since the previous snapshot; None when not tracing"""
+        if not self.tracing:
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+
+        allocations: Counter = Counter()
+        for stat in snapshot.statistics("traceback"):
+            allocations[_fold_traceback(stat.traceback)] += stat.size
+        self.last_file = _write("mem", allocations)
+
+        if self._previous is not None:
+            diff = snapshot.compare_to(self._previous, "traceback")
+            growth: Counter = Counter()
+            for stat in diff:
+                if stat.size_diff > 0:
+                    growth[_fold_traceback(stat.traceback)] += stat.size_diff
+            self.last_growth_file = _write("mem-growth", growth) or self.last_growth_file
+            self.top_growth = [{
+                "site": f"{_short_path(stat.traceback[-1].filename)}:{stat.traceback[-1].lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "count_diff": stat.count_diff,
+            } for stat in diff[:limit]]
+        self._previous = snapshot
+        self.snapshots += 1
+        return self.top_growth
+
+    def status(self) -> Dict[str, Any]:
+        traced, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            "tracing": self.tracing,
+            "traced_mb": round(traced / (1024 * 1024), 1),
+            "peak_mb": round(peak / (1024 * 1024), 1),
+            "snapshots": self.snapshots,
+            "top_growth": self.top_growth[:10],
+            "last_file": self.last_file,
+            "last_growth_file": self.last_growth_file,
+        }
+
+
+cpu_profiler = SamplingProfiler()
+slow_requests = SlowRequestSampler()
+memory_profiler = MemoryProfiler()
+
+
+def configure_profiling():
+    """Apply PROFILE_SLOW_REQUEST_MS and PROFILE_TRACEMALLOC at startup"""
+    if SLOW_REQUEST_MS > 0:
+        slow_requests.configure(SLOW_REQUEST_MS)
+    if os.getenv("PROFILE_TRACEMALLOC", "0") == "1":
+        memory_profiler.start()
+
+
+def status() -> Dict[str, Any]:
+    return {
+        "instance": socket.gethostname(),
+        "cpu": cpu_profiler.status(),
+        "slow_requests": slow_requests.status(),
+        "memory": memory_profiler.status(),
+        "files": list_profiles()[:20],
+    }
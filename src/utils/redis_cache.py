@@ -10,20 +10,25 @@ import logging
 from typing import Optional, Any
 from functools import wraps
 
+from src.utils import metrics
+
 logger = logging.getLogger(__name__)
 
 # Global Redis client
 _redis_client = None
+_redis_url_warned = False
 
 def get_redis_client():
     """Get or create Redis client (lazy initialization)"""
-    global _redis_client
+    global _redis_client, _redis_url_warned
     
     if _redis_client is None:
         redis_url = os.getenv('REDIS_URL')
         
         if not redis_url:
-            logger.warning("⚠️ REDIS_URL not set - falling back to in-process cache")
+            if not _redis_url_warned:
+                logger.warning("⚠️ REDIS_URL not set - falling back to in-process cache")
+                _redis_url_warned = True
             return None
         
         try:
@@ -101,31 +106,6 @@ def redis_cache_delete(key: str):
         logger.warning(f"Redis DELETE error for key {key}: {e}")
         return False
 
-def redis_cache_delete_pattern(pattern: str):
-    """
-    Delete all keys matching a pattern (for bulk invalidation)
-    
-    Args:
-        pattern: Redis key pattern (e.g., "branding:*")
-    """
-    try:
-        client = get_redis_client()
-        if not client:
-            return 0
-        
-        # Use SCAN for safe pattern deletion
-        deleted = 0
-        for key in client.scan_iter(match=pattern, count=100):
-            client.delete(key)
-            deleted += 1
-        
-        logger.info(f"🗑️ Deleted {deleted} Redis keys matching pattern: {pattern}")
-        return deleted
-        
-    except Exception as e:
-        logger.warning(f"Redis DELETE PATTERN error for {pattern}: {e}")
-        return 0
-
 def cached(key_prefix: str, ttl: int = 3600):
     """
     Decorator for function result caching in Redis
@@ -151,10 +131,12 @@ def cached(key_prefix: str, ttl: int = 3600):
             cached_value = redis_cache_get(cache_key)
             if cached_value is not None:
                 logger.debug(f"✅ Redis cache HIT: {cache_key}")
+                metrics.CACHE_REQUESTS.inc(cache=key_prefix, result="hit")
                 return cached_value
             
             # Cache miss - call function
             logger.debug(f"❌ Redis cache MISS: {cache_key}")
+            metrics.CACHE_REQUESTS.inc(cache=key_prefix, result="miss")
             result = func(*args, **kwargs)
             
             # Store in Redis (non-blocking - don't fail if Redis is down)
@@ -168,13 +150,15 @@ def cached(key_prefix: str, ttl: int = 3600):
 
 # Helper functions for common cache operations
 def invalidate_tenant_cache(subdomain: str):
-    """Invalidate all cache for a specific tenant"""
+    """Invalidate all cache for a specific tenant (on every instance)"""
+    from src.utils.tenant_config_cache import get_tenant_config_cache
     redis_cache_delete(f"tenant:{subdomain}")
-    redis_cache_delete(f"branding:{subdomain}")
+    get_tenant_config_cache().invalidate(subdomain)
     logger.info(f"🗑️ Invalidated cache for tenant: {subdomain}")
 
 def invalidate_all_branding_cache():
     """Invalidate all branding cache (e.g., after global settings change)"""
-    deleted = redis_cache_delete_pattern("branding:*")
-    logger.info(f"🗑️ Invalidated {deleted} branding cache entries")
-
+    from src.utils.tenant_config_cache import get_tenant_config_cache
+    # Bumps the global generation - no KEYS/SCAN over the keyspace
+    get_tenant_config_cache().invalidate(None)
+    logger.info("🗑️ Invalidated branding cache for all tenants")
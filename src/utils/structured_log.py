@@ -0,0 +1,187 @@
+"""
+Structured logging
+Asynchronous, sampled and runtime-tunable logging for the web and worker processes
+
+configure_logging() replaces the root handlers with a QueueHandler: a log call
+only formats the message and puts the record on a bounded in-memory queue, and
+one listener thread does the writing (stdout, plus LOG_FILE when set). If the
+writer falls behind, records are dropped and counted rather than making the
+caller wait on I/O.
+
+- LOG_FORMAT=json writes one JSON object per line (ts, level, logger, msg,
+  process type and any `extra=` fields); the default is the plain text format.
+- LOG_LEVELS="src.routes.casino_api=WARNING,werkzeug=INFO" sets per-logger
+  levels at startup; set_log_level() changes them at runtime
+  (POST /api/logging/levels).
+- count("settlement.bet_won") replaces a per-item log line with a counter;
+  flush_counters() logs one summary line of everything counted since the last
+  flush (the job runner calls it every COUNTER_INTERVAL seconds).
+- sample("slots.win", 100) is true on the first call and every 100th after it,
+  for lines still worth seeing occasionally.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from src.utils import json_codec
+
+QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+COUNTER_INTERVAL = int(os.getenv("LOG_COUNTER_INTERVAL", "60"))  # seconds between counter summaries
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+logger = logging.getLogger(__name__)
+
+# LogRecord attributes that aren't `extra=` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, process_type: str):
+        super().__init__()
+        self.process_type = process_type
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "process": self.process_type,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json_codec.dumps(entry)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never block the caller: a full queue drops the record"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_configured_levels: Dict[str, str] = {}
+_counters: Counter = Counter()
+_totals: Counter = Counter()
+_samples: Counter = Counter()
+_counter_lock = threading.Lock()
+_last_flush = time.time()
+
+
+def configure_logging(process_type: Optional[str] = None):
+    """Install the queue handler on the root logger (idempotent)"""
+    global _handler, _listener
+    if _handler is not None:
+        return
+    process_type = process_type or os.getenv("PROCESS_TYPE", "web")
+
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        formatter: logging.Formatter = JsonFormatter(process_type)
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    outputs = [logging.StreamHandler(sys.stdout)]
+    log_file = os.getenv("LOG_FILE", "app.log")
+    if log_file:
+        outputs.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for output in outputs:
+        output.setFormatter(formatter)
+
+    _handler = _DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+    _listener = QueueListener(_handler.queue, *outputs, respect_handler_level=False)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    _listener.start()
+    atexit.register(_listener.stop)  # flush what's queued on shutdown
+
+    for item in filter(None, (part.strip() for part in os.getenv("LOG_LEVELS", "").split(","))):
+        name, _, level = item.partition("=")
+        try:
+            set_log_level(name.strip(), level.strip())
+        except ValueError as e:
+            logger.warning(f"⚠️ Ignoring LOG_LEVELS entry {item!r}: {e}")
+
+
+def set_log_level(name: str, level: str) -> str:
+    """Set a logger's level ('' or 'root' for the root logger); raises ValueError for unknown levels"""
+    level = level.upper()
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"unknown level {level!r}")
+    name = "" if name == "root" else name
+    logging.getLogger(name or None).setLevel(level)
+    _configured_levels[name or "root"] = level
+    return level
+
+
+def log_levels() -> Dict[str, str]:
+    levels = {"root": logging.getLevelName(logging.getLogger().level)}
+    for name in _configured_levels:
+        if name != "root":
+            levels[name] = logging.getLevelName(logging.getLogger(name).level)
+    return levels
+
+
+def count(name: str, n: int = 1):
+    """Count an event instead of logging a line for it"""
+    with _counter_lock:
+        _counters[name] += n
+
+
+def sample(key: str, every: int) -> bool:
+    """True for the 1st, (every+1)th, ... call with this key"""
+    with _counter_lock:
+        _samples[key] += 1
+        return (_samples[key] - 1) % every == 0
+
+
+def flush_counters():
+    """Log one summary line of the counts since the last flush"""
+    global _last_flush
+    with _counter_lock:
+        window = dict(_counters)
+        _totals.update(_counters)
+        _counters.clear()
+        elapsed = time.time() - _last_flush
+        _last_flush = time.time()
+    if window:
+        summary = ", ".join(f"{name}={value}" for name, value in sorted(window.items()))
+        logger.info(f"📊 Counters ({elapsed:.0f}s): {summary}", extra={"counters": window})
+
+
+def status() -> Dict[str, Any]:
+    with _counter_lock:
+        totals = _totals + _counters
+    return {
+        "async": _handler is not None,
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "levels": log_levels(),
+        "counters": dict(sorted(totals.items())),
+    }
@@ -0,0 +1,280 @@
+"""
+Versioned tenant-config cache
+Bounded in-process LRU in front of Redis, kept consistent across instances
+
+Every tenant has a version counter in Redis (tenantcfg:ver:<subdomain>) plus one
+global generation counter (tenantcfg:gen). Values are stored under keys that
+embed both, e.g. tenantcfg:branding:acme:3.17, so an invalidation never deletes
+anything - it bumps the counter, old keys simply expire, and no KEYS/SCAN is
+needed to invalidate every tenant at once.
+
+Invalidations are also published on the tenantcfg:invalidate channel. Each
+process runs one subscriber that drops its local entries as soon as a message
+arrives; while that subscriber is down, local entries re-check the version in
+Redis at most once per VERSION_CHECK_SECONDS. Either way a save is visible on
+every instance within about a second, and a warm lookup is a dict access.
+
+Without Redis the cache degrades to a local LRU with a TTL.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils import metrics
+from src.utils.cache_registry import deep_sizeof, estimate_size, register_cache
+from src.utils.redis_cache import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = 'tenantcfg:invalidate'
+GENERATION_KEY = 'tenantcfg:gen'
+VERSION_KEY = 'tenantcfg:ver:{subdomain}'
+VALUE_KEY = 'tenantcfg:{namespace}:{subdomain}:{version}'
+
+VERSION_CHECK_SECONDS = 1.0   # local re-validation interval when pub/sub is down
+LOCAL_TTL = 3600              # local entry lifetime (also the Redis value TTL)
+MAX_LOCAL_ENTRIES = 2000
+
+_MISSING = object()
+
+
+class _Entry:
+    __slots__ = ('value', 'version', 'stored_at', 'checked_at')
+
+    def __init__(self, value, version: str):
+        now = time.time()
+        self.value = value
+        self.version = version
+        self.stored_at = now
+        self.checked_at = now
+
+
+class TenantConfigCache:
+    """Namespaced, versioned per-tenant cache (one instance per process)"""
+
+    def __init__(self, max_entries: int = MAX_LOCAL_ENTRIES, ttl: int = LOCAL_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local: "OrderedDict[tuple, _Entry]" = OrderedDict()  # (namespace, subdomain) -> entry
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+        self._subscriber: Optional[threading.Thread] = None
+        self._subscribed = False
+        self._subscriber_attempted = 0.0
+        self._epoch = 0  # bumped on every local drop; guards loads that race an invalidation
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, namespace: str, subdomain: str, loader: Callable[[], Any], shared: bool = True) -> Any:
+        """
+        Return the cached value, calling loader() (and populating both tiers) on a miss
+
+        shared=False keeps the value in this process only (e.g. rows holding secrets);
+        it is still versioned and dropped by invalidations like any other entry.
+        """
+        value = self.peek(namespace, subdomain, shared=shared)
+        if value is not _MISSING:
+            metrics.CACHE_REQUESTS.inc(cache=f"tenant_config:{namespace}", result="hit")
+            return value
+
+        self.misses += 1
+        metrics.CACHE_REQUESTS.inc(cache=f"tenant_config:{namespace}", result="miss")
+        epoch = self._epoch
+        client = get_redis_client()
+        version = self._current_version(client, subdomain)
+        value = loader()
+        if epoch != self._epoch:
+            # Invalidated while loading: return what we read but don't cache it
+            return value
+        if shared and client is not None and version is not None and value is not None:
+            try:
+                key = VALUE_KEY.format(namespace=namespace, subdomain=subdomain, version=version)
+                client.setex(key, self.ttl, json.dumps(value))
+            except Exception as e:
+                logger.warning(f"Tenant cache SET error for {namespace}:{subdomain}: {e}")
+        self._store(namespace, subdomain, value, version or '')
+        return value
+
+    def peek(self, namespace: str, subdomain: str, default=_MISSING, shared: bool = True) -> Any:
+        """Cached value from the local tier or Redis; never calls a loader"""
+        self._ensure_subscriber()
+        key = (namespace, subdomain)
+        now = time.time()
+        entry = self._local.get(key)
+        client = None
+
+        if entry is not None and now - entry.stored_at < self.ttl:
+            if self._subscribed or now - entry.checked_at < VERSION_CHECK_SECONDS:
+                self.hits += 1
+                return entry.value
+            client = get_redis_client()
+            if client is None:
+                self.hits += 1
+                return entry.value
+            version = self._current_version(client, subdomain)
+            if version == entry.version:
+                entry.checked_at = now
+                self.hits += 1
+                return entry.value
+
+        if not shared:
+            return default
+        client = client or get_redis_client()
+        if client is None:
+            return default
+        version = self._current_version(client, subdomain)
+        if version is None:
+            return default
+        try:
+            raw = client.get(VALUE_KEY.format(namespace=namespace, subdomain=subdomain, version=version))
+        except Exception as e:
+            logger.warning(f"Tenant cache GET error for {namespace}:{subdomain}: {e}")
+            return default
+        if raw is None:
+            return default
+        value = json.loads(raw)
+        self._store(namespace, subdomain, value, version)
+        self.hits += 1
+        return value
+
+    def stale(self, namespace: str, subdomain: str) -> Any:
+        """Whatever the local tier holds, regardless of age (for DB outages)"""
+        entry = self._local.get((namespace, subdomain))
+        return entry.value if entry is not None else None
+
+    def _store(self, namespace: str, subdomain: str, value, version: str):
+        with self._lock:
+            self._local[(namespace, subdomain)] = _Entry(value, version)
+            self._local.move_to_end((namespace, subdomain))
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    @staticmethod
+    def _current_version(client, subdomain: str) -> Optional[str]:
+        if client is None:
+            return None
+        try:
+            generation, version = client.mget(GENERATION_KEY, VERSION_KEY.format(subdomain=subdomain))
+            return f"{generation or 0}.{version or 0}"
+        except Exception as e:
+            logger.warning(f"Tenant cache version lookup failed for {subdomain}: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(self, subdomain: Optional[str] = None):
+        """Bump the tenant's version (or the global generation when subdomain is None) and broadcast"""
+        client = get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.incr(GENERATION_KEY if subdomain is None else VERSION_KEY.format(subdomain=subdomain))
+                pipe.publish(INVALIDATE_CHANNEL, subdomain or '*')
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Tenant cache invalidation broadcast failed for {subdomain or '*'}: {e}")
+        self._drop_local(subdomain)
+
+    def add_invalidation_listener(self, callback: Callable[[Optional[str]], None]):
+        """callback(subdomain) runs on every local or remote invalidation (None means all tenants)"""
+        self._listeners.append(callback)
+
+    def _drop_local(self, subdomain: Optional[str]):
+        with self._lock:
+            self._epoch += 1
+            if subdomain is None:
+                self._local.clear()
+            else:
+                for key in [k for k in self._local if k[1] == subdomain]:
+                    del self._local[key]
+        for callback in self._listeners:
+            try:
+                callback(subdomain)
+            except Exception as e:
+                logger.warning(f"Tenant cache invalidation listener failed: {e}")
+
+    def _ensure_subscriber(self):
+        if self._subscriber is not None:
+            return
+        now = time.time()
+        if now - self._subscriber_attempted < 30:
+            return
+        self._subscriber_attempted = now
+        if get_redis_client() is None:
+            return
+        with self._lock:
+            if self._subscriber is None:
+                self._subscriber = threading.Thread(target=self._subscribe_loop, daemon=True,
+                                                    name='tenant-config-invalidation')
+                self._subscriber.start()
+
+    def _subscribe_loop(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATE_CHANNEL)
+                # Anything published while we were disconnected was missed
+                self._drop_local(None)
+                self._subscribed = True
+                logger.info(f"✅ Subscribed to {INVALIDATE_CHANNEL}")
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        subdomain = message['data']
+                        self._drop_local(None if subdomain == '*' else subdomain)
+            except Exception as e:
+                self._subscribed = False
+                logger.warning(f"⚠️ Tenant cache subscriber disconnected: {e}")
+                time.sleep(2)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def cache_size_bytes(self) -> int:
+        with self._lock:
+            values = [entry.value for entry in self._local.values()]
+        return estimate_size(values)
+
+    def cache_entries(self) -> int:
+        return len(self._local)
+
+    def shrink(self, nbytes: int) -> int:
+        """Memory budget: drop least recently stored entries (they reload from Redis) until about nbytes are freed"""
+        freed = 0
+        with self._lock:
+            while self._local and freed < nbytes:
+                _, entry = self._local.popitem(last=False)
+                freed += deep_sizeof(entry.value)
+            self._epoch += 1
+        return freed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._local),
+            'max_entries': self.max_entries,
+            'subscribed': self._subscribed,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+_tenant_config_cache = TenantConfigCache()
+register_cache('tenant_config', _tenant_config_cache, cost=2)
+
+
+def get_tenant_config_cache() -> TenantConfigCache:
+    return _tenant_config_cache
@@ -2,6 +2,7 @@ import threading
 import time
 from flask_socketio import SocketIO, emit
 from src.goalserve_client import OptimizedGoalServeClient
+from src.services.cash_out_pricer import get_cash_out_pricer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -38,6 +39,12 @@ class LiveOddsWebSocketService:
                 live_odds = self.client.get_live_odds('soccer')
                 
                 if live_odds:
+                    # Reprice cash-out offers on bets in these matches
+                    try:
+                        get_cash_out_pricer().on_live_odds('soccer', live_odds)
+                    except Exception as e:
+                        logger.error(f"Error feeding live odds to the cash-out pricer: {e}")
+                    
                     # Check for critical matches (last 10 minutes or close score)
                     current_critical_matches = set()
                     for match in live_odds:
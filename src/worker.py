@@ -1,7 +1,19 @@
 #!/usr/bin/env python3
 """
-Worker module for bet settlement service
-Runs in a separate container for local development
+Worker entry points for the split web/odds/settlement/socket topology
+
+    python -m src.worker odds        # GoalServe pre-match fetch, snapshot build, odds relay
+    python -m src.worker settlement  # bet settlement and the bet stats drift check
+    python -m src.worker socket      # live odds poller, cash-out pricer, user socket events
+
+Each worker runs its loops on a job runner leased per PROCESS_TYPE, so a tier
+can run on several machines with one doing the work and the rest on standby.
+Workers reach the web tier through Redis (services/event_bus.py, odds_relay.py)
+and emit to clients through the Socket.IO Redis message queue, so an event
+reaches users connected to any web process. Run with WORKER_TOPOLOGY=split so the
+web processes stop doing the same work. Without an argument the role follows
+PROCESS_TYPE (worker_odds, worker_settlement, worker_socket), defaulting to
+settlement. Each worker serves its Prometheus metrics on METRICS_PORT.
 """
 
 import os
@@ -14,41 +26,154 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.settings import settings
-from src.bet_settlement_service import BetSettlementService
+from src.services.job_runner import get_job_runner
+from src.utils import cache_registry, metrics, profiler, structured_log
+from src.utils.structured_log import configure_logging
+
+ROLES = {'odds': 'worker_odds', 'settlement': 'worker_settlement', 'socket': 'worker_socket'}
+
+job_runner = None
 
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
     print("\n🛑 Shutting down worker...")
-    if bet_settlement_service:
-        bet_settlement_service.stop()
+    if job_runner:
+        job_runner.stop()
     print("✅ Worker stopped gracefully")
     sys.exit(0)
 
+def settlement_app():
+    """Minimal Flask app for the settlement service (it reads bets through Flask-SQLAlchemy)"""
+    from flask import Flask
+    from flask_sqlalchemy import SQLAlchemy
+    from src.models.betting import bind_models_to_db
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL') or os.getenv('PG_DSN')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db = SQLAlchemy()
+    db.init_app(app)
+    app.db = db
+    bind_models_to_db(db)
+    return app
+
+def start_odds(runner):
+    """Fetch pre-match odds, build the public snapshot and relay each sport to the caches"""
+    from src.prematch_odds_service import get_prematch_odds_service
+    from src.services.odds_relay import publish_prematch_odds
+    from src.services.snapshot_refresher import get_snapshot_refresher
+
+    prematch_odds_service = get_prematch_odds_service()
+    prematch_odds_service.add_odds_updated_callback(publish_prematch_odds)
+
+    # Build from this instance's files only while it is the one fetching
+    snapshot_refresher = get_snapshot_refresher()
+    snapshot_refresher.leader_check = lambda: runner.leader.is_leader
+    prematch_odds_service.add_odds_updated_callback(snapshot_refresher.on_odds_updated)
+    snapshot_refresher.start()
+
+    runner.add_service(
+        'prematch-odds',
+        start=prematch_odds_service.start,
+        stop=prematch_odds_service.stop,
+        is_running=lambda: prematch_odds_service.running,
+        leader_only=True,
+    )
+
+def start_settlement(runner):
+    """Settle bets and keep the bet stats rollup honest"""
+    app = settlement_app()
+    # Imported after the models are bound to the app's db
+    from src.bet_settlement_service import BetSettlementService
+    from src.services.bet_stats import VERIFY_INTERVAL, run_bet_stats_verification
+
+    bet_settlement_service = BetSettlementService(app)
+    runner.add_service(
+        'bet-settlement',
+        start=bet_settlement_service.start,
+        stop=bet_settlement_service.stop,
+        is_running=lambda: bet_settlement_service.running,
+        leader_only=True,
+    )
+    runner.add_job('bet-stats-verify', run_bet_stats_verification, interval=VERIFY_INTERVAL,
+                   jitter=300, leader_only=True, initial_delay=VERIFY_INTERVAL)
+
+def start_socket(runner):
+    """Poll live odds, reprice cash-outs and emit user events to the socket rooms"""
+    from flask_socketio import SocketIO
+    from src.live_odds_cache_service import get_live_odds_cache_service
+    from src.services.cash_out_pricer import get_cash_out_pricer
+    from src.services.event_bus import emit_user_events
+    from src.services.odds_relay import follow_prematch_odds
+    from src.websocket_service import LiveOddsWebSocketService
+
+    # Write-only Socket.IO: emits go through the Redis message queue to the web processes' clients
+    socketio = SocketIO(message_queue=os.getenv("REDIS_URL"))
+
+    cache_service = get_live_odds_cache_service()
+    cache_service.start()
+    follow_prematch_odds(cache_service)
+
+    cash_out_pricer = get_cash_out_pricer()
+    cache_service.ui_update_callbacks.append(cash_out_pricer.on_prematch_odds)
+    cash_out_pricer.start(socketio)
+
+    emit_user_events(socketio)
+
+    live_odds_service = LiveOddsWebSocketService(socketio)
+    runner.add_service(
+        'live-odds-websocket',
+        start=live_odds_service.start,
+        stop=live_odds_service.stop,
+        is_running=lambda: live_odds_service.running,
+        leader_only=True,
+    )
+
 def main():
     """Main worker function"""
-    print("👷 Starting GoalServe Sports Betting Platform - Settlement Worker")
+    global job_runner
+    role = sys.argv[1] if len(sys.argv) > 1 else next(
+        (name for name, process_type in ROLES.items() if process_type == os.getenv('PROCESS_TYPE')), 'settlement')
+    if role not in ROLES:
+        print(f"❌ Unknown worker role {role!r}, expected one of: {', '.join(ROLES)}")
+        sys.exit(2)
+    # Pool sizing, the job runner's lease and log records all key off PROCESS_TYPE
+    os.environ['PROCESS_TYPE'] = ROLES[role]
+    configure_logging()
+
+    print(f"👷 Starting GoalServe Sports Betting Platform - {role.capitalize()} Worker")
     print(f"📍 Environment: {settings.ENV}")
     print(f"📍 Database: {settings.DATABASE_TYPE}")
     print(f"📍 Redis: {settings.REDIS_URL}")
-    
+
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
-    
-    # Initialize bet settlement service
-    global bet_settlement_service
+
     try:
-        bet_settlement_service = BetSettlementService()
-        bet_settlement_service.start()
-        print("✅ Bet settlement service started successfully")
-        
+        job_runner = get_job_runner()
+        {'odds': start_odds, 'settlement': start_settlement, 'socket': start_socket}[role](job_runner)
+
+        def log_pool_metrics():
+            from src.db_compat import log_pool_metrics
+            log_pool_metrics()
+
+        job_runner.add_job('pool-metrics', log_pool_metrics, interval=60, jitter=5)
+        job_runner.add_job('log-counters', structured_log.flush_counters, interval=structured_log.COUNTER_INTERVAL)
+        profiler.configure_profiling()
+        job_runner.add_job('tracemalloc-snapshot', profiler.memory_profiler.snapshot, interval=profiler.MEMORY_INTERVAL)
+        job_runner.add_job('cache-budget', cache_registry.enforce_budget, interval=cache_registry.BUDGET_INTERVAL)
+        job_runner.start()
+        metrics.start_metrics_server()
+        print(f"✅ {role.capitalize()} worker started")
+
         # Keep the worker running
         print("🔄 Worker is running. Press Ctrl+C to stop.")
         while True:
             time.sleep(1)
-            
+
     except Exception as e:
-        print(f"❌ Error starting settlement service: {e}")
+        print(f"❌ Error starting {role} worker: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":